@@ -0,0 +1,85 @@
+"""
+Chunking throughput (articles per second) of the news ingestion splitter.
+
+Usage:
+    python -m benchmarks.bench_chunking [--articles 20000 100000] [--workers 4] [--sync-batch 500]
+
+Articles are synthetic news texts of 1 to 12 paragraphs. Three modes are compared:
+
+* rebuilt per sync: a new tokenizer and splitter for every ``--sync-batch``
+  articles, as ``process_content`` used to do,
+* inline: the process-wide splitter in the calling thread,
+* pool: the process-wide splitter in ``--workers`` worker processes (pool start-up
+  included, as in the first large sync after a restart).
+
+The pool only pays off with more than one free core. Without network access the
+tiktoken encoding cannot be loaded and every mode uses the regex token counter,
+so the rebuilt mode then understates the cost of reloading the encoding.
+"""
+import argparse
+import random
+import time
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.common import print_table, write_results
+from rag_graphs.news_rag_graph.chunking import NEWS_CHUNK_OVERLAP, NEWS_CHUNK_TOKENS, ArticleChunker, split_texts
+from utils.tokenizer import Tokenizer
+
+WORDS = ("shares", "revenue", "quarter", "analysts", "guidance", "margin", "deal", "Europe", "India", "orders",
+         "growth", "profit", "dividend", "board", "rose", "fell", "percent", "estimates", "volume", "outlook")
+
+
+def make_articles(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        paragraphs = [" ".join(rng.choices(WORDS, k=rng.randint(40, 90))) + "." for _ in range(rng.randint(1, 12))]
+        texts.append("\n\n".join(paragraphs))
+    return texts, [{"ticker": f"T{i % 50}.NS", "title": f"Update {i}"} for i in range(count)]
+
+
+def rebuilt_per_sync(texts, metadatas, sync_batch: int) -> int:
+    chunks = 0
+    for i in range(0, len(texts), sync_batch):
+        splitter = RecursiveCharacterTextSplitter(chunk_size=NEWS_CHUNK_TOKENS, chunk_overlap=NEWS_CHUNK_OVERLAP,
+                                                  length_function=Tokenizer().count)
+        chunks += sum(len(splitter.split_text(text)) for text in texts[i:i + sync_batch])
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sync-batch", type=int, default=500, help="Articles per sync in the rebuilt mode.")
+    parser.add_argument("--output", default="benchmarks/results/chunking.json")
+    args = parser.parse_args()
+
+    split_texts(["warm up the shared splitter"], [{}])
+    rows = []
+    for count in args.articles:
+        texts, metadatas = make_articles(count)
+        pool = ArticleChunker(workers=args.workers, parallel_min_docs=0)
+        modes = (
+            ("rebuilt per sync", lambda: rebuilt_per_sync(texts, metadatas, args.sync_batch)),
+            ("inline", lambda: len(ArticleChunker(workers=1).split(texts, metadatas))),
+            ("pool", lambda: len(pool.split(texts, metadatas))),
+        )
+        try:
+            for mode, run in modes:
+                started = time.perf_counter()
+                chunks = run()
+                elapsed = time.perf_counter() - started
+                rows.append({"mode": mode, "articles": count, "chunks": chunks, "seconds": elapsed,
+                             "docs_per_sec": count / elapsed})
+        finally:
+            pool.shutdown()
+
+    print(f"{args.workers} pool workers, rebuilt mode syncs {args.sync_batch} articles at a time")
+    print_table(rows, ["mode", "articles", "chunks", "seconds", "docs_per_sec"])
+    write_results(args.output, {"settings": vars(args), "results": rows})
+
+
+if __name__ == "__main__":
+    main()
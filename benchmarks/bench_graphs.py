@@ -0,0 +1,176 @@
+"""
+End-to-end and per-node latency of the three RAG graphs against offline stand-ins
+(see ``benchmarks/graph_stubs.py``): a fake Ollama behind the real LLM gateway,
+deterministic embeddings, an in-memory Mongo, a temporary local Chroma and an
+in-memory SQLite copy of ``stock_data``.
+
+Usage:
+    python -m benchmarks.bench_graphs [--iterations 20] [--llm-latency-ms 50]
+        [--output benchmarks/results/graphs.json] [--compare old.json]
+
+Per-node latency is measured from the graph's ``updates`` stream: each update
+arrives when its node finishes, so the gap since the previous update is the
+node's run time. Results are written as JSON; ``--compare`` prints the change
+of every p50/p95 against an earlier run, so regressions show up between commits.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from benchmarks.common import summarize, print_table, write_results
+
+TICKERS = ("TCS.NS", "INFY.NS", "RELIANCE.NS", "HDFCBANK.NS")
+
+SCENARIOS = {
+    "news": ("news", {"question": "What is the latest news on TCS?", "ticker": "TCS.NS"}),
+    "stock_data": ("stock_data", {"question": "How did INFY close over the last three months?"}),
+    "stock_charts": ("stock_charts", {"question": "Plot the closing price of RELIANCE for the last 90 days."}),
+}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def seed(stubs: Dict[str, Any], articles_per_ticker: int, history_days: int):
+    """Fill the stand-in Mongo, Chroma (through DocumentSyncManager) and stock table."""
+    from benchmarks.bench_ohlcv_cache import synthetic_history
+    from rag_graphs.news_rag_graph.ingestion import DocumentSyncManager
+
+    collection = stubs["mongo"].get_collection()
+    today = date.today()
+    for ticker in TICKERS:
+        symbol = ticker.split(".")[0]
+        for i in range(articles_per_ticker):
+            collection.insert_one({
+                "ticker": ticker,
+                "title": f"{symbol} update {i}",
+                "description": f"{symbol} shares moved {i % 7 - 3}% on day {i} as analysts revised "
+                               f"estimates for {symbol}; volumes were {1000 + i * 37} lots.",
+                "pubDate": (today - timedelta(days=i)).isoformat(),
+                "synced": False,
+            })
+        stubs["stock_db"].load(ticker, synthetic_history(history_days, today))
+    DocumentSyncManager().sync_documents()
+
+
+def run_once(graph, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a graph once, returning the end-to-end time and the time of every node run."""
+    nodes: List[tuple] = []
+    started = last = time.perf_counter()
+    for update in graph.stream(dict(inputs), stream_mode="updates"):
+        now = time.perf_counter()
+        for node in update:
+            nodes.append((node, (now - last) * 1000))
+        last = now
+    return {"total_ms": (time.perf_counter() - started) * 1000, "nodes": nodes}
+
+
+def run_scenario(name: str, graph_name: str, inputs: Dict[str, Any], iterations: int, warmup: int):
+    from rag_graphs.registry import get_graph
+
+    graph = get_graph(graph_name)
+    for _ in range(warmup):
+        run_once(graph, inputs)
+    totals, per_node = [], defaultdict(list)
+    for _ in range(iterations):
+        run = run_once(graph, inputs)
+        totals.append(run["total_ms"])
+        for node, elapsed in run["nodes"]:
+            per_node[node].append(elapsed)
+    return {
+        "graph": graph_name,
+        "end_to_end": summarize(totals),
+        "nodes": {node: summarize(samples) for node, samples in per_node.items()},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print p50/p95 changes of every scenario and node against an earlier run."""
+    rows = []
+    for scenario, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if before is None:
+            continue
+        pairs = [("(end to end)", result["end_to_end"], before["end_to_end"])]
+        pairs += [(node, stats, before["nodes"].get(node)) for node, stats in result["nodes"].items()]
+        for node, now, then in pairs:
+            if not then or not then.get("n"):
+                continue
+            row = {"scenario": scenario, "node": node}
+            for key in ("p50_ms", "p95_ms"):
+                row[key] = now[key]
+                row[f"{key}_change%"] = (now[key] - then[key]) / then[key] * 100 if then[key] else None
+            rows.append(row)
+    print(f"\nAgainst {baseline.get('revision', '?')}:")
+    print_table(rows, ["scenario", "node", "p50_ms", "p50_ms_change%", "p95_ms", "p95_ms_change%"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--llm-latency-ms", type=float, default=50,
+                        help="Fixed latency of every fake LLM call.")
+    parser.add_argument("--ms-per-token", type=float, default=0.5,
+                        help="Additional fake LLM latency per output word.")
+    parser.add_argument("--embed-latency-ms", type=float, default=5)
+    parser.add_argument("--articles-per-ticker", type=int, default=25)
+    parser.add_argument("--history-days", type=int, default=2 * 365)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "graphs.json"))
+    parser.add_argument("--compare", help="Earlier results JSON to compare against.")
+    args = parser.parse_args()
+
+    # The stand-ins must be installed before any graph or chain module is imported
+    from benchmarks.graph_stubs import install_stubs
+
+    vector_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    try:
+        stubs = install_stubs(
+            llm_latency_s={"default": args.llm_latency_ms / 1000},
+            per_token_s=args.ms_per_token / 1000,
+            embed_latency_s=args.embed_latency_ms / 1000,
+            vector_dir=vector_dir,
+        )
+        seed(stubs, args.articles_per_ticker, args.history_days)
+
+        results = {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "scenarios": {},
+        }
+        for name in args.scenarios:
+            graph_name, inputs = SCENARIOS[name]
+            results["scenarios"][name] = run_scenario(name, graph_name, inputs, args.iterations, args.warmup)
+        results["llm_gateway"] = stubs["gateway"].stats()
+    finally:
+        shutil.rmtree(vector_dir, ignore_errors=True)
+
+    rows = []
+    for name, result in results["scenarios"].items():
+        rows.append({"scenario": name, "node": "(end to end)", **result["end_to_end"]})
+        rows += [{"scenario": name, "node": node, **stats} for node, stats in result["nodes"].items()]
+    print_table(rows, ["scenario", "node", "n", "mean_ms", "p50_ms", "p95_ms", "max_ms"])
+
+    write_results(args.output, results)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
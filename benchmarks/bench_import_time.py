@@ -0,0 +1,64 @@
+"""
+Measure the cold-start import time of ``rest_api.main`` in fresh interpreters.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--ref <git-ref>]
+
+With ``--ref`` the same measurement is also taken on a temporary git worktree
+of that revision (e.g. the commit before the lazy graph registry), so the two
+numbers can be compared side by side. A failing import is reported with its
+last error line rather than a time.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import summarize, print_table
+
+MODULE = "rest_api.main"
+
+
+def measure(cwd: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", f"import {MODULE}"],
+            cwd=cwd, capture_output=True, text=True,
+            env={**os.environ, "PYTHONPATH": cwd},
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {"error": lines[-1] if lines else f"exit code {proc.returncode}", "elapsed_ms": elapsed}
+        samples.append(elapsed)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="git revision to compare against")
+    args = parser.parse_args()
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    rows = [{"tree": "working tree", **measure(repo, args.runs)}]
+
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, "ref")
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.ref],
+                           cwd=repo, check=True, capture_output=True)
+            try:
+                rows.append({"tree": args.ref, **measure(worktree, args.runs)})
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=repo, capture_output=True)
+
+    print_table(rows, ["tree", "n", "p50_ms", "max_ms", "error", "elapsed_ms"])
+
+
+if __name__ == "__main__":
+    main()
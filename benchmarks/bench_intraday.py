@@ -0,0 +1,122 @@
+"""
+Ingestion throughput and query latency of intraday bars: a year of one-minute
+bars for 50 tickers, written session by session with their rollups, then read
+from the rollups the granularity chooser picks against the minute table.
+
+Usage:
+    python -m benchmarks.bench_intraday [--tickers 50] [--days 250] [--repeat 20]
+
+Needs a PostgreSQL server (14+, for ``date_bin``) and the ``POSTGRES_*``
+settings of the scraper. Everything lives in the scratch schema ``--schema``,
+which is dropped and recreated. Bars are a random walk per ticker over NSE
+sessions (09:15-15:30, weekdays, 375 bars). Each session of all tickers is one
+``IntradayStore.upsert_bars`` call, as the intraday scrape would write it, so the
+ingestion rate includes the partition checks and all four rollups.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from benchmarks.common import summarize, time_calls, print_table, write_results
+
+SESSION_MINUTES = 375
+IST = ZoneInfo("Asia/Kolkata")
+
+
+def sessions(days: int, last: datetime):
+    """Session opens (09:15 IST) of the ``days`` weekdays up to ``last``."""
+    opens, day = [], last
+    while len(opens) < days:
+        if day.weekday() < 5:
+            opens.append(datetime(day.year, day.month, day.day, 9, 15, tzinfo=IST))
+        day -= timedelta(days=1)
+    return opens[::-1]
+
+
+def session_rows(tickers, session_open: datetime, prices: np.ndarray, rng):
+    """Minute bars of one session for every ticker; ``prices`` carries each ticker's last close over."""
+    minutes = [session_open + timedelta(minutes=m) for m in range(SESSION_MINUTES)]
+    steps = rng.normal(scale=0.0008, size=(len(tickers), SESSION_MINUTES))
+    closes = prices[:, None] * np.exp(np.cumsum(steps, axis=1))
+    opens = np.concatenate([prices[:, None], closes[:, :-1]], axis=1)
+    spread = np.abs(rng.normal(scale=0.0005, size=closes.shape)) * closes
+    highs, lows = np.maximum(opens, closes) + spread, np.minimum(opens, closes) - spread
+    volumes = rng.integers(100, 50_000, size=closes.shape)
+    prices[:] = closes[:, -1]
+    return [(ticker, minutes[m], float(opens[t, m]), float(highs[t, m]), float(lows[t, m]), float(closes[t, m]),
+             int(volumes[t, m]))
+            for t, ticker in enumerate(tickers) for m in range(SESSION_MINUTES)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--days", type=int, default=250, help="Trading sessions (250 is about a year).")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--schema", default="bench_intraday")
+    parser.add_argument("--output", default="benchmarks/results/intraday.json")
+    args = parser.parse_args()
+
+    from benchmarks.bench_price_stats import NIFTY_50
+    from db.intraday import GRANULARITIES, IntradayStore
+    from db.migrations.runner import migrate
+    from scraper.stock_data_scraper import StockDataScraper
+
+    db_client = StockDataScraper.initialize_db_client()
+    db_client.execute_query(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE')
+    db_client.execute_query(f'CREATE SCHEMA "{args.schema}"')
+    # Session setting: every statement of the shared connection resolves the tables in the scratch schema
+    db_client.execute_query(f'SET search_path TO "{args.schema}"')
+    migrate(db_client)
+
+    tickers = [f"{NIFTY_50[i % len(NIFTY_50)]}{'' if i < len(NIFTY_50) else i}.NS" for i in range(args.tickers)]
+    opens = sessions(args.days, datetime.now(IST) - timedelta(days=1))
+    store = IntradayStore(db_client)
+    rng = np.random.default_rng(7)
+    prices = rng.uniform(100, 3000, size=len(tickers))
+
+    batch_ms, rows_written = [], 0
+    started = time.perf_counter()
+    for session_open in opens:
+        rows = session_rows(tickers, session_open, prices, rng)
+        batch_started = time.perf_counter()
+        rows_written += store.upsert_bars(rows)
+        batch_ms.append((time.perf_counter() - batch_started) * 1000)
+    ingest_s = time.perf_counter() - started
+    for granularity in GRANULARITIES:
+        db_client.execute_query(f"ANALYZE stock_bars_{granularity}")
+
+    ticker, last_open = tickers[len(tickers) // 2], opens[-1]
+    queries = {
+        "session_hourly": (last_open, last_open + timedelta(minutes=SESSION_MINUTES + 45), timedelta(hours=1)),
+        "high_10:00-10:20": (last_open + timedelta(minutes=45), last_open + timedelta(minutes=65), None),
+        "month_of_sessions": (opens[-21], last_open + timedelta(days=1), None),
+        "year_of_sessions": (opens[0], last_open + timedelta(days=1), None),
+    }
+    rows = []
+    for name, (start, end, resolution) in queries.items():
+        for mode, accepted in (("chosen", resolution), ("1m only", GRANULARITIES["1m"])):
+            result = {}
+
+            def read():
+                result["granularity"], result["columns"] = store.read_bars(ticker, start, end, accepted)
+
+            samples = time_calls(read, args.repeat, warmup=2)
+            rows.append({"query": name, "mode": mode, "granularity": result["granularity"],
+                         "bars": len(result["columns"]["ts"]), **summarize(samples)})
+
+    ingest = {"tickers": len(tickers), "sessions": len(opens), "minute_bars": rows_written,
+              "seconds": ingest_s, "bars_per_s": rows_written / max(ingest_s, 1e-9),
+              **{f"batch_{k}": v for k, v in summarize(batch_ms).items() if k in ("p50_ms", "p95_ms")}}
+    print_table([ingest], list(ingest))
+    print()
+    print_table(rows, ["query", "mode", "granularity", "bars", "p50_ms", "p95_ms", "mean_ms"])
+    write_results(args.output, {"ingest": ingest, "queries": rows})
+    db_client.execute_query(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE')
+
+
+if __name__ == "__main__":
+    main()
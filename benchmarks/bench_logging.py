@@ -0,0 +1,93 @@
+"""
+Per-call overhead of the logging modes seen by the calling (request) thread.
+
+Usage:
+    python -m benchmarks.bench_logging [--calls 20000] [--threads 4]
+
+Compares the default synchronous handlers (text file with rotation + console)
+with queue mode (records handed to a background writer, JSON file lines), and
+queue mode with node banners that the sampler drops. Console output goes to
+/dev/null and files to a temporary directory. For queue mode the time the
+background writer needs to drain the queue afterwards is reported separately.
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import summarize, print_table
+from utils import logger_config
+
+
+def _run_calls(logger, message: str, calls: int, threads: int):
+    """Log ``calls`` messages from each of ``threads`` threads; return per-call times in microseconds."""
+    samples = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for i in range(calls):
+            started = time.perf_counter_ns()
+            logger.info(message, i) if "%d" in message else logger.info(message)
+            local.append((time.perf_counter_ns() - started) / 1000)
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20_000, help="Log calls per thread.")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix="bench_logs_")
+    logger_config.LOG_DIR = log_dir
+    # Size rotation stays in play without filling the disk
+    logger_config.LOG_MAX_BYTES = 5 * 1024 * 1024
+    logger_config.LOG_BACKUP_COUNT = 2
+    cases = [
+        ("sync", "sync", "text", "processed row %d"),
+        ("queue", "queue", "json", "processed row %d"),
+        ("queue, banners sampled", "queue", "json", "---GRADE DOCUMENTS---"),
+    ]
+    rows = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        for label, mode, file_format, message in cases:
+            logger_config.LOG_FORMAT = file_format
+            logger = logger_config.setup_logger(f"bench_{label.replace(' ', '_').replace(',', '')}", mode=mode)
+            dropped_before = logger_config.queue_logging_stats()["dropped"]
+            samples, elapsed = _run_calls(logger, message, args.calls, args.threads)
+            dropped = logger_config.queue_logging_stats()["dropped"]
+            drain_started = time.perf_counter()
+            if mode == "queue":
+                # Stopping the listener waits until every queued record is written
+                logger_config.stop_queue_logging()
+            drain = time.perf_counter() - drain_started
+            # summarize() labels its fields in ms; these samples are microseconds
+            stats = summarize(samples)
+            rows.append({
+                "mode": label,
+                "calls": len(samples),
+                "calls_per_s": len(samples) / elapsed,
+                "mean_us": stats["mean_ms"],
+                "p50_us": stats["p50_ms"],
+                "p99_us": stats["p99_ms"],
+                "drain_s": drain if mode == "queue" else None,
+                "dropped": dropped - dropped_before if mode == "queue" else None,
+            })
+    print(f"{args.threads} threads x {args.calls} calls, logs in {log_dir}")
+    print_table(rows, ["mode", "calls", "calls_per_s", "mean_us", "p50_us", "p99_us", "drain_s", "dropped"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare date-window reads from the memory-mapped OHLCV cache with the PostgreSQL path.
+
+Usage:
+    python -m benchmarks.bench_ohlcv_cache [--iterations 500] [--seed-postgres]
+
+The cache side always runs against a synthetic five-year history in a temporary
+directory. The PostgreSQL side runs only when the database from .env is reachable;
+``--seed-postgres`` first inserts the same synthetic history under ``BENCH.NS``.
+"""
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import summarize, time_calls, print_table
+from db.ohlcv_cache import OHLCVCache
+
+TICKER = "BENCH.NS"
+WINDOWS = {"30d": 30, "5y": 5 * 365}
+
+
+def synthetic_history(days: int, end: date):
+    dates = np.arange(np.datetime64(end - timedelta(days=days - 1), "D"), np.datetime64(end, "D") + 1)
+    rng = np.random.default_rng(42)
+    close = 1000 + np.cumsum(rng.normal(0, 5, size=dates.size))
+    return {
+        "date": dates,
+        "open": close + rng.normal(0, 1, size=dates.size),
+        "high": close + 5,
+        "low": close - 5,
+        "close": close,
+        "volume": rng.integers(1_000, 1_000_000, size=dates.size),
+    }
+
+
+def seed_postgres(db_client, columns):
+    db_client.execute_query("DELETE FROM stock_data WHERE ticker = %s", (TICKER,))
+    for i in range(columns["date"].size):
+        db_client.create("stock_data", {
+            "ticker": TICKER,
+            "date": columns["date"][i].astype(date),
+            "open": float(columns["open"][i]),
+            "high": float(columns["high"][i]),
+            "low": float(columns["low"][i]),
+            "close": float(columns["close"][i]),
+            "volume": int(columns["volume"][i]),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed-postgres", action="store_true")
+    args = parser.parse_args()
+
+    today = date.today()
+    columns = synthetic_history(WINDOWS["5y"] + 30, today)
+    rows = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = OHLCVCache(directory)
+        cache.write(TICKER, columns)
+        for label, days in WINDOWS.items():
+            samples = time_calls(lambda: cache.window(TICKER, days), args.iterations)
+            rows.append({"path": "ohlcv_cache", "window": label, **summarize(samples)})
+
+    try:
+        from scraper.stock_data_scraper import StockDataScraper
+
+        db_client = StockDataScraper.initialize_db_client()
+        db_client.connect()
+        if args.seed_postgres:
+            seed_postgres(db_client, columns)
+
+        def fetch(days):
+            results, names = db_client.fetch_query(
+                "SELECT date, open, high, low, close, volume FROM stock_data "
+                "WHERE ticker = %s AND date >= CURRENT_DATE - %s * INTERVAL '1 day' ORDER BY date",
+                (TICKER, days),
+            )
+            return pd.DataFrame(results, columns=names)
+
+        for label, days in WINDOWS.items():
+            samples = time_calls(lambda: fetch(days), args.iterations)
+            rows.append({"path": "postgres", "window": label, **summarize(samples)})
+    except Exception as e:
+        print(f"PostgreSQL path skipped: {e}")
+
+    print_table(rows, ["path", "window", "n", "p50_ms", "p99_ms", "mean_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Batch price statistics (``GET /stock/price-stats``) against one
+``/stock/{ticker}/price-stats`` call per ticker.
+
+Usage:
+    python -m benchmarks.bench_price_stats [--tickers 50] [--llm-latency 0.3] [--repeat 3]
+
+Runs offline on the stand-ins of ``benchmarks/graph_stubs.py``: the single-ticker
+endpoint goes through the stock data graph with a fake LLM that sleeps
+``--llm-latency`` seconds per call, and both endpoints read the same synthetic
+two-year history from the in-memory SQLite table. The single calls compute one
+statistic per ticker; the batch call computes the full matrix of operations,
+price types and windows for all tickers in one request.
+"""
+import argparse
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.common import summarize, print_table, write_results
+
+NIFTY_50 = (
+    "ADANIENT", "ADANIPORTS", "APOLLOHOSP", "ASIANPAINT", "AXISBANK", "BAJAJAUTO", "BAJFINANCE",
+    "BAJAJFINSV", "BEL", "BHARTIARTL", "BPCL", "BRITANNIA", "CIPLA", "COALINDIA", "DRREDDY",
+    "EICHERMOT", "GRASIM", "HCLTECH", "HDFCBANK", "HDFCLIFE", "HEROMOTOCO", "HINDALCO", "HINDUNILVR",
+    "ICICIBANK", "INDUSINDBK", "INFY", "ITC", "JSWSTEEL", "KOTAKBANK", "LT", "MARUTI", "NESTLEIND",
+    "NTPC", "ONGC", "POWERGRID", "RELIANCE", "SBILIFE", "SBIN", "SHRIRAMFIN", "SUNPHARMA",
+    "TATACONSUM", "TATAMOTORS", "TATASTEEL", "TCS", "TECHM", "TITAN", "TRENT", "ULTRACEMCO", "WIPRO",
+    "ZOMATO",
+)
+OPERATIONS = ("highest", "lowest", "average")
+PRICE_TYPES = ("open", "high", "low", "close")
+WINDOWS = (1, 7, 14, 30, 90, 365)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=len(NIFTY_50))
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds per fake LLM call.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/results/price_stats.json")
+    args = parser.parse_args()
+
+    # Must run before the app (and with it any chain module) is imported
+    from benchmarks.bench_ohlcv_cache import synthetic_history
+    from benchmarks.graph_stubs import install_stubs
+
+    stubs = install_stubs(llm_latency_s={"default": args.llm_latency},
+                          vector_dir=tempfile.mkdtemp(prefix="price_stats_chroma_"))
+    tickers = [f"{symbol}.NS" for symbol in NIFTY_50[:args.tickers]]
+    for ticker in tickers:
+        stubs["stock_db"].load(ticker, synthetic_history(2 * 365, date.today()))
+
+    from fastapi.testclient import TestClient
+    from rest_api.main import app
+    client = TestClient(app)
+
+    single_ms, batch_ms = [], []
+    batch_params = {"tickers": ",".join(tickers), "operations": ",".join(OPERATIONS),
+                    "price_types": ",".join(PRICE_TYPES), "windows": ",".join(map(str, WINDOWS))}
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        for ticker in tickers:
+            response = client.get(f"/stock/{ticker}/price-stats",
+                                  params={"operation": "highest", "price_type": "close", "duration": "30"})
+            response.raise_for_status()
+        single_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        response = client.get("/stock/price-stats", params=batch_params)
+        response.raise_for_status()
+        batch_ms.append((time.perf_counter() - started) * 1000)
+
+    stats_per_ticker = len(OPERATIONS) * len(PRICE_TYPES) * len(WINDOWS)
+    rows = [
+        {"mode": f"{len(tickers)} single calls", "requests": len(tickers), "statistics": len(tickers),
+         **summarize(single_ms)},
+        {"mode": "1 batch call", "requests": 1, "statistics": len(tickers) * stats_per_ticker,
+         **summarize(batch_ms)},
+    ]
+    for row in rows:
+        row["ms_per_statistic"] = row["mean_ms"] / row["statistics"]
+    print(f"{len(tickers)} tickers, fake LLM latency {args.llm_latency}s, {args.repeat} repeats")
+    print_table(rows, ["mode", "requests", "statistics", "mean_ms", "p50_ms", "max_ms", "ms_per_statistic"])
+    print(f"\nBatch speed-up (wall time): {rows[0]['mean_ms'] / rows[1]['mean_ms']:.1f}x")
+    write_results(args.output, {"settings": vars(args), "results": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+News retrieval latency with and without the query embedding cache.
+
+Usage:
+    python -m benchmarks.bench_query_embeddings [--requests 500] [--embed-latency 0.03]
+
+Runs the news graph's retrieve node against the offline stand-ins of
+``benchmarks/graph_stubs.py``. Each embedding request sleeps ``--embed-latency``
+seconds, standing in for the Ollama round trip. The workload repeats the
+API's templated questions for the configured tickers, with a skew towards
+popular tickers and an occasional topic. Three modes are compared: no cache, a
+cold cache, and a cache warmed up for every ticker before the first request.
+"""
+import argparse
+import random
+import tempfile
+
+from benchmarks.common import summarize, time_calls, print_table, write_results
+from config.config_loader import ConfigLoader
+
+TOPICS = ("earnings", "dividend", "management")
+
+
+def workload(tickers, requests: int, seed: int = 7):
+    rng = random.Random(seed)
+    # Zipf-like popularity: a few tickers get most of the traffic
+    weights = [1 / (rank + 1) for rank in range(len(tickers))]
+    questions = []
+    for ticker in rng.choices(tickers, weights=weights, k=requests):
+        topic = rng.choice(TOPICS) if rng.random() < 0.2 else None
+        questions.append(f"News related to {topic} for {ticker}" if topic else f"News related to {ticker}")
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--embed-latency", type=float, default=0.03, help="Seconds per embedding request.")
+    parser.add_argument("--output", default="benchmarks/results/query_embeddings.json")
+    args = parser.parse_args()
+
+    # Must run before any chain module is imported
+    from benchmarks.bench_graphs import seed
+    from benchmarks.graph_stubs import install_stubs
+
+    stubs = install_stubs(llm_latency_s={"default": 0.0}, embed_latency_s=args.embed_latency,
+                          vector_dir=tempfile.mkdtemp(prefix="query_embeddings_chroma_"))
+    seed(stubs, articles_per_ticker=25, history_days=30)
+
+    import config.embedding_cache as embedding_cache
+    from config.llm_config import get_embeddings_singleton
+    from rag_graphs.news_rag_graph import ingestion
+    from rag_graphs.news_rag_graph.graph.nodes.retrieve import retrieve
+
+    tickers = ConfigLoader(config_file="config/config.json").get("SCRAPE_TICKERS") or ["TCS.NS"]
+    questions = workload(tickers, args.requests)
+    rows = []
+    for mode, max_bytes, warm in (("no cache", 0, False), ("cache, cold", 16 * 1024 * 1024, False),
+                                  ("cache, warmed up", 16 * 1024 * 1024, True)):
+        embedding_cache._query_embeddings_instance = embedding_cache.CachedQueryEmbeddings(
+            get_embeddings_singleton(), embedding_cache.QueryEmbeddingCache(max_bytes))
+        # The shared store holds on to its embedding function; rebuild it for this mode
+        ingestion._news_vectorstore = None
+        if warm:
+            embedding_cache.warm_up_news_queries(tickers)
+        cache = embedding_cache.get_query_embeddings().cache
+        hits_before = cache.stats()["hits"] if cache else 0
+        pending = iter(questions)
+        samples = time_calls(lambda: retrieve({"question": next(pending)}), iterations=len(questions), warmup=0)
+        # Warm-up lookups are not part of the measured traffic
+        rows.append({"mode": mode, **summarize(samples),
+                     "hit_rate": (cache.stats()["hits"] - hits_before) / len(questions) if cache else None,
+                     "cache_kib": cache.stats()["bytes"] / 1024 if cache else None})
+
+    print(f"{args.requests} retrievals over {len(tickers)} tickers, embedding latency {args.embed_latency}s")
+    print_table(rows, ["mode", "n", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "hit_rate", "cache_kib"])
+    write_results(args.output, {"settings": vars(args), "results": rows})
+
+
+if __name__ == "__main__":
+    main()
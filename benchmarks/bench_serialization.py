@@ -0,0 +1,80 @@
+"""
+Compare the old row-by-row chart/history serialization with the vectorized
+columnar path and orjson encoder, reporting encode time and body size (raw and gzip).
+
+Usage:
+    python -m benchmarks.bench_serialization [--days 1825] [--iterations 50]
+"""
+import argparse
+import gzip
+import json
+from datetime import date
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.bench_ohlcv_cache import synthetic_history
+from benchmarks.common import summarize, time_calls, print_table
+from rest_api.responses import FastJSONResponse, frame_to_columns, columns_to_payload, series_payload
+
+
+def legacy_chart(df):
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values(by="date")
+    series = [
+        {"date": row["date"].strftime('%Y-%m-%d'), "value": float(row["close"])}
+        for _, row in df.iterrows()
+    ]
+    return json.dumps(jsonable_encoder({"series": series})).encode("utf-8")
+
+
+def legacy_history(df):
+    return json.dumps(jsonable_encoder(df.to_dict(orient="records"))).encode("utf-8")
+
+
+def vectorized_chart(df, shape):
+    df = df.assign(date=pd.to_datetime(df["date"])).sort_values(by="date")
+    dates = df["date"].to_numpy().astype("datetime64[D]")
+    return FastJSONResponse({"series": series_payload(dates, df["close"].to_numpy(), shape)}).body
+
+
+def vectorized_history(df, shape):
+    return FastJSONResponse(columns_to_payload(frame_to_columns(df), shape)).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=5 * 365)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    columns = synthetic_history(args.days, date.today())
+    # Match the Postgres path, which yields datetime.date objects
+    df = pd.DataFrame({**columns, "date": columns["date"].astype(object)})
+
+    cases = {
+        ("chart", "legacy"): lambda: legacy_chart(df),
+        ("chart", "records"): lambda: vectorized_chart(df, "records"),
+        ("chart", "columnar"): lambda: vectorized_chart(df, "columnar"),
+        ("history", "legacy"): lambda: legacy_history(df),
+        ("history", "records"): lambda: vectorized_history(df, "records"),
+        ("history", "columnar"): lambda: vectorized_history(df, "columnar"),
+    }
+    rows = []
+    for (endpoint, variant), fn in cases.items():
+        body = fn()
+        samples = time_calls(fn, args.iterations)
+        rows.append({
+            "endpoint": endpoint,
+            "variant": variant,
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body)),
+            **summarize(samples),
+        })
+    print(f"{args.days} daily bars per response")
+    print_table(rows, ["endpoint", "variant", "bytes", "gzip_bytes", "p50_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Latency of typical stock_data queries on the original schema against the
+migrated one (unique (ticker, date) index and BRIN on date) and, with
+``--partitioned``, the yearly partitioned table.
+
+Usage:
+    python -m benchmarks.bench_stock_schema [--rows 10000000] [--tickers 2000] [--repeat 20] [--partitioned]
+
+Needs a PostgreSQL server (the ``POSTGRES_*`` settings of the scraper). All
+tables live in the scratch schema ``--schema``, which is dropped and recreated,
+so the real ``stock_data`` is never touched. Bars are generated on the server
+in the order monthly scrapes append them: month by month, each month ticker by
+ticker. The table starts at migration 0001 (the original ``CREATE TABLE``), is
+queried, then migrated step by step with ``db/migrations`` and queried again
+after each step. The table reports per query and schema the latency and the
+top plan node.
+"""
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import summarize, time_calls, print_table, write_results
+
+QUERIES = {
+    # What the SQL generation chain writes for "TCS closing prices last month"
+    "ticker_30d": ("SELECT date, close FROM stock_data WHERE ticker = %(ticker)s AND date >= %(month_ago)s"
+                   " ORDER BY date"),
+    "ticker_1y_max": ("SELECT MAX(high) FROM stock_data WHERE ticker = %(ticker)s"
+                      " AND date BETWEEN %(year_ago)s AND %(last)s"),
+    "ticker_latest": "SELECT * FROM stock_data WHERE ticker = %(ticker)s ORDER BY date DESC LIMIT 1",
+    "all_tickers_one_day": "SELECT ticker, close FROM stock_data WHERE date = %(day)s",
+    "all_tickers_7d_avg": "SELECT ticker, AVG(close) FROM stock_data WHERE date >= %(week_ago)s GROUP BY ticker",
+}
+
+
+def load(cursor, rows: int, tickers: int, last: date):
+    days = max(rows // tickers, 1)
+    first = last - timedelta(days=days - 1)
+    cursor.execute(
+        """
+        INSERT INTO stock_data (ticker, date, open, high, low, close, volume)
+        SELECT 'T' || t || '.NS', d::date, p, p * 1.01, p * 0.99, p * (0.98 + random() * 0.04),
+               (random() * 1e6)::bigint
+          FROM generate_series(%s::date, %s::date, INTERVAL '1 day') AS d,
+               generate_series(1, %s) AS t,
+               LATERAL (SELECT 100 + t + random() * 10 AS p) AS price
+         ORDER BY date_trunc('month', d), t, d
+        """,
+        (first, last, tickers),
+    )
+    cursor.execute("ANALYZE stock_data")
+    return first
+
+
+def plan_node(db_client, query: str, params) -> str:
+    rows, _ = db_client.fetch_query("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = rows[0][0][0]["Plan"]
+    # Show the scan under aggregates, sorts and limits
+    while plan.get("Plans") and plan["Node Type"] in ("Aggregate", "Sort", "Limit", "Gather", "Gather Merge",
+                                                      "Append", "Finalize Aggregate", "Partial Aggregate"):
+        plan = plan["Plans"][0]
+    return plan["Node Type"]
+
+
+def run_queries(db_client, label: str, params, repeat: int):
+    results = []
+    for name, query in QUERIES.items():
+        samples = time_calls(lambda: db_client.fetch_query(query, params), repeat, warmup=2)
+        results.append({"schema": label, "query": name, "plan": plan_node(db_client, query, params),
+                        **summarize(samples)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--partitioned", action="store_true", help="Also measure the yearly partitioned table.")
+    parser.add_argument("--schema", default="bench_stock_schema")
+    parser.add_argument("--output", default="benchmarks/results/stock_schema.json")
+    args = parser.parse_args()
+
+    if args.partitioned:
+        # Read by the partitioning migration when it is imported
+        os.environ["STOCK_DATA_PARTITIONING"] = "yearly"
+    from db.migrations.runner import migrate
+    from scraper.stock_data_scraper import StockDataScraper
+
+    db_client = StockDataScraper.initialize_db_client()
+    db_client.execute_query(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE')
+    db_client.execute_query(f'CREATE SCHEMA "{args.schema}"')
+    # Session setting: every statement of the shared connection resolves stock_data in the scratch schema
+    db_client.execute_query(f'SET search_path TO "{args.schema}"')
+
+    migrate(db_client, target=1)
+    last = date.today()
+    started = time.perf_counter()
+    with db_client.transaction() as cursor:
+        first = load(cursor, args.rows, args.tickers, last)
+    load_s = time.perf_counter() - started
+    params = {"ticker": f"T{args.tickers // 2}.NS", "last": last, "day": last - timedelta(days=3),
+              "week_ago": last - timedelta(days=7), "month_ago": last - timedelta(days=30),
+              "year_ago": last - timedelta(days=365)}
+
+    rows = run_queries(db_client, "0001 original", params, args.repeat)
+    steps = [(2, "0002 unique (ticker, date)"), (3, "0003 + BRIN (date)")]
+    if args.partitioned:
+        steps.append((4, "0004 + yearly partitions"))
+    migrations = []
+    for target, label in steps:
+        started = time.perf_counter()
+        migrate(db_client, target=target)
+        migrations.append({"migration": label, "seconds": time.perf_counter() - started})
+        rows.extend(run_queries(db_client, label, params, args.repeat))
+
+    count, _ = db_client.fetch_query("SELECT COUNT(*) FROM stock_data")
+    print(f"{count[0][0]} rows, {args.tickers} tickers, {first} .. {last}, loaded in {load_s:.1f}s")
+    print_table(migrations, ["migration", "seconds"])
+    print()
+    print_table(rows, ["query", "schema", "plan", "p50_ms", "p95_ms", "mean_ms"])
+    write_results(args.output, {"rows": count[0][0], "tickers": args.tickers, "load_s": load_s,
+                                "migrations": migrations, "queries": rows})
+    db_client.execute_query(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE')
+
+
+if __name__ == "__main__":
+    main()
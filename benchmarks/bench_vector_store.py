@@ -0,0 +1,148 @@
+"""
+Recall and latency of the news vector backends: Chroma against the in-process
+memory-mapped store (``VECTOR_BACKEND=numpy`` and, when hnswlib is installed,
+``VECTOR_BACKEND=hnsw``).
+
+Usage:
+    python -m benchmarks.bench_vector_store [--sizes 100000 1000000] [--dim 384] [--queries 200]
+
+Chunks are synthetic: clustered unit vectors (news about one company embeds
+close together), each tagged with one of ``--tickers`` tickers. Every backend is
+built from the same embeddings, so no embedding model is needed. Per backend and
+size the table reports the build time, the latency of unfiltered and
+ticker-filtered top-k searches, and recall@k against exact search.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import summarize, time_calls, print_table, write_results
+from db.vector_store import MemmapVectorStore, hnswlib
+
+BATCH = 5000
+
+
+def make_corpus(size: int, dim: int, tickers: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(tickers * 4, dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=size)
+    vectors = centers[labels] + rng.normal(scale=0.6, size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, [f"T{label % tickers}.NS" for label in labels]
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 12):
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), size=count)]
+    queries = queries + rng.normal(scale=0.3, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, rows=None):
+    rows = np.arange(len(vectors)) if rows is None else rows
+    truth = []
+    for start in range(0, len(queries), 64):
+        scores = queries[start:start + 64] @ vectors[rows].T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.extend({int(rows[i]) for i in row} for row in top)
+    return truth
+
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(set(f) & t) / len(t) for f, t in zip(found, truth)]))
+
+
+class _ChromaBackend:
+    def __init__(self, directory):
+        import chromadb
+
+        self.client = chromadb.PersistentClient(path=directory)
+        self.collection = self.client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+
+    def add(self, vectors, tickers, start):
+        self.collection.add(ids=[str(start + i) for i in range(len(vectors))], embeddings=vectors,
+                            documents=[""] * len(vectors), metadatas=[{"ticker": t} for t in tickers])
+
+    def search(self, query, k, where=None):
+        result = self.collection.query(query_embeddings=[query], n_results=k, where=where, include=[])
+        return [int(i) for i in result["ids"][0]]
+
+
+class _MemmapBackend:
+    def __init__(self, directory, index):
+        self.store = MemmapVectorStore(directory, embedding=None, index=index)
+
+    def add(self, vectors, tickers, start):
+        self.store.add_embeddings([""] * len(vectors), vectors, [{"ticker": t} for t in tickers],
+                                  ids=[str(start + i) for i in range(len(vectors))])
+
+    def search(self, query, k, where=None):
+        return [int(d.id) for d in self.store.similarity_search_by_vector(query, k=k, filter=where)]
+
+
+def run(name, backend, vectors, tickers, queries, truth, filtered_truth, filter_ticker, k):
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), BATCH):
+        backend.add(vectors[offset:offset + BATCH], tickers[offset:offset + BATCH], offset)
+    build_s = time.perf_counter() - start
+
+    where = {"ticker": filter_ticker}
+    found = [backend.search(q.tolist(), k) for q in queries]
+    found_filtered = [backend.search(q.tolist(), k, where) for q in queries]
+    pending = iter(queries.tolist())
+    samples = time_calls(lambda: backend.search(next(pending), k), iterations=len(queries), warmup=0)
+    pending = iter(queries.tolist())
+    filtered_samples = time_calls(lambda: backend.search(next(pending), k, where), iterations=len(queries), warmup=0)
+    return {
+        "backend": name, "size": len(vectors), "build_s": build_s,
+        **{key: value for key, value in summarize(samples).items() if key in ("p50_ms", "p95_ms")},
+        "filtered_p50_ms": summarize(filtered_samples)["p50_ms"],
+        "filtered_p95_ms": summarize(filtered_samples)["p95_ms"],
+        "recall": recall(found, truth), "filtered_recall": recall(found_filtered, filtered_truth),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384, help="Embedding width (384 for all-minilm).")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", default="benchmarks/results/vector_store.json")
+    args = parser.parse_args()
+
+    backends = [("chroma", lambda d: _ChromaBackend(d)), ("numpy", lambda d: _MemmapBackend(d, "numpy"))]
+    if hnswlib is not None:
+        backends.append(("hnsw", lambda d: _MemmapBackend(d, "hnsw")))
+    else:
+        print("hnswlib is not installed; skipping the hnsw backend.")
+
+    rows = []
+    for size in args.sizes:
+        vectors, tickers = make_corpus(size, args.dim, args.tickers)
+        queries = make_queries(vectors, args.queries)
+        filter_ticker = tickers[0]
+        truth = exact_top_k(vectors, queries, args.k)
+        filtered_truth = exact_top_k(vectors, queries, args.k,
+                                     rows=np.flatnonzero(np.asarray(tickers) == filter_ticker))
+        for name, factory in backends:
+            directory = tempfile.mkdtemp(prefix=f"bench_{name}_")
+            try:
+                rows.append(run(name, factory(directory), vectors, tickers, queries, truth, filtered_truth,
+                                filter_ticker, args.k))
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+            print_table(rows[-1:], list(rows[-1]))
+
+    print(f"\n{args.queries} queries, top {args.k}, dim {args.dim}, {args.tickers} tickers")
+    print_table(rows, ["backend", "size", "build_s", "p50_ms", "p95_ms", "filtered_p50_ms", "filtered_p95_ms",
+                       "recall", "filtered_recall"])
+    write_results(args.output, {"settings": vars(args), "results": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+"""
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples (milliseconds) into count, mean and percentiles.
+    """
+    if not samples_ms:
+        return {"n": 0}
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "n": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def time_calls(fn: Callable[[], object], iterations: int, warmup: int = 3) -> List[float]:
+    """
+    Call ``fn`` repeatedly and return per-call wall times in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def print_table(rows: List[Dict[str, object]], columns: List[str]):
+    """Print benchmark rows as an aligned plain-text table."""
+    widths = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(c)).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return "" if value is None else str(value)
+
+
+def write_results(path: str, results: Dict[str, object]):
+    """Write benchmark results as JSON, creating the parent directory if needed."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, default=str)
@@ -0,0 +1,309 @@
+"""
+Deterministic stand-ins for the services the RAG graphs talk to, so the graphs
+can be benchmarked offline:
+
+- ``FakeOllamaClient``: replaces the Ollama HTTP client inside every gateway
+  client, answering per role after a configurable latency. Calls still go
+  through the real gateway (admission control, stats, optional cache).
+- ``SlowFakeEmbeddings``: hash-based embeddings with a per-call latency.
+- ``InMemoryMongo``: the subset of the pymongo collection API used by ingestion.
+- ``SQLiteStockDB``: a ``PostgresDBClient`` stand-in over an in-memory SQLite
+  copy of ``stock_data``.
+
+``install_stubs`` wires them in; it must run before any chain module is imported,
+because chains create their LLM clients at import time.
+"""
+import asyncio
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import sqlglot
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from config.llm_gateway import (
+    GENERATOR_ROLE, GRADER_ROLE, HALLUCINATION_ROLE, SQL_ROLE, LLMGateway,
+)
+from db.result_columns import ColumnBuffer
+from utils.metrics import record_embedding, timed_db_query
+
+_TICKER = re.compile(r"\b([A-Z]{2,}(?:\.NS)?)\b")
+_QUESTION = re.compile(r"(?:User question|question):\s*(.*)", re.IGNORECASE | re.DOTALL)
+_PG_INTERVAL = re.compile(r"CURRENT_DATE\s*-\s*INTERVAL\s*'(\d+)\s*(day|month|year)s?'", re.IGNORECASE)
+
+# stock_data column -> Postgres type OID, as the real cursor would report it
+STOCK_DATA_TYPES = {"id": 23, "ticker": 1043, "date": 1082, "open": 701, "high": 701,
+                    "low": 701, "close": 701, "volume": 20}
+
+
+def _question(prompt: str) -> str:
+    match = _QUESTION.search(prompt)
+    return (match.group(1) if match else prompt).strip()
+
+
+def _ticker(text: str, default: str = "TCS.NS") -> str:
+    for candidate in _TICKER.findall(text):
+        if candidate not in {"SQL", "NS", "AI", "LLM"}:
+            return candidate if candidate.endswith(".NS") else f"{candidate}.NS"
+    return default
+
+
+def default_responses(answer_words: int = 60) -> Dict[str, Callable[[str], str]]:
+    """
+    Per-role deterministic answers, derived from the prompt only.
+
+    - SQL: a Postgres query for the ticker named in the question.
+    - grader: ``yes`` when the document mentions the question's ticker.
+    - hallucination: always grounded.
+    - generator: a fixed-length answer.
+    """
+    def sql(prompt: str) -> str:
+        ticker = _ticker(_question(prompt).split("Previous SQL query failed")[0])
+        return (f"SELECT date, open, close, volume FROM stock_data WHERE ticker = '{ticker}' "
+                f"AND date >= CURRENT_DATE - INTERVAL '90 days' ORDER BY date")
+
+    def grader(prompt: str) -> str:
+        document, _, question = prompt.partition("User question:")
+        symbol = _ticker(question).split(".")[0]
+        return "yes" if symbol.lower() in document.lower() else "no"
+
+    def generator(prompt: str) -> str:
+        words = itertools.islice(itertools.cycle("the stock moved in line with sector peers".split()), answer_words)
+        return " ".join(words).capitalize() + "."
+
+    return {
+        SQL_ROLE: sql,
+        GRADER_ROLE: grader,
+        HALLUCINATION_ROLE: lambda prompt: "yes",
+        GENERATOR_ROLE: generator,
+    }
+
+
+class FakeOllamaClient:
+    """
+    Stands in for ``ollama.Client``/``AsyncClient``: sleeps for
+    ``latency_s + per_token_s * output tokens`` and reports Ollama-style timings.
+    """
+    def __init__(self, respond: Callable[[str], str], latency_s: float, per_token_s: float):
+        self.respond = respond
+        self.latency_s = latency_s
+        self.per_token_s = per_token_s
+
+    def _final(self, prompt: str) -> Tuple[str, float, Dict[str, Any]]:
+        text = self.respond(prompt)
+        tokens = max(len(text.split()), 1)
+        duration = self.latency_s + self.per_token_s * tokens
+        return text, duration, {
+            "response": text,
+            "done": True,
+            "prompt_eval_count": len(prompt.split()),
+            "eval_count": tokens,
+            "eval_duration": int(self.per_token_s * tokens * 1e9),
+            "total_duration": int(duration * 1e9),
+        }
+
+    def generate(self, model: str = "", prompt: str = "", **kwargs):
+        _, duration, final = self._final(prompt)
+        time.sleep(duration)
+        return iter([final])
+
+
+class FakeAsyncOllamaClient(FakeOllamaClient):
+    async def generate(self, model: str = "", prompt: str = "", **kwargs):
+        _, duration, final = self._final(prompt)
+        await asyncio.sleep(duration)
+
+        async def parts():
+            yield final
+        return parts()
+
+
+class FakeLLMGateway(LLMGateway):
+    """LLM gateway whose per-role clients answer from ``responses`` instead of Ollama."""
+    def __init__(self, responses: Dict[str, Callable[[str], str]], latency_s: Dict[str, float],
+                 per_token_s: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.responses = responses
+        self.latency_s = latency_s
+        self.per_token_s = per_token_s
+
+    def llm(self, role: str):
+        client = super().llm(role)
+        respond = self.responses.get(role, self.responses[GENERATOR_ROLE])
+        latency = self.latency_s.get(role, self.latency_s.get("default", 0.0))
+        client._client = FakeOllamaClient(respond, latency, self.per_token_s)
+        client._async_client = FakeAsyncOllamaClient(respond, latency, self.per_token_s)
+        return client
+
+
+class SlowFakeEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings with a fixed latency per call (query or batch)."""
+    latency_s: float = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        started = time.perf_counter()
+        time.sleep(self.latency_s)
+        vectors = super().embed_documents(texts)
+        record_embedding(time.perf_counter() - started, len(texts))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        time.sleep(self.latency_s)
+        vector = super().embed_query(text)
+        record_embedding(time.perf_counter() - started, 1)
+        return vector
+
+
+class _Result:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class InMemoryCollection:
+    """Equality, ``$in`` and ``$set`` subset of a pymongo collection."""
+    def __init__(self):
+        self.documents: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+        for key, condition in (query or {}).items():
+            value = document.get(key)
+            if isinstance(condition, dict) and "$in" in condition:
+                if value not in condition["$in"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def insert_one(self, document: Dict[str, Any]):
+        with self._lock:
+            document.setdefault("_id", next(self._ids))
+            self.documents.append(document)
+        return _Result(inserted_id=document["_id"])
+
+    def insert_many(self, documents: List[Dict[str, Any]]):
+        return _Result(inserted_ids=[self.insert_one(document).inserted_id for document in documents])
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        fields = [key for key, keep in (projection or {}).items() if keep]
+        for document in list(self.documents):
+            if self._matches(document, query):
+                yield {key: document[key] for key in ["_id", *fields] if key in document} if fields else dict(document)
+
+    def find_one(self, query: Optional[Dict[str, Any]] = None, projection=None):
+        return next(self.find(query, projection), None)
+
+    def update_many(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        modified = 0
+        with self._lock:
+            for document in self.documents:
+                if self._matches(document, query):
+                    document.update(update.get("$set", {}))
+                    modified += 1
+        return _Result(modified_count=modified)
+
+
+class InMemoryMongo:
+    """Stands in for ``MongoDBClient``: one in-memory collection per name."""
+    def __init__(self):
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def get_collection(self, collection_name=None):
+        return self._collections.setdefault(collection_name or "default_collection", InMemoryCollection())
+
+
+class SQLiteStockDB:
+    """
+    ``PostgresDBClient`` stand-in over an in-memory SQLite ``stock_data`` table.
+    Postgres SQL from the validator is transpiled to SQLite before execution.
+    """
+    def __init__(self):
+        self.connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE stock_data (id INTEGER PRIMARY KEY, ticker TEXT, date TEXT, open REAL, "
+            "high REAL, low REAL, close REAL, volume INTEGER)"
+        )
+        self.connection.execute("CREATE INDEX idx_stock_data_ticker_date ON stock_data (ticker, date)")
+        self._lock = threading.Lock()
+
+    def load(self, ticker: str, columns: Dict[str, Any]):
+        rows = zip(itertools.repeat(ticker), (str(d) for d in columns["date"]),
+                   *(map(float, columns[name]) for name in ("open", "high", "low", "close")),
+                   map(int, columns["volume"]))
+        with self._lock:
+            self.connection.executemany(
+                "INSERT INTO stock_data (ticker, date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.connection.commit()
+
+    @staticmethod
+    def to_sqlite(query: str) -> str:
+        query = _PG_INTERVAL.sub(lambda m: f"date('now', '-{m.group(1)} {m.group(2).lower()}s')", query)
+        return sqlglot.transpile(query, read="postgres", write="sqlite")[0]
+
+    def fetch_frame_readonly(self, query, params=None, statement_timeout_ms=None, chunk_rows=2000,
+                             max_rows=100_000, max_bytes=64 * 1024 * 1024):
+        with self._lock, timed_db_query() as counted:
+            cursor = self.connection.execute(self.to_sqlite(query), params or ())
+            description = [(column[0], STOCK_DATA_TYPES.get(column[0])) for column in cursor.description]
+            buffer = ColumnBuffer(description, max_rows=max_rows, max_bytes=max_bytes)
+            rows = cursor.fetchmany(chunk_rows)
+            while rows and not buffer.full:
+                buffer.add(rows)
+                rows = cursor.fetchmany(chunk_rows)
+            if buffer.full and rows:
+                buffer.truncated = True
+            counted.append(buffer.rows)
+        return buffer.to_frame()
+
+    def fetch_query(self, query, params=None):
+        params = [p.isoformat() if isinstance(p, date) else p for p in params or ()]
+        with self._lock, timed_db_query() as counted:
+            cursor = self.connection.execute(self.to_sqlite(query), params)
+            results = cursor.fetchall()
+            counted.append(len(results))
+        return results, [column[0] for column in cursor.description]
+
+    def execute_query(self, query, params=None):
+        raise RuntimeError("The benchmark database is read-only.")
+
+
+def install_stubs(llm_latency_s: Dict[str, float], per_token_s: float = 0.0, embed_latency_s: float = 0.0,
+                  vector_dir: Optional[str] = None, answer_words: int = 60, cache=None):
+    """
+    Point the gateway, embeddings, Mongo, Chroma and Postgres accessors at the stand-ins.
+
+    Returns:
+        dict: The installed ``gateway``, ``mongo`` and ``stock_db`` objects.
+    """
+    import config.llm_config as llm_config
+    import config.llm_gateway as llm_gateway
+    from db.mongo_db import MongoDBClient
+
+    gateway = FakeLLMGateway(default_responses(answer_words), llm_latency_s, per_token_s, cache=cache)
+    llm_gateway._gateway_instance = gateway
+    llm_config._embeddings_instance = SlowFakeEmbeddings(size=256, latency_s=embed_latency_s)
+
+    mongo = InMemoryMongo()
+    MongoDBClient._instance = mongo
+
+    from rag_graphs.news_rag_graph import ingestion
+    if vector_dir:
+        ingestion.VECTOR_DB_DIRECTORY = vector_dir
+    # DocumentSyncManager reads the collection name from the environment
+    os.environ.setdefault("VECTOR_DB_COLLECTION", ingestion.VECTOR_DB_COLLECTION)
+
+    stock_db = SQLiteStockDB()
+    from rag_graphs.stock_data_rag_graph.graph.nodes import sql_search
+    sql_search.initialize_db_client = lambda: stock_db
+
+    return {"gateway": gateway, "mongo": mongo, "stock_db": stock_db}
@@ -0,0 +1,161 @@
+"""
+Replay recorded API traffic (``logs/request_log.jsonl``, see ``rest_api/request_log.py``)
+and report throughput, latency percentiles and error rate per route.
+
+Usage:
+    python -m benchmarks.load_replay [--log logs/request_log.jsonl] [--rate 1.0]
+        [--concurrency 8] [--base-url http://localhost:8000 | --stub-backends]
+        [--output benchmarks/results/replay.json]
+
+Requests are sent at their recorded relative times divided by ``--rate`` (2.0
+replays twice as fast; 0 sends them back to back), with at most
+``--concurrency`` in flight. Without ``--base-url`` the app is driven in-process
+through an ASGI transport; ``--stub-backends`` first swaps Ollama, Chroma, Mongo
+and Postgres for the offline stand-ins of ``benchmarks/graph_stubs.py``.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import summarize, print_table, write_results
+from rest_api.request_log import REQUEST_LOG_PATH, read_request_log
+
+
+async def replay(entries: List[Dict[str, Any]], client: httpx.AsyncClient, rate: float,
+                 concurrency: int, timeout: float) -> List[Dict[str, Any]]:
+    """
+    Send the recorded requests on their (scaled) schedule.
+
+    Returns:
+        list: Per-request route, status (None on transport errors), latency and lateness.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    first_ts = entries[0].get("ts", 0)
+    started = time.perf_counter()
+    results = []
+
+    async def send(entry):
+        if rate > 0:
+            delay = (entry.get("ts", first_ts) - first_ts) / rate - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        async with semaphore:
+            scheduled_lag = time.perf_counter() - started
+            request_started = time.perf_counter()
+            status, error = None, None
+            try:
+                response = await client.request(entry.get("method", "GET"), entry["path"],
+                                                params=entry.get("params") or None, timeout=timeout)
+                status = response.status_code
+            except Exception as e:
+                error = type(e).__name__
+            results.append({
+                "route": f"{entry.get('method', 'GET')} {entry.get('route') or entry['path']}",
+                "status": status,
+                "error": error,
+                "latency_ms": (time.perf_counter() - request_started) * 1000,
+                "sent_at_s": scheduled_lag,
+            })
+
+    await asyncio.gather(*(send(entry) for entry in entries))
+    return results
+
+
+def report(results: List[Dict[str, Any]], elapsed_s: float) -> Dict[str, Any]:
+    """Aggregate per-route and overall throughput, latency percentiles and error rate."""
+    def aggregate(rows):
+        errors = sum(1 for row in rows if row["status"] is None or row["status"] >= 500)
+        client_errors = sum(1 for row in rows if row["status"] is not None and 400 <= row["status"] < 500)
+        return {
+            **summarize([row["latency_ms"] for row in rows]),
+            "throughput_rps": len(rows) / elapsed_s if elapsed_s else None,
+            "error_rate": errors / len(rows),
+            "client_error_rate": client_errors / len(rows),
+        }
+
+    by_route = defaultdict(list)
+    for row in results:
+        by_route[row["route"]].append(row)
+    return {
+        "elapsed_s": elapsed_s,
+        "overall": aggregate(results),
+        "routes": {route: aggregate(rows) for route, rows in sorted(by_route.items())},
+    }
+
+
+def _in_process_client(stub_backends: bool) -> httpx.AsyncClient:
+    if stub_backends:
+        # Must run before the app (and with it any chain module) is imported
+        from benchmarks.bench_graphs import seed
+        from benchmarks.graph_stubs import install_stubs
+
+        stubs = install_stubs(llm_latency_s={"default": 0.05}, per_token_s=0.0005, embed_latency_s=0.005,
+                              vector_dir=tempfile.mkdtemp(prefix="replay_chroma_"))
+        seed(stubs, articles_per_ticker=25, history_days=2 * 365)
+    from rest_api.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay")
+
+
+async def _run(args) -> Dict[str, Any]:
+    entries = read_request_log(args.log)
+    if args.limit:
+        entries = entries[:args.limit]
+    if not entries:
+        raise SystemExit(f"No requests recorded in {args.log}")
+
+    if args.base_url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits)
+    else:
+        client = _in_process_client(args.stub_backends)
+
+    async with client:
+        started = time.perf_counter()
+        results = await replay(entries, client, args.rate, args.concurrency, args.timeout)
+        elapsed = time.perf_counter() - started
+
+    recorded_span = entries[-1].get("ts", 0) - entries[0].get("ts", 0)
+    summary = report(results, elapsed)
+    summary.update({
+        "requests": len(entries),
+        "recorded_span_s": recorded_span,
+        "settings": {"rate": args.rate, "concurrency": args.concurrency,
+                     "target": args.base_url or ("in-process, stubbed" if args.stub_backends else "in-process")},
+    })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=REQUEST_LOG_PATH)
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="Replay speed multiplier; 0 sends requests back to back.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests.")
+    parser.add_argument("--base-url", help="Replay against a running server instead of in-process.")
+    parser.add_argument("--stub-backends", action="store_true",
+                        help="In-process only: use the offline stand-ins for all backends.")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "replay.json"))
+    args = parser.parse_args()
+    if args.base_url and args.stub_backends:
+        parser.error("--stub-backends only applies to in-process replay")
+
+    summary = asyncio.run(_run(args))
+    rows = [{"route": "(all)", **summary["overall"]}]
+    rows += [{"route": route, **stats} for route, stats in summary["routes"].items()]
+    print(f"{summary['requests']} requests in {summary['elapsed_s']:.1f}s "
+          f"(recorded over {summary['recorded_span_s']:.1f}s)")
+    print_table(rows, ["route", "n", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"])
+    write_results(args.output, summary)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+In-memory LRU cache of query embeddings.
+
+The news endpoints build their questions from fixed templates ("News related to
+{ticker}"), so retrieval embeds the same few hundred strings over and over, each
+an Ollama round trip. ``CachedQueryEmbeddings`` wraps the embedding model and
+serves repeated query strings from a process-local LRU bounded in bytes
+(``QUERY_EMBEDDING_CACHE_BYTES``; 0 disables it). Document embeddings (ingestion)
+always go to the model.
+
+With ``QUERY_EMBEDDING_WARMUP=true`` the API embeds the questions of every
+configured ticker at startup (``warm_up``).
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+from config.llm_config import EMBEDDING_MODEL, get_embeddings_singleton
+from utils.logger import logger
+from utils.metrics import get_metrics_registry
+
+load_dotenv()
+
+QUERY_EMBEDDING_CACHE_BYTES = int(os.getenv("QUERY_EMBEDDING_CACHE_BYTES", str(16 * 1024 * 1024)))
+QUERY_EMBEDDING_WARMUP = os.getenv("QUERY_EMBEDDING_WARMUP", "false").lower() == "true"
+
+# Dict slot, key tuple and array header per entry, on top of the key text and vector data
+_ENTRY_OVERHEAD = 200
+
+EMBEDDING_CACHE_LOOKUPS = get_metrics_registry().counter(
+    "query_embedding_cache_lookups_total", "Query embedding cache lookups.", ("result",))
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU of query text -> embedding vector, bounded by the bytes held.
+
+    Args:
+        max_bytes (int): Upper bound on keys plus vectors; 0 disables caching.
+    """
+    def __init__(self, max_bytes: int = QUERY_EMBEDDING_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(key: tuple, vector: np.ndarray) -> int:
+        return sys.getsizeof(key[1]) + vector.nbytes + _ENTRY_OVERHEAD
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = (model, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._counters["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+        EMBEDDING_CACHE_LOOKUPS.inc(("miss",) if vector is None else ("hit",))
+        return None if vector is None else vector.tolist()
+
+    def put(self, model: str, text: str, embedding: Sequence[float]):
+        key = (model, text)
+        vector = np.asarray(embedding, dtype=np.float32)
+        size = self._size(key, vector)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= self._size(key, previous)
+            self._entries[key] = vector
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._bytes -= self._size(old_key, old_vector)
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings whose query embeddings go through a ``QueryEmbeddingCache``.
+
+    Args:
+        embeddings (Embeddings): The model; documents are always embedded by it.
+        cache (QueryEmbeddingCache): None (or a cache of size 0) disables caching.
+        model (str): Part of the cache key, so a model change never serves stale vectors.
+    """
+    def __init__(self, embeddings: Embeddings, cache: Optional[QueryEmbeddingCache] = None,
+                 model: str = EMBEDDING_MODEL):
+        self.embeddings = embeddings
+        self.cache = cache if cache is not None and cache.max_bytes > 0 else None
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def _lookup(self, texts: Sequence[str]):
+        if self.cache is None:
+            return [None] * len(texts), list(range(len(texts)))
+        vectors = [self.cache.get(self.model, text) for text in texts]
+        return vectors, [i for i, vector in enumerate(vectors) if vector is None]
+
+    def _store(self, texts: Sequence[str], vectors: list, missing: List[int], embedded: List[List[float]]):
+        for i, vector in zip(missing, embedded):
+            vectors[i] = vector
+            if self.cache is not None:
+                self.cache.put(self.model, texts[i], vector)
+        return vectors
+
+    def embed_queries(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed several queries, sending only the uncached ones to the model in one batch."""
+        vectors, missing = self._lookup(texts)
+        if missing:
+            embedded = self.embeddings.embed_documents([texts[i] for i in missing])
+            self._store(texts, vectors, missing, embedded)
+        return vectors
+
+    async def aembed_queries(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors, missing = self._lookup(texts)
+        if missing:
+            embedded = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            self._store(texts, vectors, missing, embedded)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_queries([text]))[0]
+
+    def warm_up(self, texts: Iterable[str]) -> int:
+        """
+        Embed ``texts`` into the cache in one batch.
+
+        Returns:
+            int: Number of texts that were not cached yet.
+        """
+        texts = list(dict.fromkeys(texts))
+        if self.cache is None or not texts:
+            return 0
+        vectors, missing = self._lookup(texts)
+        if missing:
+            embedded = self.embeddings.embed_documents([texts[i] for i in missing])
+            self._store(texts, vectors, missing, embedded)
+        return len(missing)
+
+
+_query_embeddings_instance = None
+_query_embeddings_lock = threading.Lock()
+
+
+def get_query_embeddings() -> CachedQueryEmbeddings:
+    """Get or create the process-wide cached query embeddings over ``get_embeddings_singleton()``."""
+    global _query_embeddings_instance
+    if _query_embeddings_instance is None:
+        with _query_embeddings_lock:
+            if _query_embeddings_instance is None:
+                _query_embeddings_instance = CachedQueryEmbeddings(
+                    get_embeddings_singleton(), QueryEmbeddingCache(QUERY_EMBEDDING_CACHE_BYTES))
+    return _query_embeddings_instance
+
+
+def warm_up_news_queries(tickers: Iterable[str]) -> int:
+    """
+    Cache the embeddings of the news endpoints' default question for every
+    ticker, as listed and without its '.NS' suffix.
+    """
+    from rag_graphs.news_rag_graph.watchlist import news_question
+
+    questions = []
+    for ticker in tickers:
+        symbol = ticker.strip().upper()
+        questions.append(news_question(symbol))
+        if symbol.endswith(".NS"):
+            questions.append(news_question(symbol[:-3]))
+    try:
+        embedded = get_query_embeddings().warm_up(questions)
+        logger.info(f"Warmed up {embedded} query embeddings for {len(questions)} news questions.")
+        return embedded
+    except Exception as e:
+        logger.warning(f"Query embedding warm-up failed: {e}")
+        return 0
@@ -0,0 +1,208 @@
+"""
+Persistent exact-match cache of LLM generations.
+
+The chains run at temperature 0, so the same rendered prompt sent to the same
+model yields the same output. Responses are stored in a SQLite file (WAL mode,
+safe to share between API workers and the scraper process) keyed on a hash of
+(model, role, generation options, rendered prompt). Entries expire after
+``LLM_CACHE_TTL`` seconds and the least recently used ones are evicted once the
+file holds more than ``LLM_CACHE_MAX_BYTES`` of responses.
+
+Each entry remembers how long its inference took, so hits can report the
+inference seconds they saved.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from utils.logger import logger
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Comma separated roles that always go to the model, e.g. "generator"
+LLM_CACHE_BYPASS_ROLES = {role.strip() for role in os.getenv("LLM_CACHE_BYPASS_ROLES", "").split(",") if role.strip()}
+
+# Evict at most every this many writes; a full size check scans the table
+_EVICT_EVERY = 50
+
+
+def cache_key(model: str, role: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of everything that determines a temperature-0 generation."""
+    payload = json.dumps([model, role, options or {}, prompt], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL and LRU size eviction.
+
+    Args:
+        path (str): Database file.
+        ttl (float): Seconds an entry stays valid.
+        max_bytes (int): Upper bound on the stored response bytes.
+        bypass_roles (set): Roles that are never served from or written to the cache.
+    """
+    DDL = """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            role TEXT NOT NULL,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            inference_s REAL NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES, bypass_roles: Optional[set] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bypass_roles = LLM_CACHE_BYPASS_ROLES if bypass_roles is None else set(bypass_roles)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "saved_s": 0.0}
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(self.DDL)
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def enabled_for(self, role: str) -> bool:
+        return role not in self.bypass_roles
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Look up a response.
+
+        Returns:
+            tuple: (text, generation_info) or None on a miss or expired entry.
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, inference_s, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[2] < now - self.ttl:
+                    if row is not None:
+                        conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._count("misses")
+                    return None
+                conn.execute("UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        self._count("saved_s", row[1])
+        response = json.loads(row[0])
+        return response["text"], response.get("generation_info") or {}
+
+    def put(self, key: str, role: str, model: str, text: str, generation_info: Optional[Dict[str, Any]],
+            inference_s: float):
+        """Store a response along with the inference time it took."""
+        response = json.dumps({"text": text, "generation_info": generation_info or {}}, default=str)
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(key, role, model, response, size, inference_s, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, role, model, response, len(response), inference_s, now, now),
+                )
+                with self._lock:
+                    self._writes += 1
+                    evict = self._writes % _EVICT_EVERY == 0
+                if evict:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _evict(self, conn, now: float):
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        # Keep the most recently used entries that fit in max_bytes
+        conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS running
+                      FROM llm_cache)
+                 WHERE running > ?)
+            """,
+            (self.max_bytes,),
+        )
+
+    def evict(self):
+        """Drop expired entries and trim the cache to ``max_bytes`` now."""
+        try:
+            with self._connect() as conn:
+                self._evict(conn, time.time())
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache eviction failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters and saved inference seconds for this process, plus
+        the size of the cache and the seconds saved by all processes sharing it.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        stats = {
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+            "saved_inference_s": round(counters["saved_s"], 3),
+            "bypass_roles": sorted(self.bypass_roles),
+        }
+        try:
+            with self._connect() as conn:
+                entries, size, saved = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits * inference_s), 0) FROM llm_cache"
+                ).fetchone()
+            stats.update(entries=entries, bytes=size, saved_inference_s_all_processes=round(saved, 3))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache stats unavailable: {e}")
+        return stats
+
+    def clear(self, roles: Optional[Sequence[str]] = None):
+        """Delete all entries, or only those of the given roles."""
+        with self._connect() as conn:
+            if roles:
+                conn.executemany("DELETE FROM llm_cache WHERE role = ?", [(role,) for role in roles])
+            else:
+                conn.execute("DELETE FROM llm_cache")
+
+
+_cache_instance = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get or create the process-wide LLM cache; None when LLM_CACHE_ENABLED=false."""
+    global _cache_instance
+    if _cache_instance is None and LLM_CACHE_ENABLED:
+        _cache_instance = LLMResponseCache()
+    return _cache_instance
@@ -4,10 +4,13 @@ Supports Gemma 3 4B model for local inference.
 """
 
 import os
+import time
+from typing import List
 from dotenv import load_dotenv
 from langchain_ollama import OllamaLLM
 from langchain_ollama import OllamaEmbeddings
 from utils.logger import logger
+from utils.metrics import record_embedding
 
 load_dotenv()
 
@@ -38,6 +41,27 @@ def get_llm(temperature: float = 0):
         logger.error(f"Failed to initialize Ollama LLM: {e}")
         raise
 
+class MeteredOllamaEmbeddings(OllamaEmbeddings):
+    """
+    OllamaEmbeddings that records call counts and latency in ``utils.metrics``.
+    Query embeddings go through ``embed_documents``, so they are recorded too.
+    """
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        started = time.perf_counter()
+        try:
+            return super().embed_documents(texts)
+        finally:
+            record_embedding(time.perf_counter() - started, len(texts))
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        started = time.perf_counter()
+        try:
+            return await super().aembed_documents(texts)
+        finally:
+            record_embedding(time.perf_counter() - started, len(texts))
+
+
 def get_embeddings():
     """
     Get Ollama embeddings instance for local inference.
@@ -46,7 +70,7 @@ def get_embeddings():
         OllamaEmbeddings instance
     """
     try:
-        embeddings = OllamaEmbeddings(
+        embeddings = MeteredOllamaEmbeddings(
             model=EMBEDDING_MODEL,
             base_url=OLLAMA_BASE_URL,
         )
@@ -56,16 +80,18 @@ def get_embeddings():
         logger.error(f"Failed to initialize Ollama Embeddings: {e}")
         raise
 
-# Singleton instances for reuse
-_llm_instance = None
+# Singleton instances for reuse (LLMs keyed by temperature)
+_llm_instances = {}
 _embeddings_instance = None
 
 def get_llm_singleton(temperature: float = 0):
-    """Get or create a singleton LLM instance."""
-    global _llm_instance
-    if _llm_instance is None:
-        _llm_instance = get_llm(temperature)
-    return _llm_instance
+    """
+    Get or create a shared LLM instance for the given temperature.
+    Chains should prefer ``config.llm_gateway.get_role_llm``.
+    """
+    if temperature not in _llm_instances:
+        _llm_instances[temperature] = get_llm(temperature)
+    return _llm_instances[temperature]
 
 def get_embeddings_singleton():
     """Get or create a singleton embeddings instance."""
@@ -0,0 +1,366 @@
+"""
+Shared gateway in front of the local Ollama server.
+
+Chains ask the gateway for the model of their role (sql, grader, generator,
+hallucination) instead of sharing one global client. The gateway
+
+- builds one client per role, configured from ``LLM_<ROLE>_*`` environment variables,
+- routes every role through one keep-alive HTTP connection pool and asks Ollama
+  to keep the model loaded between calls (``LLM_KEEP_ALIVE``),
+- admits at most ``LLM_MAX_IN_FLIGHT`` generations at once, serving waiters in
+  arrival order,
+- records per-role latency, queue wait and generation throughput (tokens/sec
+  from Ollama's ``eval_count``/``eval_duration``), and every model call in
+  ``utils.metrics`` under the graph node running it (``llm_calls_total``,
+  ``llm_*_tokens_total``, the ``llm`` Server-Timing entry), and
+- serves repeated temperature-0 prompts from the persistent response cache in
+  ``config.llm_cache`` without taking a slot.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from langchain_ollama import OllamaLLM
+from pydantic import PrivateAttr
+
+from config.llm_cache import LLMResponseCache, cache_key, get_llm_cache
+from config.llm_config import LLM_MODEL, OLLAMA_BASE_URL
+from utils.logger import logger
+from utils.metrics import record_llm_call
+
+load_dotenv()
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "2"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "300"))
+# How long Ollama keeps the model in memory after a call
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "30m")
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120"))
+
+SQL_ROLE = "sql"
+GRADER_ROLE = "grader"
+GENERATOR_ROLE = "generator"
+HALLUCINATION_ROLE = "hallucination"
+
+# Defaults per role; each key can be overridden with LLM_<ROLE>_<KEY> (e.g. LLM_GRADER_NUM_PREDICT).
+# num_predict None leaves the output length to the model, as the plain client did
+ROLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    SQL_ROLE: {"model": LLM_MODEL, "temperature": 0.0, "num_predict": None},
+    GRADER_ROLE: {"model": LLM_MODEL, "temperature": 0.0, "num_predict": None},
+    GENERATOR_ROLE: {"model": LLM_MODEL, "temperature": 0.0, "num_predict": None},
+    HALLUCINATION_ROLE: {"model": LLM_MODEL, "temperature": 0.0, "num_predict": None},
+}
+_SETTING_TYPES = {"model": str, "temperature": float, "num_predict": int}
+
+_SAMPLE_SIZE = 512
+
+
+def role_settings(role: str) -> Dict[str, Any]:
+    """
+    Resolve the client settings of a role from ROLE_DEFAULTS and the environment.
+    Unknown roles start from the generator defaults.
+    """
+    settings = dict(ROLE_DEFAULTS.get(role, ROLE_DEFAULTS[GENERATOR_ROLE]))
+    for key in list(settings):
+        value = os.getenv(f"LLM_{role.upper()}_{key.upper()}")
+        if value is not None:
+            settings[key] = _SETTING_TYPES.get(key, str)(value)
+    return settings
+
+
+class FairLimiter:
+    """
+    Counting semaphore that admits waiters strictly in arrival order.
+    """
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._cond = threading.Condition()
+        self._waiting = deque()
+        self._in_flight = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            float: Seconds spent waiting in the queue.
+
+        Raises:
+            TimeoutError: If no slot became free within ``timeout`` seconds.
+        """
+        ticket = object()
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            self._waiting.append(ticket)
+            while self._waiting[0] is not ticket or self._in_flight >= self.limit:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self._cond.notify_all()
+                    raise TimeoutError(f"No LLM slot free after {timeout}s")
+                self._cond.wait(remaining)
+            self._waiting.popleft()
+            self._in_flight += 1
+            # The next waiter may also fit under the limit
+            self._cond.notify_all()
+        return time.perf_counter() - started
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._cond:
+            return {"limit": self.limit, "in_flight": self._in_flight, "queued": len(self._waiting)}
+
+
+def _percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RoleStats:
+    """
+    Running counters and recent latency samples for one role.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.saved_seconds = 0.0
+        self.tokens = 0
+        self.eval_seconds = 0.0
+        self.latency = deque(maxlen=_SAMPLE_SIZE)
+        self.queue_wait = deque(maxlen=_SAMPLE_SIZE)
+
+    def record(self, latency: float, queue_wait: float, generation_info: Optional[Dict[str, Any]] = None,
+               error: bool = False):
+        info = generation_info or {}
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.latency.append(latency)
+            self.queue_wait.append(queue_wait)
+            self.tokens += int(info.get("eval_count") or 0)
+            self.eval_seconds += (info.get("eval_duration") or 0) / 1e9
+
+    def record_hit(self, saved_seconds: float):
+        with self._lock:
+            self.cache_hits += 1
+            self.saved_seconds += saved_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latency, queue_wait = list(self.latency), list(self.queue_wait)
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "cache_hits": self.cache_hits,
+                "saved_inference_s": round(self.saved_seconds, 3),
+                "tokens": self.tokens,
+                "tokens_per_sec": round(self.tokens / self.eval_seconds, 2) if self.eval_seconds else None,
+                "latency_p50_s": _percentile(latency, 0.5),
+                "latency_p95_s": _percentile(latency, 0.95),
+                "queue_wait_p50_s": _percentile(queue_wait, 0.5),
+                "queue_wait_p95_s": _percentile(queue_wait, 0.95),
+                "queue_wait_max_s": max(queue_wait) if queue_wait else None,
+            }
+
+
+class GatewayLLM(OllamaLLM):
+    """
+    OllamaLLM that takes a gateway slot for every generation and reports its timings.
+    Being a regular LangChain LLM, it composes into chains like the plain client.
+    """
+    role: str = GENERATOR_ROLE
+    _gateway: "LLMGateway" = PrivateAttr(default=None)
+
+    def _cache_keys(self, prompts: List[str], stop: Optional[List[str]]) -> Optional[List[str]]:
+        # Only deterministic (temperature 0) generations are cached
+        cache = self._gateway.cache
+        if cache is None or self.temperature != 0 or not cache.enabled_for(self.role):
+            return None
+        options = {"stop": stop or self.stop, "num_predict": self.num_predict, "num_ctx": self.num_ctx}
+        return [cache_key(self.model, self.role, prompt, options) for prompt in prompts]
+
+    def _from_cache(self, keys: Optional[List[str]], count: int) -> List[Optional[List[Generation]]]:
+        generations = [None] * count
+        if keys is None:
+            return generations
+        stats = self._gateway.stats_for(self.role)
+        for i, key in enumerate(keys):
+            hit = self._gateway.cache.get(key)
+            if hit is not None:
+                text, info = hit
+                generations[i] = [Generation(text=text, generation_info=info)]
+                stats.record_hit(info.get("inference_s", 0.0))
+        return generations
+
+    def _to_cache(self, keys: Optional[List[str]], missing: List[int], result: LLMResult, inference_s: float):
+        if keys is None:
+            return
+        per_prompt = inference_s / max(len(missing), 1)
+        for i, generation in zip(missing, result.generations):
+            info = dict(generation[0].generation_info or {}, inference_s=per_prompt)
+            self._gateway.cache.put(keys[i], self.role, self.model, generation[0].text, info, per_prompt)
+
+    def _record(self, started: float, queue_wait: float, result: Optional[LLMResult], error: bool):
+        elapsed = time.perf_counter() - started
+        info = None
+        if result is not None and result.generations and result.generations[0]:
+            info = result.generations[0][0].generation_info
+        self._gateway.stats_for(self.role).record(elapsed, queue_wait, info, error)
+        infos = [generation.generation_info or {} for generations in (result.generations if result else [])
+                 for generation in generations]
+        # Attributed to the node in the metrics context, whichever chain made the call
+        record_llm_call(elapsed, sum(i.get("prompt_eval_count") or 0 for i in infos),
+                        sum(i.get("eval_count") or 0 for i in infos))
+
+    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> LLMResult:
+        keys = self._cache_keys(prompts, stop)
+        generations = self._from_cache(keys, len(prompts))
+        missing = [i for i, generation in enumerate(generations) if generation is None]
+        if not missing:
+            return LLMResult(generations=generations)
+
+        started = time.perf_counter()
+        queue_wait = self._gateway.limiter.acquire(self._gateway.queue_timeout)
+        result = None
+        try:
+            result = super()._generate([prompts[i] for i in missing], stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            self._gateway.limiter.release()
+            self._record(started, queue_wait, result, error=result is None)
+        self._to_cache(keys, missing, result, time.perf_counter() - started - queue_wait)
+        for i, generation in zip(missing, result.generations):
+            generations[i] = generation
+        return LLMResult(generations=generations)
+
+    async def _agenerate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> LLMResult:
+        keys = self._cache_keys(prompts, stop)
+        generations = await asyncio.to_thread(self._from_cache, keys, len(prompts))
+        missing = [i for i, generation in enumerate(generations) if generation is None]
+        if not missing:
+            return LLMResult(generations=generations)
+
+        started = time.perf_counter()
+        queue_wait = await asyncio.to_thread(self._gateway.limiter.acquire, self._gateway.queue_timeout)
+        result = None
+        try:
+            result = await super()._agenerate([prompts[i] for i in missing], stop=stop,
+                                              run_manager=run_manager, **kwargs)
+        finally:
+            self._gateway.limiter.release()
+            self._record(started, queue_wait, result, error=result is None)
+        await asyncio.to_thread(self._to_cache, keys, missing, result, time.perf_counter() - started - queue_wait)
+        for i, generation in zip(missing, result.generations):
+            generations[i] = generation
+        return LLMResult(generations=generations)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        started = time.perf_counter()
+        queue_wait = self._gateway.limiter.acquire(self._gateway.queue_timeout)
+        info, error = None, True
+        try:
+            for chunk in super()._stream(prompt, stop=stop, run_manager=run_manager, **kwargs):
+                if chunk.generation_info:
+                    info = chunk.generation_info
+                yield chunk
+            error = False
+        finally:
+            self._gateway.limiter.release()
+            elapsed = time.perf_counter() - started
+            self._gateway.stats_for(self.role).record(elapsed, queue_wait, info, error)
+            record_llm_call(elapsed, (info or {}).get("prompt_eval_count") or 0, (info or {}).get("eval_count") or 0)
+
+
+class LLMGateway:
+    """
+    Per-role Ollama clients behind a shared connection pool and a fair in-flight limit.
+
+    Args:
+        base_url (str): Ollama server URL.
+        max_in_flight (int): Generations allowed to run concurrently across all roles.
+        queue_timeout (float): Seconds a call may wait for a slot before failing.
+        keep_alive (str): Ollama ``keep_alive`` sent with every request.
+        cache (LLMResponseCache): Response cache for temperature-0 roles; None disables caching.
+    """
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT, keep_alive: str = LLM_KEEP_ALIVE,
+                 cache: Optional[LLMResponseCache] = None):
+        self.base_url = base_url
+        self.cache = cache
+        self.queue_timeout = queue_timeout
+        self.keep_alive = keep_alive
+        self.limiter = FairLimiter(max_in_flight)
+        limits = httpx.Limits(max_connections=max_in_flight * 2, max_keepalive_connections=max_in_flight * 2,
+                              keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY)
+        # One transport (and so one connection pool) for the sync clients of every role
+        self._transport = httpx.HTTPTransport(limits=limits)
+        self._async_limits = limits
+        self._clients: Dict[str, GatewayLLM] = {}
+        self._stats: Dict[str, RoleStats] = {}
+        self._lock = threading.Lock()
+
+    def llm(self, role: str) -> GatewayLLM:
+        """Get or create the client of a role."""
+        with self._lock:
+            client = self._clients.get(role)
+            if client is None:
+                settings = role_settings(role)
+                client = GatewayLLM(
+                    role=role,
+                    base_url=self.base_url,
+                    keep_alive=self.keep_alive,
+                    sync_client_kwargs={"transport": self._transport},
+                    async_client_kwargs={"limits": self._async_limits},
+                    **settings,
+                )
+                client._gateway = self
+                self._clients[role] = client
+                logger.info(f"Initialized LLM client for role '{role}': {settings}")
+            return client
+
+    def stats_for(self, role: str) -> RoleStats:
+        with self._lock:
+            return self._stats.setdefault(role, RoleStats())
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue state, per-role latency, queue wait and throughput, and cache savings."""
+        with self._lock:
+            roles = dict(self._stats)
+        return {
+            **self.limiter.snapshot(),
+            "roles": {role: stats.snapshot() for role, stats in sorted(roles.items())},
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+_gateway_instance = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the process-wide LLM gateway."""
+    global _gateway_instance
+    if _gateway_instance is None:
+        _gateway_instance = LLMGateway(cache=get_llm_cache())
+    return _gateway_instance
+
+
+def get_role_llm(role: str) -> GatewayLLM:
+    """Shortcut for ``get_llm_gateway().llm(role)``."""
+    return get_llm_gateway().llm(role)
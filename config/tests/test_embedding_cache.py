@@ -0,0 +1,74 @@
+import asyncio
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+from config.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_repeated_queries_are_served_from_the_cache():
+    model = _CountingEmbeddings()
+    embeddings = CachedQueryEmbeddings(model, QueryEmbeddingCache(max_bytes=1 << 20), model="m")
+
+    first = embeddings.embed_query("News related to TCS")
+    assert embeddings.embed_query("News related to TCS") == first
+    assert model.batches == [["News related to TCS"]]
+
+    # Only the misses of a batch reach the model, in one call
+    vectors = asyncio.run(embeddings.aembed_queries(["News related to TCS", "News related to INFY"]))
+    assert vectors[0] == first
+    assert model.batches[-1] == ["News related to INFY"]
+
+    # Documents are never cached
+    embeddings.embed_documents(["News related to TCS"])
+    assert model.batches[-1] == ["News related to TCS"]
+
+    stats = embeddings.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+
+
+def test_lru_eviction_by_bytes():
+    cache = QueryEmbeddingCache(max_bytes=10_000)
+    vector = [0.0] * 512  # 2 KiB each, stored as float32
+    for i in range(6):
+        cache.put("m", f"q{i}", vector)
+        cache.get("m", "q0")  # keep q0 recently used
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 10_000
+    assert stats["evictions"] > 0
+    assert cache.get("m", "q0") is not None
+    assert cache.get("m", "q1") is None
+    assert cache.get("other-model", "q0") is None
+    assert cache._entries[("m", "q0")].dtype == np.float32
+
+
+def test_disabled_cache_and_warm_up():
+    model = _CountingEmbeddings()
+    disabled = CachedQueryEmbeddings(model, QueryEmbeddingCache(max_bytes=0))
+    disabled.embed_query("q")
+    disabled.embed_query("q")
+    assert len(model.batches) == 2
+    assert disabled.warm_up(["q"]) == 0
+
+    model = _CountingEmbeddings()
+    embeddings = CachedQueryEmbeddings(model, QueryEmbeddingCache())
+    assert embeddings.warm_up(["a", "b", "a"]) == 2
+    assert embeddings.warm_up(["a", "c"]) == 1
+    # Each warmed text is looked up once
+    assert embeddings.cache.stats()["misses"] == 3
+    embeddings.embed_query("b")
+    assert model.batches == [["a", "b"], ["c"]]
@@ -0,0 +1,86 @@
+import multiprocessing
+import time
+
+from langchain_core.outputs import Generation, LLMResult
+from langchain_ollama import OllamaLLM
+
+from config.llm_cache import LLMResponseCache, cache_key
+from config.llm_gateway import LLMGateway, GENERATOR_ROLE, SQL_ROLE
+
+
+def _writer(path, worker):
+    cache = LLMResponseCache(path)
+    for i in range(50):
+        cache.put(cache_key("m", "sql", f"prompt {i}"), "sql", "m", f"answer {i} from {worker}", {}, 1.0)
+
+
+def test_hit_miss_and_ttl(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), ttl=0.2)
+    key = cache_key("qwen", SQL_ROLE, "SELECT ...")
+    assert key != cache_key("qwen", GENERATOR_ROLE, "SELECT ...")
+    assert cache.get(key) is None
+
+    cache.put(key, SQL_ROLE, "qwen", "SELECT 1", {"eval_count": 3}, inference_s=2.5)
+    assert cache.get(key) == ("SELECT 1", {"eval_count": 3})
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_inference_s"]) == (1, 1, 2.5)
+
+    time.sleep(0.25)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_eviction_keeps_recently_used(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_bytes=400)
+    keys = [cache_key("m", SQL_ROLE, str(i)) for i in range(10)]
+    for key in keys:
+        cache.put(key, SQL_ROLE, "m", "x" * 60, {}, 1.0)
+        time.sleep(0.001)
+    cache.get(keys[0])
+    cache.evict()
+
+    assert cache.stats()["bytes"] <= 400
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[-1]) is not None
+
+
+def test_concurrent_processes_share_the_file(tmp_path):
+    path = str(tmp_path / "cache.db")
+    LLMResponseCache(path)
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_writer, args=(path, w)) for w in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+    assert LLMResponseCache(path).stats()["entries"] == 50
+
+
+def test_gateway_serves_repeats_from_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_generate(self, prompts, stop=None, run_manager=None, **kwargs):
+        calls.extend(prompts)
+        return LLMResult(generations=[[Generation(text=f"out:{p}")] for p in prompts])
+
+    monkeypatch.setattr(OllamaLLM, "_generate", fake_generate)
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), bypass_roles={GENERATOR_ROLE})
+    gateway = LLMGateway(cache=cache)
+
+    sql = gateway.llm(SQL_ROLE)
+    assert sql.invoke("q1") == "out:q1"
+    assert sql.invoke("q1") == "out:q1"
+    assert sql.batch(["q1", "q2"]) == ["out:q1", "out:q2"]
+    assert calls == ["q1", "q2"]
+
+    # Bypassed roles always reach the model
+    generator = gateway.llm(GENERATOR_ROLE)
+    generator.invoke("q1")
+    generator.invoke("q1")
+    assert calls == ["q1", "q2", "q1", "q1"]
+
+    stats = gateway.stats()
+    assert stats["roles"][SQL_ROLE]["cache_hits"] == 2
+    assert stats["cache"]["hits"] == 2
@@ -0,0 +1,109 @@
+import threading
+import time
+
+from langchain_core.outputs import Generation, LLMResult
+from langchain_ollama import OllamaLLM
+
+from config.llm_config import get_llm_singleton
+from config.llm_gateway import FairLimiter, LLMGateway, GRADER_ROLE, SQL_ROLE, role_settings
+from utils import metrics
+
+
+def test_limiter_admits_in_arrival_order():
+    limiter = FairLimiter(1)
+    limiter.acquire()
+    admitted = []
+
+    def waiter(name):
+        limiter.acquire()
+        admitted.append(name)
+        limiter.release()
+
+    threads = []
+    for name in ["first", "second", "third"]:
+        thread = threading.Thread(target=waiter, args=(name,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)  # make the arrival order deterministic
+
+    assert limiter.snapshot() == {"limit": 1, "in_flight": 1, "queued": 3}
+    limiter.release()
+    for thread in threads:
+        thread.join(2)
+    assert admitted == ["first", "second", "third"]
+
+
+def test_limiter_times_out():
+    limiter = FairLimiter(1)
+    limiter.acquire()
+    try:
+        limiter.acquire(timeout=0.05)
+        assert False, "expected a timeout"
+    except TimeoutError:
+        pass
+    assert limiter.snapshot()["queued"] == 0
+
+
+def test_role_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("LLM_GRADER_TEMPERATURE", "0.3")
+    assert role_settings(GRADER_ROLE)["num_predict"] is None
+    monkeypatch.setenv("LLM_GRADER_NUM_PREDICT", "4")
+    settings = role_settings(GRADER_ROLE)
+    assert settings["num_predict"] == 4
+    assert settings["temperature"] == 0.3
+
+
+def test_gateway_limits_concurrency_and_records_stats(monkeypatch):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_generate(self, prompts, stop=None, run_manager=None, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        info = {"eval_count": 20, "eval_duration": 500_000_000}
+        return LLMResult(generations=[[Generation(text="SELECT 1", generation_info=info)]])
+
+    monkeypatch.setattr(OllamaLLM, "_generate", fake_generate)
+    gateway = LLMGateway(max_in_flight=2)
+    llm = gateway.llm(SQL_ROLE)
+    assert gateway.llm(SQL_ROLE) is llm
+
+    threads = [threading.Thread(target=llm.invoke, args=("question",)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert peak[0] == 2
+    stats = gateway.stats()
+    assert stats["in_flight"] == 0
+    sql = stats["roles"][SQL_ROLE]
+    assert sql["calls"] == 6
+    assert sql["tokens_per_sec"] == 40.0
+    assert sql["queue_wait_max_s"] > 0
+
+
+def test_llm_singleton_respects_temperature():
+    assert get_llm_singleton(0) is get_llm_singleton(0)
+    assert get_llm_singleton(0.7).temperature == 0.7
+
+
+def test_gateway_calls_are_recorded_under_the_current_node(monkeypatch):
+    def fake_generate(self, prompts, stop=None, run_manager=None, **kwargs):
+        info = {"prompt_eval_count": 30, "eval_count": 2}
+        return LLMResult(generations=[[Generation(text="yes", generation_info=info)]])
+
+    monkeypatch.setattr(OllamaLLM, "_generate", fake_generate)
+    labels = ("news_watchlist", "grade_documents")
+    calls, tokens = metrics.LLM_CALLS.value(labels), metrics.LLM_PROMPT_TOKENS.value(labels)
+
+    # A chain called outside any instrumented graph, as the watchlist digest calls the grader
+    with metrics.node_context(*labels):
+        LLMGateway().llm(GRADER_ROLE).invoke("question")
+
+    assert metrics.LLM_CALLS.value(labels) == calls + 1
+    assert metrics.LLM_PROMPT_TOKENS.value(labels) == tokens + 30
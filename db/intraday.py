@@ -0,0 +1,249 @@
+"""
+Intraday bars: one-minute bars and their rollups.
+
+Minute bars are stored in ``stock_bars_1m``, range-partitioned by month (see
+``db/migrations/v0005_intraday_bars.py``); writes create the partitions of
+backfilled months. Every write of minute bars also recomputes the 5m, 15m, 1h
+and 1d buckets it touches. Each level is rolled up from the level below
+(1m -> 5m -> 15m -> 1h -> 1d), so a batch costs a few small grouped upserts, not
+a rescan of the minute data.
+
+Buckets start at multiples of their length from ``INTRADAY_BUCKET_ORIGIN``
+(a session open, 09:15 IST for NSE), so every bucket lies inside one bucket of
+each coarser level. A day bucket starts at the session open.
+
+Reads pick the coarsest granularity that answers them (``choose_granularity``):
+the one whose buckets line up with both ends of the requested range and are no
+longer than the requested resolution. A week of hourly bars reads the 1h table;
+the high between 10:00 and 10:20 reads 5m bars.
+"""
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from db.migrations.partitioning import create_range_partition
+from db.migrations.runner import migration_lock
+from utils.logger import logger
+
+load_dotenv()
+
+INTRADAY_TIMEZONE = os.getenv("INTRADAY_TIMEZONE", "Asia/Kolkata")
+INTRADAY_BUCKET_ORIGIN = datetime.fromisoformat(os.getenv("INTRADAY_BUCKET_ORIGIN", "2000-01-03T09:15:00+05:30"))
+# Rows per INSERT statement when writing minute bars
+INTRADAY_UPSERT_PAGE_ROWS = int(os.getenv("INTRADAY_UPSERT_PAGE_ROWS", "5000"))
+
+# Finest first; each level is rolled up from the one before it
+GRANULARITIES: Dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+BAR_COLUMNS = ("ticker", "ts", "open", "high", "low", "close", "volume")
+
+
+def month_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Start and end of the minute bar partition holding ``day``: its month in ``INTRADAY_TIMEZONE``."""
+    zone = ZoneInfo(INTRADAY_TIMEZONE)
+    return (datetime(day.year, day.month, 1, tzinfo=zone),
+            datetime(day.year + day.month // 12, day.month % 12 + 1, 1, tzinfo=zone))
+
+
+def create_month_partition(cursor, day: date) -> bool:
+    """Create the minute bar partition of the month of ``day`` unless it exists."""
+    start, end = month_bounds(day)
+    return create_range_partition(cursor, "stock_bars_1m", f"stock_bars_1m_{start:%Y_%m}", "ts",
+                                  ", ".join(BAR_COLUMNS), start, end)
+
+
+def table_of(granularity: str) -> str:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unknown granularity {granularity!r}; expected {list(GRANULARITIES)}")
+    return f"stock_bars_{granularity}"
+
+
+def parse_granularity(value: str) -> timedelta:
+    """'5m', '1h', '1d' or a number of minutes."""
+    value = value.strip().lower()
+    if value in GRANULARITIES:
+        return GRANULARITIES[value]
+    units = {"m": "minutes", "h": "hours", "d": "days"}
+    try:
+        if value[-1:] in units:
+            return timedelta(**{units[value[-1]]: int(value[:-1])})
+        return timedelta(minutes=int(value))
+    except ValueError:
+        raise ValueError(f"invalid interval {value!r}; expected e.g. '5m', '1h', '1d' or minutes")
+
+
+def bucket_start(ts: datetime, granularity: str, origin: datetime = INTRADAY_BUCKET_ORIGIN) -> datetime:
+    """Start of the bucket holding ``ts``, as PostgreSQL's ``date_bin`` computes it."""
+    step = GRANULARITIES[granularity]
+    return ts - (ts - origin) % step
+
+
+def choose_granularity(start: datetime, end: datetime, resolution: Optional[timedelta] = None,
+                       origin: datetime = INTRADAY_BUCKET_ORIGIN) -> str:
+    """
+    The coarsest granularity whose buckets align with ``start`` and ``end`` (end
+    exclusive) and are no longer than ``resolution``.
+
+    Args:
+        start (datetime): Timezone-aware start of the range.
+        end (datetime): Timezone-aware end of the range.
+        resolution (timedelta): Longest bar the caller accepts; None for any.
+
+    Returns:
+        str: A key of ``GRANULARITIES``; '1m' answers everything.
+    """
+    chosen = "1m"
+    for granularity, step in GRANULARITIES.items():
+        if resolution is not None and step > resolution:
+            break
+        if (start - origin) % step or (end - origin) % step:
+            continue
+        chosen = granularity
+    return chosen
+
+
+def frame_to_rows(ticker: str, bars: pd.DataFrame) -> List[Tuple]:
+    """Rows of ``BAR_COLUMNS`` from a yfinance minute frame (timestamp index, Open/High/Low/Close/Volume)."""
+    if bars is None or len(bars) == 0:
+        return []
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is None:
+        index = index.tz_localize(INTRADAY_TIMEZONE)
+    timestamps = index.to_pydatetime()
+    columns = [bars[c].to_numpy(dtype=np.float64) for c in ("Open", "High", "Low", "Close")]
+    volumes = bars["Volume"].to_numpy(dtype=np.float64)
+    return [
+        (str(ticker), ts, *(None if np.isnan(c[i]) else float(c[i]) for c in columns),
+         None if np.isnan(volumes[i]) else int(volumes[i]))
+        for i, ts in enumerate(timestamps)
+    ]
+
+
+def rollup_query(target: str, source: str) -> str:
+    """Upsert of the ``target`` buckets in [%(start)s, %(end)s) of %(tickers)s from the ``source`` bars."""
+    bars = "COUNT(*)" if source == "1m" else "SUM(bars)"
+    return f"""
+        INSERT INTO {table_of(target)} (ticker, ts, open, high, low, close, volume, bars)
+        SELECT ticker, date_bin(%(step)s, ts, %(origin)s) AS bucket,
+               (array_agg(open ORDER BY ts))[1], MAX(high), MIN(low), (array_agg(close ORDER BY ts DESC))[1],
+               SUM(volume), {bars}
+          FROM {table_of(source)}
+         WHERE ticker = ANY(%(tickers)s) AND ts >= %(start)s AND ts < %(end)s
+         GROUP BY ticker, bucket
+        ON CONFLICT (ticker, ts) DO UPDATE
+           SET open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low, close = EXCLUDED.close,
+               volume = EXCLUDED.volume, bars = EXCLUDED.bars
+    """
+
+
+class IntradayStore:
+    """
+    Writes minute bars with their rollups and reads bars at the coarsest usable granularity.
+
+    Args:
+        db_client: ``PostgresDBClient``.
+    """
+    def __init__(self, db_client, origin: datetime = INTRADAY_BUCKET_ORIGIN):
+        self.db_client = db_client
+        self.origin = origin
+        # Months whose minute bar partition is known to exist
+        self._months = set()
+
+    def ensure_partitions(self, timestamps: Iterable[datetime]):
+        """Create the partitions of backfilled months, which would otherwise fill the default partition."""
+        zone = ZoneInfo(INTRADAY_TIMEZONE)
+        months = {ts.astimezone(zone).date().replace(day=1) for ts in timestamps} - self._months
+        if not months:
+            return
+        with self.db_client.transaction() as cursor:
+            migration_lock(cursor)
+            for month in sorted(months):
+                if create_month_partition(cursor, month):
+                    logger.info(f"Created minute bar partition for {month:%Y-%m}.")
+        self._months |= months
+
+    def rollup_ranges(self, start: datetime, end: datetime) -> List[Tuple[str, str, datetime, datetime]]:
+        """(target, source, start, end) of every rollup after minute bars in [start, end] changed."""
+        levels = list(GRANULARITIES)
+        return [(target, source, bucket_start(start, target, self.origin),
+                 bucket_start(end, target, self.origin) + GRANULARITIES[target])
+                for source, target in zip(levels, levels[1:])]
+
+    def roll_up(self, tickers: Sequence[str], start: datetime, end: datetime):
+        """Recompute every rollup bucket of ``tickers`` that overlaps [start, end], in one transaction."""
+        with self.db_client.transaction() as cursor:
+            for target, source, lo, hi in self.rollup_ranges(start, end):
+                cursor.execute(rollup_query(target, source), {
+                    "step": GRANULARITIES[target], "origin": self.origin, "tickers": list(tickers),
+                    "start": lo, "end": hi,
+                })
+
+    def upsert_bars(self, rows: Sequence[Tuple]) -> int:
+        """
+        Write minute bars (rows of ``BAR_COLUMNS``, any tickers) and update their rollups.
+
+        Returns:
+            int: Number of minute bars written.
+        """
+        if not rows:
+            return 0
+        timestamps = [row[1] for row in rows]
+        self.ensure_partitions(timestamps)
+        self.db_client.upsert_many(table_of("1m"), BAR_COLUMNS, rows, ("ticker", "ts"),
+                                   page_size=INTRADAY_UPSERT_PAGE_ROWS)
+        self.roll_up(sorted({row[0] for row in rows}), min(timestamps), max(timestamps))
+        return len(rows)
+
+    def upsert_minute_bars(self, ticker: str, bars: pd.DataFrame) -> int:
+        """Write a yfinance minute frame of one ticker; see ``upsert_bars``."""
+        count = self.upsert_bars(frame_to_rows(ticker, bars))
+        logger.info(f"Stored {count} minute bars for {ticker}.")
+        return count
+
+    def read_bars(self, ticker: str, start: datetime, end: datetime,
+                  resolution: Optional[timedelta] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Bars of ``ticker`` in [start, end) from the coarsest granularity that answers the range.
+
+        Returns:
+            tuple: (granularity, dict of columns 'ts', 'open', 'high', 'low', 'close', 'volume').
+        """
+        granularity = choose_granularity(start, end, resolution, self.origin)
+        rows, _ = self.db_client.fetch_query(
+            f"SELECT ts, open, high, low, close, volume FROM {table_of(granularity)}"
+            " WHERE ticker = %s AND ts >= %s AND ts < %s ORDER BY ts",
+            (ticker, start, end),
+        )
+        return granularity, bars_to_columns(rows)
+
+
+def bars_to_columns(rows: Iterable[Sequence]) -> Dict[str, Any]:
+    rows = list(rows)
+    return {
+        "ts": [row[0] for row in rows],
+        **{name: np.array([np.nan if row[i] is None else row[i] for row in rows], dtype=np.float64)
+           for i, name in enumerate(("open", "high", "low", "close", "volume"), start=1)},
+    }
+
+
+def summarize_bars(columns: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Open, high, low, close and volume of the whole range, from bars of any granularity."""
+    if not len(columns["ts"]):
+        return None
+    return {
+        "open": float(columns["open"][0]),
+        "high": float(np.nanmax(columns["high"])),
+        "low": float(np.nanmin(columns["low"])),
+        "close": float(columns["close"][-1]),
+        "volume": float(np.nansum(columns["volume"])),
+    }
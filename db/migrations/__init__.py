@@ -0,0 +1,3 @@
+"""
+Schema migrations of the stock database; see ``db/migrations/runner.py``.
+"""
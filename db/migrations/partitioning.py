@@ -0,0 +1,46 @@
+"""
+Helpers for the range-partitioned tables of the stock database.
+
+Partitioned tables have a ``<table>_default`` partition for rows outside their
+ranges, so inserts never fail for want of a partition. Partitions are created
+ahead of time by the migrations' ``maintain``; rows that landed in the default
+partition meanwhile move into the new partition when it is created.
+"""
+from datetime import date, datetime
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def bounds(start, end) -> str:
+    """``FOR VALUES`` bounds; the values are dates or datetimes, never user input."""
+    return f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+
+def create_range_partition(cursor, table: str, name: str, column: str, columns: str, start, end) -> bool:
+    """
+    Create partition ``name`` of ``table`` for ``start <= column < end`` unless it
+    exists, moving the rows of that range out of the default partition.
+
+    Args:
+        columns (str): The table's column list, for the move.
+
+    Returns:
+        bool: Whether the partition was created.
+    """
+    if not isinstance(start, (date, datetime)) or not isinstance(end, (date, datetime)):
+        raise TypeError("partition bounds must be dates or datetimes")
+    cursor.execute("SELECT to_regclass(%s)", (name,))
+    if cursor.fetchone()[0] is not None:
+        return False
+    cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {column} >= %s AND {column} < %s RETURNING {columns})"
+        f" INSERT INTO {name} ({columns}) SELECT {columns} FROM moved",
+        (start, end),
+    )
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds(start, end)}")
+    return True
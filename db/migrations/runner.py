@@ -0,0 +1,156 @@
+"""
+Versioned schema migrations of the stock database.
+
+Every migration is a module of ``db/migrations`` named ``v<NNNN>_<name>.py``
+that defines ``upgrade(cursor)``. It may also define:
+
+* ``applies()``: False while its setting is off (e.g. ``STOCK_DATA_PARTITIONING``).
+  The migration then stays pending and is applied once the setting is on.
+* ``maintain(cursor)``: run on every ``migrate`` once the migration is applied
+  (e.g. to create next year's partition).
+
+Applied versions are recorded in ``schema_migrations``. Each migration runs in
+its own transaction, which takes a transaction-level advisory lock, so replicas
+that start together apply every migration exactly once.
+
+Usage:
+    python -m db.migrations.runner [--status] [--target N]
+"""
+import argparse
+import importlib
+import pkgutil
+import re
+import threading
+from types import ModuleType
+from typing import Dict, List, NamedTuple, Optional
+
+from utils.logger import logger
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+"""
+# pg_advisory_xact_lock key shared by every process migrating the stock database
+_LOCK_KEY = 0x73746F636B
+
+_MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: ModuleType
+
+    def applies(self) -> bool:
+        return getattr(self.module, "applies", lambda: True)()
+
+
+def get_migrations() -> List[Migration]:
+    """All migrations of the package, ordered by version."""
+    package = importlib.import_module("db.migrations")
+    migrations = []
+    for info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f"db.migrations.{info.name}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    return sorted(migrations)
+
+
+def _applied_versions(cursor) -> set:
+    cursor.execute(SCHEMA_MIGRATIONS_DDL)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migration_lock(cursor):
+    """Serialize schema changes with every other process until the transaction ends."""
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_KEY,))
+
+
+def applied_versions(db_client) -> set:
+    with db_client.transaction() as cursor:
+        migration_lock(cursor)
+        return _applied_versions(cursor)
+
+
+def migrate(db_client, target: Optional[int] = None, migrations: Optional[List[Migration]] = None) -> List[int]:
+    """
+    Apply the pending migrations up to ``target`` (default: all), then run the
+    maintenance of the applied ones.
+
+    Args:
+        db_client: ``PostgresDBClient`` (anything with ``transaction``).
+        target (int): Last version to apply.
+
+    Returns:
+        list: Versions applied by this call.
+    """
+    migrations = get_migrations() if migrations is None else migrations
+    migrations = [m for m in migrations if target is None or m.version <= target]
+    applied = applied_versions(db_client)
+    newly_applied = []
+    for migration in migrations:
+        if migration.version in applied or not migration.applies():
+            continue
+        with db_client.transaction() as cursor:
+            migration_lock(cursor)
+            # Another replica may have applied it while this one waited for the lock
+            if migration.version not in _applied_versions(cursor):
+                logger.info(f"Applying migration {migration.version:04d}_{migration.name}.")
+                migration.module.upgrade(cursor)
+                cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                               (migration.version, migration.name))
+                newly_applied.append(migration.version)
+        applied.add(migration.version)
+
+    for migration in migrations:
+        if migration.version in applied and hasattr(migration.module, "maintain"):
+            with db_client.transaction() as cursor:
+                migration_lock(cursor)
+                migration.module.maintain(cursor)
+    return newly_applied
+
+
+def status(db_client, migrations: Optional[List[Migration]] = None) -> List[Dict]:
+    """State of every migration: 'applied', 'pending' or 'disabled' (pending while its setting is off)."""
+    applied = applied_versions(db_client)
+    return [{"version": m.version, "name": m.name,
+             "state": "applied" if m.version in applied else "pending" if m.applies() else "disabled"}
+            for m in (get_migrations() if migrations is None else migrations)]
+
+
+_migrated = False
+_migrate_lock = threading.Lock()
+
+
+def ensure_migrated(db_client):
+    """Migrate the stock database once per process."""
+    global _migrated
+    with _migrate_lock:
+        if not _migrated:
+            migrate(db_client)
+            _migrated = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="List the migrations and their state.")
+    parser.add_argument("--target", type=int, help="Last version to apply.")
+    args = parser.parse_args()
+
+    from scraper.stock_data_scraper import StockDataScraper
+
+    db_client = StockDataScraper.initialize_db_client()
+    if not args.status:
+        applied = migrate(db_client, target=args.target)
+        print(f"Applied {len(applied)} migration(s): {applied}")
+    for row in status(db_client):
+        print(f"{row['version']:04d}  {row['name']:<32}  {row['state']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+The stock_data table as the scraper created it before migrations existed.
+"""
+
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stock_data (
+            id SERIAL PRIMARY KEY,
+            ticker VARCHAR(20) NOT NULL,
+            date DATE NOT NULL,
+            open DOUBLE PRECISION,
+            high DOUBLE PRECISION,
+            low DOUBLE PRECISION,
+            close DOUBLE PRECISION,
+            volume BIGINT
+        );
+        """
+    )
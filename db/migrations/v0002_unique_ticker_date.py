@@ -0,0 +1,21 @@
+"""
+One bar per ticker and day.
+
+Every scrape used to append its whole period again, so tables migrated from
+earlier versions hold repeated bars; the latest scrape of each (ticker, date)
+is kept, as the readers did with ``ROW_NUMBER() ... ORDER BY id DESC``. The
+unique index also serves every query that filters on a ticker and a date range,
+and lets the scraper upsert.
+"""
+
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        DELETE FROM stock_data older
+         USING stock_data newer
+         WHERE older.ticker = newer.ticker AND older.date = newer.date AND older.id < newer.id
+        """
+    )
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS stock_data_ticker_date_key ON stock_data (ticker, date)")
+    cursor.execute("ANALYZE stock_data")
@@ -0,0 +1,9 @@
+"""
+BRIN index on date for queries over all tickers (``WHERE date = ...``, date
+ranges without a ticker). Scrapes append bars roughly in date order, so a block
+range summary of a few bytes per 128 pages prunes most of the table.
+"""
+
+
+def upgrade(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS stock_data_date_brin ON stock_data USING brin (date)")
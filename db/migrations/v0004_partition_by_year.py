@@ -0,0 +1,82 @@
+"""
+Range-partition stock_data by year (``STOCK_DATA_PARTITIONING=yearly``).
+
+The table is rebuilt as a partitioned table with one partition per year from
+the oldest bar to next year, plus a default partition for dates outside them.
+Queries with a date range only read the partitions of their years. Every
+``migrate`` creates the partitions of this year and the next one ahead of time;
+bars that had already landed in the default partition move into the new one.
+
+A partitioned table's keys must include the partition column, so the primary
+key becomes (id, date); the unique (ticker, date) index already includes it.
+"""
+from datetime import date
+
+from db.migrations.partitioning import bounds, create_range_partition, is_partitioned
+from db.models.stock_data import PARTITIONED
+
+COLUMNS = "id, ticker, date, open, high, low, close, volume"
+
+
+def applies() -> bool:
+    return PARTITIONED
+
+
+def _bounds(year: int) -> str:
+    return bounds(date(year, 1, 1), date(year + 1, 1, 1))
+
+
+def upgrade(cursor):
+    if is_partitioned(cursor, "stock_data"):
+        return
+    cursor.execute("SELECT EXTRACT(YEAR FROM MIN(date))::int, EXTRACT(YEAR FROM MAX(date))::int FROM stock_data")
+    first, last = cursor.fetchone()
+    this_year = date.today().year
+    first, last = first or this_year, max(last or this_year, this_year) + 1
+
+    # Free the names of the table, its key and indexes for the partitioned table
+    cursor.execute("ALTER TABLE stock_data RENAME TO stock_data_unpartitioned")
+    cursor.execute("ALTER TABLE stock_data_unpartitioned RENAME CONSTRAINT stock_data_pkey "
+                   "TO stock_data_unpartitioned_pkey")
+    cursor.execute("ALTER INDEX IF EXISTS stock_data_ticker_date_key RENAME TO stock_data_unpartitioned_ticker_date_key")
+    cursor.execute("ALTER INDEX IF EXISTS stock_data_date_brin RENAME TO stock_data_unpartitioned_date_brin")
+
+    cursor.execute(
+        """
+        CREATE TABLE stock_data (
+            id INTEGER NOT NULL DEFAULT nextval('stock_data_id_seq'),
+            ticker VARCHAR(20) NOT NULL,
+            date DATE NOT NULL,
+            open DOUBLE PRECISION,
+            high DOUBLE PRECISION,
+            low DOUBLE PRECISION,
+            close DOUBLE PRECISION,
+            volume BIGINT,
+            PRIMARY KEY (id, date)
+        ) PARTITION BY RANGE (date)
+        """
+    )
+    for year in range(first, last + 1):
+        cursor.execute(f"CREATE TABLE stock_data_y{year} PARTITION OF stock_data FOR VALUES {_bounds(year)}")
+    cursor.execute("CREATE TABLE stock_data_default PARTITION OF stock_data DEFAULT")
+    cursor.execute(f"INSERT INTO stock_data ({COLUMNS}) SELECT {COLUMNS} FROM stock_data_unpartitioned")
+    # Indexes are built after the copy, once per partition
+    cursor.execute("CREATE UNIQUE INDEX stock_data_ticker_date_key ON stock_data (ticker, date)")
+    cursor.execute("CREATE INDEX stock_data_date_brin ON stock_data USING brin (date)")
+    # The sequence would otherwise be dropped with the old table
+    cursor.execute("ALTER SEQUENCE stock_data_id_seq OWNED BY stock_data.id")
+    cursor.execute("DROP TABLE stock_data_unpartitioned")
+    cursor.execute("ANALYZE stock_data")
+
+
+def create_year_partition(cursor, year: int) -> bool:
+    """Create the partition of ``year`` unless it exists; see ``create_range_partition``."""
+    return create_range_partition(cursor, "stock_data", f"stock_data_y{year}", "date", COLUMNS,
+                                  date(year, 1, 1), date(year + 1, 1, 1))
+
+
+def maintain(cursor):
+    if is_partitioned(cursor, "stock_data"):
+        this_year = date.today().year
+        for year in (this_year, this_year + 1):
+            create_year_partition(cursor, year)
@@ -0,0 +1,41 @@
+"""
+Intraday bars (see ``db/intraday.py``).
+
+``stock_bars_1m`` holds minute bars, range-partitioned by month of ``ts`` in
+``INTRADAY_TIMEZONE``; ``maintain`` creates this month's and next month's
+partitions ahead of time. The rollups ``stock_bars_5m`` ... ``stock_bars_1d``
+are small enough for plain tables; ``bars`` counts the minute bars of a bucket,
+so a partial bucket (the current hour, a half day) can be told from a full one.
+The (ticker, ts) keys serve every read, which filters on one ticker and a range.
+"""
+from datetime import date
+
+from db.intraday import GRANULARITIES, create_month_partition, month_bounds, table_of
+from db.migrations.partitioning import bounds, is_partitioned
+
+BAR_COLUMNS_DDL = """
+    ticker VARCHAR(20) NOT NULL,
+    ts TIMESTAMPTZ NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume BIGINT
+"""
+
+
+def upgrade(cursor):
+    cursor.execute(f"CREATE TABLE stock_bars_1m ({BAR_COLUMNS_DDL}, PRIMARY KEY (ticker, ts)) PARTITION BY RANGE (ts)")
+    start, end = month_bounds(date.today())
+    cursor.execute(f"CREATE TABLE stock_bars_1m_{start:%Y_%m} PARTITION OF stock_bars_1m FOR VALUES {bounds(start, end)}")
+    cursor.execute("CREATE TABLE stock_bars_1m_default PARTITION OF stock_bars_1m DEFAULT")
+    for granularity in list(GRANULARITIES)[1:]:
+        cursor.execute(f"CREATE TABLE {table_of(granularity)} ({BAR_COLUMNS_DDL}, bars INTEGER NOT NULL,"
+                       " PRIMARY KEY (ticker, ts))")
+
+
+def maintain(cursor):
+    if is_partitioned(cursor, "stock_bars_1m"):
+        this_month = date.today()
+        for day in (this_month, month_bounds(this_month)[1].date()):
+            create_month_partition(cursor, day)
@@ -1,25 +1,37 @@
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Date, Float, BigInteger
+from sqlalchemy import create_engine, Column, Integer, String, Date, Float, BigInteger, Index
 from sqlalchemy.ext.declarative import declarative_base
 import os
 
 load_dotenv()
 
+# "yearly" range-partitions stock_data by date (applied by db/migrations); "none" keeps one table
+STOCK_DATA_PARTITIONING = os.getenv("STOCK_DATA_PARTITIONING", "none").lower()
+PARTITIONED = STOCK_DATA_PARTITIONING == "yearly"
+
 # Define the base class for declarative models
 Base = declarative_base()
 
 
-# Define the StockData model
+# Define the StockData model; the table itself is created and changed by db/migrations
 class StockData(Base):
     __tablename__ = "stock_data"  # Replace with a static name
 
     # __tablename__ = os.getenv('STOCK_TABLE')
 
+    # A partitioned table's keys must include the partition column
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ticker = Column(String(10), nullable=False)
-    date = Column(Date, nullable=False)
+    ticker = Column(String(20), nullable=False)
+    date = Column(Date, nullable=False, primary_key=PARTITIONED)
     open = Column(Float)
     high = Column(Float)
     low = Column(Float)
     close = Column(Float)
     volume = Column(BigInteger)
+
+    __table_args__ = (
+        # One bar per ticker and day; scrapes upsert on it
+        Index("stock_data_ticker_date_key", "ticker", "date", unique=True),
+        Index("stock_data_date_brin", "date", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (date)"} if PARTITIONED else {},
+    )
@@ -0,0 +1,304 @@
+"""
+Memory-mapped columnar cache of the daily bars stored in the stock_data table.
+
+Each ticker is stored as one date-sorted NumPy array per column:
+
+    <OHLCV_CACHE_DIRECTORY>/<TICKER>/<generation>/{date,open,high,low,close,volume}.npy
+    <OHLCV_CACHE_DIRECTORY>/<TICKER>/CURRENT
+
+Writers build a complete new generation and then atomically replace CURRENT, so
+readers in other processes never observe a half-written ticker. Readers map the
+columns with ``mmap_mode='r'`` and serve date windows as zero-copy slices found
+by binary search on the date column.
+
+The scraper only merges the bars it fetched (about a month), so a generation also
+records the first date from which it holds every bar of the ticker
+(``<generation>/covered_from``). ``window`` answers only windows starting on or
+after it; longer ones go to PostgreSQL until ``rebuild_from_db`` loads the full
+history.
+"""
+import os
+import shutil
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from utils.logger import logger
+
+load_dotenv()
+
+OHLCV_CACHE_DIRECTORY = os.getenv("OHLCV_CACHE_DIRECTORY", "ohlcv_cache")
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+DTYPES = {
+    "date": "datetime64[D]",
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.int64,
+}
+
+_POINTER_FILE = "CURRENT"
+_COVERAGE_FILE = "covered_from"
+
+
+class OHLCVCache:
+    """
+    Read-mostly columnar store of daily OHLCV bars, one directory per ticker.
+    """
+    def __init__(self, directory: str = OHLCV_CACHE_DIRECTORY):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # ticker -> (pointer mtime_ns, generation, {column: np.memmap}, covered_from)
+        self._mapped = {}
+
+    @staticmethod
+    def resolve_ticker(ticker: str) -> str:
+        """
+        Normalize a user supplied ticker the same way the SQL prompt does:
+        upper case, with the '.NS' suffix appended when no exchange suffix is given.
+        """
+        symbol = ticker.strip().upper()
+        return symbol if "." in symbol else f"{symbol}.NS"
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.directory, ticker)
+
+    def tickers(self):
+        """List the tickers that currently have a cached generation."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if os.path.exists(os.path.join(self.directory, name, _POINTER_FILE))
+        )
+
+    def _load(self, ticker: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Return the memory-mapped columns for a ticker, remapping when a writer has
+        published a new generation since the last call.
+        """
+        loaded = self._load_generation(ticker)
+        return loaded[0] if loaded else None
+
+    def _load_generation(self, ticker: str) -> Optional[Tuple[Dict[str, np.ndarray], Optional[date]]]:
+        """The memory-mapped columns of a ticker and the date they are complete from."""
+        pointer = os.path.join(self._ticker_dir(ticker), _POINTER_FILE)
+        try:
+            mtime_ns = os.stat(pointer).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = self._mapped.get(ticker)
+        if cached and cached[0] == mtime_ns:
+            return cached[2], cached[3]
+
+        with self._lock:
+            cached = self._mapped.get(ticker)
+            if cached and cached[0] == mtime_ns:
+                return cached[2], cached[3]
+            try:
+                with open(pointer, "r") as file:
+                    generation = file.read().strip()
+                generation_dir = os.path.join(self._ticker_dir(ticker), generation)
+                columns = {
+                    column: np.load(os.path.join(generation_dir, f"{column}.npy"), mmap_mode="r")
+                    for column in COLUMNS
+                }
+                covered_from = self._read_coverage(generation_dir, columns["date"])
+            except (OSError, ValueError) as e:
+                logger.warning(f"OHLCV cache for {ticker} is unreadable: {e}")
+                return None
+            self._mapped[ticker] = (mtime_ns, generation, columns, covered_from)
+            return columns, covered_from
+
+    @staticmethod
+    def _read_coverage(generation_dir: str, dates: np.ndarray) -> Optional[date]:
+        try:
+            with open(os.path.join(generation_dir, _COVERAGE_FILE), "r") as file:
+                return date.fromisoformat(file.read().strip())
+        except FileNotFoundError:
+            # Generations written before coverage was recorded hold what the scraper merged
+            return dates[0].astype(date) if len(dates) else None
+
+    def covered_from(self, ticker: str) -> Optional[date]:
+        """First date from which the cache holds every bar of a ticker; None when it is not cached."""
+        loaded = self._load_generation(self.resolve_ticker(ticker))
+        return loaded[1] if loaded else None
+
+    def slice(self, ticker: str, start: date, end: date) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Return zero-copy views of all columns for ``start <= date <= end``.
+
+        Args:
+            ticker (str): Stock ticker symbol (resolved with ``resolve_ticker``).
+            start (date): First date of the window, inclusive.
+            end (date): Last date of the window, inclusive.
+
+        Returns:
+            dict: Column name to read-only array view, or None when the ticker is not cached.
+        """
+        columns = self._load(self.resolve_ticker(ticker))
+        if columns is None:
+            return None
+        dates = columns["date"]
+        lo = np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return {column: values[lo:hi] for column, values in columns.items()}
+
+    def window(self, ticker: str, days: int, end: Optional[date] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Return the last ``days`` days of bars, matching
+        ``date >= CURRENT_DATE - INTERVAL '<days> days'`` in the SQL path, or None
+        when the window starts before the cached bars are complete.
+        """
+        end = end or date.today()
+        start = end - timedelta(days=int(days))
+        covered_from = self.covered_from(ticker)
+        if covered_from is None or start < covered_from:
+            return None
+        return self.slice(ticker, start, end)
+
+    def write(self, ticker: str, columns: Dict[str, np.ndarray], covered_from: Optional[date] = None):
+        """
+        Publish a complete, date-sorted set of columns as the new generation for a ticker.
+
+        Args:
+            covered_from (date): First date from which ``columns`` hold every bar
+                of the ticker; their first date when None.
+        """
+        ticker = self.resolve_ticker(ticker)
+        ticker_dir = self._ticker_dir(ticker)
+        generation = f"g{time.time_ns()}"
+        generation_dir = os.path.join(ticker_dir, generation)
+        os.makedirs(generation_dir, exist_ok=True)
+
+        for column in COLUMNS:
+            values = np.ascontiguousarray(columns[column], dtype=DTYPES[column])
+            np.save(os.path.join(generation_dir, f"{column}.npy"), values)
+        if covered_from is None and len(columns["date"]):
+            covered_from = np.asarray(columns["date"], dtype=DTYPES["date"])[0].astype(date)
+        if covered_from is not None:
+            with open(os.path.join(generation_dir, _COVERAGE_FILE), "w") as file:
+                file.write(covered_from.isoformat())
+
+        pointer = os.path.join(ticker_dir, _POINTER_FILE)
+        try:
+            with open(pointer, "r") as file:
+                previous = file.read().strip()
+        except FileNotFoundError:
+            previous = None
+
+        tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_pointer, "w") as file:
+            file.write(generation)
+        os.replace(tmp_pointer, pointer)
+        self._remove_stale_generations(ticker_dir, keep={generation, previous})
+
+    @staticmethod
+    def _remove_stale_generations(ticker_dir: str, keep: set):
+        # The previous generation is kept for readers that resolved CURRENT just before the swap.
+        for name in os.listdir(ticker_dir):
+            path = os.path.join(ticker_dir, name)
+            if name not in keep and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def merge(self, ticker: str, new_columns: Dict[str, np.ndarray]):
+        """
+        Merge new bars into the cached columns. Later rows win for duplicate dates,
+        mirroring the most recent insert in stock_data. The new bars are taken as
+        every bar between their first and last date.
+        """
+        loaded = self._load_generation(self.resolve_ticker(ticker))
+        new_dates = np.asarray(new_columns["date"], dtype=DTYPES["date"])
+        if not len(new_dates):
+            return
+        new_from, new_to = new_dates.min().astype(date), new_dates.max().astype(date)
+        if loaded is not None:
+            existing, covered_from = loaded
+            combined = {
+                column: np.concatenate([np.asarray(existing[column], dtype=DTYPES[column]),
+                                        np.asarray(new_columns[column], dtype=DTYPES[column])])
+                for column in COLUMNS
+            }
+            # Earlier bars only extend the coverage when they reach the covered range
+            if covered_from is None or new_to >= covered_from:
+                covered_from = new_from if covered_from is None else min(covered_from, new_from)
+        else:
+            combined, covered_from = new_columns, new_from
+        self.write(ticker, self._dedupe(combined), covered_from)
+
+    @staticmethod
+    def _dedupe(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Keep the last occurrence of every date and sort by date."""
+        columns = {column: np.asarray(columns[column], dtype=DTYPES[column]) for column in COLUMNS}
+        reversed_dates = columns["date"][::-1]
+        _, first_in_reversed = np.unique(reversed_dates, return_index=True)
+        keep = len(reversed_dates) - 1 - first_in_reversed
+        return {column: values[keep] for column, values in columns.items()}
+
+    def merge_history(self, ticker: str, historical_data):
+        """
+        Merge a yfinance ``Ticker.history`` DataFrame into the cache.
+        """
+        if historical_data is None or len(historical_data) == 0:
+            return
+        index = historical_data.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        self.merge(ticker, {
+            "date": index.values.astype("datetime64[D]"),
+            "open": historical_data["Open"].to_numpy(dtype=np.float64),
+            "high": historical_data["High"].to_numpy(dtype=np.float64),
+            "low": historical_data["Low"].to_numpy(dtype=np.float64),
+            "close": historical_data["Close"].to_numpy(dtype=np.float64),
+            "volume": historical_data["Volume"].fillna(0).to_numpy(dtype=np.int64),
+        })
+
+    def rebuild_from_db(self, db_client, tickers: Optional[Iterable[str]] = None):
+        """
+        Rebuild cached tickers from PostgreSQL, e.g. after rows were written outside the scraper.
+        """
+        if tickers is None:
+            rows, _ = db_client.fetch_query("SELECT DISTINCT ticker FROM stock_data")
+            tickers = [row[0] for row in rows]
+
+        for ticker in tickers:
+            rows, _ = db_client.fetch_query(
+                "SELECT date, open, high, low, close, volume FROM stock_data WHERE ticker = %s ORDER BY date, id",
+                (ticker,),
+            )
+            if not rows:
+                continue
+            date_col, open_col, high_col, low_col, close_col, volume_col = zip(*rows)
+            # The table holds no earlier bars, so every window is answered as the SQL path would
+            self.write(ticker, self._dedupe({
+                "date": np.array(date_col, dtype="datetime64[D]"),
+                "open": np.array(open_col, dtype=np.float64),
+                "high": np.array(high_col, dtype=np.float64),
+                "low": np.array(low_col, dtype=np.float64),
+                "close": np.array(close_col, dtype=np.float64),
+                "volume": np.array([v or 0 for v in volume_col], dtype=np.int64),
+            }), covered_from=date.min)
+            logger.info(f"Rebuilt OHLCV cache for {ticker} ({len(rows)} rows).")
+
+
+_cache_instance = None
+
+
+def get_ohlcv_cache() -> OHLCVCache:
+    """Get or create the process-wide OHLCV cache."""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = OHLCVCache()
+    return _cache_instance
+
+
+if __name__ == "__main__":
+    from scraper.stock_data_scraper import StockDataScraper
+
+    get_ohlcv_cache().rebuild_from_db(StockDataScraper.initialize_db_client())
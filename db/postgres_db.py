@@ -1,6 +1,12 @@
+import threading
+from contextlib import contextmanager
+
 import psycopg2
 from psycopg2 import sql, OperationalError
+from psycopg2.extras import execute_values
+from db.result_columns import ColumnBuffer, empty_frame
 from utils.logger import logger
+from utils.metrics import timed_db_query
 
 class PostgresDBClient:
     _instance = None  # Singleton instance
@@ -18,6 +24,8 @@ class PostgresDBClient:
             self.password = password
             self.port = port
             self.connection = None
+            # The connection is shared; explicit transactions must not interleave with other statements
+            self._lock = threading.RLock()
             self._initialized = True
 
     def connect(self):
@@ -48,12 +56,15 @@ class PostgresDBClient:
     def execute_query(self, query, params=None):
         """Execute a query (INSERT, UPDATE, DELETE)."""
         try:
-            self.connect()
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            self.connection.commit()
-            # logger.info("Query executed successfully.")
-            cursor.close()
+            with self._lock:
+                self.connect()
+                cursor = self.connection.cursor()
+                with timed_db_query() as rows:
+                    cursor.execute(query, params)
+                    rows.append(max(cursor.rowcount, 0))
+                self.connection.commit()
+                # logger.info("Query executed successfully.")
+                cursor.close()
         except Exception as e:
             logger.error(f"Error executing query: {e}")
             self.connection.rollback()
@@ -62,12 +73,15 @@ class PostgresDBClient:
     def fetch_query(self, query, params=None):
         """Execute a SELECT query and fetch results."""
         try:
-            self.connect()
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            cursor.close()
+            with self._lock:
+                self.connect()
+                cursor = self.connection.cursor()
+                with timed_db_query() as rows:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+                    rows.append(len(results))
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                cursor.close()
             return results, columns
         except Exception as e:
             logger.error(f"Error fetching data: {e}")
@@ -78,6 +92,80 @@ class PostgresDBClient:
                 pass
             raise
 
+    @contextmanager
+    def transaction(self):
+        """
+        Run statements in one transaction on the shared connection.
+
+        Yields:
+            cursor: Committed when the block exits, rolled back if it raises.
+        """
+        with self._lock:
+            self.connect()
+            self.connection.autocommit = False
+            try:
+                with self.connection.cursor() as cursor:
+                    yield cursor
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                self.connection.autocommit = True
+
+    def fetch_frame_readonly(self, query, params=None, statement_timeout_ms=None, chunk_rows=2000,
+                             max_rows=100_000, max_bytes=64 * 1024 * 1024):
+        """
+        Execute a SELECT in a read-only transaction through a server-side (named)
+        cursor, converting each fetched chunk straight into typed columns.
+        Used for queries that were not written by us (e.g. LLM generated SQL).
+
+        Args:
+            statement_timeout_ms (int): Abort the statement after this many milliseconds.
+            chunk_rows (int): Rows fetched per round trip.
+            max_rows (int): Hard row cap.
+            max_bytes (int): Approximate cap on the memory held by the result columns.
+
+        Returns:
+            pd.DataFrame: Results; ``df.attrs["truncated"]`` is True when a cap was hit.
+        """
+        try:
+            with self._lock:
+                self.connect()
+                # Named cursors need a transaction, which autocommit mode does not open
+                self.connection.autocommit = False
+                try:
+                    with self.connection.cursor() as cursor:
+                        cursor.execute("SET TRANSACTION READ ONLY")
+                        if statement_timeout_ms:
+                            cursor.execute("SET LOCAL statement_timeout = %s", (int(statement_timeout_ms),))
+                    with timed_db_query() as counted, self.connection.cursor(name="readonly_fetch") as cursor:
+                        cursor.itersize = chunk_rows
+                        cursor.execute(query, params)
+                        rows = cursor.fetchmany(chunk_rows)
+                        if cursor.description is None:
+                            return empty_frame()
+                        buffer = ColumnBuffer(cursor.description, max_rows=max_rows, max_bytes=max_bytes)
+                        while rows and not buffer.full:
+                            buffer.add(rows)
+                            if buffer.full:
+                                # One more row tells a result of exactly max_rows from a truncated one
+                                if not buffer.truncated and cursor.fetchmany(1):
+                                    buffer.truncated = True
+                                break
+                            rows = cursor.fetchmany(min(chunk_rows, max_rows - buffer.rows + 1))
+                        counted.append(buffer.rows)
+                    if buffer.truncated:
+                        logger.warning(f"Query result truncated at {buffer.rows} rows / {buffer.bytes} bytes.")
+                    return buffer.to_frame()
+                finally:
+                    # Nothing to commit; this also clears an aborted transaction
+                    self.connection.rollback()
+                    self.connection.autocommit = True
+        except Exception as e:
+            logger.error(f"Error fetching data: {e}")
+            raise
+
     # CRUD Methods
     def create(self, table, data):
         """Insert a row into a table."""
@@ -96,6 +184,44 @@ class PostgresDBClient:
             logger.error(f"Error in CREATE operation: {e}")
             raise
 
+    def upsert_many(self, table, columns, rows, conflict_columns, page_size=1000):
+        """
+        Insert rows in batches; a row whose ``conflict_columns`` match an existing
+        row (which needs a unique index on them) updates that row instead. Of rows
+        repeating the same key, only the last is written.
+
+        Args:
+            columns (list): Column names, in the order of the row values.
+            rows (list): Row tuples.
+            conflict_columns (list): Columns of the unique index.
+            page_size (int): Rows per statement.
+        """
+        if not rows:
+            return
+        # ON CONFLICT DO UPDATE rejects a statement that touches the same row twice; the last row wins
+        key_positions = [list(columns).index(c) for c in conflict_columns]
+        rows = list({tuple(row[i] for i in key_positions): row for row in rows}.values())
+        try:
+            updates = [c for c in columns if c not in conflict_columns]
+            query = sql.SQL(
+                "INSERT INTO {table} ({fields}) VALUES %s ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+            ).format(
+                table=sql.Identifier(table),
+                fields=sql.SQL(", ").join(map(sql.Identifier, columns)),
+                conflict=sql.SQL(", ").join(map(sql.Identifier, conflict_columns)),
+                updates=sql.SQL(", ").join(
+                    sql.SQL("{column} = EXCLUDED.{column}").format(column=sql.Identifier(c)) for c in updates
+                ),
+            )
+            with self._lock:
+                self.connect()
+                with self.connection.cursor() as cursor, timed_db_query() as counted:
+                    execute_values(cursor, query.as_string(self.connection), rows, page_size=page_size)
+                    counted.append(len(rows))
+        except Exception as e:
+            logger.error(f"Error in UPSERT operation: {e}")
+            raise
+
     def read(self, table, conditions=None):
         """Read rows from a table."""
         try:
@@ -0,0 +1,108 @@
+"""
+Typed column buffers for chunked query results.
+
+Rows fetched from a server-side cursor are converted chunk by chunk into typed
+NumPy arrays chosen from the Postgres column types, so only one chunk of row
+tuples is alive at a time and the result never exists as one big list of
+tuples next to its DataFrame copy. Buffers enforce a row cap and an
+approximate memory cap and report whether the result was truncated.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Postgres type OIDs -> NumPy dtype of the column buffer
+PG_TYPE_DTYPES = {
+    16: np.bool_,                       # bool
+    20: np.int64, 21: np.int64, 23: np.int64,   # int8, int2, int4
+    700: np.float64, 701: np.float64,   # float4, float8
+    1700: np.float64,                   # numeric
+    1082: "datetime64[D]",              # date
+    1114: "datetime64[us]",             # timestamp
+    1184: "datetime64[us]",             # timestamptz (converted to UTC-naive)
+}
+
+# Rough per-value cost of object columns (the Python object plus the pointer)
+_OBJECT_VALUE_BYTES = 64
+
+
+def _convert(values: List, dtype) -> np.ndarray:
+    if dtype is None:
+        return np.array(values, dtype=object)
+    if dtype in (np.int64, np.bool_):
+        try:
+            return np.fromiter(values, dtype=dtype, count=len(values))
+        except TypeError:
+            # NULLs: integers become floats with NaN, booleans stay objects
+            return np.array(values, dtype=np.float64 if dtype is np.int64 else object)
+    if dtype == np.float64:
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+    if dtype == "datetime64[us]":
+        values = [v.replace(tzinfo=None) if getattr(v, "tzinfo", None) else v for v in values]
+    return np.array(values, dtype=dtype)
+
+
+class ColumnBuffer:
+    """
+    Accumulates result chunks as typed columns under row and memory caps.
+
+    Args:
+        description: ``cursor.description`` of the query.
+        max_rows (int): Keep at most this many rows.
+        max_bytes (int): Stop once the buffered columns exceed this many bytes.
+    """
+    def __init__(self, description: Sequence, max_rows: int, max_bytes: int):
+        self.names = [column[0] for column in description]
+        self.dtypes = [PG_TYPE_DTYPES.get(column[1]) for column in description]
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.rows = 0
+        self.bytes = 0
+        self.truncated = False
+        self._chunks: List[List[np.ndarray]] = [[] for _ in self.names]
+
+    @property
+    def full(self) -> bool:
+        return self.truncated or self.rows >= self.max_rows
+
+    def add(self, rows: List[tuple]):
+        """Convert one chunk of rows; rows beyond the row cap mark the result truncated."""
+        if not rows:
+            return
+        room = self.max_rows - self.rows
+        if len(rows) > room:
+            rows = rows[:room]
+            self.truncated = True
+        for i, dtype in enumerate(self.dtypes):
+            array = _convert([row[i] for row in rows], dtype)
+            self._chunks[i].append(array)
+            self.bytes += array.nbytes + (len(array) * _OBJECT_VALUE_BYTES if array.dtype == object else 0)
+        self.rows += len(rows)
+        if self.bytes > self.max_bytes:
+            self.truncated = True
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        result = {}
+        for name, chunks, dtype in zip(self.names, self._chunks, self.dtypes):
+            if not chunks:
+                result[name] = np.array([], dtype=dtype or object)
+            elif len(chunks) == 1:
+                result[name] = chunks[0]
+            else:
+                # Chunks of one column can differ in dtype when only some contained NULLs;
+                # concatenate promotes them to a common dtype
+                result[name] = np.concatenate(chunks)
+        return result
+
+    def to_frame(self) -> pd.DataFrame:
+        """Build the DataFrame; ``df.attrs`` carries ``truncated`` and ``row_cap``."""
+        df = pd.DataFrame(self.columns(), columns=self.names)
+        df.attrs.update(truncated=self.truncated, row_cap=self.max_rows)
+        return df
+
+
+def empty_frame(names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    df = pd.DataFrame(columns=list(names or []))
+    df.attrs.update(truncated=False)
+    return df
@@ -0,0 +1,141 @@
+"""
+Batch price statistics over the stock_data table.
+
+One grouped query answers every (ticker, operation, price type, window)
+combination of a request: the rows of the longest window are read once,
+duplicate bars of the same ticker and date (repeated scrapes) are collapsed with
+``ROW_NUMBER()``, and each statistic is an aggregate with a per-window
+``FILTER`` clause. The result is a tickers x statistics matrix.
+"""
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from db.ohlcv_cache import OHLCVCache
+
+load_dotenv()
+
+# API operation name -> SQL aggregate
+OPERATIONS = {"highest": "MAX", "lowest": "MIN", "average": "AVG"}
+PRICE_TYPES = ("open", "high", "low", "close")
+
+PRICE_STATS_MAX_TICKERS = int(os.getenv("PRICE_STATS_MAX_TICKERS", "100"))
+PRICE_STATS_MAX_DAYS = int(os.getenv("PRICE_STATS_MAX_DAYS", str(10 * 365)))
+
+
+def _unique(values: Sequence) -> List:
+    return list(dict.fromkeys(values))
+
+
+def normalize_request(tickers: Sequence[str], operations: Sequence[str], price_types: Sequence[str],
+                      windows: Sequence) -> Tuple[List[str], List[str], List[str], List[int]]:
+    """
+    Validate a batch request and normalize it: tickers resolved like the SQL prompt
+    does ('TCS' -> 'TCS.NS'), names lower-cased, duplicates dropped, order kept.
+
+    Raises:
+        ValueError: On an empty list, an unknown operation or price type, a window
+        that is not a positive number of days, or too many tickers.
+    """
+    tickers = _unique(OHLCVCache.resolve_ticker(t) for t in tickers if t.strip())
+    operations = _unique(o.strip().lower() for o in operations if o.strip())
+    price_types = _unique(p.strip().lower() for p in price_types if p.strip())
+    try:
+        windows = _unique(int(str(w).strip()) for w in windows if str(w).strip())
+    except ValueError:
+        raise ValueError("windows must be whole numbers of days")
+
+    for name, values in (("tickers", tickers), ("operations", operations),
+                         ("price_types", price_types), ("windows", windows)):
+        if not values:
+            raise ValueError(f"{name} must not be empty")
+    if len(tickers) > PRICE_STATS_MAX_TICKERS:
+        raise ValueError(f"at most {PRICE_STATS_MAX_TICKERS} tickers per request")
+    unknown = [o for o in operations if o not in OPERATIONS]
+    if unknown:
+        raise ValueError(f"unknown operations {unknown}; expected {list(OPERATIONS)}")
+    unknown = [p for p in price_types if p not in PRICE_TYPES]
+    if unknown:
+        raise ValueError(f"unknown price_types {unknown}; expected {list(PRICE_TYPES)}")
+    if any(w < 1 or w > PRICE_STATS_MAX_DAYS for w in windows):
+        raise ValueError(f"windows must be between 1 and {PRICE_STATS_MAX_DAYS} days")
+    return tickers, operations, price_types, windows
+
+
+def build_price_stats_query(tickers: Sequence[str], operations: Sequence[str], price_types: Sequence[str],
+                            windows: Sequence[int], as_of: date) -> Tuple[str, list, List[Dict[str, Any]]]:
+    """
+    Build the grouped query for already normalized inputs.
+
+    Windows follow the SQL path and the OHLCV cache:
+    ``date >= CURRENT_DATE - INTERVAL '<days> days'``, with ``as_of`` as the current date.
+
+    Returns:
+        tuple: (query with %s placeholders, parameters, one descriptor per statistic
+        column in select order).
+    """
+    cutoffs = {w: as_of - timedelta(days=w) for w in windows}
+    columns, aggregates, params = [], [], []
+    # Identifiers below come from the OPERATIONS / PRICE_TYPES whitelists only
+    for operation in operations:
+        for price_type in price_types:
+            for window in windows:
+                alias = f"{operation}_{price_type}_{window}d"
+                aggregates.append(f"{OPERATIONS[operation]}({price_type}) FILTER (WHERE date >= %s) AS {alias}")
+                params.append(cutoffs[window])
+                columns.append({"operation": operation, "price_type": price_type, "window": window})
+
+    placeholders = ", ".join(["%s"] * len(tickers))
+    query = (
+        "WITH bars AS ("
+        f" SELECT ticker, date, {', '.join(PRICE_TYPES)},"
+        " ROW_NUMBER() OVER (PARTITION BY ticker, date ORDER BY id DESC) AS version"
+        " FROM stock_data"
+        f" WHERE ticker IN ({placeholders}) AND date >= %s AND date <= %s"
+        ")"
+        f" SELECT ticker, {', '.join(aggregates)}"
+        " FROM bars WHERE version = 1 GROUP BY ticker"
+    )
+    # Placeholders in text order: the CTE's tickers and date range, then one cutoff per aggregate
+    params = [*tickers, min(cutoffs.values()), as_of, *params]
+    return query, params, columns
+
+
+def fetch_price_stats(db_client, tickers: Sequence[str], operations: Sequence[str], price_types: Sequence[str],
+                      windows: Sequence, as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Compute every requested statistic for every ticker with a single query.
+
+    Args:
+        db_client: ``PostgresDBClient`` (anything with ``fetch_query``).
+        tickers (list): Ticker symbols; '.NS' is appended when no suffix is given.
+        operations (list): Any of 'highest', 'lowest', 'average'.
+        price_types (list): Any of 'open', 'high', 'low', 'close'.
+        windows (list): Window lengths in days.
+        as_of (date): End of the windows; defaults to today.
+
+    Returns:
+        dict: ``tickers`` (rows), ``columns`` (one operation/price_type/window
+        descriptor per column) and ``values``, a row per ticker with None where a
+        ticker has no bars in a window.
+    """
+    tickers, operations, price_types, windows = normalize_request(tickers, operations, price_types, windows)
+    as_of = as_of or date.today()
+    query, params, columns = build_price_stats_query(tickers, operations, price_types, windows, as_of)
+    rows, _ = db_client.fetch_query(query, params)
+
+    values = np.full((len(tickers), len(columns)), np.nan)
+    row_of = {ticker: i for i, ticker in enumerate(tickers)}
+    for row in rows:
+        index = row_of.get(row[0])
+        if index is not None:
+            values[index] = np.array(row[1:], dtype=np.float64)
+    return {
+        "as_of": as_of.isoformat(),
+        "tickers": tickers,
+        "columns": columns,
+        "values": [[None if np.isnan(v) else v for v in row] for row in values.tolist()],
+    }
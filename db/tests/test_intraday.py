@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from db.intraday import IntradayStore, choose_granularity, frame_to_rows, parse_granularity, summarize_bars
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+def _at(hour, minute, day=5, month=3):
+    return datetime(2024, month, day, hour, minute, tzinfo=IST)
+
+
+class _Cursor:
+    def __init__(self, db):
+        self.db = db
+
+    def execute(self, query, params=None):
+        self.db.statements.append((" ".join(str(query).split()), params))
+
+    def fetchone(self):
+        # No partition exists yet
+        return (None,)
+
+
+class _DB:
+    def __init__(self):
+        self.statements = []
+        self.upserts = []
+        self.transactions = 0
+
+    @contextmanager
+    def transaction(self):
+        self.transactions += 1
+        yield _Cursor(self)
+
+    def upsert_many(self, table, columns, rows, conflict_columns, page_size=1000):
+        self.upserts.append((table, list(rows), conflict_columns))
+
+
+def test_choose_granularity_reads_the_coarsest_aligned_bars():
+    # A whole session, a week of sessions: day bars
+    assert choose_granularity(_at(9, 15), _at(9, 15, day=6)) == "1d"
+    assert choose_granularity(_at(9, 15), _at(9, 15, day=12), parse_granularity("1h")) == "1h"
+    assert choose_granularity(_at(10, 15), _at(13, 15)) == "1h"
+    assert choose_granularity(_at(10, 0), _at(10, 30)) == "15m"
+    assert choose_granularity(_at(10, 0), _at(10, 20)) == "5m"
+    assert choose_granularity(_at(10, 1), _at(10, 20)) == "1m"
+    assert choose_granularity(_at(9, 15), _at(9, 15, day=6), parse_granularity("10")) == "5m"
+
+
+def test_rollup_ranges_cover_the_touched_buckets_of_every_level():
+    ranges = IntradayStore(_DB()).rollup_ranges(_at(10, 3), _at(10, 7))
+    assert [(target, source, lo.strftime("%d %H:%M"), hi.strftime("%d %H:%M")) for target, source, lo, hi in ranges] == [
+        ("5m", "1m", "05 10:00", "05 10:10"),
+        ("15m", "5m", "05 10:00", "05 10:15"),
+        ("1h", "15m", "05 09:15", "05 10:15"),
+        ("1d", "1h", "05 09:15", "06 09:15"),
+    ]
+
+
+def test_upsert_writes_minute_bars_then_partitions_and_rollups():
+    db = _DB()
+    store = IntradayStore(db)
+    index = pd.DatetimeIndex([_at(15, 29, day=29, month=2), _at(9, 15, day=1), _at(9, 16, day=1)])
+    bars = pd.DataFrame({"Open": [1.0, 2.0, np.nan], "High": [1.0, 2.5, 3.0], "Low": [1.0, 1.5, 3.0],
+                         "Close": [1.0, 2.2, 3.0], "Volume": [10, 20, 30]}, index=index)
+    assert frame_to_rows("TCS.NS", bars)[2] == ("TCS.NS", _at(9, 16, day=1), None, 3.0, 3.0, 3.0, 30)
+
+    assert store.upsert_minute_bars("TCS.NS", bars) == 3
+    table, rows, conflict = db.upserts[0]
+    assert (table, len(rows), conflict) == ("stock_bars_1m", 3, ("ticker", "ts"))
+    created = [q for q, _ in db.statements if q.startswith("CREATE TABLE")]
+    assert created == ["CREATE TABLE stock_bars_1m_2024_02 (LIKE stock_bars_1m INCLUDING DEFAULTS)",
+                       "CREATE TABLE stock_bars_1m_2024_03 (LIKE stock_bars_1m INCLUDING DEFAULTS)"]
+    rollups = [(q.split()[2], params) for q, params in db.statements if q.startswith("INSERT INTO stock_bars_")]
+    assert [table for table, _ in rollups] == ["stock_bars_5m", "stock_bars_15m", "stock_bars_1h", "stock_bars_1d"]
+    assert rollups[-1][1]["step"] == timedelta(days=1) and rollups[-1][1]["tickers"] == ["TCS.NS"]
+    assert (rollups[-1][1]["start"], rollups[-1][1]["end"]) == (_at(9, 15, day=29, month=2), _at(9, 15, day=2))
+
+    # Partitions are only created once per store
+    transactions = db.transactions
+    store.upsert_minute_bars("TCS.NS", bars.iloc[1:])
+    assert db.transactions == transactions + 1
+
+
+def test_summarize_bars_of_any_granularity():
+    columns = {"ts": [_at(9, 15), _at(10, 15)], "open": np.array([10.0, 11.0]), "high": np.array([12.0, np.nan]),
+               "low": np.array([9.0, 10.5]), "close": np.array([11.0, 11.5]), "volume": np.array([100.0, 50.0])}
+    assert summarize_bars(columns) == {"open": 10.0, "high": 12.0, "low": 9.0, "close": 11.5, "volume": 150.0}
+    assert summarize_bars({"ts": []}) is None
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from db.migrations.runner import Migration, get_migrations, migrate, status
+from db.models.stock_data import StockData
+from rag_graphs.stock_data_rag_graph.sql_validator import STOCK_DATA_SCHEMA
+
+
+class _Cursor:
+    """Records statements; answers the runner's own queries from ``db.versions``."""
+    def __init__(self, db):
+        self.db = db
+        self._rows = []
+
+    def execute(self, query, params=None):
+        query = " ".join(str(query).split())
+        self.db.statements.append(query)
+        self._rows = []
+        if query.startswith("SELECT version FROM schema_migrations"):
+            self._rows = [(v,) for v in sorted(self.db.versions)]
+        elif query.startswith("INSERT INTO schema_migrations"):
+            self.db.pending.append(params[0])
+
+    def fetchall(self):
+        return self._rows
+
+
+class _DB:
+    def __init__(self, versions=()):
+        self.versions = set(versions)
+        self.statements = []
+        self.pending = []
+
+    @contextmanager
+    def transaction(self):
+        self.pending = []
+        yield _Cursor(self)
+        # Recorded versions only count once their transaction commits
+        self.versions.update(self.pending)
+
+
+def _migration(version, statement, applies=True, fails=False, maintain=None):
+    def upgrade(cursor):
+        cursor.execute(statement)
+        if fails:
+            raise RuntimeError("boom")
+    module = SimpleNamespace(upgrade=upgrade, applies=lambda: applies)
+    if maintain:
+        module.maintain = lambda cursor: cursor.execute(maintain)
+    return Migration(version, f"m{version}", module)
+
+
+def test_package_migrations_are_ordered_and_partitioning_is_opt_in():
+    migrations = get_migrations()
+    assert [(m.version, m.name) for m in migrations] == [
+        (1, "create_stock_data"), (2, "unique_ticker_date"), (3, "brin_date"), (4, "partition_by_year"),
+        (5, "intraday_bars")]
+    assert [m.applies() for m in migrations] == [True, True, True, False, True]
+
+
+def test_migrate_applies_pending_migrations_once_and_in_order():
+    db = _DB(versions={1})
+    migrations = [_migration(1, "ONE"), _migration(2, "TWO"), _migration(3, "THREE", maintain="KEEP THREE"),
+                  _migration(4, "FOUR", applies=False)]
+
+    assert migrate(db, migrations=migrations) == [2, 3]
+    assert [s for s in db.statements if s.isupper()] == ["TWO", "THREE", "KEEP THREE"]
+    assert sum(s.startswith("SELECT pg_advisory_xact_lock") for s in db.statements) == 4
+    assert [row["state"] for row in status(db, migrations)] == ["applied", "applied", "applied", "disabled"]
+
+    db.statements.clear()
+    assert migrate(db, migrations=migrations) == []
+    assert [s for s in db.statements if s.isupper()] == ["KEEP THREE"]
+
+
+def test_failed_migration_is_not_recorded_and_stops_the_run():
+    db = _DB()
+    migrations = [_migration(1, "ONE"), _migration(2, "TWO", fails=True), _migration(3, "THREE")]
+    with pytest.raises(RuntimeError):
+        migrate(db, migrations=migrations)
+    assert db.versions == {1}
+    assert migrate(_DB(), target=1, migrations=migrations) == [1]
+
+
+def test_model_matches_the_migrated_table():
+    db = _DB()
+    migrate(db, migrations=get_migrations()[:3])
+    ddl = " ".join(db.statements)
+
+    table = StockData.__table__
+    assert set(table.columns.keys()) == STOCK_DATA_SCHEMA["stock_data"]
+    assert all(f"{name} " in ddl for name in table.columns.keys())
+    for index in table.indexes:
+        assert f"INDEX IF NOT EXISTS {index.name} ON stock_data" in ddl
+    assert {tuple(c.name for c in index.columns) for index in table.indexes if index.unique} == {("ticker", "date")}
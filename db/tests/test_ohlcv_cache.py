@@ -0,0 +1,83 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from db.ohlcv_cache import OHLCVCache
+
+
+def _columns(dates, close):
+    n = len(dates)
+    return {
+        "date": np.array(dates, dtype="datetime64[D]"),
+        "open": np.array(close, dtype=float),
+        "high": np.array(close, dtype=float) + 1,
+        "low": np.array(close, dtype=float) - 1,
+        "close": np.array(close, dtype=float),
+        "volume": np.arange(n),
+    }
+
+
+def test_window_slices_by_date(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    cache.write("TCS.NS", _columns(["2024-01-01", "2024-01-05", "2024-01-10"], [1, 2, 3]))
+
+    window = cache.slice("TCS.NS", date(2024, 1, 2), date(2024, 1, 10))
+    assert window["close"].tolist() == [2.0, 3.0]
+    assert isinstance(window["close"].base, np.memmap) or isinstance(window["close"], np.memmap)
+
+    recent = cache.window("TCS", 5, end=date(2024, 1, 10))
+    assert recent["date"].tolist() == [date(2024, 1, 5), date(2024, 1, 10)]
+
+
+def test_unknown_ticker_returns_none(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    assert cache.window("INFY", 30) is None
+
+
+def test_merge_keeps_latest_row_per_date(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    cache.write("TCS.NS", _columns(["2024-01-01", "2024-01-02"], [1, 2]))
+    cache.merge("TCS.NS", _columns(["2024-01-03", "2024-01-02"], [3, 20]))
+
+    window = cache.slice("TCS.NS", date(2024, 1, 1), date(2024, 1, 31))
+    assert window["close"].tolist() == [1.0, 20.0, 3.0]
+
+
+def test_readers_pick_up_new_generation(tmp_path):
+    writer = OHLCVCache(str(tmp_path))
+    reader = OHLCVCache(str(tmp_path))
+    writer.write("TCS.NS", _columns(["2024-01-01"], [1]))
+    assert reader.slice("TCS.NS", date(2024, 1, 1), date(2024, 1, 31))["close"].tolist() == [1.0]
+
+    index = pd.DatetimeIndex(["2024-01-02"], tz="Asia/Kolkata")
+    history = pd.DataFrame({"Open": [2.0], "High": [3.0], "Low": [1.0], "Close": [2.5], "Volume": [10]}, index=index)
+    writer.merge_history("TCS.NS", history)
+
+    assert reader.slice("TCS.NS", date(2024, 1, 1), date(2024, 1, 31))["close"].tolist() == [1.0, 2.5]
+    assert reader.tickers() == ["TCS.NS"]
+
+
+def test_windows_before_the_covered_range_are_not_answered(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    cache.merge("TCS.NS", _columns(["2024-03-04", "2024-03-28"], [1, 2]))
+    assert cache.covered_from("TCS") == date(2024, 3, 4)
+    assert cache.window("TCS", 7, end=date(2024, 3, 28))["close"].tolist() == [2.0]
+    # A year of bars was asked for, a month was merged: PostgreSQL has to answer
+    assert cache.window("TCS", 365, end=date(2024, 3, 28)) is None
+
+    # Bars that reach the covered range extend it; a disjoint older stretch does not
+    cache.merge("TCS.NS", _columns(["2024-02-01", "2024-03-04"], [0.5, 1]))
+    assert cache.covered_from("TCS") == date(2024, 2, 1)
+    cache.merge("TCS.NS", _columns(["2023-01-02"], [0.1]))
+    assert cache.covered_from("TCS") == date(2024, 2, 1)
+
+
+def test_rebuilt_tickers_answer_every_window(tmp_path):
+    class _DB:
+        def fetch_query(self, query, params=None):
+            return [(date(2024, 3, 4), 1.0, 2.0, 0.5, 1.5, 10)], None
+
+    cache = OHLCVCache(str(tmp_path))
+    cache.rebuild_from_db(_DB(), ["TCS.NS"])
+    assert cache.window("TCS", 1825, end=date(2024, 3, 28))["close"].tolist() == [1.5]
@@ -0,0 +1,23 @@
+from unittest.mock import MagicMock
+
+from psycopg2 import sql
+
+import db.postgres_db as postgres_db
+from db.postgres_db import PostgresDBClient
+
+
+def test_upsert_many_keeps_the_last_row_per_conflict_key(monkeypatch):
+    client = object.__new__(PostgresDBClient)
+    client.connection, client._lock = MagicMock(), MagicMock()
+    client.connect = lambda: None
+    written = []
+    monkeypatch.setattr(sql.Composed, "as_string", lambda self, context: "UPSERT")
+    monkeypatch.setattr(postgres_db, "execute_values",
+                        lambda cursor, query, rows, page_size: written.append((query, list(rows))))
+
+    rows = [("TCS.NS", "2024-03-04", 1.0), ("TCS.NS", "2024-03-05", 2.0), ("TCS.NS", "2024-03-05", 2.5),
+            ("INFY.NS", "2024-03-05", 3.0)]
+    client.upsert_many("stock_data", ("ticker", "date", "close"), rows, ("ticker", "date"))
+
+    assert written == [("UPSERT", [("TCS.NS", "2024-03-04", 1.0), ("TCS.NS", "2024-03-05", 2.5),
+                                   ("INFY.NS", "2024-03-05", 3.0)])]
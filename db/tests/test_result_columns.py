@@ -0,0 +1,60 @@
+import datetime
+
+import numpy as np
+
+from db.result_columns import ColumnBuffer, empty_frame
+
+# (name, type_code) like cursor.description
+DESCRIPTION = [("ticker", 25), ("date", 1082), ("close", 701), ("volume", 20)]
+
+
+def _rows(start, count):
+    day = datetime.date(2024, 1, 1)
+    return [("TCS.NS", day + datetime.timedelta(days=i), 100.0 + i, 1000 + i)
+            for i in range(start, start + count)]
+
+
+def test_chunks_become_typed_columns():
+    buffer = ColumnBuffer(DESCRIPTION, max_rows=100, max_bytes=1 << 20)
+    buffer.add(_rows(0, 3))
+    buffer.add(_rows(3, 2))
+    df = buffer.to_frame()
+
+    assert len(df) == 5 and not df.attrs["truncated"]
+    assert df["close"].dtype == np.float64
+    assert df["volume"].dtype == np.int64
+    assert np.issubdtype(df["date"].dtype, np.datetime64)
+    assert df["volume"].tolist() == [1000, 1001, 1002, 1003, 1004]
+
+
+def test_nulls_in_integer_columns_become_nan():
+    buffer = ColumnBuffer(DESCRIPTION, max_rows=100, max_bytes=1 << 20)
+    buffer.add(_rows(0, 2))
+    buffer.add([("TCS.NS", datetime.date(2024, 2, 1), None, None)])
+    df = buffer.to_frame()
+
+    assert df["volume"].dtype == np.float64
+    assert np.isnan(df["volume"].iloc[-1]) and np.isnan(df["close"].iloc[-1])
+
+
+def test_row_cap_truncates():
+    buffer = ColumnBuffer(DESCRIPTION, max_rows=4, max_bytes=1 << 20)
+    buffer.add(_rows(0, 3))
+    assert not buffer.full
+    buffer.add(_rows(3, 3))
+
+    df = buffer.to_frame()
+    assert buffer.full and len(df) == 4
+    assert df.attrs["truncated"] and df.attrs["row_cap"] == 4
+
+
+def test_memory_cap_truncates():
+    buffer = ColumnBuffer(DESCRIPTION, max_rows=10_000, max_bytes=2_000)
+    while not buffer.full:
+        buffer.add(_rows(buffer.rows, 10))
+    assert buffer.truncated and buffer.rows < 10_000
+
+
+def test_empty_frame_is_not_truncated():
+    df = empty_frame(["ticker"])
+    assert list(df.columns) == ["ticker"] and not df.attrs["truncated"]
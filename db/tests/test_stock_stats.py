@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import date
+
+import pytest
+import sqlglot
+
+from db.stock_stats import build_price_stats_query, fetch_price_stats, normalize_request
+
+
+class _SQLiteClient:
+    """fetch_query over an in-memory SQLite stock_data table."""
+    def __init__(self, rows):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("CREATE TABLE stock_data (id INTEGER PRIMARY KEY, ticker TEXT, date TEXT, "
+                                "open REAL, high REAL, low REAL, close REAL, volume INTEGER)")
+        self.connection.executemany("INSERT INTO stock_data (ticker, date, open, high, low, close, volume) "
+                                    "VALUES (?, ?, ?, ?, ?, ?, 0)", rows)
+        self.queries = 0
+
+    def fetch_query(self, query, params=None):
+        self.queries += 1
+        params = [p.isoformat() if isinstance(p, date) else p for p in params]
+        cursor = self.connection.execute(sqlglot.transpile(query, read="postgres", write="sqlite")[0], params)
+        return cursor.fetchall(), [d[0] for d in cursor.description]
+
+
+def _bar(ticker, day, close):
+    return ticker, day, close, close + 1, close - 1, close
+
+
+def test_one_query_for_all_tickers_and_windows():
+    client = _SQLiteClient([
+        _bar("TCS.NS", "2024-01-10", 10.0),
+        _bar("TCS.NS", "2024-01-05", 20.0),
+        _bar("TCS.NS", "2023-12-01", 50.0),
+        _bar("INFY.NS", "2024-01-09", 7.0),
+        # Re-scraped bar: the later row wins
+        _bar("INFY.NS", "2024-01-09", 8.0),
+    ])
+
+    result = fetch_price_stats(client, ["tcs", "INFY", "WIPRO"], ["highest", "average"], ["close"], [7, 90],
+                               as_of=date(2024, 1, 10))
+
+    assert client.queries == 1
+    assert result["tickers"] == ["TCS.NS", "INFY.NS", "WIPRO.NS"]
+    assert [(c["operation"], c["window"]) for c in result["columns"]] == [
+        ("highest", 7), ("highest", 90), ("average", 7), ("average", 90)]
+    assert result["values"][0] == [20.0, 50.0, 15.0, pytest.approx(80.0 / 3)]
+    assert result["values"][1] == [8.0, 8.0, 8.0, 8.0]
+    assert result["values"][2] == [None, None, None, None]
+
+
+def test_query_parameters_follow_placeholders():
+    query, params, columns = build_price_stats_query(["TCS.NS"], ["lowest"], ["low", "high"], [7],
+                                                     date(2024, 1, 10))
+    assert query.count("%s") == len(params)
+    assert params[:3] == ["TCS.NS", date(2024, 1, 3), date(2024, 1, 10)]
+    assert len(columns) == 2
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"operations": ["median"]},
+    {"price_types": ["volume"]},
+    {"windows": ["0"]},
+    {"windows": ["week"]},
+    {"tickers": []},
+])
+def test_invalid_requests_are_rejected(kwargs):
+    request = {"tickers": ["TCS"], "operations": ["highest"], "price_types": ["close"], "windows": ["7"]}
+    request.update(kwargs)
+    with pytest.raises(ValueError):
+        normalize_request(**request)
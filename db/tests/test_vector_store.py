@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from db.vector_store import MemmapVectorStore
+
+
+class _LookupEmbeddings(Embeddings):
+    """Texts are 'v:<i>'; the vector is row i of a fixed random matrix."""
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[int(text.split(":")[1])].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(300, 16)).astype(np.float32)
+
+
+def _fill(store, count):
+    texts = [f"v:{i}" for i in range(count)]
+    metadatas = [{"ticker": "TCS.NS" if i % 3 == 0 else "INFY.NS", "published_ts": i} for i in range(count)]
+    return store.add_texts(texts, metadatas, ids=[f"id{i}" for i in range(count)])
+
+
+def _exact(vectors, query, rows, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit[rows] @ (query / np.linalg.norm(query))
+    return [f"v:{rows[i]}" for i in np.argsort(-scores)[:k]]
+
+
+def test_exact_search_and_filters(tmp_path, vectors):
+    store = MemmapVectorStore(str(tmp_path), _LookupEmbeddings(vectors))
+    _fill(store, 200)
+    query = vectors[250]
+
+    found = store.similarity_search_by_vector(query.tolist(), k=5)
+    assert [d.page_content for d in found] == _exact(vectors, query, np.arange(200), 5)
+
+    filtered = store.similarity_search_by_vector(query.tolist(), k=5, filter={"ticker": {"$in": ["TCS.NS"]}})
+    assert [d.page_content for d in filtered] == _exact(vectors, query, np.arange(0, 200, 3), 5)
+    assert all(d.metadata["ticker"] == "TCS.NS" for d in filtered)
+
+    recent = store.similarity_search_by_vector(
+        query.tolist(), k=50, filter={"$and": [{"ticker": "INFY.NS"}, {"published_ts": {"$gte": 190}}]})
+    assert sorted(d.metadata["published_ts"] for d in recent) == [190, 191, 193, 194, 196, 197, 199]
+
+    scored = store.similarity_search_with_relevance_scores("v:7", k=1)
+    assert scored[0][0].page_content == "v:7" and scored[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_delete_upsert_and_other_instances_see_writes(tmp_path, vectors):
+    embeddings = _LookupEmbeddings(vectors)
+    writer = MemmapVectorStore(str(tmp_path), embeddings)
+    reader = MemmapVectorStore(str(tmp_path), embeddings)
+    _fill(writer, 30)
+    assert len(reader) == 30
+
+    writer.delete(["id7"])
+    assert "v:7" not in [d.page_content for d in reader.similarity_search("v:7", k=3)]
+
+    # Re-adding an id replaces the chunk
+    writer.add_documents([Document(id="id8", page_content="v:299", metadata={"ticker": "WIPRO.NS"})])
+    [doc] = reader.get_by_ids(["id8"])
+    assert (doc.page_content, doc.metadata) == ("v:299", {"ticker": "WIPRO.NS"})
+    assert len(reader) == 29
+    assert reader.similarity_search("v:299", k=1)[0].id == "id8"
+
+    reopened = MemmapVectorStore(str(tmp_path), embeddings)
+    assert len(reopened) == 29
+    assert reopened.similarity_search("v:8", k=1)[0].page_content != "v:8"
+
+
+def test_dimension_mismatch_is_rejected(tmp_path, vectors):
+    store = MemmapVectorStore(str(tmp_path), _LookupEmbeddings(vectors))
+    _fill(store, 3)
+    with pytest.raises(ValueError):
+        store.add_embeddings(["x"], [[1.0, 2.0]])
+    assert store.add_embeddings([], []) == []
+    assert len(store) == 3
+
+
+def test_hnsw_index_matches_exact_search(tmp_path, vectors):
+    pytest.importorskip("hnswlib")
+    embeddings = _LookupEmbeddings(vectors)
+    store = MemmapVectorStore(str(tmp_path), embeddings, index="hnsw")
+    _fill(store, 300)
+    store.delete(["id0"])
+    query = vectors[0]
+
+    found = [d.page_content for d in store.similarity_search_by_vector(query.tolist(), k=10)]
+    assert "v:0" not in found
+    assert len(set(found) & set(_exact(vectors, query, np.arange(1, 300), 10))) >= 9
+
+    reopened = MemmapVectorStore(str(tmp_path), embeddings, index="hnsw")
+    assert [d.page_content for d in reopened.similarity_search_by_vector(query.tolist(), k=10)] == found
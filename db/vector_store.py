@@ -0,0 +1,479 @@
+"""
+In-process vector store over memory-mapped float32 vectors.
+
+An alternative to Chroma for the news chunks (``VECTOR_BACKEND=numpy`` or
+``hnsw``). It runs inside the API process, so a search costs no serialization
+and no round trip to a Chroma server. The layout of a store directory:
+
+    vectors.f32   unit-normalized float32 vectors, one row per chunk, append-only
+    chunks.db     SQLite: row -> id, text, metadata (JSON), alive flag, version
+    index.hnsw    HNSW graph over the rows (``hnsw`` only), saved after every write
+
+Adds append vectors and insert rows in one ``BEGIN IMMEDIATE`` transaction, so
+writers in different processes (API, scraper) are serialized. Deletes only clear
+the alive flag. Every write bumps a store version, and readers pick up the rows
+changed since their last version before each search. Search is exact (one matrix
+product) with ``numpy``. With ``hnsw`` it walks an hnswlib graph, falling back to
+an exact scan when a metadata filter leaves few rows. hnswlib is optional; without
+it ``hnsw`` falls back to exact search.
+
+Metadata filters follow Chroma's ``where`` syntax: ``{"ticker": "TCS.NS"}``,
+``{"ticker": {"$in": [...]}}``, ``$eq``, ``$ne``, ``$nin``, ``$gt``, ``$gte``,
+``$lt``, ``$lte``, ``$and`` and ``$or``.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from utils.logger import logger
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - hnswlib is optional
+    hnswlib = None
+
+load_dotenv()
+
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+# A filter matching at most this many rows is answered by an exact scan of those rows
+VECTOR_EXACT_FILTER_ROWS = int(os.getenv("VECTOR_EXACT_FILTER_ROWS", "5000"))
+
+INDEX_TYPES = ("numpy", "hnsw")
+_DTYPE = np.float32
+_ITEM_BYTES = np.dtype(_DTYPE).itemsize
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=_DTYPE))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _MetadataColumns:
+    """Per-key metadata columns for vectorized filter evaluation, built on first use."""
+    def __init__(self, metadatas: List[Optional[Dict[str, Any]]]):
+        self._metadatas = metadatas
+        self._columns: Dict[str, pd.Series] = {}
+
+    def column(self, key: str) -> pd.Series:
+        series = self._columns.get(key)
+        if series is None:
+            series = pd.Series([m.get(key) if m else None for m in self._metadatas], dtype=object)
+            self._columns[key] = series
+        return series
+
+    def mask(self, where: Dict[str, Any]) -> np.ndarray:
+        masks = []
+        for key, condition in where.items():
+            if key == "$and":
+                masks.extend(self.mask(part) for part in condition)
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self.mask(part) for part in condition]))
+            else:
+                masks.append(self._condition(self.column(key), condition))
+        if not masks:
+            return np.ones(len(self._metadatas), dtype=bool)
+        return np.logical_and.reduce(masks)
+
+    @staticmethod
+    def _condition(series: pd.Series, condition) -> np.ndarray:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        mask = np.ones(len(series), dtype=bool)
+        for op, value in condition.items():
+            if op == "$eq":
+                mask &= (series == value).to_numpy(dtype=bool)
+            elif op == "$ne":
+                mask &= (series != value).to_numpy(dtype=bool)
+            elif op == "$in":
+                mask &= series.isin(list(value)).to_numpy(dtype=bool)
+            elif op == "$nin":
+                mask &= ~series.isin(list(value)).to_numpy(dtype=bool)
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+                with np.errstate(invalid="ignore"):
+                    compare = {"$gt": np.greater, "$gte": np.greater_equal,
+                               "$lt": np.less, "$lte": np.less_equal}[op]
+                    mask &= compare(numbers, float(value))
+            else:
+                raise ValueError(f"Unsupported filter operator {op!r}")
+        return mask
+
+
+class _HnswIndex:
+    """hnswlib inner-product graph over store rows, persisted next to the vectors."""
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        self.version = 0
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        meta_path = path + ".json"
+        if os.path.exists(path) and os.path.exists(meta_path):
+            try:
+                with open(meta_path) as file:
+                    self.version = json.load(file)["version"]
+                self.index.load_index(path, max_elements=0)
+            except Exception as e:
+                logger.warning(f"Could not load HNSW index {path} ({e}); rebuilding.")
+                self.index = hnswlib.Index(space="ip", dim=dim)
+                self.version = 0
+        if self.version == 0:
+            self.index.init_index(max_elements=1024, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        self.index.set_ef(HNSW_EF_SEARCH)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        needed = self.index.get_current_count() + len(rows)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(vectors, rows)
+
+    def delete(self, rows: Iterable[int]):
+        for row in rows:
+            try:
+                self.index.mark_deleted(int(row))
+            except RuntimeError:
+                # Not in the graph (never added, or already deleted)
+                pass
+
+    def query(self, vector: np.ndarray, k: int, allowed: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        self.index.set_ef(max(HNSW_EF_SEARCH, k))
+        check = None if allowed is None else (lambda label: bool(allowed[label]))
+        labels, distances = self.index.knn_query(vector, k=k, filter=check)
+        # "ip" distance is 1 - inner product
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+    def save(self, version: int):
+        tmp = f"{self.path}.tmp"
+        self.index.save_index(tmp)
+        os.replace(tmp, self.path)
+        with open(f"{self.path}.json.tmp", "w") as file:
+            json.dump({"version": version}, file)
+        os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
+        self.version = version
+
+
+class MemmapVectorStore(VectorStore):
+    """
+    LangChain vector store over memory-mapped vectors with exact or HNSW search.
+
+    Args:
+        directory (str): Store directory (created when missing).
+        embedding (Embeddings): Embeds documents on add and queries on search.
+        index (str): 'numpy' for exact search, 'hnsw' for an hnswlib graph.
+    """
+    DDL = (
+        """CREATE TABLE IF NOT EXISTS chunks (
+            row INTEGER PRIMARY KEY,
+            id TEXT NOT NULL,
+            text TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            alive INTEGER NOT NULL,
+            version INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS chunks_id ON chunks (id)",
+        "CREATE INDEX IF NOT EXISTS chunks_version ON chunks (version)",
+        "CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    )
+
+    def __init__(self, directory: str, embedding: Embeddings, index: str = "numpy"):
+        if index not in INDEX_TYPES:
+            raise ValueError(f"index must be one of {INDEX_TYPES}")
+        if index == "hnsw" and hnswlib is None:
+            logger.warning("hnswlib is not installed; the vector store falls back to exact search.")
+            index = "numpy"
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.embedding = embedding
+        self.index_type = index
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._db_path = os.path.join(directory, "chunks.db")
+        self._lock = threading.RLock()
+        self._version = 0
+        self._dim: Optional[int] = None
+        self._ids: List[Optional[str]] = []
+        self._texts: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._columns = _MetadataColumns(self._metadatas)
+        self._hnsw: Optional[_HnswIndex] = None
+        with self._connect() as conn:
+            for statement in self.DDL:
+                conn.execute(statement)
+        self._refresh()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _info(conn, key: str, default=None):
+        row = conn.execute("SELECT value FROM store_info WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._alive.sum())
+
+    # Reading
+
+    def _refresh(self):
+        """Load the rows written (by any process) since the last refresh."""
+        with self._lock, self._connect() as conn:
+            version = int(self._info(conn, "version", 0))
+            if version == self._version:
+                return
+            if self._dim is None:
+                dim = self._info(conn, "dim")
+                self._dim = int(dim) if dim is not None else None
+            changed = conn.execute(
+                "SELECT row, id, text, metadata, alive FROM chunks WHERE version > ? ORDER BY row",
+                (self._version,),
+            ).fetchall()
+        if not changed:
+            self._version = version
+            return
+
+        previous_rows = len(self._ids)
+        size = max(previous_rows, changed[-1][0] + 1)
+        if size > previous_rows:
+            # Rows left behind by a writer that failed before committing stay dead
+            grow = size - previous_rows
+            self._ids.extend([None] * grow)
+            self._texts.extend([None] * grow)
+            self._metadatas.extend([None] * grow)
+            self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        added, removed = [], []
+        for row, chunk_id, text, metadata, alive in changed:
+            if row >= previous_rows or self._ids[row] is None:
+                self._ids[row] = chunk_id
+                self._texts[row] = text
+                self._metadatas[row] = json.loads(metadata)
+            if alive and not self._alive[row]:
+                added.append(row)
+                self._row_of[chunk_id] = row
+            elif not alive and self._alive[row]:
+                removed.append(row)
+                if self._row_of.get(chunk_id) == row:
+                    del self._row_of[chunk_id]
+            self._alive[row] = bool(alive)
+
+        if size > previous_rows or self._vectors is None:
+            self._vectors = np.memmap(self._vectors_path, dtype=_DTYPE, mode="r", shape=(size, self._dim))
+            self._columns = _MetadataColumns(self._metadatas)
+        if self.index_type == "hnsw":
+            self._sync_hnsw(added, removed)
+        self._version = version
+
+    def _sync_hnsw(self, added: List[int], removed: List[int]):
+        if self._hnsw is None:
+            self._hnsw = _HnswIndex(os.path.join(self.directory, "index.hnsw"), self._dim)
+            if self._hnsw.version:
+                # A saved graph covers everything up to its version; replay the rest
+                added, removed = self._changed_since(self._hnsw.version)
+            else:
+                added, removed = np.flatnonzero(self._alive).tolist(), []
+        if added:
+            rows = np.asarray(added, dtype=np.int64)
+            self._hnsw.add(rows, np.asarray(self._vectors[rows]))
+        self._hnsw.delete(removed)
+
+    def _changed_since(self, version: int) -> Tuple[List[int], List[int]]:
+        with self._connect() as conn:
+            changed = conn.execute("SELECT row, alive FROM chunks WHERE version > ?", (version,)).fetchall()
+        return [row for row, alive in changed if alive], [row for row, alive in changed if not alive]
+
+    def _document(self, row: int) -> Document:
+        return Document(id=self._ids[row], page_content=self._texts[row], metadata=dict(self._metadatas[row] or {}))
+
+    def _search(self, vector, k: int, where: Optional[Dict[str, Any]]) -> List[Tuple[int, float]]:
+        with self._lock:
+            self._refresh()
+            if self._vectors is None or not self._alive.any():
+                return []
+            query = _normalize(vector)[0]
+            allowed = self._alive if not where else self._alive & self._columns.mask(where)
+            candidates = int(allowed.sum())
+            k = min(k, candidates)
+            if k == 0:
+                return []
+            if self._hnsw is not None and (not where or candidates > VECTOR_EXACT_FILTER_ROWS):
+                try:
+                    rows, scores = self._hnsw.query(query, k, None if not where else allowed)
+                    return list(zip(rows.tolist(), scores.tolist()))
+                except RuntimeError as e:
+                    # Too few reachable neighbours under the filter; scan instead
+                    logger.debug(f"HNSW query fell back to an exact scan: {e}")
+            if candidates == len(allowed):
+                rows = None
+                scores = np.asarray(self._vectors @ query)
+            else:
+                rows = np.flatnonzero(allowed)
+                scores = np.asarray(self._vectors[rows] @ query)
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+            picked = top if rows is None else rows[top]
+            return list(zip(picked.tolist(), scores[top].tolist()))
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                                filter: Optional[Dict[str, Any]] = None,
+                                                **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Nearest chunks with their cosine distance (0 = identical direction)."""
+        with self._lock:
+            return [(self._document(row), 1.0 - score) for row, score in self._search(embedding, k, filter)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, filter)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                          **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k, filter)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._cosine_relevance_score_fn
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        with self._lock:
+            self._refresh()
+            return [self._document(self._row_of[i]) for i in ids if i in self._row_of]
+
+    def get(self, include: Sequence[str] = ("documents", "metadatas")) -> Dict[str, Any]:
+        """
+        All live chunks in the layout of Chroma's ``get``: ``ids`` plus the
+        ``documents``, ``metadatas`` and ``embeddings`` (unit-normalized) asked for.
+        """
+        with self._lock:
+            self._refresh()
+            rows = np.flatnonzero(self._alive)
+            result: Dict[str, Any] = {"ids": [self._ids[row] for row in rows]}
+            if "documents" in include:
+                result["documents"] = [self._texts[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [dict(self._metadatas[row] or {}) for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = (np.asarray(self._vectors[rows]) if len(rows)
+                                        else np.zeros((0, self._dim or 0), dtype=_DTYPE))
+            return result
+
+    # Writing
+
+    def _bump_version(self, conn) -> int:
+        version = int(self._info(conn, "version", 0)) + 1
+        conn.execute("INSERT OR REPLACE INTO store_info (key, value) VALUES ('version', ?)", (str(version),))
+        return version
+
+    def add_embeddings(self, texts: Sequence[str], embeddings, metadatas: Optional[Sequence[dict]] = None,
+                       ids: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Add chunks with precomputed embeddings. An id that already exists replaces
+        the previous chunk.
+        """
+        if not len(texts) and not len(embeddings):
+            return []
+        vectors = _normalize(embeddings)
+        if len(vectors) != len(texts):
+            raise ValueError("texts and embeddings differ in length")
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        with self._lock:
+            conn = self._connect()
+            try:
+                # Serializes writers across processes until COMMIT
+                conn.execute("BEGIN IMMEDIATE")
+                dim = self._info(conn, "dim")
+                if dim is None:
+                    conn.execute("INSERT INTO store_info (key, value) VALUES ('dim', ?)", (str(vectors.shape[1]),))
+                elif int(dim) != vectors.shape[1]:
+                    raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store's {dim}")
+                version = self._bump_version(conn)
+                with open(self._vectors_path, "ab") as file:
+                    first_row = file.tell() // (_ITEM_BYTES * vectors.shape[1])
+                    file.write(vectors.tobytes())
+                    file.flush()
+                    os.fsync(file.fileno())
+                conn.executemany(
+                    "UPDATE chunks SET alive = 0, version = ? WHERE id = ? AND alive = 1",
+                    [(version, chunk_id) for chunk_id in ids],
+                )
+                conn.executemany(
+                    "INSERT INTO chunks (row, id, text, metadata, alive, version) VALUES (?, ?, ?, ?, 1, ?)",
+                    [(first_row + i, chunk_id, text, json.dumps(metadata or {}, default=str), version)
+                     for i, (chunk_id, text, metadata) in enumerate(zip(ids, texts, metadatas))],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+            self._after_write(version)
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, *,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                version = self._bump_version(conn)
+                conn.executemany("UPDATE chunks SET alive = 0, version = ? WHERE id = ? AND alive = 1",
+                                 [(version, chunk_id) for chunk_id in ids])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+            self._after_write(version)
+        return True
+
+    def _after_write(self, version: int):
+        self._refresh()
+        if self._hnsw is not None:
+            try:
+                self._hnsw.save(version)
+            except Exception as e:
+                logger.warning(f"Could not save the HNSW index: {e}")
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, *,
+                   ids: Optional[List[str]] = None, directory: Optional[str] = None, index: str = "numpy",
+                   **kwargs: Any) -> "MemmapVectorStore":
+        if directory is None:
+            raise ValueError("MemmapVectorStore.from_texts needs a directory")
+        store = cls(directory, embedding, index=index)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
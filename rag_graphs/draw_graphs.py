@@ -0,0 +1,40 @@
+"""
+Render the graph diagrams. This used to happen on every import of the graph modules.
+
+Usage:
+    python -m rag_graphs.draw_graphs [news stock_data stock_charts] [--output-dir DIR] [--mermaid]
+
+PNG rendering goes through the mermaid.ink service and needs network access;
+``--mermaid`` writes the Mermaid source (.mmd) instead and works offline.
+"""
+import argparse
+import os
+
+from dotenv import load_dotenv
+from rag_graphs.registry import GRAPH_DIAGRAMS, get_graph_registry
+from utils.logger import logger
+
+
+def draw_graphs(names=None, output_dir=".", mermaid_source=False):
+    registry = get_graph_registry()
+    os.makedirs(output_dir, exist_ok=True)
+    for name in names or registry.names():
+        graph = registry.get(name).get_graph()
+        path = os.path.join(output_dir, GRAPH_DIAGRAMS.get(name, f"{name}.png"))
+        if mermaid_source:
+            path = os.path.splitext(path)[0] + ".mmd"
+            with open(path, "w") as file:
+                file.write(graph.draw_mermaid())
+        else:
+            graph.draw_mermaid_png(output_file_path=path)
+        logger.info(f"Wrote diagram for graph '{name}' to {path}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Render RAG graph diagrams.")
+    parser.add_argument("names", nargs="*", help="Graphs to draw (default: all)")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--mermaid", action="store_true", help="Write Mermaid source instead of PNG")
+    args = parser.parse_args()
+    draw_graphs(args.names, args.output_dir, args.mermaid)
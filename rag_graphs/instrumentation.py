@@ -0,0 +1,79 @@
+"""
+LangGraph instrumentation feeding ``utils.metrics``.
+
+``instrument_graph`` binds a ``MetricsCallbackHandler`` to a compiled graph, so
+every run records the wall time of the graph and of each node execution. While a
+node runs, the node is also set as the metrics context, so the LLM calls (recorded
+by the gateway, ``config/llm_gateway.py``), embedding and database time of lower
+layers are attributed to it.
+"""
+import os
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import Runnable
+
+from utils import metrics
+
+GRAPH_METRICS_ENABLED = os.getenv("GRAPH_METRICS_ENABLED", "true").lower() == "true"
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records graph and node timings of one graph.
+
+    Args:
+        graph (str): Graph name used as the ``graph`` label.
+    """
+    # Run in the caller's thread and context, also for async graph runs
+    run_inline = True
+
+    def __init__(self, graph: str):
+        self.graph = graph
+        # run id -> (kind, node, started, context token)
+        self._runs: Dict[UUID, tuple] = {}
+
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *, run_id: UUID,
+                       parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None,
+                       **kwargs: Any):
+        node = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            self._runs[run_id] = ("graph", None, time.perf_counter(), None)
+        elif node and kwargs.get("name") == node:
+            # Nested runnables inherit the node metadata; only the node's own run matches its name
+            token = metrics.set_current_node(self.graph, node)
+            self._runs[run_id] = ("node", node, time.perf_counter(), token)
+
+    def _finish_chain(self, run_id: UUID, error: bool):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        kind, node, started, token = run
+        elapsed = time.perf_counter() - started
+        if kind == "graph":
+            metrics.record_graph_run(self.graph, elapsed)
+            return
+        metrics.record_node(self.graph, node, elapsed, error=error)
+        try:
+            metrics._current_node.reset(token)
+        except ValueError:
+            # Ended in another context (e.g. a worker thread); that context is discarded anyway
+            pass
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        self._finish_chain(run_id, error=False)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish_chain(run_id, error=True)
+
+
+def instrument_graph(name: str, graph: Any) -> Any:
+    """
+    Bind the metrics handler to a compiled graph (no-op when disabled or when
+    ``graph`` is not a runnable).
+    """
+    if not GRAPH_METRICS_ENABLED or not isinstance(graph, Runnable):
+        return graph
+    return graph.with_config(callbacks=[MetricsCallbackHandler(name)])
@@ -0,0 +1,151 @@
+"""
+Splits news articles into token-bounded chunks for the vector store.
+
+The splitter and its tokenizer are built once per process (``get_splitter``),
+instead of reloading the tiktoken encoding on every sync. Token counts come from
+the shared tokenizer of ``utils/tokenizer.py``, so the splitter also works on
+hosts where the encoding cannot be downloaded.
+
+Batches of at least ``NEWS_CHUNK_PARALLEL_MIN_DOCS`` articles are split in a
+process pool (``NEWS_CHUNK_WORKERS``), in slices of ``NEWS_CHUNK_SLICE_DOCS``;
+smaller batches are split in the calling thread, where starting workers would
+cost more than it saves. Every chunk carries the metadata of its article, which
+includes the article title, and its position in the article. Ingestion puts the
+title ahead of the description (``article_text``), so it is embedded with the
+article's first chunk.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from utils.logger import logger
+from utils.metrics import get_metrics_registry
+from utils.tokenizer import get_tokenizer
+
+load_dotenv()
+
+NEWS_CHUNK_TOKENS = int(os.getenv("NEWS_CHUNK_TOKENS", "250"))
+NEWS_CHUNK_OVERLAP = int(os.getenv("NEWS_CHUNK_OVERLAP", "0"))
+NEWS_CHUNK_WORKERS = int(os.getenv("NEWS_CHUNK_WORKERS", str(min(4, os.cpu_count() or 1))))
+NEWS_CHUNK_PARALLEL_MIN_DOCS = int(os.getenv("NEWS_CHUNK_PARALLEL_MIN_DOCS", "2000"))
+NEWS_CHUNK_SLICE_DOCS = int(os.getenv("NEWS_CHUNK_SLICE_DOCS", "500"))
+
+CHUNKED_DOCUMENTS = get_metrics_registry().counter(
+    "news_chunking_documents_total", "Articles split into chunks.", ("mode",))
+CHUNKED_CHUNKS = get_metrics_registry().counter(
+    "news_chunking_chunks_total", "Chunks produced from articles.", ("mode",))
+CHUNKING_SECONDS = get_metrics_registry().counter(
+    "news_chunking_seconds_total", "Wall time spent splitting articles.", ("mode",))
+
+
+@lru_cache(maxsize=1)
+def get_splitter() -> RecursiveCharacterTextSplitter:
+    """Get or create the process-wide splitter (in each pool worker too)."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=NEWS_CHUNK_TOKENS,
+        chunk_overlap=NEWS_CHUNK_OVERLAP,
+        length_function=get_tokenizer().count,
+    )
+
+
+def split_texts(texts: Sequence[str], metadatas: Sequence[Dict]) -> List[Tuple[str, Dict]]:
+    """
+    Split texts into (chunk text, metadata) pairs; the metadata gains the position
+    of the chunk in its article (``chunk``). Runs in the caller or a pool worker;
+    pairs pickle more cheaply than Documents.
+    """
+    splitter = get_splitter()
+    return [(chunk, {**metadata, "chunk": position})
+            for text, metadata in zip(texts, metadatas)
+            for position, chunk in enumerate(splitter.split_text(text))]
+
+
+class ArticleChunker:
+    """
+    Splits articles in the calling thread or, for large batches, in a process pool.
+    """
+    def __init__(self, workers: int = NEWS_CHUNK_WORKERS, parallel_min_docs: int = NEWS_CHUNK_PARALLEL_MIN_DOCS,
+                 slice_docs: int = NEWS_CHUNK_SLICE_DOCS):
+        self.workers = workers
+        self.parallel_min_docs = parallel_min_docs
+        self.slice_docs = slice_docs
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=get_splitter,
+                )
+            return self._executor
+
+    def _split_in_pool(self, texts: List[str], metadatas: List[Dict]) -> List[Tuple[str, Dict]]:
+        futures = [self._pool().submit(split_texts, texts[i:i + self.slice_docs], metadatas[i:i + self.slice_docs])
+                   for i in range(0, len(texts), self.slice_docs)]
+        # Slices are collected in submission order, so chunks keep the article order
+        return [pair for future in futures for pair in future.result()]
+
+    def split(self, texts: Sequence[str], metadatas: Optional[Sequence[Dict]] = None) -> List[Document]:
+        """
+        Split articles into chunks, each carrying its article's metadata.
+
+        Args:
+            texts (list): Article texts.
+            metadatas (list): Metadata per article (ticker, title); defaults to empty.
+
+        Returns:
+            list: Chunk Documents in article order.
+        """
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        parallel = self.workers > 1 and len(texts) >= self.parallel_min_docs
+        started = time.perf_counter()
+        pairs = None
+        if parallel:
+            try:
+                pairs = self._split_in_pool(texts, metadatas)
+            except BrokenProcessPool:
+                logger.warning("Chunking pool broke; splitting in-process and recreating it on the next batch.")
+                self.shutdown()
+                parallel = False
+        if pairs is None:
+            pairs = split_texts(texts, metadatas)
+        elapsed = time.perf_counter() - started
+
+        mode = "pool" if parallel else "inline"
+        CHUNKED_DOCUMENTS.inc((mode,), len(texts))
+        CHUNKED_CHUNKS.inc((mode,), len(pairs))
+        CHUNKING_SECONDS.inc((mode,), elapsed)
+        if texts:
+            logger.info(f"Chunked {len(texts)} articles into {len(pairs)} chunks in {elapsed:.2f}s "
+                        f"({len(texts) / max(elapsed, 1e-9):.0f} docs/sec, {mode}).")
+        return [Document(page_content=chunk, metadata=metadata) for chunk, metadata in pairs]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_chunker_instance = None
+
+
+def get_chunker() -> ArticleChunker:
+    """Get or create the process-wide article chunker."""
+    global _chunker_instance
+    if _chunker_instance is None:
+        _chunker_instance = ArticleChunker()
+    return _chunker_instance
@@ -0,0 +1,131 @@
+"""
+Packs retrieved news chunks into a compact, token-budgeted prompt context.
+
+The generate and hallucination-check prompts used to receive the raw list of
+``Document`` objects, i.e. their Python repr with metadata noise, duplicates
+and every web-search result appended so far. Prompt length drives local model
+latency almost linearly, so the packer
+
+1. renders each chunk as plain text with a short header,
+2. drops exact and near-duplicate chunks (word-shingle Jaccard similarity),
+3. orders chunks by relevance to the question, and
+4. keeps chunks until ``NEWS_CONTEXT_TOKEN_BUDGET`` tokens are used, truncating
+   the last one that only partly fits.
+"""
+import os
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_core.documents import Document
+from utils.tokenizer import count_tokens, get_tokenizer
+
+NEWS_CONTEXT_TOKEN_BUDGET = int(os.getenv("NEWS_CONTEXT_TOKEN_BUDGET", "1500"))
+NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.85"))
+
+# A truncated chunk shorter than this is not worth including
+_MIN_TRUNCATED_TOKENS = 32
+_SHINGLE_SIZE = 3
+_WORD = re.compile(r"\w+", re.UNICODE)
+_HEADER_KEYS = ("title", "source", "published", "pubDate")
+
+
+def _as_document(item: Any) -> Document:
+    if isinstance(item, Document):
+        return item
+    if isinstance(item, dict):
+        return Document(page_content=str(item.get("content") or item.get("description") or ""))
+    return Document(page_content=str(item))
+
+
+def _render(document: Document) -> str:
+    text = " ".join(document.page_content.split())
+    header = ", ".join(str(document.metadata[key]) for key in _HEADER_KEYS if document.metadata.get(key))
+    return f"({header}) {text}" if header else text
+
+
+def _shingles(text: str) -> frozenset:
+    words = _WORD.findall(text.lower())
+    if len(words) < _SHINGLE_SIZE:
+        return frozenset([tuple(words)])
+    return frozenset(tuple(words[i:i + _SHINGLE_SIZE]) for i in range(len(words) - _SHINGLE_SIZE + 1))
+
+
+def _relevance(question_terms: set, document: Document, text: str) -> float:
+    # Prefer a retriever score when one was attached; otherwise question-term coverage
+    score = document.metadata.get("relevance_score")
+    if score is not None:
+        return float(score)
+    if not question_terms:
+        return 0.0
+    terms = set(_WORD.findall(text.lower()))
+    return len(question_terms & terms) / len(question_terms)
+
+
+def dedup(texts: Sequence[str], threshold: float = NEWS_DEDUP_THRESHOLD) -> List[int]:
+    """
+    Return the indices of the texts to keep, dropping any text whose shingle set
+    overlaps an earlier kept text by at least ``threshold`` (Jaccard).
+    """
+    kept, kept_shingles, seen_exact = [], [], set()
+    for i, text in enumerate(texts):
+        normalized = " ".join(_WORD.findall(text.lower()))
+        if not normalized or normalized in seen_exact:
+            continue
+        shingles = _shingles(text)
+        if any(len(shingles & other) / len(shingles | other) >= threshold for other in kept_shingles):
+            continue
+        seen_exact.add(normalized)
+        kept.append(i)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def pack_context(question: str, documents: Sequence[Any],
+                 token_budget: int = NEWS_CONTEXT_TOKEN_BUDGET) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the prompt context for ``question`` from retrieved documents.
+
+    Args:
+        question (str): User question, used to rank chunks.
+        documents (list): Documents (or strings) from retrieval and web search.
+        token_budget (int): Maximum number of context tokens.
+
+    Returns:
+        tuple: (context string, stats) where stats reports the chunk counts and
+        the prompt tokens saved against interpolating the raw document list.
+    """
+    documents = [_as_document(item) for item in documents or []]
+    texts = [_render(document) for document in documents]
+    unique = dedup(texts)
+
+    question_terms = set(_WORD.findall((question or "").lower()))
+    ranked = sorted(unique, key=lambda i: (-_relevance(question_terms, documents[i], texts[i]), i))
+
+    tokenizer = get_tokenizer()
+    parts, used, truncated = [], 0, False
+    for i in ranked:
+        entry = f"[{len(parts) + 1}] {texts[i]}"
+        tokens = count_tokens(entry)
+        remaining = token_budget - used
+        if tokens > remaining:
+            if remaining >= _MIN_TRUNCATED_TOKENS:
+                parts.append(tokenizer.truncate(entry, remaining))
+                used = token_budget
+            truncated = True
+            break
+        parts.append(entry)
+        used += tokens
+
+    context = "\n\n".join(parts)
+    raw_tokens = tokenizer.count(str(list(documents)))
+    packed_tokens = tokenizer.count(context)
+    return context, {
+        "documents": len(documents),
+        "unique": len(unique),
+        "packed": len(parts),
+        "truncated": truncated,
+        "raw_tokens": raw_tokens,
+        "packed_tokens": packed_tokens,
+        "tokens_saved": raw_tokens - packed_tokens,
+        "budget": token_budget,
+    }
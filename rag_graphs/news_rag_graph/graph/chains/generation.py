@@ -1,10 +1,10 @@
 from dotenv import load_dotenv
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, GENERATOR_ROLE
 
 load_dotenv()
-llm = get_llm_singleton(temperature=0)
+llm = get_role_llm(GENERATOR_ROLE)
 
 system = "You are a helpful assistant. Use the provided context (news documents) to answer the question concisely."
 generation_prompt = ChatPromptTemplate.from_messages([
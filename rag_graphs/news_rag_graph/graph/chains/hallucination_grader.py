@@ -1,8 +1,8 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, HALLUCINATION_ROLE
 
-llm = get_llm_singleton(temperature=0)
+llm = get_role_llm(HALLUCINATION_ROLE)
 
 system = """You are a grader assessing whether an LLM generation is grounded in / supported by a set of retrieved facts. \n 
      Give a binary score 'yes' or 'no'. 'yes' means that the answer is grounded in / supported by the set of facts."""
@@ -1,10 +1,10 @@
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, GRADER_ROLE
 
 load_dotenv()
-llm = get_llm_singleton(temperature=0)
+llm = get_role_llm(GRADER_ROLE)
 
 system  = """You are a grader assessing relevance of a retrieved document to a user question.
 If the document contains keyword(s) or semantic meaning related to the question, respond with exactly 'yes' or 'no'."""
@@ -1,8 +1,8 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, GENERATOR_ROLE
 
-llm = get_llm_singleton(temperature=0)
+llm = get_role_llm(GENERATOR_ROLE)
 
 system = """You are a helpful assistant that generates web search queries.
 Given a user question and a stock ticker, generate 3 distinct web search queries to find comprehensive information.
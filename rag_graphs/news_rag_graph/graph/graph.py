@@ -1,14 +1,9 @@
-from dotenv import load_dotenv
 from langgraph.graph import StateGraph,END
 from rag_graphs.news_rag_graph.graph.constants import RETRIEVE_NEWS, GENERATE_RESULT, GRADE_DOCUMENT, WEB_SEARCH, HALLUCINATION_CHECK
 from rag_graphs.news_rag_graph.graph.nodes import retrieve, generate, grade_documents, web_search, check_hallucination
 from rag_graphs.news_rag_graph.graph.state import GraphState
 from utils.logger import logger
 
-load_dotenv()
-from utils.langsmith_tracing import enable_langsmith_tracing
-enable_langsmith_tracing("StocksInsights")
-
 def decide_to_generate(state):
     logger.info("---ASSESS GRADED DOCUMENTS---")
     if state["web_search"]:
@@ -18,26 +13,6 @@ def decide_to_generate(state):
         logger.info("---DECISION: GENERATE---")
         return GENERATE_RESULT
 
-graph_builder  = StateGraph(state_schema=GraphState)
-
-graph_builder.add_node(RETRIEVE_NEWS, retrieve)
-graph_builder.add_node(GRADE_DOCUMENT, grade_documents)
-graph_builder.add_node(WEB_SEARCH, web_search)
-graph_builder.add_node(GENERATE_RESULT, generate)
-graph_builder.add_node(HALLUCINATION_CHECK, check_hallucination)
-
-graph_builder.add_edge(RETRIEVE_NEWS, GRADE_DOCUMENT)
-graph_builder.add_conditional_edges(
-    GRADE_DOCUMENT,
-    decide_to_generate,
-    path_map={
-        WEB_SEARCH: WEB_SEARCH,
-        GENERATE_RESULT: GENERATE_RESULT
-    }
-)
-graph_builder.add_edge(WEB_SEARCH, GENERATE_RESULT)
-graph_builder.add_edge(GENERATE_RESULT, HALLUCINATION_CHECK)
-
 def decide_after_hallucination(state):
     """
     Decide what to do after hallucination check.
@@ -54,16 +29,46 @@ def decide_after_hallucination(state):
         logger.info("---DECISION: END---")
         return END
 
-graph_builder.add_conditional_edges(
-    HALLUCINATION_CHECK,
-    decide_after_hallucination,
-    path_map={
-        WEB_SEARCH: WEB_SEARCH,
-        END: END
-    }
-)
+def build_graph():
+    """
+    Build and compile the news RAG graph. Called once by the graph registry.
+    """
+    graph_builder  = StateGraph(state_schema=GraphState)
+
+    graph_builder.add_node(RETRIEVE_NEWS, retrieve)
+    graph_builder.add_node(GRADE_DOCUMENT, grade_documents)
+    graph_builder.add_node(WEB_SEARCH, web_search)
+    graph_builder.add_node(GENERATE_RESULT, generate)
+    graph_builder.add_node(HALLUCINATION_CHECK, check_hallucination)
+
+    graph_builder.add_edge(RETRIEVE_NEWS, GRADE_DOCUMENT)
+    graph_builder.add_conditional_edges(
+        GRADE_DOCUMENT,
+        decide_to_generate,
+        path_map={
+            WEB_SEARCH: WEB_SEARCH,
+            GENERATE_RESULT: GENERATE_RESULT
+        }
+    )
+    graph_builder.add_edge(WEB_SEARCH, GENERATE_RESULT)
+    graph_builder.add_edge(GENERATE_RESULT, HALLUCINATION_CHECK)
+
+    graph_builder.add_conditional_edges(
+        HALLUCINATION_CHECK,
+        decide_after_hallucination,
+        path_map={
+            WEB_SEARCH: WEB_SEARCH,
+            END: END
+        }
+    )
+
+    graph_builder.set_entry_point(RETRIEVE_NEWS)
 
-graph_builder.set_entry_point(RETRIEVE_NEWS)
+    return graph_builder.compile()
 
-app = graph_builder.compile()
-app.get_graph().draw_mermaid_png(output_file_path="news-rag-graph.png")
\ No newline at end of file
+def __getattr__(name):
+    # Backwards-compatible `from ...graph import app`, compiled on first access
+    if name == "app":
+        from rag_graphs.registry import get_graph, NEWS_GRAPH
+        return get_graph(NEWS_GRAPH)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 from typing import Any, Dict
 from rag_graphs.news_rag_graph.graph.chains.generation import generation_chain
 from rag_graphs.news_rag_graph.graph.state import GraphState
+from rag_graphs.news_rag_graph.context_packer import pack_context
 from utils.logger import logger
 
 load_dotenv()
@@ -11,13 +12,21 @@ def generate(state: GraphState) -> Dict[str, Any]:
     question    = state["question"]
     documents   = state["documents"]
 
+    context, context_stats = pack_context(question, documents)
+    logger.info(
+        f"Packed {context_stats['packed']}/{context_stats['documents']} chunks into "
+        f"{context_stats['packed_tokens']} tokens ({context_stats['tokens_saved']} prompt tokens saved)."
+    )
+
     generation  = generation_chain.invoke({
-        "context": documents,
+        "context": context,
         "question": question,
     })
 
     return {
         "documents": documents,
         "question": question,
-        "generation": generation
+        "generation": generation,
+        "context": context,
+        "context_stats": context_stats,
     }
\ No newline at end of file
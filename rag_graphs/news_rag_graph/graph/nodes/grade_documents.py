@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 from typing import Any, Dict
 from rag_graphs.news_rag_graph.graph.chains.retrieval_grader import retrieval_grader
 from rag_graphs.news_rag_graph.graph.state import GraphState
+from rag_graphs.news_rag_graph.recency import record_grades
 from utils.logger import logger
 
 load_dotenv()
@@ -23,6 +24,7 @@ def grade_documents(state: GraphState)-> Dict[str, Any]:
     documents   = state.get("documents") or []
 
     filtered_docs   = []
+    grades          = []
     web_search      = True
 
     for d in documents:
@@ -30,6 +32,7 @@ def grade_documents(state: GraphState)-> Dict[str, Any]:
             {"question": question, "document": d.page_content}
         )
         grade   = str(score_text).strip().lower()
+        grades.append(grade == "yes")
 
         if grade == "yes":
             logger.info("---GRADE: DOCUMENT RELEVANT---")
@@ -40,6 +43,7 @@ def grade_documents(state: GraphState)-> Dict[str, Any]:
             web_search  = True
             continue
 
+    record_grades(documents, grades)
     return {"documents": filtered_docs, "question": question, "web_search": web_search}
 
 
@@ -1,6 +1,7 @@
 from typing import Any, Dict
 from rag_graphs.news_rag_graph.graph.state import GraphState
 from rag_graphs.news_rag_graph.graph.chains.hallucination_grader import hallucination_grader
+from rag_graphs.news_rag_graph.context_packer import pack_context
 from utils.logger import logger
 
 def check_hallucination(state: GraphState) -> Dict[str, Any]:
@@ -15,11 +16,14 @@ def check_hallucination(state: GraphState) -> Dict[str, Any]:
     """
     logger.info("---CHECK HALLUCINATIONS---")
     question = state["question"]
-    documents = state["documents"]
     generation = state["generation"]
+    # Grade against the same packed context the generation was given
+    context = state.get("context")
+    if context is None:
+        context, _ = pack_context(question, state["documents"])
 
     score = hallucination_grader.invoke(
-        {"documents": documents, "generation": generation}
+        {"documents": context, "generation": generation}
     )
     grade = score.strip().lower()
 
@@ -1,4 +1,4 @@
-from typing import List, TypedDict
+from typing import Any, Dict, List, TypedDict
 
 class GraphState(TypedDict):
     """
@@ -9,6 +9,8 @@ class GraphState(TypedDict):
         generation: LLM generation
         web_seach: Whether to search the web for additional info
         documents: List of documents
+        context: Packed, token-budgeted context given to the generation
+        context_stats: Chunk counts and prompt tokens saved by the packer
     """
     question: str
     generation: str
@@ -17,3 +19,5 @@ class GraphState(TypedDict):
     grounded: bool
     ticker: str
     web_search_performed: bool
+    context: str
+    context_stats: Dict[str, Any]
@@ -1,12 +1,20 @@
 from dotenv import load_dotenv
-from langchain_chroma import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from db.mongo_db import MongoDBClient
 import os
-from typing import List
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
 from utils.logger import logger
-from config.llm_config import get_embeddings_singleton
+from config.embedding_cache import get_query_embeddings
+from db.vector_store import INDEX_TYPES
+from rag_graphs.news_rag_graph.chunking import get_chunker
+from rag_graphs.news_rag_graph.partitions import (NEWS_PARTITIONING, ChromaPartitions, MemmapPartitions,
+                                                  PartitionedNewsStore, month_of)
+from rag_graphs.news_rag_graph.recency import NewsRetriever
+from rag_graphs.news_rag_graph.retention import retention_cutoff
 
 import chromadb
 from chromadb.config import Settings
@@ -18,6 +26,8 @@ VECTOR_DB_DIRECTORY = os.getenv("VECTOR_DB_DIRECTORY", "vector_db")
 VECTOR_DB_COLLECTION = os.getenv("VECTOR_DB_COLLECTION", "news_articles")
 CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
 CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8001"))
+# "chroma", or an in-process store over memory-mapped vectors: "numpy" (exact) or "hnsw"
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
 
 
 def _build_chroma_client():
@@ -34,18 +44,108 @@ def _build_chroma_client():
 
 
 def get_news_retriever():
-    """Construct and return a Chroma retriever for news articles."""
-    client = _build_chroma_client()
-    if not client:
-        # Return a dummy retriever or handle None upstream
-        # For now, returning None and handling it in retrieve node is safer
-        return None
-        
-    return Chroma(
-        client=client,
-        collection_name=VECTOR_DB_COLLECTION,
-        embedding_function=get_embeddings_singleton()
-    ).as_retriever()
+    """Return a retriever over the shared news store, or None while Chroma is unavailable."""
+    vectorstore = get_news_vectorstore()
+    # Handled in the retrieve node
+    return NewsRetriever(vectorstore=vectorstore) if vectorstore is not None else None
+
+
+_news_vectorstore = None
+_news_vectorstore_lock = threading.Lock()
+
+
+def get_news_vectorstore():
+    """
+    Get the process-wide store of news chunks, selected by ``VECTOR_BACKEND`` and
+    partitioned by month unless ``NEWS_PARTITIONING=none``. With Chroma the client
+    is opened once; None is returned (and the client retried on the next call)
+    while Chroma is unavailable.
+    """
+    global _news_vectorstore
+    with _news_vectorstore_lock:
+        if _news_vectorstore is None:
+            embeddings = get_query_embeddings()
+            if VECTOR_BACKEND in INDEX_TYPES:
+                # numpy and hnsw share the vectors; hnsw adds a graph file next to them
+                backend = MemmapPartitions(VECTOR_DB_DIRECTORY, embeddings, index=VECTOR_BACKEND)
+            else:
+                client = _build_chroma_client()
+                if not client:
+                    return None
+                backend = ChromaPartitions(client, embeddings)
+            if NEWS_PARTITIONING == "monthly":
+                _news_vectorstore = PartitionedNewsStore(backend, VECTOR_DB_COLLECTION, embeddings)
+            else:
+                _news_vectorstore = backend.open(VECTOR_DB_COLLECTION, create=True)
+        return _news_vectorstore
+
+
+# Yahoo cards show relative times: "2 hours ago", "a day ago"
+_RELATIVE_TIME = re.compile(r"\b(\d+|an?)\s*(second|sec|minute|min|hour|hr|day|week|month|year)s?\s+ago\b", re.I)
+_UNIT_SECONDS = {"second": 1, "sec": 1, "minute": 60, "min": 60, "hour": 3600, "hr": 3600, "day": 86400,
+                 "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400}
+
+
+def _parse_published(value: str, scraped: Optional[datetime]) -> Optional[datetime]:
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        pass
+    # Relative times count back from when the article was scraped
+    reference = scraped or datetime.now(timezone.utc)
+    if value.lower() == "yesterday":
+        return reference - timedelta(days=1)
+    match = _RELATIVE_TIME.search(value)
+    if match:
+        count = 1 if match.group(1).lower() in ("a", "an") else int(match.group(1))
+        return reference - timedelta(seconds=count * _UNIT_SECONDS[match.group(2).lower()])
+    return None
+
+
+def article_published(article: Dict) -> Optional[datetime]:
+    """
+    Publication time of a Mongo article from ``pubDate``/``posted`` (ISO, RSS or
+    relative dates such as '3 hours ago'), else the creation time of its
+    ObjectId; None when unknown.
+    """
+    scraped = getattr(article.get("_id"), "generation_time", None)
+    for key in ("pubDate", "posted"):
+        value = article.get(key)
+        if isinstance(value, str) and value.strip():
+            value = _parse_published(value, scraped)
+        if isinstance(value, datetime):
+            return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return scraped
+
+
+def article_metadata(article: Dict) -> Dict:
+    """Chunk metadata carried over from a Mongo article (Chroma rejects None values)."""
+    published = article_published(article)
+    metadata = {"month": month_of(published or datetime.now(timezone.utc))}
+    if published is not None:
+        # Numeric, so the store can filter and the retriever can rank on it
+        metadata["published_ts"] = int(published.timestamp())
+    if article.get("_id") is not None:
+        metadata["article_id"] = str(article["_id"])
+    ticker = article.get("ticker")
+    if ticker:
+        metadata["ticker"] = str(ticker).upper()
+    # Scrapers store the title as 'headline'
+    title = article.get("headline") or article.get("title")
+    if title:
+        metadata["title"] = " ".join(str(title).split())
+    return metadata
+
+
+def article_text(article: Dict, metadata: Dict) -> str:
+    """Text to chunk and embed: the title, when there is one, leads the description."""
+    title = metadata.get("title")
+    return f"{title} {article['description']}" if title else article['description']
 
 class DocumentSyncManager:
     def __init__(self):
@@ -58,49 +158,43 @@ class DocumentSyncManager:
         """
         Fetches documents from the database where 'synced' is set to False.
         """
-        return self.news_collection.find({'synced': False}, {'_id': 1, 'description': 1})
+        return self.news_collection.find({'synced': False}, {'_id': 1, 'description': 1, 'ticker': 1, 'headline': 1, 'title': 1,
+                                                          'pubDate': 1, 'posted': 1})
 
-    def mark_documents_as_synced(self, document_ids: List):
+    def mark_documents_as_synced(self, document_ids: List, **fields):
         """
-        Marks the provided document IDs as synced in the database.
+        Marks the provided document IDs as synced in the database, setting any
+        extra ``fields`` (the ``partition`` holding their chunks, or ``expired``).
         """
         result = self.news_collection.update_many(
             {'_id': {'$in': document_ids}},
-            {'$set': {'synced': True}}
+            {'$set': {'synced': True, **fields}}
         )
         logger.info(f"Marked {result.modified_count} documents as synced.")
 
-    def process_content(self, contents: List[str]):
+    def process_content(self, contents: List[str], metadatas: Optional[List[Dict]] = None):
         """
-        Processes content into chunks using a text splitter.
+        Processes content into chunks with the shared chunker. Every chunk keeps the
+        metadata (ticker, title) of the article it came from.
         """
-        text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-            chunk_size=250, chunk_overlap=0
-        )
-        documents = [Document(page_content=content) for content in contents]
-        return text_splitter.split_documents(documents)
+        return get_chunker().split(contents, metadatas)
 
-    def store_documents_in_chroma(self, doc_splits: List[Document]) -> bool:
+    def store_documents(self, doc_splits: List[Document]) -> bool:
         """
-        Stores processed document chunks as embeddings in Chroma.
+        Stores processed document chunks as embeddings in the news vector store.
         Returns True if successful, False otherwise.
         """
-        client = _build_chroma_client()
-        if not client:
-            logger.warning("Chroma client unavailable. Skipping document storage.")
+        vectorstore = get_news_vectorstore()
+        if vectorstore is None:
+            logger.warning("Vector store unavailable. Skipping document storage.")
             return False
 
         try:
-            vectorstore = Chroma.from_documents(
-                documents=doc_splits,
-                client=client,
-                collection_name=self.vector_db_collection,
-                embedding=get_embeddings_singleton()
-            )
-            logger.info("Documents stored in Chroma.")
+            vectorstore.add_documents(doc_splits)
+            logger.info(f"Documents stored in the {VECTOR_BACKEND} vector store.")
             return True
         except Exception as e:
-            logger.error(f"Failed to store documents in Chroma: {e}")
+            logger.error(f"Failed to store documents in the vector store: {e}")
             return False
 
     def sync_documents(self):
@@ -108,21 +202,41 @@ class DocumentSyncManager:
         Orchestrates the process of syncing unsynced documents:
         - Fetches unsynced documents
         - Processes their content
-        - Stores them in Chroma
+        - Stores them in the news vector store, by month when it is partitioned
         - Marks them as synced in the database (ONLY if storage succeeded)
+
+        Articles already past retention are not stored; they are marked synced and expired.
         """
         unsynced_articles = list(self.fetch_unsynced_documents())
         if not unsynced_articles:
             logger.info("No unsynced documents found in MongoDB!")
             return
 
-        descriptions = [article['description'] for article in unsynced_articles if 'description' in article]
-        document_ids = [article['_id'] for article in unsynced_articles]
+        partitioned = isinstance(get_news_vectorstore(), PartitionedNewsStore)
+        cutoff = retention_cutoff(month_of(datetime.now(timezone.utc))) if partitioned else None
+        metadatas = [article_metadata(article) for article in unsynced_articles]
+        expired = [article['_id'] for article, metadata in zip(unsynced_articles, metadatas)
+                   if cutoff and metadata["month"] < cutoff]
+        if expired:
+            self.mark_documents_as_synced(expired, expired=True)
+            logger.info(f"{len(expired)} articles are older than the news retention; not stored.")
+
+        current = [(article, metadata) for article, metadata in zip(unsynced_articles, metadatas)
+                   if not (cutoff and metadata["month"] < cutoff)]
+        described = [(article, metadata) for article, metadata in current if 'description' in article]
+        descriptions = [article_text(article, metadata) for article, metadata in described]
 
         if descriptions:
-            doc_splits = self.process_content(descriptions)
-            if self.store_documents_in_chroma(doc_splits):
-                self.mark_documents_as_synced(document_ids)
+            doc_splits = self.process_content(descriptions, [metadata for _, metadata in described])
+            if self.store_documents(doc_splits):
+                if partitioned:
+                    by_month: Dict[str, List] = {}
+                    for article, metadata in current:
+                        by_month.setdefault(metadata["month"], []).append(article['_id'])
+                    for month, document_ids in by_month.items():
+                        self.mark_documents_as_synced(document_ids, partition=month)
+                else:
+                    self.mark_documents_as_synced([article['_id'] for article, _ in current])
                 logger.info("Documents processed, stored, and marked as synced.")
             else:
                 logger.warning("Document storage failed. Documents will NOT be marked as synced.")
@@ -1,9 +1,11 @@
 from dotenv import load_dotenv
-from rag_graphs.news_rag_graph.graph.graph import app
+from rag_graphs.registry import get_graph, NEWS_GRAPH
+from utils.langsmith_tracing import enable_langsmith_tracing
 from utils.logger import logger
 
 load_dotenv()
 
 if __name__=='__main__':
+    enable_langsmith_tracing("StocksInsights")
     logger.info("--STOCK NEWS GRAPH--")
-    res = app.invoke({"question": "Documents related to Apple"})
+    res = get_graph(NEWS_GRAPH).invoke({"question": "Documents related to Apple"})
@@ -0,0 +1,389 @@
+"""
+Monthly partitions of the news vector store.
+
+A single ``news_articles`` collection only grows: every chunk ever synced stays
+in the index, so search latency and memory grow with the history, and old news
+competes with fresh news. With ``NEWS_PARTITIONING=monthly`` (the default) each
+month of news is a collection of its own (Chroma) or a store directory of its own
+(``numpy``/``hnsw``), named ``<VECTOR_DB_COLLECTION>_YYYY_MM``. A chunk goes to
+the partition of the month its article was published (the ``month`` metadata).
+
+A search visits only the partitions within the question's time horizon
+("today", "this week", "last 3 months", otherwise ``NEWS_DEFAULT_HORIZON_DAYS``),
+newest first, and goes further back only while fewer than ``k`` chunks were
+found. Results of several partitions are merged by relevance score. The
+unpartitioned collection of earlier versions is searched as well until it is
+migrated (``python -m rag_graphs.news_rag_graph.retention --migrate-legacy``).
+
+The retention job (``retention.py``) drops old partitions and rewrites older ones
+downsampled as a new generation, ``<name>_g1``. The new generation is written
+under a staging name (``<name>_g1_staging``) that searches ignore and renamed
+once complete, so every listed generation is complete and searches use the
+newest. Opening a partition never creates it: only writes do, so a process with
+an outdated listing cannot bring back a dropped generation.
+"""
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from db.vector_store import MemmapVectorStore
+from utils.logger import logger
+
+load_dotenv()
+
+# "monthly", or "none" for the single collection of earlier versions
+NEWS_PARTITIONING = os.getenv("NEWS_PARTITIONING", "monthly").lower()
+NEWS_DEFAULT_HORIZON_DAYS = int(os.getenv("NEWS_DEFAULT_HORIZON_DAYS", "90"))
+# Seconds a partition listing is reused before the backend is listed again
+NEWS_PARTITION_LIST_TTL_S = float(os.getenv("NEWS_PARTITION_LIST_TTL_S", "30"))
+
+_COSINE = {"hnsw": {"space": "cosine"}}
+# Suffix of a generation that is still being written
+STAGING_SUFFIX = "_staging"
+_UNITS = {"day": 1, "week": 7, "month": 31, "quarter": 92, "year": 366}
+_LAST_N = re.compile(r"\b(?:last|past|previous|recent)\s+(\d{1,3})\s+(day|week|month|quarter|year)s?\b")
+_PHRASES = (
+    (re.compile(r"\b(?:today|intraday|right now)\b"), 1),
+    (re.compile(r"\byesterday\b"), 2),
+    (re.compile(r"\b(?:this|past|current)\s+week\b"), 7),
+    (re.compile(r"\b(?:last|previous)\s+week\b"), 14),
+    (re.compile(r"\b(?:this|past|current)\s+month\b"), 31),
+    (re.compile(r"\b(?:last|previous)\s+month\b"), 62),
+    (re.compile(r"\b(?:this|past|current|last|previous)\s+quarter\b"), 184),
+    (re.compile(r"\b(?:this|past|current)\s+year\b|\bytd\b|year to date"), 366),
+    (re.compile(r"\b(?:last|previous)\s+year\b"), 731),
+)
+
+
+class Partition(NamedTuple):
+    month: str  # 'YYYY-MM'
+    generation: int
+    name: str
+
+
+def partition_name(base: str, month: str, generation: int = 0) -> str:
+    """Collection name of a month's partition: ``news_articles_2024_05`` (``_g1`` after a downsample)."""
+    name = f"{base}_{month.replace('-', '_')}"
+    return f"{name}_g{generation}" if generation else name
+
+
+def parse_partition_name(base: str, name: str) -> Optional[Partition]:
+    match = re.fullmatch(rf"{re.escape(base)}_(\d{{4}})_(\d{{2}})(?:_g(\d+))?", name)
+    if not match:
+        return None
+    return Partition(f"{match.group(1)}-{match.group(2)}", int(match.group(3) or 0), name)
+
+
+def staging_name(name: str) -> str:
+    return f"{name}{STAGING_SUFFIX}"
+
+
+def month_of(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m")
+
+
+def add_months(month: str, delta: int) -> str:
+    """Shift a 'YYYY-MM' month by ``delta`` months."""
+    year, number = map(int, month.split("-"))
+    index = year * 12 + number - 1 + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def question_horizon_days(question: str) -> int:
+    """How many days back a question looks, from phrases such as 'this week' or 'last 3 months'."""
+    text = (question or "").lower()
+    match = _LAST_N.search(text)
+    if match:
+        return max(1, int(match.group(1))) * _UNITS[match.group(2)]
+    for pattern, days in _PHRASES:
+        if pattern.search(text):
+            return days
+    return NEWS_DEFAULT_HORIZON_DAYS
+
+
+def scored_search(store: VectorStore, embedding: List[float], k: int,
+                  filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+    """Nearest chunks of any of the news stores with their relevance score (higher is closer)."""
+    relevance = store._select_relevance_score_fn()
+    # langchain-chroma's name for the by-vector search returning distances
+    search = getattr(store, "similarity_search_with_score_by_vector", None) \
+        or store.similarity_search_by_vector_with_relevance_scores
+    return [(document, relevance(distance)) for document, distance in search(embedding, k=k, filter=filter, **kwargs)]
+
+
+class ChromaPartitions:
+    """Partitions as collections of one Chroma client; new ones use the cosine space."""
+    def __init__(self, client, embedding: Embeddings):
+        self.client = client
+        self.embedding = embedding
+
+    def names(self) -> List[str]:
+        # chromadb < 0.6 lists names, later versions Collection objects
+        return [getattr(collection, "name", collection) for collection in self.client.list_collections()]
+
+    def open(self, name: str, create: bool = False) -> VectorStore:
+        """The collection ``name`` as a vector store; a missing one raises unless ``create``."""
+        from langchain_chroma import Chroma
+
+        # The configuration only applies when the collection is created
+        return Chroma(client=self.client, collection_name=name, embedding_function=self.embedding,
+                      collection_configuration=_COSINE, create_collection_if_not_exists=create)
+
+    def drop(self, name: str):
+        self.client.delete_collection(name)
+
+    def rename(self, name: str, new_name: str):
+        self.client.get_collection(name).modify(name=new_name)
+
+    def read(self, name: str) -> Dict[str, Any]:
+        return self.client.get_collection(name).get(include=["documents", "metadatas", "embeddings"])
+
+    def write(self, name: str, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings):
+        collection = self.client.get_or_create_collection(name, configuration=_COSINE)
+        batch = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch):
+            end = start + batch
+            collection.add(ids=ids[start:end], documents=texts[start:end], metadatas=metadatas[start:end],
+                           embeddings=embeddings[start:end])
+
+
+class MemmapPartitions:
+    """Partitions as ``<name>.memmap`` store directories under one root."""
+    SUFFIX = ".memmap"
+
+    def __init__(self, directory: str, embedding: Embeddings, index: str = "numpy"):
+        self.directory = directory
+        self.embedding = embedding
+        self.index = index
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}{self.SUFFIX}")
+
+    def names(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [entry[:-len(self.SUFFIX)] for entry in os.listdir(self.directory) if entry.endswith(self.SUFFIX)]
+
+    def _existing(self, name: str) -> str:
+        path = self._path(name)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"News partition {name} does not exist in {self.directory}")
+        return path
+
+    def open(self, name: str, create: bool = False) -> VectorStore:
+        """The store directory ``name``; a missing one raises unless ``create``."""
+        path = self._path(name) if create else self._existing(name)
+        return MemmapVectorStore(path, self.embedding, index=self.index)
+
+    def drop(self, name: str):
+        shutil.rmtree(self._path(name), ignore_errors=True)
+
+    def rename(self, name: str, new_name: str):
+        os.rename(self._existing(name), self._path(new_name))
+
+    def read(self, name: str) -> Dict[str, Any]:
+        return MemmapVectorStore(self._existing(name), self.embedding).get(
+            include=("documents", "metadatas", "embeddings"))
+
+    def write(self, name: str, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings):
+        MemmapVectorStore(self._path(name), self.embedding, index=self.index).add_embeddings(
+            texts, embeddings, metadatas, ids)
+
+
+class PartitionedNewsStore(VectorStore):
+    """
+    LangChain vector store over monthly partitions of a backend.
+
+    Args:
+        backend: ``ChromaPartitions`` or ``MemmapPartitions``.
+        base_name (str): Collection name the partition names derive from; the
+            unpartitioned collection of earlier versions has exactly this name.
+        embedding (Embeddings): Embeds documents on add and queries on search.
+        clock (callable): Epoch seconds; decides the current month.
+    """
+    def __init__(self, backend, base_name: str, embedding: Embeddings,
+                 list_ttl: float = NEWS_PARTITION_LIST_TTL_S, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.base_name = base_name
+        self.embedding = embedding
+        self.list_ttl = list_ttl
+        self.clock = clock
+        self._stores: Dict[str, VectorStore] = {}
+        self._listing: Optional[Tuple[float, List[Partition], bool]] = None
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def today(self) -> date:
+        return datetime.fromtimestamp(self.clock(), timezone.utc).date()
+
+    # Partitions
+
+    def _list(self) -> Tuple[List[Partition], bool]:
+        with self._lock:
+            now = time.monotonic()
+            if self._listing is None or now - self._listing[0] > self.list_ttl:
+                names = self.backend.names()
+                parsed = [parse_partition_name(self.base_name, name) for name in names]
+                self._listing = (now, [p for p in parsed if p], self.base_name in names)
+            return self._listing[1], self._listing[2]
+
+    def all_partitions(self) -> List[Partition]:
+        """Every partition of every generation, newest month first."""
+        return sorted(self._list()[0], key=lambda p: (p.month, -p.generation), reverse=True)
+
+    def partitions(self) -> List[Partition]:
+        """The partition in use per month (the newest generation present), newest month first."""
+        in_use: Dict[str, Partition] = {}
+        for partition in self._list()[0]:
+            current = in_use.get(partition.month)
+            if current is None or partition.generation > current.generation:
+                in_use[partition.month] = partition
+        return [in_use[month] for month in sorted(in_use, reverse=True)]
+
+    def staged(self) -> List[str]:
+        """Generations still being written (or left behind by an interrupted downsample)."""
+        return [name for name in self.backend.names() if name.endswith(STAGING_SUFFIX)
+                and parse_partition_name(self.base_name, name[:-len(STAGING_SUFFIX)])]
+
+    def has_legacy(self) -> bool:
+        """Whether the unpartitioned collection of earlier versions exists."""
+        return self._list()[1]
+
+    def store(self, name: str, create: bool = False) -> VectorStore:
+        """
+        The vector store of one partition, opened once. A missing partition
+        raises unless ``create``.
+        """
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = self._stores[name] = self.backend.open(name, create=create)
+            return store
+
+    def invalidate(self, name: Optional[str] = None):
+        """Forget the listing and the open store of ``name`` (all stores when None)."""
+        with self._lock:
+            self._listing = None
+            if name is None:
+                self._stores.clear()
+            else:
+                self._stores.pop(name, None)
+
+    def drop(self, name: str):
+        self.backend.drop(name)
+        self.invalidate(name)
+
+    # Writing
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, *,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Add chunks to the partition of their ``month`` metadata (the current month when missing)."""
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        current = self.today().strftime("%Y-%m")
+        by_month: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            by_month.setdefault((metadata or {}).get("month") or current, []).append(i)
+
+        with self._lock:
+            # A partition that is missing from an outdated listing would be created next to its newer generation
+            self._listing = None
+        in_use = {p.month: p.name for p in self.partitions()}
+        for month, positions in by_month.items():
+            self.store(in_use.get(month) or partition_name(self.base_name, month), create=True).add_texts(
+                [texts[i] for i in positions], [metadatas[i] for i in positions], ids=[ids[i] for i in positions])
+        if set(by_month) - set(in_use):
+            # New partitions were created
+            with self._lock:
+                self._listing = None
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        names = [p.name for p in self.all_partitions()] + ([self.base_name] if self.has_legacy() else [])
+        for name in names:
+            self.store(name).delete(ids)
+        return True
+
+    # Reading
+
+    def _search_partition(self, name: str, embedding: List[float], k: int,
+                          filter: Optional[Dict[str, Any]]) -> List[Tuple[Document, float]]:
+        try:
+            return scored_search(self.store(name), embedding, k, filter)
+        except Exception as e:
+            # Dropped by the retention job in another process, or Chroma is down
+            logger.warning(f"Search in news partition {name} failed: {e}")
+            self.invalidate(name)
+            return []
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                                filter: Optional[Dict[str, Any]] = None,
+                                                horizon_days: Optional[int] = None,
+                                                **kwargs: Any) -> List[Tuple[Document, float]]:
+        """
+        Nearest chunks from the partitions within the horizon, as (document, cosine distance).
+
+        Args:
+            horizon_days (int): Days back to search; ``NEWS_DEFAULT_HORIZON_DAYS`` when None.
+        """
+        horizon_days = NEWS_DEFAULT_HORIZON_DAYS if horizon_days is None else horizon_days
+        first_month = (self.today() - timedelta(days=horizon_days)).strftime("%Y-%m")
+        partitions = self.partitions()
+        recent = [p.name for p in partitions if p.month >= first_month]
+        if self.has_legacy():
+            recent.append(self.base_name)
+        older = [p.name for p in partitions if p.month < first_month]
+
+        # Partitions are searched one after another: there are only a few per horizon
+        scored = [hit for name in recent for hit in self._search_partition(name, embedding, k, filter)]
+        for name in older:
+            if len(scored) >= k:
+                break
+            scored.extend(self._search_partition(name, embedding, k, filter))
+        scored.sort(key=lambda hit: hit[1], reverse=True)
+        return [(document, 1.0 - relevance) for document, relevance in scored[:k]]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score_by_vector(embedding, k, filter, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                                     horizon_days: Optional[int] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Like the by-vector search; the horizon defaults to the one the question asks for."""
+        if horizon_days is None:
+            horizon_days = question_horizon_days(query)
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, filter,
+                                                           horizon_days=horizon_days)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                          **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k, filter, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, *,
+                   ids: Optional[List[str]] = None, backend=None, base_name: Optional[str] = None,
+                   **kwargs: Any) -> "PartitionedNewsStore":
+        if backend is None or base_name is None:
+            raise ValueError("PartitionedNewsStore.from_texts needs a backend and a base_name")
+        store = cls(backend, base_name, embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,276 @@
+"""
+Retention and compaction of the monthly news partitions.
+
+Run by the scrape scheduler after the vector sync at most every
+``NEWS_RETENTION_INTERVAL_S`` seconds, or by hand:
+
+    python -m rag_graphs.news_rag_graph.retention [--dry-run] [--migrate-legacy]
+
+* Partitions more than ``NEWS_RETENTION_MONTHS`` months older than the current
+  month are dropped.
+* Partitions more than ``NEWS_DOWNSAMPLE_AFTER_MONTHS`` months old are
+  downsampled once: per ticker only the lead chunk of the
+  ``NEWS_DOWNSAMPLE_KEEP_PER_TICKER`` latest articles is kept. The kept chunks
+  are written to a new generation of the partition, which replaces the old one
+  and so gives back all of its space, in Chroma as well as in the memmap stores.
+  A partition without chunks to keep is dropped.
+
+Both are off until their setting is above 0, so nothing is deleted unless a
+deployment opts in.
+
+Mongo stays consistent with the vector store: every synced article has
+``synced: True`` and either the ``partition`` ('YYYY-MM') holding its chunks or
+``expired: True`` once it has no chunks left. The sync never stores articles
+that are already past retention; it marks them expired instead.
+
+``--migrate-legacy`` moves the unpartitioned collection of earlier versions into
+partitions: its articles are marked unsynced, so the next sync stores them in
+the partitions of their months, and the collection is dropped. Articles scraped
+before they carried a ``ticker`` get the one configured ticker (``SCRAPE_TICKERS``)
+whose symbol their headline or description names, so the ticker-filtered
+searches of the watchlist digest find them; the others stay without.
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+from rag_graphs.news_rag_graph.partitions import (Partition, PartitionedNewsStore, add_months, partition_name,
+                                                  staging_name)
+from utils.logger import logger
+
+load_dotenv()
+
+# 0 (the default) keeps every partition
+NEWS_RETENTION_MONTHS = int(os.getenv("NEWS_RETENTION_MONTHS", "0"))
+# 0 (the default) never downsamples
+NEWS_DOWNSAMPLE_AFTER_MONTHS = int(os.getenv("NEWS_DOWNSAMPLE_AFTER_MONTHS", "0"))
+NEWS_DOWNSAMPLE_KEEP_PER_TICKER = int(os.getenv("NEWS_DOWNSAMPLE_KEEP_PER_TICKER", "20"))
+NEWS_RETENTION_INTERVAL_S = float(os.getenv("NEWS_RETENTION_INTERVAL_S", "86400"))
+
+# Mongo '$in' lists are sent in batches of this size
+_ID_BATCH = 5000
+
+
+def retention_cutoff(current_month: str, retention_months: int = NEWS_RETENTION_MONTHS) -> Optional[str]:
+    """The oldest month that is kept, or None when everything is kept."""
+    return add_months(current_month, -retention_months) if retention_months > 0 else None
+
+
+def _article_order(key: str):
+    # ObjectId hex strings sort by creation time; numeric ids by value
+    return len(key), key
+
+
+def downsample(metadatas: List[Dict[str, Any]], ids: List[str], keep_per_ticker: int) -> List[int]:
+    """
+    Positions of the chunks a downsampled partition keeps: the lead chunk of the
+    ``keep_per_ticker`` latest articles of every ticker.
+    """
+    articles: Dict[str, Dict[str, int]] = {}
+    for position, (chunk_id, metadata) in enumerate(zip(ids, metadatas)):
+        metadata = metadata or {}
+        if metadata.get("chunk", 0) != 0:
+            continue
+        # Chunks synced without an article id stand for themselves
+        article = str(metadata.get("article_id") or chunk_id)
+        articles.setdefault(str(metadata.get("ticker") or ""), {}).setdefault(article, position)
+    kept = []
+    for lead_chunks in articles.values():
+        latest = sorted(lead_chunks, key=_article_order)[-keep_per_ticker:] if keep_per_ticker > 0 else []
+        kept.extend(lead_chunks[article] for article in latest)
+    return sorted(kept)
+
+
+def infer_ticker(article: Dict[str, Any], tickers: Iterable[str]) -> Optional[str]:
+    """
+    The ticker of an article scraped without one: the only ticker whose symbol
+    ('TCS' for 'TCS.NS') its headline or description names, else None.
+    """
+    text = f"{article.get('headline') or article.get('title') or ''} {article.get('description') or ''}"
+    named = {ticker for ticker in tickers
+             if re.search(rf"(?<![\w&-]){re.escape(ticker.upper().split('.')[0])}(?![\w&-])", text)}
+    return named.pop() if len(named) == 1 else None
+
+
+class RetentionJob:
+    """
+    Drops and downsamples the partitions of a ``PartitionedNewsStore`` and keeps
+    the ``synced``/``partition``/``expired`` fields of the Mongo articles in step.
+
+    Args:
+        store (PartitionedNewsStore): The news vector store.
+        collection: Mongo collection of the news articles.
+        dry_run (bool): Only report what would change.
+    """
+    def __init__(self, store: PartitionedNewsStore, collection, retention_months: int = NEWS_RETENTION_MONTHS,
+                 downsample_after_months: int = NEWS_DOWNSAMPLE_AFTER_MONTHS,
+                 keep_per_ticker: int = NEWS_DOWNSAMPLE_KEEP_PER_TICKER, dry_run: bool = False):
+        self.store = store
+        self.collection = collection
+        self.retention_months = retention_months
+        self.downsample_after_months = downsample_after_months
+        self.keep_per_ticker = keep_per_ticker
+        self.dry_run = dry_run
+
+    def _update(self, ids: List, fields: Dict[str, Any]) -> int:
+        if self.dry_run or not ids:
+            return len(ids)
+        modified = 0
+        for start in range(0, len(ids), _ID_BATCH):
+            result = self.collection.update_many({'_id': {'$in': ids[start:start + _ID_BATCH]}}, {'$set': fields})
+            modified += result.modified_count
+        return modified
+
+    def _articles_of(self, month: str) -> List[Dict[str, Any]]:
+        return list(self.collection.find({'partition': month}, {'_id': 1}))
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Apply retention once.
+
+        Returns:
+            dict: Dropped partitions, chunks kept and removed per downsampled
+            partition, and the number of articles marked expired.
+        """
+        current = self.store.today().strftime("%Y-%m")
+        cutoff = retention_cutoff(current, self.retention_months)
+        downsample_before = (add_months(current, -self.downsample_after_months)
+                             if self.downsample_after_months > 0 else None)
+        report: Dict[str, Any] = {"dry_run": self.dry_run, "dropped": [], "downsampled": {}, "expired_articles": 0}
+
+        for name in self.store.staged():
+            # A generation left behind by an interrupted downsample
+            logger.warning(f"Dropping incomplete news partition {name}.")
+            if not self.dry_run:
+                self.store.backend.drop(name)
+        in_use = {p.name for p in self.store.partitions()}
+        for partition in self.store.all_partitions():
+            if partition.name not in in_use:
+                # Replaced by a newer generation before the downsample could drop it
+                logger.warning(f"Dropping replaced news partition {partition.name}.")
+                if not self.dry_run:
+                    self.store.drop(partition.name)
+
+        for partition in self.store.partitions():
+            if cutoff and partition.month < cutoff:
+                # Expire first: a crash in between leaves chunks of expired articles, never
+                # articles marked as stored without chunks
+                report["expired_articles"] += self._update(
+                    [article['_id'] for article in self._articles_of(partition.month)], {'expired': True})
+                if not self.dry_run:
+                    self.store.drop(partition.name)
+                report["dropped"].append(partition.name)
+            elif downsample_before and partition.month < downsample_before and partition.generation == 0:
+                kept, removed, expired = self._downsample(partition)
+                report["downsampled"][partition.name] = {"kept": kept, "removed": removed}
+                report["expired_articles"] += expired
+        if report["dropped"] or report["downsampled"]:
+            logger.info(f"News retention: {json.dumps(report)}")
+        return report
+
+    def _downsample(self, partition: Partition):
+        data = self.store.backend.read(partition.name)
+        ids, metadatas = list(data["ids"]), [m or {} for m in data["metadatas"]]
+        kept = downsample(metadatas, ids, self.keep_per_ticker)
+        kept_articles = {str(metadatas[i].get("article_id")) for i in kept}
+        expired = [article['_id'] for article in self._articles_of(partition.month)
+                   if str(article['_id']) not in kept_articles]
+        target = partition_name(self.store.base_name, partition.month, partition.generation + 1)
+        if kept and not self.dry_run:
+            self.store.backend.write(staging_name(target), [ids[i] for i in kept],
+                                     [data["documents"][i] for i in kept], [metadatas[i] for i in kept],
+                                     [data["embeddings"][i] for i in kept])
+        # Expire before the new generation replaces the old one: a crash in between leaves chunks of
+        # expired articles, never articles marked as stored without chunks
+        expired_count = self._update(expired, {'expired': True})
+        if not self.dry_run:
+            if kept:
+                self.store.backend.rename(staging_name(target), target)
+            self.store.drop(partition.name)
+        return len(kept), len(ids) - len(kept), expired_count
+
+    def migrate_legacy(self, tickers: Iterable[str] = ()) -> int:
+        """
+        Re-sync the articles of the unpartitioned collection into partitions and drop it.
+
+        Args:
+            tickers (iterable): Configured tickers; articles without a ``ticker``
+                get the one their headline names (``infer_ticker``).
+
+        Returns:
+            int: Number of articles marked for re-sync.
+        """
+        if not self.store.has_legacy():
+            return 0
+        tickers = list(tickers)
+        articles = self.collection.find({'synced': True}, {'_id': 1, 'partition': 1, 'expired': 1, 'ticker': 1,
+                                                           'headline': 1, 'title': 1, 'description': 1})
+        by_ticker: Dict[Optional[str], List] = {}
+        for article in articles:
+            if not article.get('partition') and not article.get('expired'):
+                ticker = None if article.get('ticker') else infer_ticker(article, tickers)
+                by_ticker.setdefault(ticker, []).append(article['_id'])
+        # Unsync first: a crash in between leaves duplicates for one sync, never lost articles
+        count = sum(self._update(ids, {'synced': False, **({'ticker': ticker} if ticker else {})})
+                    for ticker, ids in by_ticker.items())
+        backfilled = sum(len(ids) for ticker, ids in by_ticker.items() if ticker)
+        if backfilled:
+            logger.info(f"Backfilled the ticker of {backfilled} articles from their headlines.")
+        if not self.dry_run:
+            self.store.drop(self.store.base_name)
+        logger.info(f"Marked {count} articles of {self.store.base_name} for re-sync into partitions.")
+        return count
+
+
+_last_run = 0.0
+_run_lock = threading.Lock()
+
+
+def run_retention_if_due(interval: float = NEWS_RETENTION_INTERVAL_S) -> Optional[Dict[str, Any]]:
+    """Run the retention job when the news store is partitioned and the interval has passed."""
+    global _last_run
+    from rag_graphs.news_rag_graph.ingestion import DocumentSyncManager, get_news_vectorstore
+
+    with _run_lock:
+        if time.time() - _last_run < interval:
+            return None
+        store = get_news_vectorstore()
+        if not isinstance(store, PartitionedNewsStore):
+            return None
+        _last_run = time.time()
+        try:
+            return RetentionJob(store, DocumentSyncManager().news_collection).run()
+        except Exception as e:
+            logger.error(f"News retention failed: {e}")
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without changing it.")
+    parser.add_argument("--migrate-legacy", action="store_true",
+                        help="Move the unpartitioned collection into monthly partitions.")
+    args = parser.parse_args()
+
+    from config.config_loader import ConfigLoader
+    from rag_graphs.news_rag_graph.ingestion import DocumentSyncManager, get_news_vectorstore
+
+    store = get_news_vectorstore()
+    if not isinstance(store, PartitionedNewsStore):
+        parser.error("The news store is not partitioned (NEWS_PARTITIONING) or unavailable.")
+    job = RetentionJob(store, DocumentSyncManager().news_collection, dry_run=args.dry_run)
+    report = job.run()
+    if args.migrate_legacy:
+        tickers = ConfigLoader(config_file="config/config.json").get("SCRAPE_TICKERS") or []
+        report["legacy_articles_resynced"] = job.migrate_legacy(tickers)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+News digest for a watchlist: the news RAG flow for many tickers in one request.
+
+Calling ``/news/{ticker}`` per ticker embeds every question separately, opens a
+Chroma client per call and grades and generates one ticker at a time. The digest
+shares that work across the watchlist:
+
+1. all questions not in the query embedding cache are embedded in one request,
+2. the vector searches run concurrently on the shared store, each filtered on the
+   ``ticker`` metadata of the chunks and re-ranked by recency,
+3. the candidates of all tickers are graded together in batches (each ticker
+   has its own question, so chunk text repeated within a ticker's candidates is
+   the only grading that is saved),
+4. the per-ticker summaries are generated concurrently; the LLM gateway decides
+   how many generations actually run at once (``LLM_MAX_IN_FLIGHT``).
+
+Results are yielded per ticker as soon as its summary is ready. Tickers without a
+relevant chunk go through the full news graph, which adds web search.
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from config.embedding_cache import get_query_embeddings
+from rag_graphs.news_rag_graph.context_packer import pack_context
+from rag_graphs.news_rag_graph.ingestion import get_news_vectorstore
+from rag_graphs.news_rag_graph.recency import record_grades, search_by_vector
+from utils.logger import logger
+from utils.metrics import node_context
+
+load_dotenv()
+
+# Chunks retrieved per ticker (the single-ticker retriever's default)
+NEWS_WATCHLIST_K = int(os.getenv("NEWS_WATCHLIST_K", "4"))
+NEWS_WATCHLIST_MAX_TICKERS = int(os.getenv("NEWS_WATCHLIST_MAX_TICKERS", "50"))
+# Grading prompts submitted together; the gateway still caps how many run at once
+NEWS_GRADE_BATCH_SIZE = int(os.getenv("NEWS_GRADE_BATCH_SIZE", "16"))
+# Graph label of the digest's LLM calls in the metrics
+WATCHLIST_METRICS_GRAPH = "news_watchlist"
+
+
+def news_question(ticker: str, topic: Optional[str] = None) -> str:
+    """The question the news endpoints ask for a ticker."""
+    return f"News related to {topic} for {ticker}" if topic else f"News related to {ticker}"
+
+
+def ticker_variants(ticker: str) -> List[str]:
+    """Spellings a ticker may be stored under: 'TCS', 'TCS.NS'."""
+    symbol = ticker.strip().upper()
+    base = symbol[:-3] if symbol.endswith(".NS") else symbol
+    return list(dict.fromkeys([symbol, base, f"{base}.NS"]))
+
+
+def _grader():
+    from rag_graphs.news_rag_graph.graph.chains.retrieval_grader import retrieval_grader
+    return retrieval_grader
+
+
+def _generator():
+    from rag_graphs.news_rag_graph.graph.chains.generation import generation_chain
+    return generation_chain
+
+
+async def _search(store, vector: List[float], ticker: str, question: str, k: int) -> List[Document]:
+    # No unfiltered retry: it would return other tickers' news. Without a match the graph fallback searches
+    return await asyncio.to_thread(search_by_vector, store, vector, k,
+                                   {"ticker": {"$in": ticker_variants(ticker)}}, question)
+
+
+async def retrieve_candidates(tickers: Sequence[str], questions: Sequence[str],
+                              k: int = NEWS_WATCHLIST_K) -> List[List[Document]]:
+    """
+    Embed all questions in one request and run the per-ticker searches concurrently.
+
+    Returns:
+        list: Candidate chunks per ticker; empty lists when Chroma is unavailable.
+    """
+    candidates: List[List[Document]] = [[] for _ in tickers]
+    store = get_news_vectorstore()
+    if store is None:
+        logger.warning("Vector store unavailable (Chroma down); watchlist digest has no candidates.")
+        return candidates
+    try:
+        vectors = await get_query_embeddings().aembed_queries(list(questions))
+    except Exception as e:
+        logger.warning(f"Embedding the watchlist questions failed: {e}")
+        return candidates
+    results = await asyncio.gather(*(_search(store, vector, ticker, question, k)
+                                     for vector, ticker, question in zip(vectors, tickers, questions)),
+                                   return_exceptions=True)
+    for i, (ticker, result) in enumerate(zip(tickers, results)):
+        if isinstance(result, Exception):
+            logger.warning(f"News search for {ticker} failed: {result}")
+        else:
+            candidates[i] = result
+    return candidates
+
+
+async def grade_candidates(questions: Sequence[str], candidates: Sequence[List[Document]]) -> List[List[Document]]:
+    """
+    Grade the candidates of all tickers in one batched call. Grades depend on the
+    ticker's question, so only chunks with the same text among one ticker's
+    candidates share a grade.
+
+    Returns:
+        list: The relevant chunks per ticker.
+    """
+    pairs: Dict[tuple, int] = {}
+    graded_documents: List[Document] = []
+    for question, documents in zip(questions, candidates):
+        for document in documents:
+            if (question, document.page_content) not in pairs:
+                pairs[(question, document.page_content)] = len(pairs)
+                graded_documents.append(document)
+    if not pairs:
+        return [[] for _ in candidates]
+
+    inputs = [{"question": question, "document": content} for question, content in pairs]
+    with node_context(WATCHLIST_METRICS_GRAPH, "grade_documents"):
+        grades = await _grader().abatch(inputs, config={"max_concurrency": NEWS_GRADE_BATCH_SIZE},
+                                        return_exceptions=True)
+    relevant = [not isinstance(grade, Exception) and str(grade).strip().lower() == "yes" for grade in grades]
+    failed = sum(isinstance(grade, Exception) for grade in grades)
+    if failed:
+        logger.warning(f"{failed}/{len(grades)} watchlist grading calls failed; those chunks are dropped.")
+    answered = [i for i, grade in enumerate(grades) if not isinstance(grade, Exception)]
+    record_grades([graded_documents[i] for i in answered], [relevant[i] for i in answered])
+    return [
+        [document for document in documents if relevant[pairs[(question, document.page_content)]]]
+        for question, documents in zip(questions, candidates)
+    ]
+
+
+async def summarize_ticker(ticker: str, question: str, documents: List[Document],
+                           topic: Optional[str] = None) -> Dict[str, Any]:
+    """Generate one ticker's summary; without relevant chunks, run the full news graph instead."""
+    result: Dict[str, Any] = {"ticker": ticker, "topic": topic}
+    try:
+        if documents:
+            context, _ = pack_context(question, documents)
+            with node_context(WATCHLIST_METRICS_GRAPH, "generate_result"):
+                result["result"] = await _generator().ainvoke({"context": context, "question": question})
+            result["documents"] = len(documents)
+            result["source"] = "digest"
+        else:
+            from rag_graphs.registry import get_graph, NEWS_GRAPH
+
+            res = await asyncio.to_thread(get_graph(NEWS_GRAPH).invoke, {"question": question, "ticker": ticker})
+            result["result"] = res["generation"]
+            result["documents"] = 0
+            result["source"] = "graph"
+    except Exception as e:
+        logger.error(f"News summary for {ticker} failed: {e}")
+        result["error"] = str(e)
+    return result
+
+
+async def watchlist_digest(tickers: Sequence[str], topic: Optional[str] = None,
+                           k: int = NEWS_WATCHLIST_K) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Summarize the news of every ticker, yielding each result as it completes.
+
+    Args:
+        tickers (list): Ticker symbols; duplicates are dropped.
+        topic (str): Optional topic, as for ``/news/{ticker}``.
+        k (int): Chunks retrieved per ticker.
+
+    Yields:
+        dict: ``ticker``, ``topic``, ``result`` (or ``error``), the number of relevant
+        ``documents`` and ``source`` ('digest', or 'graph' for the full-graph fallback).
+    """
+    tickers = list(dict.fromkeys(t.strip() for t in tickers if t.strip()))
+    questions = [news_question(ticker, topic) for ticker in tickers]
+
+    candidates = await retrieve_candidates(tickers, questions, k)
+    relevant = await grade_candidates(questions, candidates)
+
+    tasks = [asyncio.create_task(summarize_ticker(ticker, question, documents, topic))
+             for ticker, question, documents in zip(tickers, questions, relevant)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The client went away: stop generating for it
+        for task in tasks:
+            task.cancel()
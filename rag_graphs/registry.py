@@ -0,0 +1,105 @@
+"""
+Registry of the compiled LangGraph applications.
+
+Graph modules are imported and compiled on first use instead of at import time,
+so importing the API does not pull in LangGraph, the chains or the model clients.
+``warm_up`` compiles graphs ahead of the first request when that is preferred.
+Compiled graphs are wrapped with the metrics instrumentation
+(``rag_graphs/instrumentation.py``) unless ``GRAPH_METRICS_ENABLED=false``.
+"""
+import importlib
+import threading
+from typing import Callable, Dict, Iterable, Optional, Union
+
+from utils.logger import logger
+
+NEWS_GRAPH          = "news"
+STOCK_DATA_GRAPH    = "stock_data"
+STOCK_CHARTS_GRAPH  = "stock_charts"
+
+# Graph name -> "module:function" returning a compiled graph
+GRAPH_BUILDERS = {
+    NEWS_GRAPH: "rag_graphs.news_rag_graph.graph.graph:build_graph",
+    STOCK_DATA_GRAPH: "rag_graphs.stock_data_rag_graph.graph.graph:build_graph",
+    STOCK_CHARTS_GRAPH: "rag_graphs.stock_charts_graph.graph.graph:build_graph",
+}
+
+# Diagram file names written by `python -m rag_graphs.draw_graphs`
+GRAPH_DIAGRAMS = {
+    NEWS_GRAPH: "news-rag-graph.png",
+    STOCK_DATA_GRAPH: "stock-data-rag-graph.png",
+    STOCK_CHARTS_GRAPH: "stock-charts-rag-graph.png",
+}
+
+
+def _resolve_builder(builder: Union[str, Callable]) -> Callable:
+    if callable(builder):
+        return builder
+    module_name, function_name = builder.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+class GraphRegistry:
+    """
+    Compiles each registered graph once, on first request, in a thread-safe way.
+    """
+    def __init__(self, builders: Optional[Dict[str, Union[str, Callable]]] = None):
+        self._builders = dict(GRAPH_BUILDERS if builders is None else builders)
+        self._graphs = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, builder: Union[str, Callable]):
+        """
+        Register (or replace) a graph builder, given as a callable or a "module:function" path.
+        """
+        with self._lock:
+            self._builders[name] = builder
+            self._graphs.pop(name, None)
+
+    def names(self):
+        return list(self._builders)
+
+    def get(self, name: str):
+        """
+        Return the compiled graph for ``name``, compiling it on first use.
+        """
+        graph = self._graphs.get(name)
+        if graph is not None:
+            return graph
+        if name not in self._builders:
+            raise KeyError(f"Unknown graph '{name}'. Registered graphs: {self.names()}")
+        with self._lock:
+            graph = self._graphs.get(name)
+            if graph is None:
+                logger.info(f"Compiling graph '{name}'.")
+                from rag_graphs.instrumentation import instrument_graph
+                graph = instrument_graph(name, _resolve_builder(self._builders[name])())
+                self._graphs[name] = graph
+            return graph
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """
+        Compile graphs ahead of the first request. Failures are logged, not raised,
+        so a missing backend does not prevent the API from starting.
+        """
+        for name in names or self.names():
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Warm-up of graph '{name}' failed: {e}")
+
+
+_registry_instance = None
+
+
+def get_graph_registry() -> GraphRegistry:
+    """Get or create the process-wide graph registry."""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = GraphRegistry()
+    return _registry_instance
+
+
+def get_graph(name: str):
+    """Shortcut for ``get_graph_registry().get(name)``."""
+    return get_graph_registry().get(name)
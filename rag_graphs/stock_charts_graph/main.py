@@ -1,10 +1,12 @@
 from dotenv import load_dotenv
-from rag_graphs.stock_charts_graph.graph.graph import app
+from rag_graphs.registry import get_graph, STOCK_CHARTS_GRAPH
+from utils.langsmith_tracing import enable_langsmith_tracing
 from utils.logger import logger
 
 load_dotenv()
 
 if __name__=='__main__':
+    enable_langsmith_tracing("StocksInsights")
     logger.info("--STOCK CHARTS CHAIN--")
-    res = app.invoke({"question": "All unique values of 'Date' and 'Low' of AAPL for last 7 days"})
+    res = get_graph(STOCK_CHARTS_GRAPH).invoke({"question": "All unique values of 'Date' and 'Low' of AAPL for last 7 days"})
     print(res)
\ No newline at end of file
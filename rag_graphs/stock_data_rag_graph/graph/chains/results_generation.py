@@ -1,12 +1,15 @@
 from dotenv import load_dotenv
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, GENERATOR_ROLE
 load_dotenv()
 
-llm                 = get_llm_singleton(temperature=0)
+llm                 = get_role_llm(GENERATOR_ROLE)
 
-system = """You are a helpful AI assistant which specializes in reading stock data provided in pandas.Dataframe format and answering relevant queries.
+system = """You are a helpful AI assistant which specializes in reading stock data and answering relevant queries.
+            The stock data is a summary of SQL query results: the row count and date range, per-ticker
+            first/last/min/max/mean/change of each numeric column computed over all rows, and a sample of the rows.
+            Prefer the summary figures for questions about ranges, averages or changes over the period.
             Answer the question user asks directly and concisely.
             Consider the provided context to frame your answer.
             Do not add conversational filler or ask follow-up questions.
@@ -1,10 +1,10 @@
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic.v1 import BaseModel, Field
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, GRADER_ROLE
 
 load_dotenv()
-llm = get_llm_singleton(temperature=0)
+llm = get_role_llm(GRADER_ROLE)
 
 class GradeDocuments(BaseModel):
     """Binary score for relevance check on retrieved documents"""
@@ -2,10 +2,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 from utils.logger import logger
-from config.llm_config import get_llm_singleton
+from config.llm_gateway import get_role_llm, SQL_ROLE
 
 load_dotenv()
-llm = get_llm_singleton(temperature=0)
+llm = get_role_llm(SQL_ROLE)
 
 system = """
 You are an AI assistant that converts natural language queries into PostgreSQL SQL queries.
@@ -1,3 +1,4 @@
 GENERATE_SQL        = "generate_sql"
+VALIDATE_SQL        = "validate_sql"
 EXECUTE_SQL         = "execute_sql"
 GENERATE_RESULTS    = "generate_results"
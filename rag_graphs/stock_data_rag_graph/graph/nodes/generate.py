@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 from typing import Any, Dict
 from rag_graphs.stock_data_rag_graph.graph.chains.results_generation import generation_chain
 from rag_graphs.stock_data_rag_graph.graph.state import GraphState
+from rag_graphs.stock_data_rag_graph.result_summary import summarize_results
 from utils.logger import logger
 
 load_dotenv()
@@ -11,13 +12,21 @@ def generate(state: GraphState) -> Dict[str, Any]:
     question    = state["question"]
     sql_results = state["sql_results"]
 
+    # Only the compact summary goes to the LLM, never the DataFrame itself
+    summary, summary_stats = summarize_results(sql_results)
+    logger.info(
+        f"Summarized {summary_stats['rows']} result rows into {summary_stats['tokens']} tokens "
+        f"({summary_stats['rows_shown']} rows shown)."
+    )
+
     generation  = generation_chain.invoke({
-        "context": sql_results,
+        "context": summary,
         "question": question,
     })
 
     return {
         "sql_results": sql_results,
         "question": question,
-        "generation": generation
+        "generation": generation,
+        "result_summary": summary,
     }
\ No newline at end of file
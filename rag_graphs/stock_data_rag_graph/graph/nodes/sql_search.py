@@ -2,6 +2,7 @@ from typing import Any, Dict
 from dotenv import load_dotenv
 from db.postgres_db import PostgresDBClient
 from rag_graphs.stock_data_rag_graph.graph.state import GraphState
+from rag_graphs.stock_data_rag_graph.sql_validator import SQL_ROW_LIMIT, SQL_STATEMENT_TIMEOUT_MS
 # from sqlalchemy import create_engine, text
 import os
 import pandas as pd
@@ -9,6 +10,9 @@ from utils.logger import logger
 
 load_dotenv()
 
+SQL_FETCH_CHUNK_ROWS = int(os.getenv("SQL_FETCH_CHUNK_ROWS", "2000"))
+SQL_FETCH_MAX_BYTES = int(os.getenv("SQL_FETCH_MAX_BYTES", str(64 * 1024 * 1024)))
+
 def initialize_db_client():
     """
     Initialize the PostgresDBClient using .env credentials.
@@ -42,11 +46,16 @@ def execute_query(query: str, params: dict = None):
     db_client   = initialize_db_client()
     try:
         if "select" in query.lower():  # For SELECT queries
-            results, columns = db_client.fetch_query(query, params)
-            if not columns:  # Handle case where no columns are returned
+            results = db_client.fetch_frame_readonly(
+                query, params,
+                statement_timeout_ms=SQL_STATEMENT_TIMEOUT_MS,
+                chunk_rows=SQL_FETCH_CHUNK_ROWS,
+                max_rows=SQL_ROW_LIMIT,
+                max_bytes=SQL_FETCH_MAX_BYTES,
+            )
+            if results.columns.empty:  # Handle case where no columns are returned
                 logger.warning("Query returned no columns.")
-                return pd.DataFrame()  # Return an empty DataFrame
-            return pd.DataFrame(results, columns=columns)
+            return results
         else:  # For other queries (INSERT, UPDATE, DELETE)
             db_client.execute_query(query, params)
             return pd.DataFrame()  # Return an empty DataFrame for non-SELECT
@@ -64,7 +73,8 @@ def sql_fetch_query(state:GraphState) -> Dict[str, Any]:
     try:
         sql_results = execute_query(sql_query)
         # If successful, clear error
-        return {"sql_results": sql_results, "sql_query": sql_query, "error": None, "tries": tries}
+        return {"sql_results": sql_results, "sql_query": sql_query, "error": None, "tries": tries,
+                "sql_truncated": bool(sql_results.attrs.get("truncated", False))}
     except Exception as e:
         logger.error(f"SQL Execution failed: {e}")
         return {"sql_results": None, "sql_query": sql_query, "error": str(e), "tries": tries + 1}
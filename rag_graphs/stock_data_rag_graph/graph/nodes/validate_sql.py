@@ -0,0 +1,39 @@
+from typing import Any, Dict
+from rag_graphs.stock_data_rag_graph.graph.constants import EXECUTE_SQL, GENERATE_SQL, GENERATE_RESULTS
+from rag_graphs.stock_data_rag_graph.graph.state import GraphState
+from rag_graphs.stock_data_rag_graph.sql_validator import SQLValidationError, validate_sql
+from utils.logger import logger
+
+MAX_RETRIES = 3
+
+
+def validate_generated_sql(state: GraphState) -> Dict[str, Any]:
+    """
+    Validates and repairs the generated SQL locally before it is executed.
+
+    Args:
+        state (dict): The current graph state
+
+    Returns:
+        state (dict): The repaired query, or an error (and one more try) if it cannot be repaired
+    """
+    logger.info("---VALIDATE SQL---")
+    tries = state.get("tries", 0)
+    try:
+        sql_query, repairs = validate_sql(state["sql_query"])
+    except SQLValidationError as e:
+        return {"sql_results": None, "error": str(e), "tries": tries + 1}
+    return {"sql_query": sql_query, "sql_repairs": repairs, "error": None}
+
+
+def decide_to_execute(state):
+    """
+    Execute a valid query; otherwise regenerate it, or give up after MAX_RETRIES.
+    """
+    if not state.get("error"):
+        return EXECUTE_SQL
+    if state.get("tries", 0) < MAX_RETRIES:
+        logger.info(f"---DECISION: INVALID SQL, RETRY ({state.get('tries', 0)}/{MAX_RETRIES})---")
+        return GENERATE_SQL
+    logger.info("---DECISION: INVALID SQL, GIVING UP---")
+    return GENERATE_RESULTS
@@ -14,7 +14,10 @@ class GraphState(TypedDict):
     """
     question: str
     sql_query: str
+    sql_repairs: List[str]
     sql_results: str
+    sql_truncated: bool
     generation: str
     error: str
     tries: int
+    result_summary: str
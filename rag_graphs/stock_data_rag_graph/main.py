@@ -1,10 +1,12 @@
 from dotenv import load_dotenv
-from rag_graphs.stock_data_rag_graph.graph.graph import app
+from rag_graphs.registry import get_graph, STOCK_DATA_GRAPH
+from utils.langsmith_tracing import enable_langsmith_tracing
 from utils.logger import logger
 
 load_dotenv()
 
 if __name__=='__main__':
+    enable_langsmith_tracing("StocksInsights")
     logger.info("--STOCK DATA CHAIN--")
-    res = app.invoke({"question": "What is the lowest price of AAPL over last 7 days?"})
+    res = get_graph(STOCK_DATA_GRAPH).invoke({"question": "What is the lowest price of AAPL over last 7 days?"})
     print(res)
\ No newline at end of file
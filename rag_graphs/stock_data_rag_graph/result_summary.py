@@ -0,0 +1,159 @@
+"""
+Compact, token-capped rendering of SQL results for the stock generation prompt.
+
+Instead of the DataFrame repr (verbose, and truncated by pandas at arbitrary
+rows), the LLM receives
+
+- a header with the row count, tickers and date range,
+- per-ticker first/last/min/max/mean/change of every numeric column, computed
+  with one vectorized groupby, and
+- as many evenly spaced rows (always including the first and last) as fit in
+  what is left of ``STOCK_CONTEXT_TOKEN_BUDGET``.
+
+The rendered size is bounded by the budget, so generation latency stays flat
+however many rows the query returns.
+"""
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from utils.tokenizer import get_tokenizer
+
+STOCK_CONTEXT_TOKEN_BUDGET = int(os.getenv("STOCK_CONTEXT_TOKEN_BUDGET", "600"))
+
+_AGGREGATES = ("first", "last", "min", "max", "mean")
+# Surrogate keys carry no information for the model
+_SKIP_COLUMNS = {"id"}
+
+
+def _fmt(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "-"
+    if isinstance(value, (int, np.integer)):
+        value = int(value)
+        return f"{value / 1e6:.2f}M" if abs(value) >= 10_000_000 else str(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if abs(value) >= 1e9:
+            return f"{value / 1e9:.2f}B"
+        if abs(value) >= 1e7:
+            return f"{value / 1e6:.2f}M"
+        if abs(value) >= 1e5:
+            return f"{value:.0f}"
+        return f"{value:.2f}"
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _table(header: List[str], rows: List[List[str]]) -> List[str]:
+    widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+    return ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+            for line in [header, *rows]]
+
+
+def _date_column(df: pd.DataFrame) -> Optional[str]:
+    for name in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[name]):
+            return name
+    return "date" if "date" in df.columns else None
+
+
+def _fit_lines(lines: List[str], budget: int) -> Tuple[List[str], int]:
+    """Keep leading lines within ``budget`` tokens, noting how many were dropped."""
+    tokenizer = get_tokenizer()
+    kept, used = [], 0
+    for i, line in enumerate(lines):
+        tokens = tokenizer.count(line) + 1
+        if used + tokens > budget:
+            kept.append(f"... ({len(lines) - i} more lines)")
+            return kept, used
+        kept.append(line)
+        used += tokens
+    return kept, used
+
+
+def aggregate(df: pd.DataFrame, date_column: Optional[str], group_column: Optional[str]) -> pd.DataFrame:
+    """
+    Per-group first/last/min/max/mean/change of the numeric columns, in date order.
+
+    Returns:
+        pd.DataFrame: One row per (group, column).
+    """
+    numeric = [c for c in df.select_dtypes(include="number").columns if c not in _SKIP_COLUMNS]
+    if not numeric:
+        return pd.DataFrame()
+    ordered = df.sort_values(date_column, kind="stable") if date_column else df
+    keys = ordered[group_column] if group_column else pd.Series("all", index=ordered.index)
+    stats = ordered[numeric].groupby(keys, sort=True).agg(list(_AGGREGATES))
+    stats = stats.stack(level=0, future_stack=True)
+    stats.index.names = ["group", "column"]
+    stats["change"] = stats["last"] - stats["first"]
+    stats["change_pct"] = stats["change"] / stats["first"].replace(0, np.nan) * 100
+    return stats.reset_index()
+
+
+def summarize_results(results: Optional[pd.DataFrame],
+                      token_budget: int = STOCK_CONTEXT_TOKEN_BUDGET) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render SQL results as a compact text table for the generation prompt.
+
+    Args:
+        results (pd.DataFrame): Rows returned by the SQL search.
+        token_budget (int): Maximum tokens of the rendered summary.
+
+    Returns:
+        tuple: (summary text, stats with the row counts and token usage).
+    """
+    if results is None or len(results) == 0:
+        return "The query returned no rows.", {"rows": 0, "rows_shown": 0, "tokens": 0}
+
+    df = results.drop(columns=[c for c in _SKIP_COLUMNS if c in results.columns])
+    date_column = _date_column(df)
+    if date_column and not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        df = df.assign(**{date_column: pd.to_datetime(df[date_column], errors="coerce")})
+    group_column = "ticker" if "ticker" in df.columns else None
+
+    lines = [f"Rows: {len(df)}"]
+    if results.attrs.get("truncated"):
+        lines[0] += " (partial result: the row or memory cap was reached, more rows matched)"
+    if group_column:
+        tickers = df[group_column].dropna().unique()
+        lines.append(f"Tickers: {', '.join(map(str, tickers[:20]))}" + (" ..." if len(tickers) > 20 else ""))
+    if date_column:
+        lines.append(f"Dates: {_fmt(df[date_column].min())} to {_fmt(df[date_column].max())}")
+
+    # Aggregates are only informative when there are several rows per group
+    stats = aggregate(df, date_column, group_column) if len(df) > 1 else pd.DataFrame()
+    if not stats.empty:
+        header = ["ticker" if group_column else "group", "column", *_AGGREGATES, "change", "change%"]
+        rows = [[_fmt(v) for v in row] for row in stats[["group", "column", *_AGGREGATES, "change", "change_pct"]]
+                .itertuples(index=False, name=None)]
+        lines += ["", "Summary:", *_table(header, rows)]
+
+    lines, used = _fit_lines(lines, token_budget)
+
+    if date_column:
+        df = df.sort_values(([group_column] if group_column else []) + [date_column], kind="stable")
+    header = [str(c) for c in df.columns]
+    remaining = token_budget - used - 4
+    shown = 0
+    if remaining > 0:
+        tokenizer = get_tokenizer()
+        sample = _table(header, [[_fmt(v) for v in df.iloc[0]]])
+        per_row = max(tokenizer.count(sample[1]) + 1, 1)
+        limit = max(0, min(len(df), (remaining - tokenizer.count(sample[0])) // per_row))
+        if limit > 0:
+            # Evenly spaced rows, always including the first and last
+            positions = np.unique(np.linspace(0, len(df) - 1, limit).round().astype(int))
+            picked = df.iloc[positions]
+            rows = [[_fmt(v) for v in row] for row in picked.itertuples(index=False, name=None)]
+            title = "Rows:" if len(positions) == len(df) else f"Rows ({len(positions)} of {len(df)}, evenly spaced):"
+            table, _ = _fit_lines(_table(header, rows), remaining)
+            lines += ["", title, *table]
+            shown = len(positions)
+
+    summary = "\n".join(lines)
+    return summary, {"rows": len(df), "rows_shown": shown, "tokens": get_tokenizer().count(summary)}
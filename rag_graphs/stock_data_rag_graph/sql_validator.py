@@ -0,0 +1,248 @@
+"""
+Local validation and repair of LLM generated SQL before it reaches Postgres.
+
+The generated query is parsed with sqlglot, trying Postgres first and then the
+dialects local models tend to slip into (MySQL, SQLite, T-SQL); the first parse
+without unknown functions wins and is rendered back as Postgres. SQLite date
+arithmetic on 'now' (``date('now', '-7 days')``) parses in every dialect but only
+runs in SQLite, so it is rewritten to ``CURRENT_DATE - INTERVAL '7 DAYS'``. The
+result is then checked against the known ``stock_data`` schema (close misspellings of
+tables and columns are repaired), restricted to a single read-only SELECT, and
+given a row LIMIT. Errors that can be repaired never cost a database round
+trip or another generation; the rest are reported back to the retry loop
+without touching the database. The LIMIT is one above ``SQL_ROW_LIMIT`` so the
+fetch can tell a result that was cut off from one that fits exactly.
+"""
+import difflib
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
+from utils.logger import logger
+
+SQL_ROW_LIMIT = int(os.getenv("SQL_ROW_LIMIT", "5000"))
+SQL_STATEMENT_TIMEOUT_MS = int(os.getenv("SQL_STATEMENT_TIMEOUT_MS", "5000"))
+
+# Keep in sync with db/models/stock_data.py and the SQL generation prompt
+STOCK_DATA_SCHEMA: Dict[str, Set[str]] = {
+    "stock_data": {"id", "ticker", "date", "open", "high", "low", "close", "volume"},
+}
+
+READ_DIALECTS = ("postgres", "mysql", "sqlite", "tsql")
+
+# Names models use for stock_data columns
+COLUMN_SYNONYMS = {
+    "symbol": "ticker", "stock": "ticker", "stock_ticker": "ticker", "ticker_symbol": "ticker",
+    "trade_date": "date", "trading_date": "date", "day": "date",
+    "open_price": "open", "opening_price": "open",
+    "high_price": "high", "low_price": "low",
+    "close_price": "close", "closing_price": "close", "price": "close", "adj_close": "close",
+    "trade_volume": "volume", "vol": "volume",
+}
+
+_WRITE_NODES = tuple(getattr(exp, name) for name in (
+    "Insert", "Update", "Delete", "Merge", "Create", "Drop", "Alter", "Command",
+    "Into", "Lock", "Copy", "Transaction", "Set", "Pragma",
+) if hasattr(exp, name))
+_FORBIDDEN_FUNCTIONS = {"dblink", "lo_import", "lo_export", "set_config", "current_setting"}
+# SQLite functions taking a time value and modifiers; strftime takes a format first
+_SQLITE_TIME_FUNCTIONS = {"date", "datetime", "strftime"}
+_SQLITE_OFFSET = re.compile(r"^([+-]?)\s*(\d+)\s*(day|month|year|hour|minute|second)s?$", re.IGNORECASE)
+_SQLITE_START_OF = re.compile(r"^start of (day|month|year)$", re.IGNORECASE)
+
+
+class SQLValidationError(ValueError):
+    """Raised for generated SQL that cannot be repaired locally."""
+
+
+_stats_lock = threading.Lock()
+_stats = {"validated": 0, "repaired": 0, "rejected": 0}
+
+
+def get_validation_stats() -> Dict[str, int]:
+    """
+    Counters since process start. ``repaired`` queries would have failed in
+    Postgres and cost a retry; ``rejected`` ones were sent back to the retry
+    loop without a database round trip.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["retries_avoided"] = stats["repaired"]
+    stats["db_round_trips_avoided"] = stats["repaired"] + stats["rejected"]
+    return stats
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _parse(sql: str) -> Tuple[exp.Expression, str]:
+    """Parse with the first dialect that yields a single statement without unknown functions."""
+    fallback, errors = None, []
+    for dialect in READ_DIALECTS:
+        try:
+            statements = [s for s in sqlglot.parse(sql, read=dialect) if s is not None]
+        except ParseError as e:
+            errors.append(f"{dialect}: {str(e).splitlines()[0]}")
+            continue
+        if len(statements) != 1:
+            raise SQLValidationError(f"Expected a single SELECT statement, got {len(statements)} statements.")
+        if not any(statements[0].find_all(exp.Anonymous)):
+            return statements[0], dialect
+        fallback = fallback or (statements[0], dialect)
+    if fallback:
+        return fallback
+    raise SQLValidationError(f"Could not parse SQL ({'; '.join(errors)}).")
+
+
+def _is_now(node: exp.Expression) -> bool:
+    return isinstance(node, exp.Literal) and node.is_string and node.this.strip().lower() == "now"
+
+
+def _sqlite_time_value(now: exp.Expression, modifiers: List[exp.Expression]) -> exp.Expression:
+    value = now
+    for modifier in modifiers:
+        text = modifier.this.strip() if isinstance(modifier, exp.Literal) and modifier.is_string else ""
+        offset, start_of = _SQLITE_OFFSET.match(text), _SQLITE_START_OF.match(text)
+        if offset:
+            sign, amount, unit = offset.groups()
+            interval = exp.Interval(this=exp.Literal.string(amount), unit=exp.var(f"{unit.upper()}S"))
+            value = (exp.Sub if sign == "-" else exp.Add)(this=value, expression=interval)
+        elif start_of:
+            value = exp.DateTrunc(this=value, unit=exp.Literal.string(start_of.group(1).upper()))
+        else:
+            raise SQLValidationError(f"Unsupported SQLite date modifier {modifier.sql()}; "
+                                     "use CURRENT_DATE - INTERVAL 'N days'.")
+    return value
+
+
+def _repair_sqlite_now(tree: exp.Expression, repairs: List[str]):
+    """Rewrite SQLite date arithmetic on 'now', e.g. date('now', '-7 days'), as Postgres."""
+    for node in list(tree.find_all(exp.Func)):
+        name = (node.name if isinstance(node, exp.Anonymous) else node.sql_name()).lower()
+        if name not in _SQLITE_TIME_FUNCTIONS:
+            continue
+        if isinstance(node, exp.Anonymous):
+            args = list(node.expressions)
+        else:
+            args = [node.args[key] for key in node.arg_types if isinstance(node.args.get(key), exp.Expression)]
+        format_, args = (args[0], args[1:]) if name == "strftime" and args else (None, args)
+        if not args or not _is_now(args[0]):
+            continue
+        now = exp.CurrentDate() if name == "date" else exp.CurrentTimestamp()
+        value = _sqlite_time_value(now, args[1:])
+        if format_ is not None:
+            value = exp.TimeToStr(this=value, format=format_)
+        elif len(args) > 1 and isinstance(node.parent, exp.Binary) and not isinstance(node.parent, exp.Predicate):
+            value = exp.paren(value)
+        repairs.append(f"{node.sql()} -> {value.sql(dialect='postgres')}")
+        node.replace(value)
+
+
+def _check_read_only(tree: exp.Expression):
+    if not isinstance(tree, (exp.Select, exp.SetOperation)):
+        raise SQLValidationError(f"Only SELECT queries are allowed, got {tree.key.upper()}.")
+    for node in tree.walk():
+        if isinstance(node, _WRITE_NODES):
+            raise SQLValidationError(f"Only read-only SELECT queries are allowed ({node.key.upper()} found).")
+        if isinstance(node, exp.Func):
+            name = (node.name if isinstance(node, exp.Anonymous) else node.sql_name()).lower()
+            if name in _FORBIDDEN_FUNCTIONS or name.startswith("pg_"):
+                raise SQLValidationError(f"Function {name} is not allowed.")
+
+
+def _closest(name: str, candidates: Set[str], cutoff: float) -> Optional[str]:
+    matches = difflib.get_close_matches(name, sorted(candidates), n=1, cutoff=cutoff)
+    return matches[0] if matches else None
+
+
+def _check_schema(tree: exp.Expression, schema: Dict[str, Set[str]], repairs: List[str]):
+    cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+    for table in tree.find_all(exp.Table):
+        name = table.name.lower()
+        if name in schema or name in cte_names:
+            if table.name != name:
+                table.set("this", exp.to_identifier(name))
+            continue
+        match = _closest(name, set(schema), 0.6)
+        if match is None:
+            raise SQLValidationError(f"Unknown table {table.name}; available tables: {', '.join(sorted(schema))}.")
+        repairs.append(f"table {table.name} -> {match}")
+        table.set("this", exp.to_identifier(match))
+
+    columns = set().union(*(schema[t.name] for t in tree.find_all(exp.Table) if t.name in schema))
+    # Names defined inside the query itself: select aliases and CTE/subquery column lists
+    defined = {alias.alias.lower() for alias in tree.find_all(exp.Alias)}
+    defined |= {col.name.lower() for alias in tree.find_all(exp.TableAlias) for col in alias.columns}
+    for column in tree.find_all(exp.Column):
+        if isinstance(column.this, exp.Star):
+            continue
+        name = column.name.lower()
+        if name in columns or name in defined:
+            if column.name != name:
+                # Quoted mixed-case identifiers are case-sensitive in Postgres
+                repairs.append(f"column {column.name} -> {name}")
+                column.set("this", exp.to_identifier(name))
+            continue
+        match = COLUMN_SYNONYMS.get(name) or _closest(name, columns, 0.75)
+        if match is None or match not in columns:
+            raise SQLValidationError(f"Unknown column {column.name}; available columns: {', '.join(sorted(columns))}.")
+        repairs.append(f"column {column.name} -> {match}")
+        column.set("this", exp.to_identifier(match))
+
+
+def _apply_limit(tree: exp.Expression, limit: int, repairs: List[str]) -> exp.Expression:
+    current = tree.args.get("limit")
+    value = current.expression if isinstance(current, exp.Limit) else None
+    if value is None:
+        repairs.append(f"limit {limit} added")
+        return tree.limit(limit)
+    if isinstance(value, exp.Literal) and value.is_int and int(value.this) > limit:
+        repairs.append(f"limit {value.this} -> {limit}")
+        return tree.limit(limit)
+    return tree
+
+
+def validate_sql(sql: str, schema: Dict[str, Set[str]] = STOCK_DATA_SCHEMA,
+                 row_limit: int = SQL_ROW_LIMIT) -> Tuple[str, List[str]]:
+    """
+    Validate and repair a generated query.
+
+    Args:
+        sql (str): Query produced by the SQL generation chain.
+        schema (dict): Table name to column names the query may use.
+        row_limit (int): Maximum rows kept from the result; the query is limited
+            to one more row so truncation can be detected.
+
+    Returns:
+        tuple: (Postgres SQL to execute, list of repairs applied).
+
+    Raises:
+        SQLValidationError: If the query is not a single read-only SELECT over the schema.
+    """
+    sql = (sql or "").strip().rstrip(";").strip()
+    if not sql:
+        _count("rejected")
+        raise SQLValidationError("The generated SQL query is empty.")
+    try:
+        tree, dialect = _parse(sql)
+        repairs = [] if dialect == "postgres" else [f"transpiled from {dialect}"]
+        _repair_sqlite_now(tree, repairs)
+        _check_read_only(tree)
+        _check_schema(tree, schema, repairs)
+        tree = _apply_limit(tree, row_limit + 1, repairs)
+    except SQLValidationError as e:
+        _count("rejected")
+        logger.info(f"Rejected generated SQL before execution: {e}")
+        raise
+
+    _count("validated")
+    if any(not repair.startswith("limit") for repair in repairs):
+        _count("repaired")
+        logger.info(f"Repaired generated SQL locally: {', '.join(repairs)}")
+    return tree.sql(dialect="postgres"), repairs
@@ -0,0 +1,72 @@
+from concurrent.futures.process import BrokenProcessPool
+
+from rag_graphs.news_rag_graph.chunking import ArticleChunker, get_splitter
+from rag_graphs.news_rag_graph.ingestion import article_metadata, article_text
+from utils.tokenizer import get_tokenizer
+
+SENTENCE = "Tata Consultancy Services reported higher quarterly revenue as deal wins in Europe picked up. "
+
+
+def _articles(count):
+    texts = [SENTENCE * (1 + i % 60) for i in range(count)]
+    metadatas = [{"ticker": f"T{i}.NS", "title": f"Update {i}"} for i in range(count)]
+    return texts, metadatas
+
+
+def test_chunks_are_bounded_and_keep_article_metadata():
+    assert get_splitter() is get_splitter()
+    texts, metadatas = _articles(5)
+    chunks = ArticleChunker(workers=1).split(texts, metadatas)
+
+    assert all(get_tokenizer().count(chunk.page_content) <= get_splitter()._chunk_size for chunk in chunks)
+    assert [c.metadata["title"] for c in chunks if c.metadata["ticker"] == "T4.NS"][0] == "Update 4"
+    # Short articles stay whole; long ones span several chunks
+    assert sum(c.metadata["ticker"] == "T0.NS" for c in chunks) == 1
+    assert sum(c.metadata["ticker"] == "T4.NS" for c in chunks) == 1
+    long_texts, long_metadatas = [SENTENCE * 60], [{"ticker": "TCS.NS"}]
+    assert len(ArticleChunker(workers=1).split(long_texts, long_metadatas)) > 1
+
+
+def test_pool_split_matches_inline_split():
+    texts, metadatas = _articles(12)
+    inline = ArticleChunker(workers=1).split(texts, metadatas)
+    chunker = ArticleChunker(workers=2, parallel_min_docs=10, slice_docs=5)
+    try:
+        pooled = chunker.split(texts, metadatas)
+        assert chunker._executor is not None
+    finally:
+        chunker.shutdown()
+    assert [(c.page_content, c.metadata) for c in pooled] == [(c.page_content, c.metadata) for c in inline]
+
+
+def test_article_metadata_takes_the_headline_as_title():
+    article = {"_id": 7, "ticker": "tcs.ns", "headline": " TCS  wins deal ", "description": "...",
+               "posted": "Tue, 05 Mar 2024 08:00:00 GMT"}
+    assert article_metadata(article) == {"month": "2024-03", "published_ts": 1709625600, "article_id": "7",
+                                         "ticker": "TCS.NS", "title": "TCS wins deal"}
+    assert set(article_metadata({"description": "..."})) == {"month"}
+
+
+def test_article_text_leads_with_the_title():
+    article = {"headline": "TCS wins deal", "description": SENTENCE * 60}
+    chunks = ArticleChunker(workers=1).split([article_text(article, article_metadata(article))])
+    assert chunks[0].page_content.startswith("TCS wins deal Tata Consultancy")
+    assert article_text({"description": "..."}, {}) == "..."
+
+
+def test_broken_pool_is_shut_down_and_split_inline():
+    class _BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool()
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            calls.append((wait, cancel_futures))
+
+    calls = []
+    texts, metadatas = _articles(12)
+    chunker = ArticleChunker(workers=2, parallel_min_docs=10)
+    chunker._executor = _BrokenPool()
+    chunks = chunker.split(texts, metadatas)
+
+    assert calls == [(False, True)] and chunker._executor is None
+    assert len(chunks) == len(ArticleChunker(workers=1).split(texts, metadatas))
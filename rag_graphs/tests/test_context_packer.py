@@ -0,0 +1,36 @@
+from langchain_core.documents import Document
+
+from rag_graphs.news_rag_graph.context_packer import dedup, pack_context
+from utils.tokenizer import get_tokenizer
+
+RELEVANT = "Reliance Industries shares rose 3% after strong quarterly earnings from its retail business."
+OTHER = "Monsoon rainfall was above average across most of southern India this week."
+
+
+def test_dedup_drops_exact_and_near_duplicates():
+    texts = [RELEVANT, RELEVANT + " ", RELEVANT.replace("3%", "3 %"), OTHER]
+    assert dedup(texts) == [0, 3]
+
+
+def test_pack_orders_by_relevance_and_strips_repr():
+    documents = [
+        Document(page_content=OTHER, metadata={"id": "abc"}),
+        Document(page_content=RELEVANT, metadata={"source": "web_search_agent"}),
+        Document(page_content=RELEVANT),
+    ]
+    context, stats = pack_context("Reliance earnings news", documents)
+
+    assert context.startswith("[1] (web_search_agent) Reliance Industries")
+    assert "page_content" not in context and "metadata" not in context
+    assert (stats["documents"], stats["unique"], stats["packed"]) == (3, 2, 2)
+    assert stats["tokens_saved"] > 0
+    assert stats["packed_tokens"] < stats["raw_tokens"]
+
+
+def test_pack_respects_token_budget():
+    documents = [Document(page_content=f"{RELEVANT} Chunk {i}. " + "filler words " * 60) for i in range(10)]
+    context, stats = pack_context("Reliance earnings", documents, token_budget=200)
+
+    assert stats["truncated"]
+    assert get_tokenizer().count(context) <= 200 + stats["packed"]
+    assert stats["packed"] < 10
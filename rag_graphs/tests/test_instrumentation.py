@@ -0,0 +1,42 @@
+from typing import TypedDict
+
+from langgraph.graph import END, StateGraph
+
+from rag_graphs.instrumentation import instrument_graph
+from utils import metrics
+
+
+class _State(TypedDict):
+    value: int
+
+
+def _fetch(state):
+    with metrics.timed_db_query() as rows:
+        rows.append(3)
+    return {"value": state["value"] + 1}
+
+
+def _build():
+    builder = StateGraph(_State)
+    builder.add_node("fetch", _fetch)
+    builder.add_node("double", lambda state: {"value": state["value"] * 2})
+    builder.set_entry_point("fetch")
+    builder.add_edge("fetch", "double")
+    builder.add_edge("double", END)
+    return builder.compile()
+
+
+def test_node_and_graph_timings_are_recorded():
+    graph = instrument_graph("demo_graph", _build())
+    runs = metrics.GRAPH_RUN_SECONDS.count(("demo_graph",))
+
+    assert graph.invoke({"value": 1}) == {"value": 4}
+    assert metrics.GRAPH_RUN_SECONDS.count(("demo_graph",)) == runs + 1
+    assert metrics.GRAPH_NODE_SECONDS.count(("demo_graph", "fetch")) >= 1
+    assert metrics.GRAPH_NODE_SECONDS.count(("demo_graph", "double")) >= 1
+    # The query ran inside the fetch node
+    assert metrics.DB_SECONDS.count(("demo_graph", "fetch")) >= 1
+
+
+def test_non_runnables_are_left_alone():
+    assert instrument_graph("demo", "graph") == "graph"
@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from rag_graphs.news_rag_graph import ingestion
+from rag_graphs.news_rag_graph.partitions import (MemmapPartitions, PartitionedNewsStore, question_horizon_days,
+                                                  staging_name)
+from rag_graphs.news_rag_graph.retention import RetentionJob, retention_cutoff
+
+NOW = datetime(2026, 10, 15, tzinfo=timezone.utc).timestamp()
+
+
+class _LetterEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[text.lower().count(c) + 0.1 for c in "abcdefghijklmnopqrstuvwxyz"] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class _Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class _Collection:
+    """The subset of a Mongo collection the sync and retention use."""
+    def __init__(self, documents):
+        self.documents = documents
+
+    @staticmethod
+    def _matches(document, query):
+        return all(document.get(key) in value["$in"] if isinstance(value, dict) else document.get(key) == value
+                   for key, value in query.items())
+
+    def find(self, query, projection=None):
+        return [dict(d) for d in self.documents if self._matches(d, query)]
+
+    def update_many(self, query, update):
+        matched = [d for d in self.documents if self._matches(d, query)]
+        for document in matched:
+            document.update(update["$set"])
+        return _Result(len(matched))
+
+
+def _store(tmp_path, list_ttl=0):
+    return PartitionedNewsStore(MemmapPartitions(str(tmp_path), _LetterEmbeddings()), "news", _LetterEmbeddings(),
+                                list_ttl=list_ttl, clock=lambda: NOW)
+
+
+def _chunk(text, month, article_id, ticker="TCS.NS", chunk=0):
+    return Document(page_content=text, metadata={"month": month, "article_id": article_id, "ticker": ticker,
+                                                 "chunk": chunk})
+
+
+def test_question_horizon_days():
+    assert question_horizon_days("What happened to TCS today?") == 1
+    assert question_horizon_days("INFY news this week") == 7
+    assert question_horizon_days("Reliance results over the last 3 months") == 93
+    assert question_horizon_days("News related to TCS") == 90
+
+
+def test_searches_only_the_partitions_within_the_horizon(tmp_path):
+    store = _store(tmp_path)
+    store.add_documents([_chunk("tcs order win", "2026-10", "a1"), _chunk("tcs order win again", "2026-10", "a2"),
+                         _chunk("tcs order win", "2026-01", "a0")])
+    assert [p.name for p in store.partitions()] == ["news_2026_10", "news_2026_01"]
+
+    found = store.similarity_search("tcs order win this week", k=2)
+    assert {d.metadata["month"] for d in found} == {"2026-10"}
+    # Too few matches within the horizon: older partitions fill up k
+    found = store.similarity_search("tcs order win this week", k=3)
+    assert [d.metadata["month"] for d in found].count("2026-01") == 1
+
+    # The unpartitioned store of earlier versions is always searched
+    store.backend.open("news", create=True).add_texts(["legacy tcs order win"], [{"ticker": "TCS.NS"}])
+    assert "legacy tcs order win" in [d.page_content for d in store.similarity_search("tcs order win", k=4)]
+
+
+def test_retention_drops_downsamples_and_expires_articles(tmp_path):
+    store = _store(tmp_path)
+    store.add_documents([
+        _chunk("old news", "2025-05", "1"),
+        _chunk("q2 results", "2026-03", "2"), _chunk("q2 results, more", "2026-03", "2", chunk=1),
+        _chunk("q3 results", "2026-03", "3"), _chunk("infy deal", "2026-03", "4", ticker="INFY.NS"),
+        _chunk("fresh news", "2026-10", "5"),
+    ])
+    collection = _Collection([{"_id": i, "synced": True, "partition": month}
+                              for i, month in [(1, "2025-05"), (2, "2026-03"), (3, "2026-03"), (4, "2026-03"),
+                                               (5, "2026-10")]])
+
+    # Retention is opt-in: with the default settings nothing is dropped or downsampled
+    assert RetentionJob(store, collection).run() == {"dry_run": False, "dropped": [], "downsampled": {},
+                                                     "expired_articles": 0}
+    report = RetentionJob(store, collection, retention_months=12, downsample_after_months=3,
+                          keep_per_ticker=1).run()
+
+    assert report["dropped"] == ["news_2025_05"]
+    assert report["downsampled"] == {"news_2026_03": {"kept": 2, "removed": 2}}
+    assert [p.name for p in store.partitions()] == ["news_2026_10", "news_2026_03_g1"]
+    assert sorted(d.page_content for d in store.similarity_search("results deal news", k=10,
+                                                                  horizon_days=3650)) == ["fresh news", "infy deal",
+                                                                                          "q3 results"]
+    assert [d["_id"] for d in collection.documents if d.get("expired")] == [1, 2]
+
+    # A downsampled partition is not downsampled again
+    assert RetentionJob(store, collection, downsample_after_months=3, keep_per_ticker=1).run()["downsampled"] == {}
+
+
+def test_outdated_listing_does_not_bring_back_a_replaced_generation(tmp_path):
+    searcher, store = _store(tmp_path, list_ttl=3600), _store(tmp_path)
+    store.add_documents([_chunk("q2 results", "2026-03", "1"), _chunk("q2 results, more", "2026-03", "1", chunk=1)])
+    collection = _Collection([{"_id": 1, "synced": True, "partition": "2026-03"}])
+    assert [p.name for p in searcher.partitions()] == ["news_2026_03"]
+
+    RetentionJob(store, collection, downsample_after_months=3, keep_per_ticker=1).run()
+    # The searcher still lists the dropped generation 0; opening it must not create it again
+    searcher.similarity_search("results", k=2, horizon_days=3650)
+    assert sorted(store.backend.names()) == ["news_2026_03_g1"]
+    assert RetentionJob(store, collection, downsample_after_months=3, keep_per_ticker=1).run()["dropped"] == []
+    assert [d.page_content for d in searcher.similarity_search("results", k=2, horizon_days=3650)] == ["q2 results"]
+
+
+def test_retention_drops_partitions_with_nothing_to_keep_and_incomplete_generations(tmp_path):
+    store = _store(tmp_path)
+    store.add_documents([_chunk("q2 results, more", "2026-03", "1", chunk=1), _chunk("fresh news", "2026-10", "2")])
+    # Left behind by a downsample that was interrupted while writing
+    store.backend.write(staging_name("news_2026_10_g1"), ["x"], ["partial"], [{"month": "2026-10"}], [[1.0] * 26])
+    collection = _Collection([{"_id": 1, "synced": True, "partition": "2026-03"},
+                              {"_id": 2, "synced": True, "partition": "2026-10"}])
+
+    report = RetentionJob(store, collection, downsample_after_months=3, keep_per_ticker=1).run()
+
+    assert report["downsampled"] == {"news_2026_03": {"kept": 0, "removed": 1}}
+    assert sorted(store.backend.names()) == ["news_2026_10"]
+    assert [d["_id"] for d in collection.documents if d.get("expired")] == [1]
+
+
+def test_from_texts_stores_by_month(tmp_path):
+    store = PartitionedNewsStore.from_texts(
+        ["tcs order win", "tcs in march"], _LetterEmbeddings(), [{"month": "2026-10"}, {"month": "2026-03"}],
+        backend=MemmapPartitions(str(tmp_path), _LetterEmbeddings()), base_name="news", clock=lambda: NOW)
+    assert [p.name for p in store.partitions()] == ["news_2026_10", "news_2026_03"]
+
+
+def test_sync_stores_by_month_and_expires_articles_past_retention(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    monkeypatch.setattr(ingestion, "_news_vectorstore", store)
+    monkeypatch.setattr(ingestion, "retention_cutoff", lambda month: retention_cutoff(month, 12))
+    today = datetime.now(timezone.utc)
+    collection = _Collection([
+        {"_id": 1, "synced": False, "ticker": "TCS.NS", "description": "TCS wins a deal", "pubDate": today.isoformat()},
+        {"_id": 2, "synced": False, "ticker": "TCS.NS", "description": "TCS in 2001",
+         "posted": "Mon, 01 Jan 2001 10:00:00 GMT"},
+    ])
+    manager = ingestion.DocumentSyncManager.__new__(ingestion.DocumentSyncManager)
+    manager.news_collection = collection
+    manager.sync_documents()
+
+    fresh, old = collection.documents
+    assert (fresh["synced"], fresh["partition"], fresh.get("expired")) == (True, today.strftime("%Y-%m"), None)
+    assert (old["synced"], old["expired"], old.get("partition")) == (True, True, None)
+    assert [d.metadata["article_id"] for d in store.similarity_search("TCS deal", k=5, horizon_days=30)] == ["1"]
+
+
+def test_migrate_legacy_resyncs_articles_and_backfills_their_ticker(tmp_path):
+    store = _store(tmp_path)
+    store.backend.open("news", create=True).add_texts(["legacy tcs order win"], [{}])
+    collection = _Collection([
+        {"_id": 1, "synced": True, "headline": "TCS wins a large deal", "description": "..."},
+        {"_id": 2, "synced": True, "headline": "Markets close higher", "description": "Sensex up"},
+        {"_id": 3, "synced": True, "headline": "Infosys guidance", "ticker": "INFY.NS"},
+        {"_id": 4, "synced": True, "partition": "2026-10", "headline": "TCS news", "ticker": "TCS.NS"},
+    ])
+
+    assert RetentionJob(store, collection).migrate_legacy(["TCS.NS", "INFY.NS"]) == 3
+
+    assert [(d["_id"], d["synced"], d.get("ticker")) for d in collection.documents] == [
+        (1, False, "TCS.NS"), (2, False, None), (3, False, "INFY.NS"), (4, True, "TCS.NS")]
+    assert not store.has_legacy()
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from langchain_core.documents import Document
+
+from rag_graphs.news_rag_graph.ingestion import article_published
+from rag_graphs.news_rag_graph.recency import RETRIEVAL_GRADES, record_grades, rerank
+
+NOW = datetime(2026, 10, 15, tzinfo=timezone.utc).timestamp()
+DAY = 86400
+
+
+def _hit(name, relevance, age_days=None):
+    metadata = {"name": name}
+    if age_days is not None:
+        metadata["published_ts"] = int(NOW - age_days * DAY)
+    return Document(page_content=name, metadata=metadata), relevance
+
+
+def test_rerank_prefers_fresh_chunks_at_equal_relevance():
+    hits = [_hit("stale", 0.80, age_days=200), _hit("fresh", 0.80, age_days=1), _hit("week", 0.80, age_days=7)]
+    ranked = rerank(hits, k=2, now=NOW, weight=0.3)
+    assert [d.metadata["name"] for d in ranked] == ["fresh", "week"]
+    assert ranked[0].metadata["relevance_score"] > ranked[1].metadata["relevance_score"]
+
+    # A much closer match still beats a fresher one
+    ranked = rerank([_hit("fresh", 0.40, age_days=0), _hit("close", 0.95, age_days=60)], k=1, now=NOW, weight=0.3)
+    assert ranked[0].metadata["name"] == "close"
+
+
+def test_weight_zero_keeps_similarity_order_and_unknown_dates_get_no_credit():
+    hits = [_hit("a", 0.9, age_days=300), _hit("b", 0.7, age_days=0), _hit("c", 0.8)]
+    assert [d.metadata["name"] for d in rerank(hits, k=3, now=NOW, weight=0.0)] == ["a", "c", "b"]
+    ranked = rerank([_hit("undated", 0.8), _hit("dated", 0.8, age_days=30)], k=2, now=NOW, weight=0.5)
+    assert [d.metadata["name"] for d in ranked] == ["dated", "undated"]
+    assert ranked[1].metadata["relevance_score"] == 0.4
+
+
+def test_record_grades_labels_by_age_and_ranking():
+    labels = [("relevant", "7d", "recency"), ("rejected", "unknown", "recency"), ("rejected", "7d", "recency")]
+    before = [RETRIEVAL_GRADES.value(label) for label in labels]
+    now = datetime.now(timezone.utc).timestamp()
+    documents = [Document(page_content="x", metadata={"published_ts": now - 3 * DAY}),
+                 Document(page_content="y", metadata={})]
+    record_grades(documents, [True, False])
+    assert [RETRIEVAL_GRADES.value(label) - b for label, b in zip(labels, before)] == [1, 1, 0]
+
+
+def test_article_published_parses_relative_times_from_the_scrape_time():
+    scraped = datetime(2026, 10, 15, 12, tzinfo=timezone.utc)
+    article = {"_id": ObjectId.from_datetime(scraped), "posted": "3 hours ago"}
+    assert article_published(article) == datetime(2026, 10, 15, 9, tzinfo=timezone.utc)
+    assert article_published({**article, "posted": "Yesterday"}).date() == datetime(2026, 10, 14).date()
+    assert article_published({**article, "posted": "2 days ago"}).day == 13
+    assert article_published({"pubDate": "2026-10-01T08:30:00Z"}) == datetime(2026, 10, 1, 8, 30,
+                                                                               tzinfo=timezone.utc)
@@ -0,0 +1,39 @@
+import pytest
+
+from rag_graphs.registry import GraphRegistry
+
+
+def test_graph_is_built_once_on_first_use():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return object()
+
+    registry = GraphRegistry({"demo": build})
+    assert calls == []
+
+    first = registry.get("demo")
+    assert registry.get("demo") is first
+    assert calls == [1]
+
+
+def test_register_replaces_compiled_graph():
+    registry = GraphRegistry({"demo": lambda: "old"})
+    assert registry.get("demo") == "old"
+    registry.register("demo", lambda: "new")
+    assert registry.get("demo") == "new"
+
+
+def test_unknown_graph_raises():
+    with pytest.raises(KeyError):
+        GraphRegistry({}).get("missing")
+
+
+def test_warm_up_logs_failures_instead_of_raising():
+    def broken():
+        raise RuntimeError("backend down")
+
+    registry = GraphRegistry({"ok": lambda: "graph", "broken": broken})
+    registry.warm_up()
+    assert registry.get("ok") == "graph"
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from rag_graphs.stock_data_rag_graph.result_summary import summarize_results
+from utils.tokenizer import get_tokenizer
+
+
+def _frame(days, tickers=("RELIANCE.NS",)):
+    dates = pd.date_range("2024-01-01", periods=days).date
+    rows = [(i, t, d, 100.0 + i, 102.0 + i, 99.0 + i, 101.0 + i, 1000 + i)
+            for t in tickers for i, d in enumerate(dates)]
+    return pd.DataFrame(rows, columns=["id", "ticker", "date", "open", "high", "low", "close", "volume"])
+
+
+def test_summary_has_aggregates_over_all_rows():
+    summary, stats = summarize_results(_frame(30, ("RELIANCE.NS", "TCS.NS")))
+
+    assert "Rows: 60" in summary
+    assert "Dates: 2024-01-01 to 2024-01-30" in summary
+    close = [line.split() for line in summary.splitlines() if line.startswith("TCS.NS") and " close " in line]
+    # first, last, min, max, mean, change, change%
+    assert close[0][2:9] == ["101.00", "130.00", "101.00", "130.00", "115.50", "29.00", "28.71"]
+    assert " id " not in summary
+    assert stats["rows"] == 60
+
+
+def test_summary_size_is_capped():
+    small, _ = summarize_results(_frame(10), token_budget=400)
+    large, stats = summarize_results(_frame(5000, ("A.NS", "B.NS", "C.NS")), token_budget=400)
+
+    assert get_tokenizer().count(large) <= 400
+    assert stats["rows_shown"] < stats["rows"]
+    assert "2024-01-01" in large and "Rows: 15000" in large
+    assert "Rows:\n" in small  # all rows fit
+
+
+def test_empty_and_scalar_results():
+    assert summarize_results(None)[0] == "The query returned no rows."
+    summary, _ = summarize_results(pd.DataFrame({"avg": [123.456]}))
+    assert "123.46" in summary
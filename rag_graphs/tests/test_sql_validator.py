@@ -0,0 +1,80 @@
+import pytest
+
+from rag_graphs.stock_data_rag_graph.graph.nodes.generate_sql import normalize_sql
+from rag_graphs.stock_data_rag_graph.sql_validator import SQLValidationError, get_validation_stats, validate_sql
+
+
+def test_valid_postgres_only_gets_a_limit():
+    sql, repairs = validate_sql(
+        "SELECT date, close FROM stock_data WHERE ticker = 'TCS.NS' "
+        "AND date >= CURRENT_DATE - INTERVAL '30 days' ORDER BY date"
+    )
+    assert sql.endswith("ORDER BY date LIMIT 5001")
+    assert repairs == ["limit 5001 added"]
+
+
+@pytest.mark.parametrize("generated, expected", [
+    ("SELECT `close` FROM stock_data WHERE ticker = 'TCS.NS'", 'SELECT "close" FROM stock_data'),
+    ("SELECT * FROM stock_data WHERE date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)", "CURRENT_DATE - INTERVAL '7 DAY'"),
+    ("SELECT TOP 5 close FROM stock_data", "LIMIT 5"),
+    ("SELECT closing_price FROM stocks_data", "SELECT close FROM stock_data"),
+    ('SELECT "Close" FROM stock_data', "SELECT close FROM stock_data"),
+])
+def test_foreign_dialects_and_misspellings_are_repaired(generated, expected):
+    before = get_validation_stats()["retries_avoided"]
+    sql, repairs = validate_sql(generated)
+    assert expected in sql
+    assert get_validation_stats()["retries_avoided"] == before + 1
+
+
+def test_sqlite_dates_are_repaired_with_the_regex_pass():
+    sql, _ = validate_sql(normalize_sql("SELECT close FROM stock_data WHERE date >= date('now','-7 days')"))
+    assert "CURRENT_DATE - INTERVAL '7 DAYS'" in sql
+
+
+@pytest.mark.parametrize("generated, expected", [
+    ("SELECT close FROM stock_data WHERE date >= date('now', '-7 days')", "date >= CURRENT_DATE - INTERVAL '7 DAYS'"),
+    ("SELECT close FROM stock_data WHERE date >= datetime('now', '-30 day')",
+     "date >= CURRENT_TIMESTAMP - INTERVAL '30 DAYS'"),
+    ("SELECT close FROM stock_data WHERE date >= date('now', 'start of month')",
+     "date >= DATE_TRUNC('MONTH', CURRENT_DATE)"),
+    ("SELECT close FROM stock_data WHERE date = date('now')", "date = CURRENT_DATE"),
+    ("SELECT strftime('%Y-%m', 'now', '-1 month')", "TO_CHAR(CURRENT_TIMESTAMP - INTERVAL '1 MONTHS', 'YYYY-MM')"),
+])
+def test_sqlite_dates_are_repaired_without_the_regex_pass(generated, expected):
+    sql, repairs = validate_sql(generated)
+    assert expected in sql
+    assert "'now'" not in sql
+
+
+def test_unsupported_sqlite_date_modifiers_are_rejected():
+    with pytest.raises(SQLValidationError):
+        validate_sql("SELECT close FROM stock_data WHERE date >= date('now', 'weekday 0')")
+
+
+def test_large_limits_are_capped():
+    sql, _ = validate_sql("SELECT close FROM stock_data LIMIT 1000000", row_limit=100)
+    assert sql.endswith("LIMIT 101")
+
+
+@pytest.mark.parametrize("generated", [
+    "DELETE FROM stock_data",
+    "SELECT 1; DROP TABLE stock_data",
+    "SELECT * INTO backup FROM stock_data",
+    "SELECT * FROM stock_data FOR UPDATE",
+    "SELECT pg_sleep(100)",
+    "SELECT * FROM users",
+    "SELECT dividend FROM stock_data",
+    "",
+])
+def test_unrepairable_queries_are_rejected(generated):
+    with pytest.raises(SQLValidationError):
+        validate_sql(generated)
+
+
+def test_aliases_and_ctes_are_not_schema_errors():
+    sql, _ = validate_sql(
+        "WITH recent AS (SELECT ticker, close AS last_close FROM stock_data) "
+        "SELECT ticker, AVG(last_close) AS avg_close FROM recent GROUP BY ticker ORDER BY avg_close"
+    )
+    assert "FROM recent" in sql
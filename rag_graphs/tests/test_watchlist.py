@@ -0,0 +1,88 @@
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from rag_graphs.news_rag_graph import watchlist
+
+
+class _Embeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def aembed_queries(self, texts):
+        self.calls.append(list(texts))
+        return [[float(i)] for i in range(len(texts))]
+
+
+class _Store:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.filters = []
+
+    def similarity_search_with_score_by_vector(self, vector, k=4, filter=None):
+        self.filters.append(filter)
+        allowed = filter["ticker"]["$in"] if filter else None
+        return [(c, 0.0) for c in self.chunks if allowed is None or c.metadata.get("ticker") in allowed][:k]
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+
+def _collect(tickers):
+    async def run():
+        return [item async for item in watchlist.watchlist_digest(tickers)]
+    return asyncio.run(run())
+
+
+def test_digest_batches_embeddings_and_grades_each_pair_once(monkeypatch):
+    embeddings = _Embeddings()
+    store = _Store([
+        Document(page_content="TCS wins a large deal", metadata={"ticker": "TCS.NS"}),
+        Document(page_content="Unrelated TCS chatter", metadata={"ticker": "TCS.NS"}),
+        Document(page_content="INFY guidance raised", metadata={"ticker": "INFY"}),
+    ])
+    graded = []
+
+    def grade(inputs):
+        graded.append(inputs["document"])
+        return "no" if "Unrelated" in inputs["document"] else "yes"
+
+    monkeypatch.setattr(watchlist, "get_query_embeddings", lambda: embeddings)
+    monkeypatch.setattr(watchlist, "get_news_vectorstore", lambda: store)
+    monkeypatch.setattr(watchlist, "_grader", lambda: RunnableLambda(grade))
+    monkeypatch.setattr(watchlist, "_generator",
+                        lambda: RunnableLambda(lambda inputs: f"summary of {inputs['question']}"))
+
+    results = {item["ticker"]: item for item in _collect(["TCS", "INFY.NS", "TCS"])}
+
+    assert embeddings.calls == [["News related to TCS", "News related to INFY.NS"]]
+    assert {"ticker": {"$in": ["TCS", "TCS.NS"]}} in store.filters
+    assert sorted(graded) == ["INFY guidance raised", "TCS wins a large deal", "Unrelated TCS chatter"]
+    assert results["TCS"]["documents"] == 1
+    assert results["TCS"]["result"] == "summary of News related to TCS"
+    assert results["INFY.NS"]["source"] == "digest"
+
+
+def test_ticker_without_relevant_news_falls_back_to_the_graph(monkeypatch):
+    class _Graph:
+        def invoke(self, state):
+            return {"generation": f"graph answer for {state['ticker']}"}
+
+    # News of other tickers only; none of it may end up in the WIPRO digest
+    store = _Store([Document(page_content="INFY guidance raised", metadata={"ticker": "INFY.NS"})])
+    monkeypatch.setattr(watchlist, "get_query_embeddings", _Embeddings)
+    monkeypatch.setattr(watchlist, "get_news_vectorstore", lambda: store)
+    monkeypatch.setattr("rag_graphs.registry.get_graph", lambda name: _Graph())
+
+    [result] = _collect(["WIPRO"])
+
+    assert None not in store.filters
+
+    assert result == {"ticker": "WIPRO", "topic": None, "result": "graph answer for WIPRO",
+                      "documents": 0, "source": "graph"}
+
+
+def test_ticker_variants():
+    assert watchlist.ticker_variants("tcs.ns") == ["TCS.NS", "TCS"]
+    assert watchlist.ticker_variants("M&M") == ["M&M", "M&M.NS"]
@@ -0,0 +1,151 @@
+"""
+PNG chart rendering off the request threads.
+
+Charts are drawn with matplotlib's object-oriented API on the Agg canvas (no
+pyplot global state) inside a small process pool. Worker processes are recycled
+after ``CHART_WORKER_MAX_TASKS`` renders to bound their RSS, and rendered images
+are kept in a byte-bounded LRU keyed on (ticker, price_type, duration, latest bar date).
+"""
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Hashable, Optional
+
+from utils.logger import logger
+
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+CHART_WORKER_MAX_TASKS = int(os.getenv("CHART_WORKER_MAX_TASKS", "200"))
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "30"))
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+
+def render_png(ticker: str, price_type: str, duration: str, dates, values) -> bytes:
+    """
+    Render a line chart as PNG bytes. Runs inside a worker process.
+    """
+    import matplotlib.dates as mdates
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.subplots()
+        ax.plot(dates, values, marker='o', linestyle='-', linewidth=2, markersize=4)
+
+        ax.set_title(f"{ticker} {price_type} ({duration}d)", fontsize=12)
+        ax.set_xlabel("Date", fontsize=10)
+        ax.set_ylabel(price_type, fontsize=10)
+
+        # Format x-axis dates
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        fig.autofmt_xdate(rotation=45, ha='right')
+
+        # Add grid
+        ax.grid(True, linestyle='--', alpha=0.7)
+
+        buf = io.BytesIO()
+        fig.tight_layout()
+        fig.savefig(buf, format='png', dpi=100)
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+class ChartRenderer:
+    """
+    Process-pool chart renderer with a byte-bounded LRU of rendered PNGs.
+    """
+    def __init__(self, workers: int = CHART_RENDER_WORKERS, max_cache_bytes: int = CHART_CACHE_MAX_BYTES,
+                 max_tasks_per_worker: int = CHART_WORKER_MAX_TASKS, timeout: float = CHART_RENDER_TIMEOUT):
+        self.workers = workers
+        self.max_cache_bytes = max_cache_bytes
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.timeout = timeout
+        self._executor = None
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # max_tasks_per_child is not available with the 'fork' start method
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_worker,
+                )
+            return self._executor
+
+    def cached(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached PNG for a key, marking it most recently used."""
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+            return png
+
+    def _store(self, key: Hashable, png: bytes):
+        if len(png) > self.max_cache_bytes:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_bytes -= len(previous)
+            self._cache[key] = png
+            self._cache_bytes += len(png)
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def render(self, key: Hashable, ticker: str, price_type: str, duration: str, dates, values) -> bytes:
+        """
+        Return the PNG for ``key``, rendering it in the pool on a cache miss.
+
+        Args:
+            key: Cache key, typically (ticker, price_type, duration, latest bar date).
+            dates, values: Series to plot.
+
+        Returns:
+            bytes: PNG image.
+        """
+        png = self.cached(key)
+        if png is not None:
+            return png
+        try:
+            future = self._pool().submit(render_png, ticker, price_type, duration, dates, values)
+            png = future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.warning("Chart render pool broke; it will be recreated on the next request.")
+            with self._lock:
+                self._executor = None
+            raise
+        self._store(key, png)
+        return png
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._cache), "bytes": self._cache_bytes}
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_renderer_instance = None
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """Get or create the process-wide chart renderer."""
+    global _renderer_instance
+    if _renderer_instance is None:
+        _renderer_instance = ChartRenderer()
+    return _renderer_instance
@@ -1,14 +1,20 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 from config.config_loader import ConfigLoader
-from rag_graphs.news_rag_graph.ingestion import DocumentSyncManager
-from rest_api.routes import stock_routes, news_routes
+from rag_graphs.registry import get_graph_registry
+from rest_api.routes import stock_routes, news_routes, scraper_routes, llm_routes, metrics_routes
+from rest_api.chart_renderer import get_chart_renderer
+from rest_api.request_log import REQUEST_LOG_ENABLED, get_request_recorder, route_template
+from scraper.scheduler import get_scrape_scheduler, SCRAPER_MODE
 from utils.logger import logger
-from scraper.scraper_factory import StockScraperFactory, NewsScraperFactory
-from datetime import datetime
+from utils.logger_config import set_request_id, reset_request_id
+from utils.metrics import start_request_timings, stop_request_timings
 
 import asyncio
 import os
+import time
+import uuid
 
 # Load .env
 load_dotenv()
@@ -17,64 +23,125 @@ enable_langsmith_tracing("StocksInsights")
 
 # Initialize FastAPI
 app = FastAPI()
+# Compress larger bodies (multi-year history/chart windows) for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-# Initialize ConfigLoader
-config_loader = ConfigLoader(config_file="config/config.json")
-
-# Load configurations
-SCRAPE_TICKERS = config_loader.get("SCRAPE_TICKERS") or ["AAPL"]
-SCRAPING_INTERVAL = config_loader.get("SCRAPING_INTERVAL", 3600)
-
-if not SCRAPE_TICKERS:
-    SCRAPE_TICKERS = ["AAPL"]
-
-async def run_scrapers_in_background():
+@app.middleware("http")
+async def request_id(request: Request, call_next):
     """
-    Run news_scraper and stock_scraper in parallel in the background.
+    Tag the request's log records with an id (the client's X-Request-ID or a new
+    one) and return it in the X-Request-ID response header.
     """
-    loop = asyncio.get_event_loop()
-
-    stock_factory = StockScraperFactory()
-    stock_scraper = stock_factory.create_scraper()
-
-    news_factory = NewsScraperFactory()
-    news_scraper = news_factory.create_scraper(collection_name=os.getenv("COLLECTION_NAME"),
-                                               scrape_num_articles=int(os.getenv("SCRAPE_NUM_ARTICLES", 1)))
-
-    # Run both scrapers concurrently
-    await asyncio.gather(
-        loop.run_in_executor(None, news_scraper.scrape_all_tickers, SCRAPE_TICKERS),
-        loop.run_in_executor(None, stock_scraper.scrape_all_tickers, SCRAPE_TICKERS)
-    )
-    # Sync scraped docs in Vector DB
-    DocumentSyncManager().sync_documents()
+    current = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+    token = set_request_id(current)
+    try:
+        response = await call_next(request)
+    finally:
+        reset_request_id(token)
+    response.headers["X-Request-ID"] = current
+    return response
+
+# Clients send this header to get a Server-Timing breakdown (per node, LLM, embedding, DB) back
+TIMING_REQUEST_HEADER = "x-timing-breakdown"
+
+@app.middleware("http")
+async def timing_breakdown(request: Request, call_next):
+    """
+    Collect a per-request timing breakdown and return it as a Server-Timing
+    header when the request carries ``X-Timing-Breakdown: 1``.
+    """
+    if request.headers.get(TIMING_REQUEST_HEADER, "").lower() not in ("1", "true"):
+        return await call_next(request)
+    timings, token = start_request_timings()
+    try:
+        response = await call_next(request)
+    finally:
+        stop_request_timings(token)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return response
+
+if REQUEST_LOG_ENABLED:
+    @app.middleware("http")
+    async def record_requests(request: Request, call_next):
+        """
+        Append every request to the request log (REQUEST_LOG_PATH) for load replay.
+        """
+        recorder = get_request_recorder()
+        if not recorder.should_record(request.url.path):
+            return await call_next(request)
+        started_at, started = time.time(), time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            path = request.url.path
+            recorder.record(request.method, path, request.query_params.multi_items(), started_at, status,
+                            (time.perf_counter() - started) * 1000, route_template(path, request.path_params))
+
+    @app.on_event("shutdown")
+    async def close_request_log():
+        """
+        Flush and close the request log.
+        """
+        get_request_recorder().close()
+
+# Compile the RAG graphs in the background at startup instead of on the first request
+WARM_UP_GRAPHS = os.getenv("WARM_UP_GRAPHS", "false").lower() == "true"
 
 @app.on_event("startup")
 async def start_scraping_task():
     """
-    Start the background task to scrape data at regular intervals when the server starts.
+    Start the scrape scheduler when the server starts (SCRAPER_MODE=embedded).
     """
-    asyncio.create_task(scrape_in_interval(SCRAPING_INTERVAL))
+    if SCRAPER_MODE == "embedded":
+        get_scrape_scheduler().start()
+    else:
+        logger.info("SCRAPER_MODE=external; scraping is left to the scheduler worker.")
 
-async def scrape_in_interval(interval: int):
+@app.on_event("shutdown")
+async def stop_scraping_task():
     """
-    Runs the scraping task at regular intervals.
+    Stop the embedded scrape scheduler.
     """
-    while True:
-        logger.info(f"Starting scraping at {datetime.now()}")
+    if SCRAPER_MODE == "embedded":
+        get_scrape_scheduler().stop()
 
-        # Run scrapers in parallel
-        await run_scrapers_in_background()
+@app.on_event("startup")
+async def warm_up_graphs():
+    """
+    Optionally compile all RAG graphs off the event loop (WARM_UP_GRAPHS=true).
+    """
+    if WARM_UP_GRAPHS:
+        asyncio.get_event_loop().run_in_executor(None, get_graph_registry().warm_up)
+
+@app.on_event("startup")
+async def warm_up_query_embeddings():
+    """
+    Optionally embed the news question of every configured ticker off the event
+    loop (QUERY_EMBEDDING_WARMUP=true), so first requests hit the query cache.
+    """
+    # Imported on first use: the query cache loads the Ollama embedding client
+    from config.embedding_cache import QUERY_EMBEDDING_WARMUP, warm_up_news_queries
 
-        hours   = interval / 3600  # Convert seconds to hours
-        logger.info(f"Scraping completed at {datetime.now()}. Next run in {hours:.2f} hours.")
-        # Wait for the specified interval
-        await asyncio.sleep(interval)
+    if QUERY_EMBEDDING_WARMUP:
+        tickers = ConfigLoader(config_file="config/config.json").get("SCRAPE_TICKERS") or []
+        asyncio.get_event_loop().run_in_executor(None, warm_up_news_queries, tickers)
 
+@app.on_event("shutdown")
+async def stop_chart_renderer():
+    """
+    Stop the chart rendering worker processes.
+    """
+    get_chart_renderer().shutdown()
 
 # Include routes
 app.include_router(stock_routes.router, prefix="/stock", tags=["Stock Data"])
 app.include_router(news_routes.router, prefix="/news", tags=["News Articles"])
+app.include_router(scraper_routes.router, prefix="/scraper", tags=["Scraper"])
+app.include_router(llm_routes.router, prefix="/llm", tags=["LLM"])
+app.include_router(metrics_routes.router, prefix="/metrics", tags=["Metrics"])
 
 @app.get("/")
 def root():
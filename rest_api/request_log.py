@@ -0,0 +1,112 @@
+"""
+Records API traffic as JSON lines for ``benchmarks/load_replay.py``.
+
+Each line holds the request timestamp, method, path, matched route template,
+query parameters, response status and latency. Recording is off unless
+``REQUEST_LOG_ENABLED=true``; the log goes to ``REQUEST_LOG_PATH``.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "false").lower() == "true"
+REQUEST_LOG_PATH = os.getenv("REQUEST_LOG_PATH", os.path.join("logs", "request_log.jsonl"))
+# Paths that are not application traffic
+REQUEST_LOG_EXCLUDE = tuple(
+    p for p in os.getenv("REQUEST_LOG_EXCLUDE", "/metrics,/docs,/openapi.json,/redoc").split(",") if p
+)
+
+
+def _query_params(items) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    for key, value in items:
+        if key in params:
+            existing = params[key]
+            params[key] = existing + [value] if isinstance(existing, list) else [existing, value]
+        else:
+            params[key] = value
+    return params
+
+
+def route_template(path: str, path_params: Optional[Dict[str, Any]]) -> str:
+    """
+    Rebuild the route template (``/news/{ticker}``) from the concrete path and the
+    matched path parameters, so replay results can be grouped per route.
+    """
+    if not path_params:
+        return path
+    by_value = {str(value): name for name, value in path_params.items()}
+    return "/".join(f"{{{by_value[segment]}}}" if segment in by_value else segment for segment in path.split("/"))
+
+
+class RequestRecorder:
+    """
+    Appends one JSON line per request to ``path``.
+
+    Args:
+        path (str): JSONL file to append to (parent directories are created).
+        exclude (tuple): Path prefixes that are not recorded.
+    """
+    def __init__(self, path: str = REQUEST_LOG_PATH, exclude=REQUEST_LOG_EXCLUDE):
+        self.path = path
+        self.exclude = tuple(exclude)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def should_record(self, path: str) -> bool:
+        return not path.startswith(self.exclude)
+
+    def record(self, method: str, path: str, query_items, started: float, status: int,
+               duration_ms: float, route: Optional[str] = None):
+        entry = {
+            "ts": round(started, 6),
+            "method": method,
+            "path": path,
+            "route": route or path,
+            "params": _query_params(query_items),
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_request_log(path: str) -> List[Dict[str, Any]]:
+    """Load recorded requests in timestamp order, skipping malformed lines."""
+    return sorted(iter_request_log(path), key=lambda entry: entry.get("ts", 0))
+
+
+def iter_request_log(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get("path"):
+                yield entry
+
+
+_recorder_instance = None
+
+
+def get_request_recorder() -> RequestRecorder:
+    """Get or create the process-wide request recorder."""
+    global _recorder_instance
+    if _recorder_instance is None:
+        _recorder_instance = RequestRecorder()
+    return _recorder_instance
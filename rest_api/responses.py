@@ -0,0 +1,109 @@
+"""
+Response helpers for the read-heavy stock endpoints.
+
+``FastJSONResponse`` renders with orjson when it is installed (falling back to the
+standard library) and is returned directly from routes, which skips FastAPI's
+recursive ``jsonable_encoder`` pass. The column helpers convert DataFrames and
+cache windows into JSON-ready columns with vectorized date formatting.
+"""
+import datetime
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+RESPONSE_SHAPES = ("records", "columnar")
+
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.date, datetime.datetime, pd.Timestamp)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_json(content: Any) -> bytes:
+    """Serialize with orjson when available (NumPy arrays natively), else the standard library."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, with NumPy arrays serialized natively.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def format_dates(values) -> np.ndarray:
+    """
+    Format a date-like column as 'YYYY-MM-DD' strings in one vectorized pass.
+    """
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        return np.datetime_as_string(values, unit="D")
+    return pd.to_datetime(pd.Series(values)).dt.strftime("%Y-%m-%d").to_numpy()
+
+
+def _is_date_column(series: pd.Series) -> bool:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    if series.dtype == object:
+        first = series.dropna().head(1)
+        return not first.empty and isinstance(first.iloc[0], datetime.date)
+    return False
+
+
+def frame_to_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Convert a DataFrame into a dict of column arrays, formatting date columns as strings.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if _is_date_column(series):
+            columns[str(name)] = format_dates(series)
+        else:
+            columns[str(name)] = series.to_numpy()
+    return columns
+
+
+def columns_to_payload(columns: Dict[str, np.ndarray], shape: str = "records"):
+    """
+    Shape column arrays for a response body.
+
+    Args:
+        columns (dict): Column name to array, all of equal length.
+        shape (str): 'records' for a list of row dicts, 'columnar' for a dict of lists.
+
+    Returns:
+        list | dict: JSON-ready payload.
+    """
+    lists = {name: np.asarray(values).tolist() for name, values in columns.items()}
+    if shape == "columnar":
+        return lists
+    names = list(lists)
+    return [dict(zip(names, row)) for row in zip(*lists.values())]
+
+
+def series_payload(dates, values, shape: str = "records"):
+    """
+    Build the chart ``series`` field, either as ``[{"date", "value"}]`` records
+    or as ``{"dates": [...], "values": [...]}``.
+    """
+    date_list: List[str] = format_dates(dates).tolist()
+    value_list: List[float] = np.asarray(values, dtype=np.float64).tolist()
+    if shape == "columnar":
+        return {"dates": date_list, "values": value_list}
+    return [{"date": d, "value": v} for d, v in zip(date_list, value_list)]
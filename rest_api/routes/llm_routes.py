@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+router = APIRouter()
+
+@router.get("/stats")
+def llm_stats():
+    """
+    Get the LLM gateway's queue state and per-role statistics.
+
+    Returns:
+        dict: In-flight limit, current in-flight and queued calls, and for every
+        role its call count, latency and queue-wait percentiles and tokens/sec,
+        plus the SQL generation retries avoided by local validation and the
+        query embedding cache's hit rate and size.
+    """
+    # Imported on first use: the gateway and the embeddings load the Ollama clients
+    from config.embedding_cache import get_query_embeddings
+    from config.llm_gateway import get_llm_gateway
+    from rag_graphs.stock_data_rag_graph.sql_validator import get_validation_stats
+
+    cache = get_query_embeddings().cache
+    return {
+        **get_llm_gateway().stats(),
+        "sql_validation": get_validation_stats(),
+        "query_embedding_cache": cache.stats() if cache is not None else None,
+    }
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from utils.metrics import get_metrics_registry
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _gateway_metrics():
+    """LLM gateway queue gauges and local SQL validation counters, read at scrape time."""
+    from config.llm_gateway import get_llm_gateway
+    from rag_graphs.stock_data_rag_graph.sql_validator import get_validation_stats
+
+    queue = get_llm_gateway().limiter.snapshot()
+    validation = get_validation_stats()
+    return [
+        ("llm_gateway_in_flight", "gauge", "LLM generations currently running.", [f"llm_gateway_in_flight {queue['in_flight']}"]),
+        ("llm_gateway_queued", "gauge", "LLM calls waiting for a slot.", [f"llm_gateway_queued {queue['queued']}"]),
+        ("sql_validation_total", "counter", "Generated SQL queries by local validation outcome.",
+         [f'sql_validation_total{{outcome="{outcome}"}} {validation[outcome]}'
+          for outcome in ("validated", "repaired", "rejected")]),
+    ]
+
+
+get_metrics_registry().register_collector(_gateway_metrics)
+
+
+@router.get("", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Returns:
+        str: Graph, node, LLM, embedding and database metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE)
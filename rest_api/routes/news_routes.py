@@ -1,7 +1,43 @@
+from typing import List
+
 from fastapi import APIRouter, HTTPException, Query
-from rag_graphs.news_rag_graph.graph.graph import app
+from fastapi.responses import StreamingResponse
+from rag_graphs.registry import get_graph, NEWS_GRAPH
+from rest_api.responses import dumps_json
 router = APIRouter()
 
+# Registered before /{ticker}, which would otherwise match it
+@router.get("/watchlist")
+async def watchlist_news(
+    tickers: List[str] = Query(..., description="Tickers, repeated or comma separated: 'TCS,INFY'"),
+    topic: str         = Query(None, description="Topic"),
+):
+    """
+    Get news summaries for a watchlist, streamed as NDJSON: one JSON object per
+    line and ticker, in the order the summaries complete.
+
+    Args:
+        tickers (list): Stock ticker symbols.
+        topic (str): Topic to fetch news for, applied to every ticker.
+
+    Returns:
+        StreamingResponse: Lines of {"ticker", "topic", "result" or "error", "documents", "source"}.
+    """
+    # Imported on first use: the digest pulls in the vector store and the embedding clients
+    from rag_graphs.news_rag_graph.watchlist import NEWS_WATCHLIST_MAX_TICKERS, watchlist_digest
+
+    tickers = list(dict.fromkeys(item.strip() for value in tickers for item in value.split(",") if item.strip()))
+    if not tickers:
+        raise HTTPException(status_code=422, detail="tickers must not be empty")
+    if len(tickers) > NEWS_WATCHLIST_MAX_TICKERS:
+        raise HTTPException(status_code=422, detail=f"at most {NEWS_WATCHLIST_MAX_TICKERS} tickers per request")
+
+    async def lines():
+        async for item in watchlist_digest(tickers, topic):
+            yield dumps_json(item) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @router.get("/{ticker}")
 def news_by_topic(
     ticker: str,
@@ -19,14 +55,13 @@ def news_by_topic(
         dict: Relevant news for a speicific ticker.
     """
 
+    from rag_graphs.news_rag_graph.watchlist import news_question
+
     try:
 
-        if topic:
-            human_query = f"News related to {topic} for {ticker}"
-        else:
-            human_query = f"News related to {ticker}"
+        human_query = news_question(ticker, topic)
 
-        res         = app.invoke({"question": human_query, "ticker": ticker})
+        res         = get_graph(NEWS_GRAPH).invoke({"question": human_query, "ticker": ticker})
         return {
             "ticker": ticker,
             "topic": topic,
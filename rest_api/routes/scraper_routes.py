@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+from scraper.scheduler import get_scrape_scheduler, read_status_file, SCRAPER_MODE
+router = APIRouter()
+
+@router.get("/status")
+def scrape_status():
+    """
+    Get the state of the scrape scheduler and of every per-ticker job.
+
+    Returns:
+        dict: Scheduler status, read from the embedded scheduler or, when
+        SCRAPER_MODE=external, from the status file written by the worker.
+    """
+    if SCRAPER_MODE == "embedded":
+        return get_scrape_scheduler().status()
+
+    status = read_status_file()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No status reported by the scraper worker yet.")
+    return status
@@ -1,12 +1,83 @@
 from fastapi import APIRouter, HTTPException, Query
-from rag_graphs.stock_data_rag_graph.graph.graph import app as stock_data_graph
-from rag_graphs.stock_charts_graph.graph.graph import app as stock_charts_graph
+from rag_graphs.registry import get_graph, STOCK_DATA_GRAPH, STOCK_CHARTS_GRAPH
+from db.ohlcv_cache import get_ohlcv_cache, COLUMNS
+from db.stock_stats import fetch_price_stats
+from db.intraday import INTRADAY_BUCKET_ORIGIN, IntradayStore, parse_granularity, summarize_bars
+from rest_api.chart_renderer import get_chart_renderer
+from rest_api.responses import FastJSONResponse, RESPONSE_SHAPES, frame_to_columns, columns_to_payload, series_payload
+from utils.logger import logger
 router = APIRouter()
 #
-import io
 import base64
+from datetime import datetime
+from typing import List
+import numpy as np
 import pandas as pd
 
+
+def _cached_columns(ticker: str, duration: str, columns):
+    """
+    Serve a date window from the memory-mapped OHLCV cache.
+
+    Returns:
+        dict: Date-sorted column views for the window, or None when the request
+        cannot be answered from the cache and must go through PostgreSQL.
+    """
+    if not duration.strip().isdigit() or any(c not in COLUMNS for c in columns):
+        return None
+    try:
+        window = get_ohlcv_cache().window(ticker, int(duration))
+    except Exception as e:
+        logger.warning(f"OHLCV cache lookup failed for {ticker}: {e}")
+        return None
+    if window is None or len(window["date"]) == 0:
+        return None
+    return {c: window[c] for c in columns}
+
+
+def _check_shape(shape: str) -> str:
+    shape = shape.lower()
+    if shape not in RESPONSE_SHAPES:
+        raise HTTPException(status_code=422, detail=f"shape must be one of {RESPONSE_SHAPES}")
+    return shape
+
+def _split_values(values: List[str]) -> List[str]:
+    """Accept both repeated query parameters and comma separated values."""
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
+
+
+def _stats_db_client():
+    # The same client the stock data graph queries through
+    from rag_graphs.stock_data_rag_graph.graph.nodes import sql_search
+    return sql_search.initialize_db_client()
+
+
+@router.get("/price-stats")
+def batch_price_stats(
+    tickers: List[str]     = Query(..., description="Tickers, repeated or comma separated: 'TCS,INFY'"),
+    operations: List[str]  = Query(..., description="Operations: 'highest', 'lowest', 'average'"),
+    price_types: List[str] = Query(..., description="Price types: 'open', 'close', 'low', 'high'"),
+    windows: List[str]     = Query(..., description="Windows (days): '7,30,90'"),
+):
+    """
+    Get price statistics for many tickers at once with a single grouped SQL query
+    (no LLM involved).
+
+    Returns:
+        dict: ``tickers`` (rows), ``columns`` (operation, price_type and window of
+        each column) and ``values``, one row per ticker; null where a ticker has no
+        data in a window.
+    """
+    try:
+        payload = fetch_price_stats(_stats_db_client(), _split_values(tickers), _split_values(operations),
+                                    _split_values(price_types), _split_values(windows))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch price stats failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse(payload)
+
 @router.get("/{ticker}/price-stats")
 def price_stats(
     ticker: str,
@@ -30,7 +101,7 @@ def price_stats(
     try:
         human_query = f"What is the {operation} value of {price_type} for '{ticker}' over last {duration} day(s) ?"
 
-        res         = stock_data_graph.invoke({"question": human_query})
+        res         = get_graph(STOCK_DATA_GRAPH).invoke({"question": human_query})
         return {
             "ticker": ticker,
             "operation": operation,
@@ -41,25 +112,80 @@ def price_stats(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _parse_time(value: str, name: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be an ISO date or datetime")
+    # Naive times are exchange times
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=INTRADAY_BUCKET_ORIGIN.tzinfo)
+
+
+@router.get("/{ticker}/intraday")
+def intraday(
+    ticker: str,
+    start: str    = Query(..., description="Start (ISO datetime, exchange time if no offset): '2024-03-05T09:15'"),
+    end: str      = Query(..., description="End, exclusive: '2024-03-05T15:30'"),
+    interval: str = Query(None, description="Longest bar accepted: '1m', '5m', '15m', '1h', '1d'"),
+    shape: str    = Query("records", description="Response shape: 'records' or 'columnar'"),
+):
+    """
+    Get intraday bars and the range's open/high/low/close/volume for a ticker.
+
+    The bars come from the coarsest stored granularity that lines up with the range
+    and is no longer than ``interval``; the response names it as ``granularity``.
+    """
+    shape = _check_shape(shape)
+    start_ts, end_ts = _parse_time(start, "start"), _parse_time(end, "end")
+    if end_ts <= start_ts:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    try:
+        resolution = parse_granularity(interval) if interval else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        granularity, columns = IntradayStore(_stats_db_client()).read_bars(
+            get_ohlcv_cache().resolve_ticker(ticker), start_ts, end_ts, resolution)
+    except Exception as e:
+        logger.error(f"Intraday bars for {ticker} failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    summary = summarize_bars(columns)
+    columns["ts"] = np.array([ts.isoformat() for ts in columns["ts"]], dtype=object)
+    return FastJSONResponse({
+        "ticker": ticker,
+        "granularity": granularity,
+        "summary": summary,
+        "bars": columns_to_payload(columns, shape),
+    })
+
 @router.get("/{ticker}/history")
 def stock_history(
     ticker: str,
     duration: str = Query(..., description="Duration (days): '7', '14', '30', '90'"),
+    shape: str    = Query("records", description="Response shape: 'records' or 'columnar'"),
 ):
     """
-    Get raw historical stock data.
+    Get raw historical stock data, newest first.
+
+    The 'columnar' shape returns one list per column instead of one object per row.
     """
+    shape = _check_shape(shape)
     try:
-        human_query = f"Select date, open, high, low, close, volume for '{ticker}' for the last {duration} days order by date desc"
-        
-        # Use stock_charts_graph as it returns raw SQL results without LLM summarization
-        res = stock_charts_graph.invoke({"question": human_query})
-        df = res.get('sql_results')
-        
-        if hasattr(df, 'to_dict'):
-            return df.to_dict(orient='records')
-        return df
-        
+        columns = _cached_columns(ticker, duration, COLUMNS)
+        if columns is not None:
+            columns = {name: values[::-1] for name, values in columns.items()}
+        else:
+            human_query = f"Select date, open, high, low, close, volume for '{ticker}' for the last {duration} days order by date desc"
+
+            # Use stock_charts_graph as it returns raw SQL results without LLM summarization
+            res = get_graph(STOCK_CHARTS_GRAPH).invoke({"question": human_query})
+            df = res.get('sql_results')
+            if not hasattr(df, 'to_dict'):
+                return df
+            columns = frame_to_columns(df)
+
+        return FastJSONResponse(columns_to_payload(columns, shape))
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -69,6 +195,7 @@ def chart(
     price_type: str = Query(..., description="Price type: 'open', 'close', 'low', 'high'"),
     duration :str   = Query(..., description="Duration (days): '1', '7', '14', '30'"),
     format: str     = Query("json", description="Format: 'json' or 'png'"),
+    shape: str      = Query("records", description="Series shape: 'records' or 'columnar'"),
 
 ):
     """
@@ -78,80 +205,30 @@ def chart(
         ticker (str): Stock ticker symbol.
         price_type (str): Type of price (e.g., 'open', 'close', 'low', 'high').
         duration (int): Number of days
+        shape (str): 'records' for [{"date", "value"}], 'columnar' for {"dates": [...], "values": [...]}
 
     Returns:
         dict: Stock data with the requested statistics.
     """
-
+    shape = _check_shape(shape)
     try:
-        human_query = f"All unique values of 'date' and {price_type} for '{ticker}' for last {duration} day(s)"
+        df = None
+        window = _cached_columns(ticker, duration, ("date", price_type))
+        if window is None:
+            human_query = f"All unique values of 'date' and {price_type} for '{ticker}' for last {duration} day(s)"
 
-        res = stock_charts_graph.invoke({"question": human_query})
-        df = res.get('sql_results')
+            res = get_graph(STOCK_CHARTS_GRAPH).invoke({"question": human_query})
+            df = res.get('sql_results')
         try:
-            import pandas as pd
-            if isinstance(df, pd.DataFrame) and not df.empty:
+            if window is not None:
+                dates, values = window["date"], window[price_type]
+            elif isinstance(df, pd.DataFrame) and not df.empty:
                 date_col = next((c for c in df.columns if c.lower() == 'date'), df.columns[0])
                 value_col = price_type if price_type in df.columns else df.columns[-1]
                 # Ensure dates are datetime objects and sorted
-                df[date_col] = pd.to_datetime(df[date_col])
-                df = df.sort_values(by=date_col)
-
-                series = [
-                    {"date": row[date_col].strftime('%Y-%m-%d'), "value": float(row[value_col])}
-                    for _, row in df.iterrows()
-                ]
-                if format.lower() == "png":
-                    try:
-                        import matplotlib.pyplot as plt
-                        import matplotlib.dates as mdates
-                        import io, base64
-                        
-                        fig, ax = plt.subplots(figsize=(10, 5))
-                        
-                        dates = df[date_col].tolist()
-                        values = df[value_col].tolist()
-                        
-                        ax.plot(dates, values, marker='o', linestyle='-', linewidth=2, markersize=4)
-                        
-                        ax.set_title(f"{ticker} {price_type} ({duration}d)", fontsize=12)
-                        ax.set_xlabel("Date", fontsize=10)
-                        ax.set_ylabel(price_type, fontsize=10)
-                        
-                        # Format x-axis dates
-                        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-                        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-                        plt.xticks(rotation=45, ha='right')
-                        
-                        # Add grid
-                        ax.grid(True, linestyle='--', alpha=0.7)
-                        
-                        buf = io.BytesIO()
-                        plt.tight_layout()
-                        fig.savefig(buf, format='png', dpi=100)
-                        buf.seek(0)
-                        img_b64 = base64.b64encode(buf.read()).decode('utf-8')
-                        return {
-                            "ticker": ticker,
-                            "price_type": price_type,
-                            "duration": duration,
-                            "image_base64": img_b64
-                        }
-                    except Exception:
-                        # Fallback to JSON if plotting fails
-                        return {
-                            "ticker": ticker,
-                            "price_type": price_type,
-                            "duration": duration,
-                            "series": series
-                        }
-                else:
-                    return {
-                        "ticker": ticker,
-                        "price_type": price_type,
-                        "duration": duration,
-                        "series": series
-                    }
+                ordered = df.assign(**{date_col: pd.to_datetime(df[date_col])}).sort_values(by=date_col)
+                dates = ordered[date_col].to_numpy().astype("datetime64[D]")
+                values = ordered[value_col].to_numpy(dtype=float)
             else:
                 return {
                     "ticker": ticker,
@@ -159,6 +236,27 @@ def chart(
                     "duration": duration,
                     "result": df
                 }
+
+            if format.lower() == "png" and len(dates):
+                try:
+                    cache_key = (get_ohlcv_cache().resolve_ticker(ticker), price_type, duration, str(dates[-1]))
+                    png = get_chart_renderer().render(cache_key, ticker, price_type, duration,
+                                                      np.asarray(dates), np.asarray(values))
+                    return {
+                        "ticker": ticker,
+                        "price_type": price_type,
+                        "duration": duration,
+                        "image_base64": base64.b64encode(png).decode('utf-8')
+                    }
+                except Exception as e:
+                    # Fallback to JSON if plotting fails
+                    logger.warning(f"Chart rendering failed for {ticker}: {e}")
+            return FastJSONResponse({
+                "ticker": ticker,
+                "price_type": price_type,
+                "duration": duration,
+                "series": series_payload(dates, values, shape)
+            })
         except Exception:
             return {
                 "ticker": ticker,
@@ -0,0 +1,28 @@
+import numpy as np
+
+from rest_api.chart_renderer import ChartRenderer, render_png
+
+
+def test_render_png_produces_image():
+    dates = np.array(["2024-01-01", "2024-01-02", "2024-01-03"], dtype="datetime64[D]")
+    png = render_png("TCS.NS", "close", "3", dates, np.array([1.0, 2.0, 1.5]))
+    assert png.startswith(b"\x89PNG")
+
+
+def test_renderer_caches_and_evicts_by_bytes():
+    renderer = ChartRenderer(max_cache_bytes=10)
+    renderer._store("a", b"12345")
+    renderer._store("b", b"67890")
+    assert renderer.cached("a") == b"12345"
+
+    # "b" is now least recently used and is evicted to fit "c"
+    renderer._store("c", b"abcde")
+    assert renderer.cached("b") is None
+    assert renderer.stats() == {"entries": 2, "bytes": 10}
+
+
+def test_renderer_serves_cached_png_without_pool():
+    renderer = ChartRenderer()
+    renderer._store(("TCS.NS", "close", "7", "2024-01-03"), b"png")
+    assert renderer.render(("TCS.NS", "close", "7", "2024-01-03"), "TCS", "close", "7", [], []) == b"png"
+    assert renderer._executor is None
@@ -0,0 +1,22 @@
+from rest_api.request_log import RequestRecorder, read_request_log, route_template
+
+
+def test_route_template_restores_path_parameters():
+    assert route_template("/stock/TCS.NS/chart", {"ticker": "TCS.NS"}) == "/stock/{ticker}/chart"
+    assert route_template("/llm/stats", {}) == "/llm/stats"
+
+
+def test_recorded_requests_read_back_in_order(tmp_path):
+    path = str(tmp_path / "logs" / "request_log.jsonl")
+    recorder = RequestRecorder(path, exclude=("/metrics",))
+    recorder.record("GET", "/news/INFY", [("topic", "results")], 20.0, 200, 12.5, "/news/{ticker}")
+    recorder.record("GET", "/news/TCS", [("tag", "a"), ("tag", "b")], 10.0, 500, 3.0, "/news/{ticker}")
+    recorder.close()
+    with open(path, "a") as file:
+        file.write("not json\n")
+
+    entries = read_request_log(path)
+    assert [e["path"] for e in entries] == ["/news/TCS", "/news/INFY"]
+    assert entries[0]["params"] == {"tag": ["a", "b"]}
+    assert entries[1]["route"] == "/news/{ticker}" and entries[1]["status"] == 200
+    assert not recorder.should_record("/metrics")
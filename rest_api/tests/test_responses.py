@@ -0,0 +1,42 @@
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+
+from rest_api.responses import FastJSONResponse, frame_to_columns, columns_to_payload, series_payload
+
+
+def test_series_payload_shapes():
+    dates = np.array(["2024-01-02", "2024-01-03"], dtype="datetime64[D]")
+    values = np.array([10, 11.5])
+
+    assert series_payload(dates, values, "records") == [
+        {"date": "2024-01-02", "value": 10.0},
+        {"date": "2024-01-03", "value": 11.5},
+    ]
+    assert series_payload(dates, values, "columnar") == {
+        "dates": ["2024-01-02", "2024-01-03"],
+        "values": [10.0, 11.5],
+    }
+
+
+def test_frame_to_columns_formats_date_objects():
+    df = pd.DataFrame({
+        "date": [datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)],
+        "close": [1.5, 2.5],
+        "volume": np.array([100, 200], dtype=np.int64),
+    })
+    columns = frame_to_columns(df)
+
+    assert columns_to_payload(columns, "columnar") == {
+        "date": ["2024-01-02", "2024-01-03"],
+        "close": [1.5, 2.5],
+        "volume": [100, 200],
+    }
+    assert columns_to_payload(columns, "records")[0] == {"date": "2024-01-02", "close": 1.5, "volume": 100}
+
+
+def test_fast_json_response_encodes_numpy():
+    response = FastJSONResponse({"values": np.array([1.0, 2.0]), "n": np.int64(2)})
+    assert json.loads(response.body) == {"values": [1.0, 2.0], "n": 2}
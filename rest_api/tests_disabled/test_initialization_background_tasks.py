@@ -1,25 +1,20 @@
-import asyncio
 from unittest.mock import patch
-from rest_api.main import run_scrapers_in_background, scrape_in_interval
+from rest_api.main import start_scraping_task, stop_scraping_task
 import pytest
 
-@patch("scraper.scraper_factory.StockScraperFactory.create_scraper")
-@patch("scraper.scraper_factory.NewsScraperFactory.create_scraper")
-@patch("rag_graphs.news_rag_graph.ingestion.DocumentSyncManager.sync_documents")
+@patch("rest_api.main.SCRAPER_MODE", "embedded")
+@patch("rest_api.main.get_scrape_scheduler")
 @pytest.mark.asyncio
-async def test_run_scrapers_in_background(mock_sync, mock_news_scraper, mock_stock_scraper):
-    mock_news_scraper().scrape_all_tickers = lambda x: None
-    mock_stock_scraper().scrape_all_tickers = lambda x: None
+async def test_start_scraping_task_starts_scheduler(mock_get_scheduler):
+    await start_scraping_task()
+    mock_get_scheduler().start.assert_called_once()
 
-    await run_scrapers_in_background()
-    mock_sync.assert_called_once()
+    await stop_scraping_task()
+    mock_get_scheduler().stop.assert_called_once()
 
-@patch("main.run_scrapers_in_background")
+@patch("rest_api.main.SCRAPER_MODE", "external")
+@patch("rest_api.main.get_scrape_scheduler")
 @pytest.mark.asyncio
-async def test_scrape_in_interval(mock_run_scrapers):
-    mock_run_scrapers.return_value = None
-    interval = 2
-    task = asyncio.create_task(scrape_in_interval(interval))
-    await asyncio.sleep(3)  # Allow the interval to trigger
-    task.cancel()
-    mock_run_scrapers.assert_called()
+async def test_external_mode_does_not_start_scheduler(mock_get_scheduler):
+    await start_scraping_task()
+    mock_get_scheduler().start.assert_not_called()
@@ -0,0 +1,253 @@
+"""
+Lease-based coordination of scrape work across API replicas.
+
+Every ticker is a row in a lease table. A replica claims the stalest task that
+is due and not currently leased, runs it, and records completion. Leases expire,
+so work held by a dead replica is taken over once its lease runs out. Because
+a task is only due again ``min_interval`` seconds after its last completion,
+the total scrape work stays constant no matter how many replicas run.
+
+Backends:
+    PostgresLeaseStore  - shared table in the stock database (FOR UPDATE SKIP LOCKED)
+    SQLiteLeaseStore    - single file, for one host or for local multi-process testing
+"""
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from utils.logger import logger
+
+load_dotenv()
+
+# "postgres" (default), "sqlite" or "none" to disable coordination
+SCRAPE_LEASE_BACKEND = os.getenv("SCRAPE_LEASE_BACKEND", "postgres").lower()
+SCRAPE_LEASE_SQLITE_PATH = os.getenv("SCRAPE_LEASE_SQLITE_PATH", "scrape_leases.db")
+
+
+def default_owner_id() -> str:
+    """Identify this replica: host, process and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseStore(ABC):
+    """
+    Abstract lease store interface shared by the scheduler's coordination backends.
+    """
+    @abstractmethod
+    def ensure_tasks(self, task_keys: List[str]):
+        """Create rows for tasks that do not exist yet."""
+
+    @abstractmethod
+    def claim(self, owner: str, task_keys: List[str], lease_seconds: float, min_interval: float) -> Optional[str]:
+        """
+        Atomically lease the stalest due task among ``task_keys``.
+
+        A task is due when it is not leased (or its lease expired) and it has not
+        completed within the last ``min_interval`` seconds.
+
+        Returns:
+            str: The claimed task key, or None if nothing is due.
+        """
+
+    @abstractmethod
+    def complete(self, task_key: str, owner: str) -> bool:
+        """Record a successful run and release the lease. False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, task_key: str, owner: str, error: str, retry_after: float) -> bool:
+        """Release the lease after a failed run; the task becomes claimable after ``retry_after`` seconds."""
+
+    @abstractmethod
+    def snapshot(self) -> List[Dict[str, object]]:
+        """Current state of all leases."""
+
+
+class PostgresLeaseStore(LeaseStore):
+    """
+    Lease table in PostgreSQL. Claims use FOR UPDATE SKIP LOCKED so concurrent
+    replicas never block on, or receive, the same task.
+    """
+    DDL = """
+        CREATE TABLE IF NOT EXISTS scrape_leases (
+            task_key VARCHAR(64) PRIMARY KEY,
+            owner VARCHAR(128),
+            lease_expires_at TIMESTAMPTZ,
+            last_completed_at TIMESTAMPTZ,
+            last_error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        );
+    """
+
+    def __init__(self, db_client):
+        self.db_client = db_client
+        self.db_client.execute_query(self.DDL)
+
+    def ensure_tasks(self, task_keys: List[str]):
+        self.db_client.execute_query(
+            "INSERT INTO scrape_leases (task_key) SELECT unnest(%s::text[]) ON CONFLICT (task_key) DO NOTHING",
+            (list(task_keys),),
+        )
+
+    def claim(self, owner: str, task_keys: List[str], lease_seconds: float, min_interval: float) -> Optional[str]:
+        rows, _ = self.db_client.fetch_query(
+            """
+            UPDATE scrape_leases
+               SET owner = %s,
+                   lease_expires_at = now() + %s * INTERVAL '1 second',
+                   attempts = attempts + 1
+             WHERE task_key = (
+                   SELECT task_key FROM scrape_leases
+                    WHERE task_key = ANY(%s)
+                      AND (lease_expires_at IS NULL OR lease_expires_at < now())
+                      AND (last_completed_at IS NULL OR last_completed_at < now() - %s * INTERVAL '1 second')
+                    ORDER BY last_completed_at NULLS FIRST, task_key
+                    LIMIT 1
+                      FOR UPDATE SKIP LOCKED)
+            RETURNING task_key
+            """,
+            (owner, lease_seconds, list(task_keys), min_interval),
+        )
+        return rows[0][0] if rows else None
+
+    def complete(self, task_key: str, owner: str) -> bool:
+        rows, _ = self.db_client.fetch_query(
+            """
+            UPDATE scrape_leases
+               SET owner = NULL, lease_expires_at = NULL, last_completed_at = now(), last_error = NULL
+             WHERE task_key = %s AND owner = %s
+            RETURNING task_key
+            """,
+            (task_key, owner),
+        )
+        return bool(rows)
+
+    def fail(self, task_key: str, owner: str, error: str, retry_after: float) -> bool:
+        rows, _ = self.db_client.fetch_query(
+            """
+            UPDATE scrape_leases
+               SET owner = NULL, lease_expires_at = now() + %s * INTERVAL '1 second', last_error = %s
+             WHERE task_key = %s AND owner = %s
+            RETURNING task_key
+            """,
+            (retry_after, error, task_key, owner),
+        )
+        return bool(rows)
+
+    def snapshot(self) -> List[Dict[str, object]]:
+        rows, columns = self.db_client.fetch_query("SELECT * FROM scrape_leases ORDER BY task_key")
+        return [dict(zip(columns, row)) for row in rows]
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """
+    Lease table in a local SQLite file. ``BEGIN IMMEDIATE`` serializes claims
+    across processes on the same host.
+    """
+    DDL = """
+        CREATE TABLE IF NOT EXISTS scrape_leases (
+            task_key TEXT PRIMARY KEY,
+            owner TEXT,
+            lease_expires_at REAL,
+            last_completed_at REAL,
+            last_error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """
+
+    def __init__(self, path: str = SCRAPE_LEASE_SQLITE_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(self.DDL)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def ensure_tasks(self, task_keys: List[str]):
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO scrape_leases (task_key) VALUES (?)",
+                             [(key,) for key in task_keys])
+
+    def claim(self, owner: str, task_keys: List[str], lease_seconds: float, min_interval: float) -> Optional[str]:
+        now = time.time()
+        placeholders = ",".join("?" * len(task_keys))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"""
+                SELECT task_key FROM scrape_leases
+                 WHERE task_key IN ({placeholders})
+                   AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+                   AND (last_completed_at IS NULL OR last_completed_at < ?)
+                 ORDER BY last_completed_at IS NOT NULL, last_completed_at, task_key
+                 LIMIT 1
+                """,
+                (*task_keys, now, now - min_interval),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE scrape_leases SET owner = ?, lease_expires_at = ?, attempts = attempts + 1 WHERE task_key = ?",
+                    (owner, now + lease_seconds, row[0]),
+                )
+            conn.execute("COMMIT")
+            return row[0] if row else None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, task_key: str, owner: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE scrape_leases
+                   SET owner = NULL, lease_expires_at = NULL, last_completed_at = ?, last_error = NULL
+                 WHERE task_key = ? AND owner = ?
+                """,
+                (time.time(), task_key, owner),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_key: str, owner: str, error: str, retry_after: float) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE scrape_leases
+                   SET owner = NULL, lease_expires_at = ?, last_error = ?
+                 WHERE task_key = ? AND owner = ?
+                """,
+                (time.time() + retry_after, error, task_key, owner),
+            )
+            return cursor.rowcount == 1
+
+    def snapshot(self) -> List[Dict[str, object]]:
+        with self._connect() as conn:
+            cursor = conn.execute("SELECT * FROM scrape_leases ORDER BY task_key")
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def build_lease_store(backend: str = SCRAPE_LEASE_BACKEND) -> Optional[LeaseStore]:
+    """
+    Build the configured lease store. Returns None (uncoordinated scraping) when
+    coordination is disabled or the backend is unavailable.
+    """
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteLeaseStore(SCRAPE_LEASE_SQLITE_PATH)
+    try:
+        from scraper.stock_data_scraper import StockDataScraper
+
+        return PostgresLeaseStore(StockDataScraper.initialize_db_client())
+    except Exception as e:
+        logger.warning(f"Scrape lease table unavailable ({e}); replicas will not coordinate scraping.")
+        return None
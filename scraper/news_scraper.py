@@ -88,6 +88,7 @@ class NewsScraper(GenericScraper):
                     'posted': item.pubDate.text if item.pubDate else "Unknown",
                     'description': item.description.text if item.description else item.title.text,
                     'link': item.link.text,
+                    'ticker': search_query,
                     'synced': False
                 }
                 articles.append(article)
@@ -0,0 +1,482 @@
+"""
+Per-ticker scrape scheduler.
+
+Instead of scraping every ticker back-to-back on the API's default executor,
+the scheduler spreads one job per ticker over the scraping interval (stalest
+tickers first, with jitter), runs jobs on its own small thread pool with a
+per-job timeout, optionally restricts work to NSE market hours, and runs the
+vector sync (with the daily news retention job) once per cycle. It can run inside the API process (on its own
+thread) or as a separate worker:
+
+    python -m scraper.scheduler
+
+Job status is kept in memory and mirrored to SCRAPE_STATUS_FILE so that the
+API can report it even when the scheduler runs in another process.
+
+When several API replicas run a scheduler, a lease store (see scraper.leases)
+decides which replica scrapes which ticker: at each slot a replica claims the
+stalest due ticker instead of running its own plan, so every ticker (and the
+vector sync) is scraped once per interval regardless of the replica count.
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, time as dtime
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+from config.config_loader import ConfigLoader
+from scraper.leases import LeaseStore, build_lease_store, default_owner_id
+from utils.logger import logger
+
+load_dotenv()
+
+# "embedded": the API runs the scheduler on its own thread; "external": a separate worker does
+SCRAPER_MODE = os.getenv("SCRAPER_MODE", "embedded").lower()
+SCRAPE_STATUS_FILE = os.getenv("SCRAPE_STATUS_FILE", os.path.join("logs", "scrape_status.json"))
+# Also store one-minute bars (with their rollups) on every ticker scrape
+SCRAPE_INTRADAY = os.getenv("SCRAPE_INTRADAY", "false").lower() == "true"
+
+# Regular NSE equity session. Exchange holidays are not modelled.
+NSE_TIMEZONE = ZoneInfo("Asia/Kolkata")
+NSE_OPEN = dtime(9, 15)
+NSE_CLOSE = dtime(15, 30)
+
+# Lease key of the per-cycle vector sync, next to the ticker keys
+VECTOR_SYNC_TASK = "__vector_sync__"
+
+
+def is_nse_market_open(timestamp: float) -> bool:
+    """Return True if the epoch timestamp falls inside a regular NSE session."""
+    now = datetime.fromtimestamp(timestamp, NSE_TIMEZONE)
+    return now.weekday() < 5 and NSE_OPEN <= now.time() < NSE_CLOSE
+
+
+def nse_open_windows(start: float, end: float) -> List[Tuple[float, float]]:
+    """
+    Return the (start, end) epoch ranges between ``start`` and ``end`` during which NSE is open.
+    """
+    windows = []
+    day = datetime.fromtimestamp(start, NSE_TIMEZONE).date()
+    last_day = datetime.fromtimestamp(end, NSE_TIMEZONE).date()
+    while day <= last_day:
+        if day.weekday() < 5:
+            session_open = datetime.combine(day, NSE_OPEN, NSE_TIMEZONE).timestamp()
+            session_close = datetime.combine(day, NSE_CLOSE, NSE_TIMEZONE).timestamp()
+            lo, hi = max(session_open, start), min(session_close, end)
+            if lo < hi:
+                windows.append((lo, hi))
+        day += timedelta(days=1)
+    return windows
+
+
+def _new_status(ticker: str) -> Dict[str, object]:
+    return {
+        "ticker": ticker,
+        "state": "idle",
+        "next_run": None,
+        "last_started": None,
+        "last_finished": None,
+        "last_success": None,
+        "last_error": None,
+        "duration_s": None,
+    }
+
+
+class ScrapeScheduler:
+    """
+    Spreads per-ticker scrape jobs over the interval on a dedicated executor.
+
+    Args:
+        tickers (list): Tickers to scrape.
+        interval (int): Length of one scheduling cycle in seconds.
+        job (callable): Function scraping a single ticker; defaults to stock + news scraping.
+        sync_documents (callable): Run once per cycle after the ticker jobs; defaults to the vector sync.
+        job_timeout (float): Seconds to wait for a job before marking it timed out.
+        max_workers (int): Size of the scheduler's own thread pool.
+        market_hours_only (bool): Only run jobs while NSE is open.
+        jitter (float): Fraction of a job slot used as random start offset.
+        lease_store (LeaseStore): Coordinates work between replicas; None scrapes every ticker locally.
+        owner (str): Lease owner id of this replica.
+        min_interval (float): Seconds after a completed run before a ticker is due again
+            (defaults to 90% of the interval, leaving room for slot jitter).
+    """
+    def __init__(self, tickers: List[str], interval: int, job: Optional[Callable[[str], None]] = None,
+                 sync_documents: Optional[Callable[[], None]] = None, job_timeout: float = 600,
+                 max_workers: int = 2, market_hours_only: bool = True, jitter: float = 0.5,
+                 status_file: Optional[str] = SCRAPE_STATUS_FILE, clock: Callable[[], float] = time.time,
+                 seed: Optional[int] = None, lease_store: Optional[LeaseStore] = None,
+                 owner: Optional[str] = None, min_interval: Optional[float] = None):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.interval = interval
+        self.job = job or self.scrape_ticker
+        self.sync_documents = sync_documents or self._sync_vector_store
+        self.job_timeout = job_timeout
+        self.market_hours_only = market_hours_only
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.status_file = status_file
+        self.clock = clock
+        self.lease_store = lease_store
+        self.owner = owner or default_owner_id()
+        self.min_interval = 0.9 * interval if min_interval is None else min_interval
+        # A lease outlives the job timeout so a slow job is not taken over while it can still succeed
+        self.lease_seconds = job_timeout + 60
+
+        self._random = random.Random(seed)
+        self._max_workers = max_workers
+        self._executor = self._new_executor()
+        self._executor_stopped = False
+        self._status = {ticker: _new_status(ticker) for ticker in self.tickers}
+        self._inflight = {}
+        self._leased = set()
+        self._lock = threading.Lock()
+        # The scheduler thread and executor callbacks both write the status file
+        self._status_file_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._scrapers = None
+        self._cycle = {"started": None, "planned": 0, "sync": None}
+
+    @classmethod
+    def from_config(cls, config_file: str = "config/config.json", **kwargs) -> "ScrapeScheduler":
+        """
+        Build a scheduler from config.json (SCRAPE_TICKERS, SCRAPING_INTERVAL, SCRAPE_* settings).
+        """
+        config = ConfigLoader(config_file=config_file)
+        options = dict(
+            tickers=config.get("SCRAPE_TICKERS") or ["AAPL"],
+            interval=config.get("SCRAPING_INTERVAL", 3600),
+            job_timeout=config.get("SCRAPE_JOB_TIMEOUT", 600),
+            max_workers=config.get("SCRAPE_MAX_WORKERS", 2),
+            market_hours_only=config.get("SCRAPE_MARKET_HOURS_ONLY", True),
+            jitter=config.get("SCRAPE_JITTER", 0.5),
+        )
+        options.update(kwargs)
+        if "lease_store" not in options:
+            options["lease_store"] = build_lease_store()
+        return cls(**options)
+
+    def _get_scrapers(self):
+        if self._scrapers is None:
+            from scraper.scraper_factory import StockScraperFactory, NewsScraperFactory
+
+            stock_scraper = StockScraperFactory().create_scraper()
+            news_scraper = NewsScraperFactory().create_scraper(
+                collection_name=os.getenv("COLLECTION_NAME"),
+                scrape_num_articles=int(os.getenv("SCRAPE_NUM_ARTICLES", 1)),
+            )
+            self._scrapers = (stock_scraper, news_scraper)
+        return self._scrapers
+
+    def scrape_ticker(self, ticker: str):
+        """
+        Scrape daily bars (and minute bars with SCRAPE_INTRADAY) and news for one ticker.
+        Errors propagate so the job is marked failed.
+        """
+        stock_scraper, news_scraper = self._get_scrapers()
+        historical_data = stock_scraper.fetch_stock_data_sync(ticker)
+        stock_scraper.insert_data_into_db_sync(ticker, historical_data)
+        if SCRAPE_INTRADAY:
+            stock_scraper.insert_intraday_into_db(ticker, stock_scraper.fetch_intraday_sync(ticker))
+        news_scraper.scrape_articles(ticker)
+
+    @staticmethod
+    def _sync_vector_store():
+        from rag_graphs.news_rag_graph.ingestion import DocumentSyncManager
+        from rag_graphs.news_rag_graph.retention import run_retention_if_due
+
+        DocumentSyncManager().sync_documents()
+        run_retention_if_due()
+
+    def _open_windows(self, start: float) -> List[Tuple[float, float]]:
+        end = start + self.interval
+        if self.market_hours_only:
+            return nse_open_windows(start, end)
+        return [(start, end)]
+
+    def plan_cycle(self, now: float) -> List[Tuple[float, str]]:
+        """
+        Plan one cycle starting at ``now``.
+
+        Tickers are ordered stalest first (never scraped, then oldest success) and
+        given evenly sized slots across the usable time of the interval, each
+        starting at a random offset within the first ``jitter`` fraction of its slot.
+
+        Returns:
+            list: (epoch run time, ticker) pairs in run order; empty if there is
+            no usable time in the interval (e.g. the market is closed throughout).
+        """
+        windows = self._open_windows(now)
+        usable = sum(hi - lo for lo, hi in windows)
+        if usable <= 0 or not self.tickers:
+            return []
+
+        with self._lock:
+            ordered = sorted(self.tickers, key=lambda t: self._status[t]["last_success"] or 0.0)
+
+        slot = usable / len(ordered)
+        plan = []
+        for i, ticker in enumerate(ordered):
+            offset = i * slot + self._random.uniform(0, slot * self.jitter)
+            plan.append((self._at_offset(windows, offset), ticker))
+        return plan
+
+    @staticmethod
+    def _at_offset(windows: List[Tuple[float, float]], offset: float) -> float:
+        # Map an offset in "usable seconds" onto the wall clock
+        for lo, hi in windows:
+            if offset < hi - lo:
+                return lo + offset
+            offset -= hi - lo
+        return windows[-1][1]
+
+    def _update(self, ticker: str, **fields):
+        with self._lock:
+            self._status[ticker].update(fields)
+
+    def run_ticker(self, ticker: str) -> str:
+        """
+        Run the job for one ticker on the scheduler's executor, waiting at most ``job_timeout``.
+
+        Returns:
+            str: Final state recorded for this run.
+        """
+        previous = self._inflight.get(ticker)
+        if previous is not None and not previous.done():
+            logger.warning(f"Scrape of {ticker} still running from an earlier cycle; skipping.")
+            self._update(ticker, state="skipped", last_error="previous job still running")
+            return "skipped"
+
+        started = self.clock()
+        self._update(ticker, state="running", last_started=started, next_run=None)
+        future = self._executor.submit(self.job, ticker)
+        self._inflight[ticker] = future
+        try:
+            future.result(timeout=self.job_timeout)
+            state = "succeeded"
+            self._update(ticker, state=state, last_success=self.clock(), last_error=None)
+            self._release(ticker, state)
+        except FutureTimeout:
+            state = "timed_out"
+            logger.error(f"Scrape of {ticker} exceeded {self.job_timeout}s.")
+            self._update(ticker, state=state, last_error=f"timed out after {self.job_timeout}s")
+            future.add_done_callback(lambda f, t=ticker: self._finish_late(t, f))
+        except Exception as e:
+            state = "failed"
+            logger.error(f"Scrape of {ticker} failed: {e}")
+            self._update(ticker, state=state, last_error=str(e))
+            self._release(ticker, state, str(e))
+        self._update(ticker, last_finished=self.clock(), duration_s=round(self.clock() - started, 3))
+        self._write_status()
+        return state
+
+    def _finish_late(self, ticker: str, future):
+        # A timed out job may still complete; record the outcome when it does.
+        if future.exception() is None:
+            self._update(ticker, state="succeeded", last_success=self.clock(), last_error=None)
+            self._release(ticker, "succeeded")
+        else:
+            self._update(ticker, state="failed", last_error=str(future.exception()))
+            self._release(ticker, "failed", str(future.exception()))
+        self._write_status()
+
+    def _claim(self, task_keys: List[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Claim the stalest due task from the lease store.
+
+        Returns:
+            tuple: (coordinated, task key). ``coordinated`` is False when there is no
+            lease store or it is unreachable, in which case the caller runs its own plan.
+        """
+        if self.lease_store is None:
+            return False, None
+        try:
+            return True, self.lease_store.claim(self.owner, task_keys, self.lease_seconds, self.min_interval)
+        except Exception as e:
+            logger.warning(f"Could not claim a scrape lease ({e}); running the local plan.")
+            return False, None
+
+    def _release(self, task_key: str, state: str, error: Optional[str] = None):
+        # Only tasks claimed through the lease store have a lease to release
+        if self.lease_store is None or task_key not in self._leased:
+            return
+        self._leased.discard(task_key)
+        try:
+            if state == "succeeded":
+                released = self.lease_store.complete(task_key, self.owner)
+            else:
+                # Retry after one slot rather than immediately hammering a failing source
+                retry_after = self.interval / max(len(self.tickers), 1)
+                released = self.lease_store.fail(task_key, self.owner, error or state, retry_after)
+            if not released:
+                logger.warning(f"Lease on {task_key} expired before the job finished; another replica may rerun it.")
+        except Exception as e:
+            logger.warning(f"Could not release the lease on {task_key}: {e}")
+
+    def run_slot(self, planned: str) -> Optional[str]:
+        """
+        Run one slot of the plan. Without coordination this is the planned ticker;
+        with a lease store it is whichever ticker this replica manages to claim.
+
+        Returns:
+            str: Final state of the run, or None if no ticker was due.
+        """
+        coordinated, ticker = self._claim(self.tickers)
+        if not coordinated:
+            return self.run_ticker(planned)
+        if ticker is None:
+            # Another replica already covered the remaining work for this interval
+            with self._lock:
+                if self._status[planned]["state"] == "queued":
+                    self._status[planned].update(state="idle", next_run=None)
+            return None
+        self._leased.add(ticker)
+        return self.run_ticker(ticker)
+
+    def run_sync(self):
+        """
+        Run the per-cycle vector sync with the same timeout as ticker jobs. With a
+        lease store only the replica holding the sync lease runs it.
+        """
+        coordinated, task = self._claim([VECTOR_SYNC_TASK])
+        if coordinated and task is None:
+            return
+        if coordinated:
+            self._leased.add(task)
+        future = self._executor.submit(self.sync_documents)
+        try:
+            future.result(timeout=self.job_timeout)
+            self._cycle["sync"] = {"state": "succeeded", "finished": self.clock()}
+            self._release(VECTOR_SYNC_TASK, "succeeded")
+        except FutureTimeout:
+            self._cycle["sync"] = {"state": "timed_out", "finished": self.clock()}
+            logger.error(f"Vector sync exceeded {self.job_timeout}s.")
+        except Exception as e:
+            self._cycle["sync"] = {"state": "failed", "finished": self.clock(), "error": str(e)}
+            logger.error(f"Vector sync failed: {e}")
+            self._release(VECTOR_SYNC_TASK, "failed", str(e))
+        self._write_status()
+
+    def run_cycle(self, now: Optional[float] = None):
+        """
+        Plan and run one cycle, sleeping between jobs. Returns early if the scheduler is stopped.
+        """
+        now = self.clock() if now is None else now
+        plan = self.plan_cycle(now)
+        self._cycle.update(started=now, planned=len(plan))
+        if self.lease_store is not None:
+            try:
+                self.lease_store.ensure_tasks(self.tickers + [VECTOR_SYNC_TASK])
+            except Exception as e:
+                logger.warning(f"Could not register scrape leases: {e}")
+        if not plan:
+            logger.info("No NSE market hours in this scraping interval; skipping cycle.")
+            for ticker in self.tickers:
+                self._update(ticker, state="skipped", last_error="outside NSE market hours")
+            self._write_status()
+            return
+
+        for run_at, ticker in plan:
+            self._update(ticker, state="queued", next_run=run_at)
+        self._write_status()
+
+        ran_any = False
+        for run_at, ticker in plan:
+            if self._stop.wait(max(0.0, run_at - self.clock())):
+                return
+            if self.market_hours_only and not is_nse_market_open(self.clock()):
+                self._update(ticker, state="skipped", next_run=None, last_error="outside NSE market hours")
+                continue
+            if self.run_slot(ticker) is not None:
+                ran_any = True
+
+        if ran_any and not self._stop.is_set():
+            self.run_sync()
+
+    def run_forever(self):
+        """Run cycles back to back, one per interval, until ``stop`` is called."""
+        while not self._stop.is_set():
+            started = self.clock()
+            logger.info(f"Starting scraping cycle at {datetime.now()}")
+            self.run_cycle(started)
+            remaining = started + self.interval - self.clock()
+            logger.info(f"Scraping cycle completed at {datetime.now()}. Next cycle in {max(remaining, 0) / 3600:.2f} hours.")
+            if self._stop.wait(max(0.0, remaining)):
+                break
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="scrape")
+
+    def start(self):
+        """Run the scheduler on a background thread of the current process; it can be restarted after ``stop``."""
+        if self._executor_stopped:
+            self._executor, self._executor_stopped = self._new_executor(), False
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="scrape-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_stopped = True
+
+    def status(self) -> Dict[str, object]:
+        """Snapshot of the scheduler and per-ticker job states."""
+        with self._lock:
+            jobs = [dict(self._status[t]) for t in self.tickers]
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval": self.interval,
+            "market_hours_only": self.market_hours_only,
+            "market_open": is_nse_market_open(self.clock()),
+            "coordinated": self.lease_store is not None,
+            "owner": self.owner,
+            "cycle": dict(self._cycle),
+            "jobs": jobs,
+        }
+
+    def _write_status(self):
+        if not self.status_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.status_file) or ".", exist_ok=True)
+            tmp_file = f"{self.status_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with self._status_file_lock:
+                with open(tmp_file, "w") as file:
+                    json.dump(self.status(), file)
+                os.replace(tmp_file, self.status_file)
+        except OSError as e:
+            logger.warning(f"Could not write scrape status file: {e}")
+
+
+def read_status_file(status_file: str = SCRAPE_STATUS_FILE) -> Optional[Dict[str, object]]:
+    """Read the status written by a scheduler running in another process."""
+    try:
+        with open(status_file, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+_scheduler_instance = None
+
+
+def get_scrape_scheduler() -> ScrapeScheduler:
+    """Get or create the process-wide scrape scheduler."""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        _scheduler_instance = ScrapeScheduler.from_config()
+    return _scheduler_instance
+
+
+if __name__ == "__main__":
+    scheduler = get_scrape_scheduler()
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
@@ -1,14 +1,27 @@
 import asyncio
+import sys
 
+from db.intraday import IntradayStore
+from db.migrations.runner import ensure_migrated
 from db.postgres_db import PostgresDBClient
+from db.ohlcv_cache import get_ohlcv_cache
 from utils.logger import logger
 import yfinance as yf
 from dotenv import load_dotenv
 import os
 
+load_dotenv()
+
+STOCK_COLUMNS = ("ticker", "date", "open", "high", "low", "close", "volume")
+# Minute bars fetched per intraday scrape; Yahoo serves at most 7 days of 1m bars per request
+INTRADAY_PERIOD = os.getenv("INTRADAY_PERIOD", "1d")
+
+
 class StockDataScraper:
     def __init__(self):
         self.db_client = self.initialize_db_client()
+        self.ohlcv_cache = get_ohlcv_cache()
+        self.intraday_store = IntradayStore(self.db_client)
         self.db_available = True
         try:
             # Attempt a connection early; mark unavailable if it fails
@@ -44,65 +57,93 @@ class StockDataScraper:
         ticker_data = yf.Ticker(ticker)
         return ticker_data.history(period=period)
 
+    def fetch_intraday_sync(self, ticker, period=INTRADAY_PERIOD):
+        """
+        Synchronously fetches one-minute bars for a given ticker.
+        """
+        ticker_data = yf.Ticker(ticker)
+        return ticker_data.history(period=period, interval="1m")
+
     def _ensure_table_exists(self):
-        ddl = (
-            """
-            CREATE TABLE IF NOT EXISTS stock_data (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(20) NOT NULL,
-                date DATE NOT NULL,
-                open DOUBLE PRECISION,
-                high DOUBLE PRECISION,
-                low DOUBLE PRECISION,
-                close DOUBLE PRECISION,
-                volume BIGINT
-            );
-            """
-        )
+        """Create or migrate the stock_data table (once per process); see db/migrations."""
         try:
-            self.db_client.execute_query(ddl)
+            ensure_migrated(self.db_client)
         except Exception as e:
-            logger.error(f"Error ensuring stock_data table exists: {e}")
+            logger.error(f"Error migrating the stock_data schema: {e}")
             raise
 
     def insert_data_into_db(self, ticker, historical_data):
         """
-        Inserts historical stock data for a given ticker into the database using PostgresDBClient.
+        Upserts historical stock data for a given ticker into the database using PostgresDBClient.
+        Bars already stored for the same ticker and date are updated, so re-scraping a period
+        does not duplicate it.
         """
         if not self.db_available:
             logger.info(f"Skipping DB insert for {ticker}: PostgreSQL unavailable.")
             return
         try:
-            # Create table if missing
+            # Create or migrate the table if needed
             self._ensure_table_exists()
-            for date, row in historical_data.iterrows():
+            rows = [
                 # Normalize numpy/pandas types to native Python types for psycopg2
-                data = {
-                    "ticker": str(ticker),
-                    "date": date.date(),
-                    "open": float(row["Open"]) if row.get("Open") is not None else None,
-                    "high": float(row["High"]) if row.get("High") is not None else None,
-                    "low": float(row["Low"]) if row.get("Low") is not None else None,
-                    "close": float(row["Close"]) if row.get("Close") is not None else None,
-                    "volume": int(row["Volume"]) if row.get("Volume") is not None else None,
-                }
-                self.db_client.create("stock_data", data)
+                (
+                    str(ticker),
+                    date.date(),
+                    float(row["Open"]) if row.get("Open") is not None else None,
+                    float(row["High"]) if row.get("High") is not None else None,
+                    float(row["Low"]) if row.get("Low") is not None else None,
+                    float(row["Close"]) if row.get("Close") is not None else None,
+                    int(row["Volume"]) if row.get("Volume") is not None else None,
+                )
+                for date, row in historical_data.iterrows()
+            ]
+            self.db_client.upsert_many("stock_data", STOCK_COLUMNS, rows, ("ticker", "date"))
             logger.info(f"Data for {ticker} successfully inserted into the database.")
         except Exception as e:
             logger.error(f"Error inserting data for {ticker}: {e}")
             raise
+        self.update_ohlcv_cache(ticker, historical_data)
+
+    def insert_intraday_into_db(self, ticker, minute_bars):
+        """
+        Upserts one-minute bars for a given ticker and updates their 5m/15m/1h/1d rollups
+        (see db/intraday.py).
+        """
+        if not self.db_available:
+            logger.info(f"Skipping intraday insert for {ticker}: PostgreSQL unavailable.")
+            return
+        try:
+            self._ensure_table_exists()
+            self.intraday_store.upsert_minute_bars(str(ticker), minute_bars)
+        except Exception as e:
+            logger.error(f"Error inserting intraday bars for {ticker}: {e}")
+            raise
+
+    def update_ohlcv_cache(self, ticker, historical_data):
+        """
+        Mirror freshly inserted rows into the columnar OHLCV cache used by the read endpoints.
+        A cache failure never fails the scrape; the API falls back to PostgreSQL.
+        """
+        try:
+            self.ohlcv_cache.merge_history(ticker, historical_data)
+        except Exception as e:
+            logger.warning(f"Failed to update OHLCV cache for {ticker}: {e}")
 
     # Backwards-compatible alias for tests
     def insert_data_into_db_sync(self, ticker, historical_data):
         return self.insert_data_into_db(ticker, historical_data)
 
-    def scrape_all_tickers(self, tickers):
+    def scrape_all_tickers(self, tickers, intraday=False):
         """
-        Fetches and stores stock data for all tickers.
+        Fetches and stores stock data for all tickers: daily bars, or one-minute bars
+        (with their rollups) when ``intraday`` is set.
         """
         for ticker in tickers:
             try:
-                logger.info(f"Scraping data for {ticker}...")
+                logger.info(f"Scraping {'intraday' if intraday else 'daily'} data for {ticker}...")
+                if intraday:
+                    self.insert_intraday_into_db(ticker, self.fetch_intraday_sync(ticker))
+                    continue
                 historical_data = self.fetch_stock_data_sync(ticker)
                 # Use sync alias for test compatibility
                 self.insert_data_into_db_sync(ticker, historical_data)
@@ -125,4 +166,4 @@ if __name__ == "__main__":
     ]
 
     scraper = StockDataScraper()
-    scraper.scrape_all_tickers(nifty_50_tickers)
+    scraper.scrape_all_tickers(nifty_50_tickers, intraday="--intraday" in sys.argv)
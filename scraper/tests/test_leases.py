@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import time
+
+from scraper.leases import SQLiteLeaseStore
+from scraper.scheduler import ScrapeScheduler, VECTOR_SYNC_TASK
+
+TICKERS = [f"T{i:02d}" for i in range(12)]
+
+
+def _replica(db_path, log_path):
+    """
+    One API replica: runs a single coordinated cycle and logs the work it did.
+    ``min_interval`` is pinned because replicas start up at different times.
+    """
+    def record(task):
+        with open(log_path, "a") as file:
+            file.write(f"{task}\n")
+        time.sleep(0.02)
+
+    scheduler = ScrapeScheduler(TICKERS, interval=1.5, job=record, sync_documents=lambda: record(VECTOR_SYNC_TASK),
+                                status_file=None, market_hours_only=False,
+                                lease_store=SQLiteLeaseStore(db_path), min_interval=60)
+    scheduler.run_cycle()
+    scheduler.stop()
+
+
+def test_replicas_split_work_without_duplicates(tmp_path):
+    db_path, log_path = str(tmp_path / "leases.db"), str(tmp_path / "work.log")
+    SQLiteLeaseStore(db_path).ensure_tasks(TICKERS + [VECTOR_SYNC_TASK])
+
+    ctx = multiprocessing.get_context("spawn")
+    replicas = [ctx.Process(target=_replica, args=(db_path, log_path)) for _ in range(4)]
+    for replica in replicas:
+        replica.start()
+    for replica in replicas:
+        replica.join(60)
+        assert replica.exitcode == 0
+
+    with open(log_path) as file:
+        done = file.read().split()
+    # Every ticker and the vector sync ran exactly once across all replicas
+    assert sorted(done) == sorted(TICKERS + [VECTOR_SYNC_TASK])
+    assert all(row["last_completed_at"] is not None for row in SQLiteLeaseStore(db_path).snapshot())
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    store = SQLiteLeaseStore(os.path.join(tmp_path, "leases.db"))
+    store.ensure_tasks(["A", "B"])
+
+    assert store.claim("dead", ["A"], lease_seconds=0.1, min_interval=60) == "A"
+    assert store.claim("alive", ["A"], lease_seconds=0.1, min_interval=60) is None
+    time.sleep(0.15)
+    assert store.claim("alive", ["A"], lease_seconds=10, min_interval=60) == "A"
+
+    # The dead owner lost its lease and cannot record completion
+    assert not store.complete("A", "dead")
+    assert store.complete("A", "alive")
+    assert store.claim("alive", ["A"], lease_seconds=10, min_interval=60) is None
+
+    # A failed task is retried only after its back-off
+    assert store.claim("alive", ["B"], lease_seconds=10, min_interval=60) == "B"
+    assert store.fail("B", "alive", "boom", retry_after=0.1)
+    assert store.claim("other", ["B"], lease_seconds=10, min_interval=60) is None
+    time.sleep(0.15)
+    assert store.claim("other", ["B"], lease_seconds=10, min_interval=60) == "B"
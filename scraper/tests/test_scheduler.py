@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import datetime
+
+from scraper.scheduler import ScrapeScheduler, NSE_TIMEZONE, is_nse_market_open, nse_open_windows, read_status_file
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=NSE_TIMEZONE).timestamp()
+
+
+def test_market_hours():
+    assert is_nse_market_open(_ts(2024, 1, 10, 10, 0))       # Wednesday
+    assert not is_nse_market_open(_ts(2024, 1, 10, 16, 0))   # after close
+    assert not is_nse_market_open(_ts(2024, 1, 13, 11, 0))   # Saturday
+
+    windows = nse_open_windows(_ts(2024, 1, 12, 12, 0), _ts(2024, 1, 15, 10, 15))
+    assert windows == [(_ts(2024, 1, 12, 12, 0), _ts(2024, 1, 12, 15, 30)),
+                       (_ts(2024, 1, 15, 9, 15), _ts(2024, 1, 15, 10, 15))]
+
+
+def test_plan_puts_stalest_first_and_stays_in_market_hours():
+    scheduler = ScrapeScheduler(["A", "B", "C"], interval=86400, job=lambda t: None,
+                                status_file=None, seed=1)
+    scheduler._status["A"]["last_success"] = 300.0
+    scheduler._status["C"]["last_success"] = 100.0
+
+    now = _ts(2024, 1, 10, 8, 0)
+    plan = scheduler.plan_cycle(now)
+
+    assert [ticker for _, ticker in plan] == ["B", "C", "A"]
+    assert all(is_nse_market_open(run_at) for run_at, _ in plan)
+    assert [run_at for run_at, _ in plan] == sorted(run_at for run_at, _ in plan)
+
+
+def test_plan_is_empty_when_market_closed_all_interval():
+    scheduler = ScrapeScheduler(["A"], interval=3600, job=lambda t: None, status_file=None)
+    assert scheduler.plan_cycle(_ts(2024, 1, 13, 11, 0)) == []
+
+
+def test_run_ticker_records_success_failure_and_timeout():
+    release = threading.Event()
+
+    def job(ticker):
+        if ticker == "FAIL":
+            raise RuntimeError("boom")
+        if ticker == "SLOW":
+            release.wait(5)
+
+    scheduler = ScrapeScheduler(["OK", "FAIL", "SLOW"], interval=60, job=job, job_timeout=0.2,
+                                status_file=None, market_hours_only=False)
+    assert scheduler.run_ticker("OK") == "succeeded"
+    assert scheduler.run_ticker("FAIL") == "failed"
+    assert scheduler.run_ticker("SLOW") == "timed_out"
+    # The timed out job is still running, so the next run is skipped
+    assert scheduler.run_ticker("SLOW") == "skipped"
+
+    release.set()
+    time.sleep(0.2)
+    jobs = {job["ticker"]: job for job in scheduler.status()["jobs"]}
+    assert jobs["OK"]["last_success"] is not None
+    assert jobs["FAIL"]["last_error"] == "boom"
+    assert jobs["SLOW"]["state"] == "succeeded"
+    scheduler.stop()
+
+
+def test_run_cycle_runs_every_ticker_then_syncs():
+    ran, synced = [], []
+    scheduler = ScrapeScheduler(["A", "B"], interval=0.2, job=ran.append, sync_documents=lambda: synced.append(1),
+                                status_file=None, market_hours_only=False)
+    scheduler.run_cycle()
+    assert sorted(ran) == ["A", "B"]
+    assert synced == [1]
+    scheduler.stop()
+
+
+def test_scheduler_can_be_started_again_after_stop():
+    ran = []
+    scheduler = ScrapeScheduler(["A"], interval=0.2, job=ran.append, sync_documents=lambda: None,
+                                status_file=None, market_hours_only=False)
+    scheduler.stop()
+    # A second app lifespan in the same process starts the singleton again
+    scheduler.start()
+    deadline = time.monotonic() + 5
+    while not ran and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+    assert ran[:1] == ["A"]
+
+
+def test_concurrent_status_writes_leave_a_complete_file(tmp_path):
+    status_file = tmp_path / "status.json"
+    scheduler = ScrapeScheduler(["A", "B"], interval=60, job=lambda t: None, status_file=str(status_file),
+                                market_hours_only=False)
+    threads = [threading.Thread(target=lambda: [scheduler._write_status() for _ in range(50)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [job["ticker"] for job in read_status_file(str(status_file))["jobs"]] == ["A", "B"]
+    assert [p.name for p in tmp_path.iterdir()] == ["status.json"]
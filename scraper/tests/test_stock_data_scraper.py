@@ -14,3 +14,23 @@ def test_scrape_all_tickers(mock_insert):
     scraper = StockDataScraper()
     scraper.scrape_all_tickers(["AAPL", "MSFT"])
     assert mock_insert.call_count == 2
+
+@patch("scraper.stock_data_scraper.ensure_migrated")
+def test_insert_upserts_on_ticker_and_date(mock_migrated):
+    import pandas as pd
+    from unittest.mock import MagicMock
+
+    scraper = StockDataScraper()
+    scraper.db_available = True
+    scraper.db_client = MagicMock()
+    scraper.ohlcv_cache = MagicMock()
+    history = pd.DataFrame({"Open": [1.0, 2.0], "High": [1.5, 2.5], "Low": [0.5, 1.5], "Close": [1.2, 2.2],
+                            "Volume": [100, 200]}, index=pd.to_datetime(["2024-03-04", "2024-03-05"]))
+    scraper.insert_data_into_db("TCS.NS", history)
+
+    mock_migrated.assert_called_once_with(scraper.db_client)
+    table, columns, rows, conflict = scraper.db_client.upsert_many.call_args.args
+    assert (table, conflict) == ("stock_data", ("ticker", "date"))
+    assert dict(zip(columns, rows[1])) == {"ticker": "TCS.NS", "date": pd.Timestamp("2024-03-05").date(),
+                                           "open": 2.0, "high": 2.5, "low": 1.5, "close": 2.2, "volume": 200}
+    assert scraper.db_client.create.call_count == 0
@@ -1,45 +1,273 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 
+from utils.metrics import current_node
+
 # Define the log directory
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# "sync" writes from the logging thread (the default); "queue" hands records to a background writer
+LOG_MODE = os.getenv("LOG_MODE", "sync").lower()
+# File format: "text" or "json" (one JSON object per line); queue mode defaults to json
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json" if LOG_MODE == "queue" else "text").lower()
+# Queue mode rotation: by size and at least once per interval
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+LOG_ROTATE_INTERVAL = int(os.getenv("LOG_ROTATE_INTERVAL", str(24 * 3600)))
+# Queue mode: at most this many identical node banners (---X---) per second; 0 keeps all
+LOG_BANNER_RATE = float(os.getenv("LOG_BANNER_RATE", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("log_request_id", default="")
+
+
+def set_request_id(request_id: str) -> contextvars.Token:
+    """Tag log records emitted in the current context with ``request_id``."""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token):
+    _request_id.reset(token)
+
+
+def get_request_id() -> str:
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps records with the request id and the running graph node. Runs on the
+    logging thread, before the record crosses the queue and loses its context.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.graph, record.node = current_node()
+        return True
+
+
+class BannerSampler(logging.Filter):
+    """
+    Rate-limits node banners (``---GRADE DOCUMENTS---``): each distinct banner
+    passes at most ``rate`` times per second. The next banner that passes carries
+    the number dropped in between as ``sampled_out``.
+
+    Args:
+        rate (float): Banners per second allowed per distinct message.
+    """
+    BANNER = re.compile(r"^---.*---$")
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        # message -> [tokens, last refill, dropped]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno > logging.INFO or not isinstance(record.msg, str) \
+                or not self.BANNER.match(record.msg):
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(record.msg, [self.rate, now, 0])
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            record.sampled_out, bucket[2] = bucket[2], 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and context fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("request_id", "graph", "node", "sampled_out"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotates when the file would exceed ``maxBytes`` or when ``interval`` seconds
+    have passed since the last rotation, keeping ``backupCount`` numbered backups.
+    """
+    def __init__(self, filename, maxBytes: int, backupCount: int, interval: int, encoding="utf-8"):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval > 0 else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            if os.path.isfile(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return True
+            self.rollover_at = time.time() + self.interval
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rollover_at is not None:
+            self.rollover_at = time.time() + self.interval
+
+
+class _PlainQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message for the JSON writer."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block the request thread on a slow disk; count what was dropped
+            _queue_state["dropped"] += 1
+
+
+class _BlockingStopListener(QueueListener):
+    """QueueListener whose stop waits for room in a full queue instead of raising."""
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class _FileRouter(logging.Handler):
+    """Writes each record to ``logs/<logger name>.log``, like the per-logger files of sync mode."""
+    def __init__(self, formatter: logging.Formatter):
+        super().__init__(logging.DEBUG)
+        self._formatter = formatter
+        self._files = {}
+
+    def emit(self, record: logging.LogRecord):
+        handler = self._files.get(record.name)
+        if handler is None:
+            handler = SizeAndTimeRotatingFileHandler(os.path.join(LOG_DIR, f"{record.name}.log"),
+                                                     LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_INTERVAL)
+            handler.setFormatter(self._formatter)
+            self._files[record.name] = handler
+        handler.handle(record)
+
+    def close(self):
+        for handler in self._files.values():
+            handler.close()
+        super().close()
+
+
+_queue_state = {"queue": None, "listener": None, "dropped": 0}
+_queue_lock = threading.Lock()
+
+
+def _file_formatter() -> logging.Formatter:
+    return JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+
+
+def _get_log_queue() -> queue.Queue:
+    """Start the process-wide background writer on first use."""
+    with _queue_lock:
+        if _queue_state["queue"] is None:
+            log_queue = queue.Queue(LOG_QUEUE_SIZE)
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+            listener = _BlockingStopListener(log_queue, console_handler, _FileRouter(_file_formatter()),
+                                     respect_handler_level=True)
+            listener.start()
+            atexit.register(stop_queue_logging)
+            _queue_state.update(queue=log_queue, listener=listener)
+        return _queue_state["queue"]
+
+
+def stop_queue_logging():
+    """Flush and stop the background writer (registered with atexit)."""
+    with _queue_lock:
+        listener = _queue_state["listener"]
+        if listener is None:
+            return
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        _queue_state.update(queue=None, listener=None)
+
+
+def queue_logging_stats() -> dict:
+    log_queue = _queue_state["queue"]
+    return {"queued": log_queue.qsize() if log_queue else 0, "dropped": _queue_state["dropped"]}
+
+
 # Configure the logger
-def setup_logger(name):
+def setup_logger(name, mode=None):
     """
     Set up a logger with a specific name.
 
     Args:
         name (str): Name of the logger (usually __name__ of the module).
+        mode (str): "sync" or "queue"; defaults to ``LOG_MODE``.
 
     Returns:
         logging.Logger: Configured logger instance.
     """
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)  # Log everything, including debug-level messages
+    if logger.handlers:  # Avoid duplicate handlers on this logger
+        return logger
+
+    if (mode or LOG_MODE) == "queue":
+        # Only the enqueue happens on the calling thread; formatting, writing and
+        # rotation happen on the background writer
+        queue_handler = _PlainQueueHandler(_get_log_queue())
+        queue_handler.addFilter(BannerSampler(LOG_BANNER_RATE))
+        queue_handler.addFilter(ContextFilter())
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+        return logger
 
     # Console Handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)  # Console logs only for info and above
-    console_format = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+    console_format = logging.Formatter(TEXT_FORMAT)
     console_handler.setFormatter(console_format)
 
     # File Handler (Rotating)
     log_file = os.path.join(LOG_DIR, f"{name}.log")
     file_handler = RotatingFileHandler(log_file, maxBytes=100 * 1024, backupCount=3)
     file_handler.setLevel(logging.DEBUG)
-    file_format = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(file_format)
+    file_handler.setFormatter(_file_formatter())
+    if LOG_FORMAT == "json":
+        file_handler.addFilter(ContextFilter())
 
     # Add Handlers
-    if not logger.handlers:  # Avoid duplicate handlers on this logger
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
 
     return logger
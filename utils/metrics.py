@@ -0,0 +1,322 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are labelled by graph and node. Work done inside a node
+(LLM calls, embeddings, database queries) is attributed to it through a context
+variable that the graph instrumentation (``rag_graphs/instrumentation.py``) sets
+when a node starts; code outside any graph is labelled ``graph="", node=""``.
+
+Each API request can also collect a timing breakdown (``RequestTimings``), which
+the API returns as a ``Server-Timing`` header when asked for it.
+
+The module has no third-party dependencies, so low-level code such as the
+database client can record into it cheaply.
+"""
+import bisect
+import contextvars
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; spans fast DB lookups to slow local-model generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000)
+
+_current_node: contextvars.ContextVar[Tuple[str, str]] = contextvars.ContextVar("metrics_node", default=("", ""))
+_request_timings: contextvars.ContextVar[Optional["RequestTimings"]] = contextvars.ContextVar(
+    "request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Sequence[str] = (), amount: float = 1.0):
+        with self._lock:
+            self._values[tuple(labels)] += amount
+
+    def value(self, labels: Sequence[str] = ()) -> float:
+        with self._lock:
+            return self._values.get(tuple(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Sequence[str], value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(tuple(labels))
+            if series is None:
+                series = self._series[tuple(labels)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels: Sequence[str] = ()) -> int:
+        with self._lock:
+            series = self._series.get(tuple(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and renders them for ``GET /metrics``.
+    Collectors are callables returning extra (name, type, help, samples) groups
+    computed at scrape time, e.g. gauges read from the LLM gateway.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, List[str]]]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(self, collector: Callable[[], List[Tuple[str, str, str, List[str]]]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        groups = [(m.name, m.kind, m.documentation, m.samples()) for m in metrics]
+        for collector in collectors:
+            try:
+                groups.extend(collector())
+            except Exception:
+                # A broken collector must not take the whole scrape down
+                continue
+        lines = []
+        for name, kind, documentation, samples in groups:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+_registry_instance = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get or create the process-wide metrics registry."""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = MetricsRegistry()
+    return _registry_instance
+
+
+NODE_LABELS = ("graph", "node")
+
+_registry = get_metrics_registry()
+GRAPH_RUN_SECONDS = _registry.histogram("graph_run_duration_seconds", "Wall time of graph runs.", ("graph",))
+GRAPH_NODE_SECONDS = _registry.histogram("graph_node_duration_seconds", "Wall time of node executions.", NODE_LABELS)
+GRAPH_NODE_ERRORS = _registry.counter("graph_node_errors_total", "Node executions that raised.", NODE_LABELS)
+LLM_CALLS = _registry.counter("llm_calls_total", "LLM generations.", NODE_LABELS)
+LLM_SECONDS = _registry.histogram("llm_call_duration_seconds", "Wall time of LLM calls.", NODE_LABELS)
+LLM_PROMPT_TOKENS = _registry.counter("llm_prompt_tokens_total", "Prompt tokens evaluated.", NODE_LABELS)
+LLM_COMPLETION_TOKENS = _registry.counter("llm_completion_tokens_total", "Tokens generated.", NODE_LABELS)
+EMBEDDING_CALLS = _registry.counter("embedding_calls_total", "Embedding requests.", NODE_LABELS)
+EMBEDDING_TEXTS = _registry.counter("embedding_texts_total", "Texts embedded.", NODE_LABELS)
+EMBEDDING_SECONDS = _registry.histogram("embedding_duration_seconds", "Wall time of embedding requests.", NODE_LABELS)
+DB_SECONDS = _registry.histogram("db_query_duration_seconds", "Wall time of database queries.", NODE_LABELS)
+DB_ROWS = _registry.histogram("db_query_rows", "Rows returned per database query.", NODE_LABELS, ROW_BUCKETS)
+
+
+class RequestTimings:
+    """
+    Per-request timing breakdown: wall time per ``graph.node`` plus totals of
+    LLM, embedding and database time. Rendered as a ``Server-Timing`` header.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._entries: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, count: int = 1):
+        with self._lock:
+            entry = self._entries.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+
+    def entries(self) -> Dict[str, Tuple[float, int]]:
+        with self._lock:
+            return {name: (seconds, count) for name, (seconds, count) in self._entries.items()}
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, (seconds, count) in self.entries().items():
+            metric = "".join(c if c.isalnum() or c in "_-" else "_" for c in name)
+            parts.append(f'{metric};dur={seconds * 1000:.1f};desc="{name} x{count}"')
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start_request_timings() -> Tuple[RequestTimings, contextvars.Token]:
+    """Begin collecting a timing breakdown for the current request."""
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def stop_request_timings(token: contextvars.Token):
+    _request_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _request_timings.get()
+
+
+def set_current_node(graph: str, node: str) -> contextvars.Token:
+    """Attribute work in the current context to ``graph``/``node``."""
+    return _current_node.set((graph, node))
+
+
+def current_node() -> Tuple[str, str]:
+    return _current_node.get()
+
+
+@contextmanager
+def node_context(graph: str, node: str) -> Iterator[None]:
+    """Attribute work inside the block to ``graph``/``node``, for chains run outside an instrumented graph."""
+    token = set_current_node(graph, node)
+    try:
+        yield
+    finally:
+        _current_node.reset(token)
+
+
+def _add_timing(name: str, seconds: float, count: int = 1):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds, count)
+
+
+def record_node(graph: str, node: str, seconds: float, error: bool = False):
+    GRAPH_NODE_SECONDS.observe((graph, node), seconds)
+    if error:
+        GRAPH_NODE_ERRORS.inc((graph, node))
+    _add_timing(f"{graph}.{node}", seconds)
+
+
+def record_graph_run(graph: str, seconds: float):
+    GRAPH_RUN_SECONDS.observe((graph,), seconds)
+
+
+def record_llm_call(seconds: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+                    node: Optional[Tuple[str, str]] = None):
+    labels = node or _current_node.get()
+    LLM_CALLS.inc(labels)
+    LLM_SECONDS.observe(labels, seconds)
+    if prompt_tokens:
+        LLM_PROMPT_TOKENS.inc(labels, prompt_tokens)
+    if completion_tokens:
+        LLM_COMPLETION_TOKENS.inc(labels, completion_tokens)
+    _add_timing("llm", seconds)
+
+
+def record_embedding(seconds: float, texts: int):
+    labels = _current_node.get()
+    EMBEDDING_CALLS.inc(labels)
+    EMBEDDING_TEXTS.inc(labels, texts)
+    EMBEDDING_SECONDS.observe(labels, seconds)
+    _add_timing("embedding", seconds)
+
+
+def record_db_query(seconds: float, rows: int = 0):
+    labels = _current_node.get()
+    DB_SECONDS.observe(labels, seconds)
+    DB_ROWS.observe(labels, rows)
+    _add_timing("db", seconds)
+
+
+@contextmanager
+def timed_db_query() -> Iterator[list]:
+    """
+    Time a database query; append the row count to the yielded list to record it.
+
+    Example:
+        with timed_db_query() as rows:
+            results = cursor.fetchall()
+            rows.append(len(results))
+    """
+    rows: list = []
+    started = time.perf_counter()
+    try:
+        yield rows
+    finally:
+        record_db_query(time.perf_counter() - started, sum(rows))
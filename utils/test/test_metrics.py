@@ -0,0 +1,45 @@
+from utils import metrics
+from utils.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", ("graph",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(("news",), value)
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{graph="news",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{graph="news",le="1"} 2' in text
+    assert 'demo_seconds_bucket{graph="news",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{graph="news"} 3' in text
+
+
+def test_work_is_attributed_to_the_current_node():
+    labels = ("demo", "fetch")
+    before = metrics.DB_SECONDS.count(labels)
+    token = metrics.set_current_node(*labels)
+    try:
+        with metrics.timed_db_query() as rows:
+            rows.append(42)
+    finally:
+        metrics._current_node.reset(token)
+
+    assert metrics.DB_SECONDS.count(labels) == before + 1
+    assert metrics.current_node() == ("", "")
+
+
+def test_request_timings_render_server_timing():
+    timings, token = metrics.start_request_timings()
+    try:
+        metrics.record_node("news", "retrieve_news", 0.012)
+        metrics.record_llm_call(0.5, prompt_tokens=10, completion_tokens=2, node=("news", "generate_result"))
+    finally:
+        metrics.stop_request_timings(token)
+
+    header = timings.server_timing()
+    assert 'news_retrieve_news;dur=12.0;desc="news.retrieve_news x1"' in header
+    assert "llm;dur=500.0" in header
+    assert "total;dur=" in header
+    assert metrics.current_timings() is None
@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+import time
+
+from utils import logger_config
+from utils.logger_config import BannerSampler, SizeAndTimeRotatingFileHandler, setup_logger
+
+
+def test_queue_mode_writes_json_lines_with_request_ids(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger_config, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(logger_config, "LOG_FORMAT", "json")
+    logger = setup_logger("test_queue_logger", mode="queue")
+    assert [type(h) for h in logger.handlers] == [logger_config._PlainQueueHandler]
+
+    token = logger_config.set_request_id("req-1")
+    try:
+        logger.info("processed %d rows", 3)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        logger_config.reset_request_id(token)
+    logger_config.stop_queue_logging()
+
+    with open(os.path.join(tmp_path, "test_queue_logger.log")) as file:
+        lines = [json.loads(line) for line in file]
+    assert lines[0]["msg"] == "processed 3 rows" and lines[0]["request_id"] == "req-1"
+    assert lines[1]["level"] == "ERROR" and "ValueError: boom" in lines[1]["exc"]
+
+
+def test_banner_sampler_rate_limits_identical_banners():
+    sampler = BannerSampler(rate=2)
+
+    def record(msg):
+        return logging.LogRecord("x", logging.INFO, __file__, 1, msg, None, None)
+
+    passed = [sampler.filter(record("---GRADE---")) for _ in range(10)]
+    assert passed.count(True) == 2
+    # Other messages and other banners are not affected
+    assert sampler.filter(record("---RETRIEVE---"))
+    assert all(sampler.filter(record("graded 3 documents")) for _ in range(10))
+
+
+def test_rotation_by_time_as_well_as_size(tmp_path):
+    path = str(tmp_path / "app.log")
+    handler = SizeAndTimeRotatingFileHandler(path, maxBytes=10_000, backupCount=2, interval=3600)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.emit(logging.LogRecord("x", logging.INFO, __file__, 1, "first", None, None))
+
+    handler.rollover_at = time.time() - 1
+    handler.emit(logging.LogRecord("x", logging.INFO, __file__, 1, "second", None, None))
+    handler.close()
+
+    assert os.path.exists(path + ".1")
+    with open(path) as file:
+        assert file.read() == "second\n"
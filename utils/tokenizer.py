@@ -0,0 +1,66 @@
+"""
+Process-wide tokenizer used to budget prompt sizes.
+
+Loads the tiktoken encoding once (``TOKENIZER_ENCODING``). When tiktoken or its
+encoding file is unavailable (e.g. offline hosts) it falls back to a regex
+word/punctuation split, which tracks BPE counts closely enough for budgeting.
+Token counts of individual texts are memoized, since the same news chunks are
+packed into prompts again and again.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import List
+
+from utils.logger import logger
+
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+_PIECE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+class Tokenizer:
+    """
+    Thin wrapper over a tiktoken encoding with a regex fallback.
+    """
+    def __init__(self, encoding_name: str = TOKENIZER_ENCODING):
+        self.encoding = None
+        try:
+            import tiktoken
+
+            self.encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding '{encoding_name}' unavailable ({e}); using approximate token counts.")
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(_PIECE.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` that fits in ``max_tokens``."""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens: List[int] = self.encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+        for i, match in enumerate(_PIECE.finditer(text)):
+            if i == max_tokens:
+                return text[:match.start()].rstrip()
+        return text
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Tokenizer:
+    """Get or create the process-wide tokenizer."""
+    return Tokenizer()
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """Memoized token count of ``text``."""
+    return get_tokenizer().count(text)